@@ -0,0 +1,181 @@
+"""
+Versioned in-cache index of employee location assignments.
+
+Administrative reference metadata only — like the assignment rows it is
+built from, the index must not be used for authorization or operational
+scoping (farmer visibility, visits, tracking).
+
+The index answers, with one cache read:
+
+- which employees have an assignment row at a district / taluk / village
+  (``employee_ids_for``; the admin assignment-list filters), and
+- which villages an employee's assignments cover once district- and
+  taluk-level rows are expanded (``effective_village_ids``), and the
+  reverse (``employees_covering_village``).
+
+Id sets are stored as sorted ``array('I')`` values, so the whole index for a
+few thousand employees pickles into a few hundred kilobytes.
+
+Every assignment write bumps a version key (accounts.signals); the index is
+stored under its version, so readers never see a half-updated index, and the
+next read after a bump rebuilds it with two queries.
+``replace_employee_location_assignments`` rebuilds it right after commit.
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import EmployeeLocationAssignment
+from masters.models import Village
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "accounts:assignment_index:version"
+INDEX_TTL = 24 * 60 * 60
+
+_EMPTY = array("I")
+
+
+def _ids(values: Iterable[int]) -> array:
+    return array("I", sorted(set(values)))
+
+
+@dataclass
+class AssignmentIndex:
+    version: int
+    by_district: dict[int, array] = field(default_factory=dict)
+    by_taluk: dict[int, array] = field(default_factory=dict)
+    by_village: dict[int, array] = field(default_factory=dict)
+    villages_by_employee: dict[int, array] = field(default_factory=dict)
+    employees_by_village: dict[int, array] = field(default_factory=dict)
+
+    def employee_ids_for(
+        self,
+        *,
+        district_id: Optional[int] = None,
+        taluk_id: Optional[int] = None,
+        village_id: Optional[int] = None,
+    ) -> Optional[set[int]]:
+        """Employees with a row at every given level; None when no level is given."""
+        result: Optional[set[int]] = None
+        for level, key in (
+            (self.by_district, district_id),
+            (self.by_taluk, taluk_id),
+            (self.by_village, village_id),
+        ):
+            if key:
+                ids = set(level.get(key, _EMPTY))
+                result = ids if result is None else result & ids
+        return result
+
+    def effective_village_ids(self, employee_id: int) -> array:
+        return self.villages_by_employee.get(employee_id, _EMPTY)
+
+    def employees_covering_village(self, village_id: int) -> array:
+        return self.employees_by_village.get(village_id, _EMPTY)
+
+
+def _index_key(version: int) -> str:
+    return f"accounts:assignment_index:v{version}"
+
+
+def current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return int(version)
+
+
+def _bump_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_assignment_index() -> None:
+    """Retire the stored index now and again after commit."""
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+def build_assignment_index(version: int) -> AssignmentIndex:
+    """Two queries: active assignment rows, then the villages they cover."""
+    rows = list(
+        EmployeeLocationAssignment.objects.filter(is_active=True).values_list(
+            "employee_id", "district_id", "taluk_id", "village_id"
+        )
+    )
+    by_district, by_taluk, by_village = defaultdict(list), defaultdict(list), defaultdict(list)
+    whole_districts, whole_taluks = defaultdict(set), defaultdict(set)
+    effective: dict[int, set[int]] = defaultdict(set)
+    for employee_id, district_id, taluk_id, village_id in rows:
+        by_district[district_id].append(employee_id)
+        if taluk_id:
+            by_taluk[taluk_id].append(employee_id)
+        if village_id:
+            by_village[village_id].append(employee_id)
+            effective[employee_id].add(village_id)
+        elif taluk_id:
+            whole_taluks[taluk_id].add(employee_id)
+        else:
+            whole_districts[district_id].add(employee_id)
+
+    if whole_districts or whole_taluks:
+        villages = Village.objects.filter(
+            Q(taluk_id__in=list(whole_taluks))
+            | Q(district_id__in=list(whole_districts))
+            | Q(taluk__district_id__in=list(whole_districts))
+        ).values_list("id", "taluk_id", "district_id", "taluk__district_id")
+        for village_id, taluk_id, district_id, taluk_district_id in villages:
+            covering = (
+                whole_taluks.get(taluk_id, set())
+                | whole_districts.get(district_id, set())
+                | whole_districts.get(taluk_district_id, set())
+            )
+            for employee_id in covering:
+                effective[employee_id].add(village_id)
+
+    reverse: dict[int, list[int]] = defaultdict(list)
+    for employee_id, village_ids in effective.items():
+        for village_id in village_ids:
+            reverse[village_id].append(employee_id)
+
+    return AssignmentIndex(
+        version=version,
+        by_district={k: _ids(v) for k, v in by_district.items()},
+        by_taluk={k: _ids(v) for k, v in by_taluk.items()},
+        by_village={k: _ids(v) for k, v in by_village.items()},
+        villages_by_employee={k: _ids(v) for k, v in effective.items()},
+        employees_by_village={k: _ids(v) for k, v in reverse.items()},
+    )
+
+
+def rebuild_assignment_index() -> AssignmentIndex:
+    version = current_version()
+    index = build_assignment_index(version)
+    cache.set(_index_key(version), index, timeout=INDEX_TTL)
+    logger.info(
+        "event=assignment_index_rebuilt version=%s employees=%s villages=%s",
+        version,
+        len(index.villages_by_employee),
+        len(index.employees_by_village),
+    )
+    return index
+
+
+def get_assignment_index() -> AssignmentIndex:
+    index = cache.get(_index_key(current_version()))
+    if index is None:
+        index = rebuild_assignment_index()
+    return index
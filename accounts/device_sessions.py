@@ -237,41 +237,21 @@ def batch_device_status_map(user_ids: list[int]) -> dict[int, dict[str, Any]]:
     return result
 
 
-def device_status_payload(user: User) -> dict[str, Any]:
-    """Admin employee list device_status field."""
-    session = get_active_device_session(user)
-    if session:
-        return {
-            "active_device_id": session.active_device_id,
-            "session_version": session.session_version,
-            "device_name": session.device_name,
-            "device_model": session.device_model,
-            "platform": session.platform,
-            "app_version": session.app_version,
-            "last_login_at": _iso(session.last_login_at),
-            "last_seen_at": _iso(session.last_seen_at),
-            "is_active": True,
-        }
+def _session_status(session: EmployeeDeviceSession, *, is_active: bool) -> dict[str, Any]:
+    return {
+        "active_device_id": session.active_device_id,
+        "session_version": session.session_version,
+        "device_name": session.device_name,
+        "device_model": session.device_model,
+        "platform": session.platform,
+        "app_version": session.app_version,
+        "last_login_at": _iso(session.last_login_at),
+        "last_seen_at": _iso(session.last_seen_at),
+        "is_active": is_active,
+    }
 
-    last_session = (
-        EmployeeDeviceSession.objects.filter(user=user)
-        .order_by("-last_login_at")
-        .first()
-    )
-    if last_session:
-        return {
-            "active_device_id": last_session.active_device_id,
-            "session_version": last_session.session_version,
-            "device_name": last_session.device_name,
-            "device_model": last_session.device_model,
-            "platform": last_session.platform,
-            "app_version": last_session.app_version,
-            "last_login_at": _iso(last_session.last_login_at),
-            "last_seen_at": _iso(last_session.last_seen_at),
-            "is_active": False,
-        }
 
-    profile = getattr(user, "employee_profile", None)
+def _profile_device_status(profile: EmployeeProfile | None) -> dict[str, Any]:
     return {
         "active_device_id": profile.active_device_id if profile else None,
         "session_version": profile.mobile_session_version if profile else 0,
@@ -283,3 +263,47 @@ def device_status_payload(user: User) -> dict[str, Any]:
         "last_seen_at": None,
         "is_active": False,
     }
+
+
+def device_status_payload(user: User) -> dict[str, Any]:
+    """Admin employee list device_status field."""
+    session = get_active_device_session(user)
+    if session:
+        return _session_status(session, is_active=True)
+
+    last_session = (
+        EmployeeDeviceSession.objects.filter(user=user)
+        .order_by("-last_login_at")
+        .first()
+    )
+    if last_session:
+        return _session_status(last_session, is_active=False)
+
+    return _profile_device_status(getattr(user, "employee_profile", None))
+
+
+def batch_device_status_payloads(
+    profiles: list[EmployeeProfile],
+) -> dict[int, dict[str, Any]]:
+    """``device_status_payload`` for many employees (by user id) in one query."""
+    user_ids = [p.user_id for p in profiles]
+    if not user_ids:
+        return {}
+    active: dict[int, EmployeeDeviceSession] = {}
+    latest: dict[int, EmployeeDeviceSession] = {}
+    for session in EmployeeDeviceSession.objects.filter(user_id__in=user_ids).order_by(
+        "user_id", "-last_login_at"
+    ):
+        latest.setdefault(session.user_id, session)
+        if session.is_active:
+            active.setdefault(session.user_id, session)
+    result: dict[int, dict[str, Any]] = {}
+    for profile in profiles:
+        uid = profile.user_id
+        if uid in active:
+            result[uid] = _session_status(active[uid], is_active=True)
+        elif uid in latest:
+            result[uid] = _session_status(latest[uid], is_active=False)
+        else:
+            result[uid] = _profile_device_status(profile)
+    return result
@@ -0,0 +1,172 @@
+"""
+Employee directory read model: one cached row per employee.
+
+A row is the admin employee-list payload (``AdminEmployeeListSerializer``)
+plus the location-assignment summary and preview.  Rows are cached per user
+id and built in batches for cache misses — one query each for device
+sessions and assignment rows, whatever the page size.
+
+- Rows are deleted on EmployeeProfile, User, device-session and
+  location-assignment writes (accounts.signals); EMPLOYEE_DIRECTORY_TTL
+  bounds staleness from master renames.
+- Photo URLs are cached relative to the site and made absolute per request.
+- ``live_status`` (duty / GPS state) changes on every push and with the
+  clock, so it is overlaid per page from batched queries, never cached.
+  So is ``device_status.last_seen_at``, which every authenticated ping
+  touches without invalidating the row.
+
+List views return directory pages through ``utils.response.etag_response``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.device_sessions import batch_device_status_payloads
+from accounts.location_assignments import (
+    assignment_preview_from_rows,
+    assignment_summary_from_rows,
+)
+from accounts.models import EmployeeDeviceSession, EmployeeLocationAssignment, EmployeeProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60 * 60
+
+
+def _row_key(user_id: int) -> str:
+    return f"accounts:directory:{user_id}"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "EMPLOYEE_DIRECTORY_TTL", DEFAULT_TTL))
+
+
+def invalidate_directory_rows(user_ids: Iterable[int]) -> None:
+    """
+    Drop cached rows now and again once the current transaction commits, so
+    a row rebuilt from pre-commit data in between does not survive.
+    """
+    keys = [_row_key(uid) for uid in set(user_ids) if uid]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def build_directory_rows(profiles: list[EmployeeProfile]) -> dict[int, dict]:
+    """Uncached rows by user id; ``profiles`` need ``user`` and ``district`` loaded."""
+    from accounts.serializers import AdminEmployeeListSerializer
+
+    if not profiles:
+        return {}
+    assignments: dict[int, list[EmployeeLocationAssignment]] = defaultdict(list)
+    for row in (
+        EmployeeLocationAssignment.objects.filter(
+            employee_id__in=[p.pk for p in profiles], is_active=True
+        )
+        .select_related("district", "taluk", "village")
+        .order_by("employee_id", "district__name", "taluk__name", "village__name")
+    ):
+        assignments[row.employee_id].append(row)
+
+    serialized = AdminEmployeeListSerializer(
+        profiles,
+        many=True,
+        context={"request": None, "device_statuses": batch_device_status_payloads(profiles)},
+    ).data
+    rows = {}
+    for profile, data in zip(profiles, serialized):
+        employee_rows = assignments.get(profile.pk, [])
+        rows[profile.user_id] = {
+            **data,
+            "location_assignment_summary": assignment_summary_from_rows(employee_rows),
+            "location_assignment_preview": assignment_preview_from_rows(employee_rows),
+        }
+    return rows
+
+
+def directory_rows(profiles: Iterable[EmployeeProfile], request=None) -> list[dict]:
+    """Rows for ``profiles`` in order, from cache where possible."""
+    profiles = list(profiles)
+    keys = {p.user_id: _row_key(p.user_id) for p in profiles}
+    cached = cache.get_many(list(keys.values()))
+    rows = {uid: cached[key] for uid, key in keys.items() if key in cached}
+    missing = [p for p in profiles if p.user_id not in rows]
+    if missing:
+        built = build_directory_rows(missing)
+        cache.set_many({keys[uid]: row for uid, row in built.items()}, timeout=_ttl())
+        rows.update(built)
+        logger.debug(
+            "event=employee_directory_build rows=%s cached=%s", len(built), len(cached)
+        )
+
+    result = []
+    for profile in profiles:
+        row = dict(rows[profile.user_id])
+        if request is not None and row.get("profile_photo_url"):
+            row["profile_photo_url"] = request.build_absolute_uri(row["profile_photo_url"])
+        result.append(row)
+    return result
+
+
+def _overlay_last_seen(rows: list[dict], user_ids: list[int]) -> None:
+    last_seen: dict[int, object] = {}
+    for user_id, seen_at in (
+        EmployeeDeviceSession.objects.filter(user_id__in=user_ids, is_active=True)
+        .order_by("user_id", "-last_login_at")
+        .values_list("user_id", "last_seen_at")
+    ):
+        last_seen.setdefault(user_id, seen_at)
+    for row in rows:
+        status = row.get("device_status")
+        if status and status.get("is_active") and row["user_id"] in last_seen:
+            seen_at = last_seen[row["user_id"]]
+            row["device_status"] = {
+                **status,
+                "last_seen_at": seen_at.isoformat() if seen_at else None,
+            }
+
+
+def attach_live_status(rows: list[dict], *, now=None) -> list[dict]:
+    """Add ``live_status`` and the current ``last_seen_at`` to directory rows (five queries per page)."""
+    from tracking.employee_status import batch_gps_off_user_ids, build_status_for_live_employee
+    from tracking.models import DutySession, EmployeeGpsState, EmployeeLiveLocation
+
+    user_ids = [row["user_id"] for row in rows]
+    if not user_ids:
+        return rows
+    now = now or timezone.now()
+    _overlay_last_seen(rows, user_ids)
+    duties = {
+        d.user_id: d for d in DutySession.objects.filter(user_id__in=user_ids, is_active=True)
+    }
+    live_rows = {r.user_id: r for r in EmployeeLiveLocation.objects.filter(user_id__in=user_ids)}
+    gps_states = {r.user_id: r for r in EmployeeGpsState.objects.filter(user_id__in=user_ids)}
+    gps_off = batch_gps_off_user_ids(user_ids)
+
+    for row in rows:
+        uid = row["user_id"]
+        duty, live, gps_state = duties.get(uid), live_rows.get(uid), gps_states.get(uid)
+        last_heartbeat_at = None
+        if live and live.last_heartbeat_at:
+            last_heartbeat_at = live.last_heartbeat_at
+        elif duty and duty.last_heartbeat:
+            last_heartbeat_at = duty.last_heartbeat
+        row["live_status"] = build_status_for_live_employee(
+            user_id=uid,
+            live_row=live,
+            gps_state_row=gps_state,
+            has_active_duty=duty is not None,
+            device_status=row.get("device_status"),
+            gps_off=uid in gps_off and (gps_state is None or gps_state.gps_enabled is None),
+            last_heartbeat_at=last_heartbeat_at,
+            now=now,
+        )
+    return rows
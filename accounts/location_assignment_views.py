@@ -9,8 +9,6 @@ from rest_framework.views import APIView
 
 from accounts.location_assignments import (
     LocationAssignmentValidationError,
-    annotate_assignment_counts,
-    assignment_previews_for_employees,
     assignment_rows_for_employee,
     assignment_summary_from_rows,
     employee_summary_payload,
@@ -20,9 +18,10 @@ from accounts.location_assignments import (
     group_assignments_for_response,
     replace_employee_location_assignments,
 )
+from accounts.employee_directory import directory_rows
 from accounts.models import EmployeeProfile
 from utils.permissions import IsStaffAdmin
-from utils.response import error_response, not_found_response, success_response
+from utils.response import error_response, etag_response, not_found_response, success_response
 
 
 class AssignmentGroupSerializerMixin:
@@ -75,34 +74,23 @@ class AdminEmployeeLocationAssignmentListAPI(APIView):
             village_id=_int_param(request, "village"),
             search=(request.query_params.get("search") or "").strip() or None,
         )
-        qs = annotate_assignment_counts(qs)
 
         paginator = PageNumberPagination()
         paginator.page_size = min(int(request.query_params.get("page_size", 20)), 100)
         page = paginator.paginate_queryset(qs, request)
 
         page_profiles = list(page)
-        previews = assignment_previews_for_employees([p.id for p in page_profiles])
-
-        results = []
-        for profile in page_profiles:
-            results.append(
-                {
-                    "employee": employee_summary_payload(profile),
-                    "location_assignment_summary": {
-                        "district_count": profile.location_district_count,
-                        "taluk_count": profile.location_taluk_count,
-                        "village_count": profile.location_village_count,
-                    },
-                    "location_assignment_preview": previews.get(
-                        profile.id,
-                        {"districts": [], "taluks": [], "villages": []},
-                    ),
-                }
-            )
+        results = [
+            {
+                "employee": employee_summary_payload(profile),
+                "location_assignment_summary": row["location_assignment_summary"],
+                "location_assignment_preview": row["location_assignment_preview"],
+            }
+            for profile, row in zip(page_profiles, directory_rows(page_profiles))
+        ]
 
         paginated = paginator.get_paginated_response(results).data
-        return success_response(data=paginated)
+        return etag_response(request, data=paginated)
 
 
 @extend_schema(
@@ -15,6 +15,7 @@ from django.db import transaction
 from django.db.models import Count, Q, QuerySet
 from rest_framework import serializers
 
+from accounts.assignment_index import get_assignment_index, rebuild_assignment_index
 from accounts.models import EmployeeLocationAssignment, EmployeeProfile
 from masters.models import District, Taluk, Village
 
@@ -271,6 +272,18 @@ def _validate_district(district: District) -> None:
     _validate_active_master(district, "district")
 
 
+def _as_id(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_by_id(qs: QuerySet, raw_ids: list) -> dict[int, Any]:
+    ids = {pk for pk in map(_as_id, raw_ids) if pk}
+    return qs.in_bulk(ids) if ids else {}
+
+
 def expand_assignment_groups(
     assignment_groups: list[dict[str, Any]],
 ) -> list[tuple[int, int | None, int | None]]:
@@ -281,9 +294,18 @@ def expand_assignment_groups(
     rows: list[tuple[int, int | None, int | None]] = []
     seen: set[tuple[int, int | None, int | None]] = set()
 
-    district_cache: dict[int, District] = {}
-    taluk_cache: dict[int, Taluk] = {}
-    village_cache: dict[int, Village] = {}
+    # One query per level for the whole payload instead of one per id.
+    districts = _load_by_id(
+        District.objects.all(), [g.get("district_id") for g in assignment_groups]
+    )
+    taluks = _load_by_id(
+        Taluk.objects.select_related("district"),
+        [g.get("taluk_id") for g in assignment_groups],
+    )
+    villages = _load_by_id(
+        Village.objects.select_related("taluk", "taluk__district"),
+        [v for g in assignment_groups for v in (g.get("village_ids") or [])],
+    )
 
     for index, group in enumerate(assignment_groups):
         prefix = f"assignments[{index}]"
@@ -296,26 +318,20 @@ def expand_assignment_groups(
                 {prefix: "district_id is required for each assignment group."}
             )
 
-        district = district_cache.get(district_id)
-        if district is None:
-            district = District.objects.filter(pk=district_id).first()
-            if not district:
-                raise LocationAssignmentValidationError(
-                    {f"{prefix}.district_id": "District not found."}
-                )
-            district_cache[district_id] = district
+        district = districts.get(_as_id(district_id))
+        if not district:
+            raise LocationAssignmentValidationError(
+                {f"{prefix}.district_id": "District not found."}
+            )
         _validate_district(district)
 
         taluk = None
         if taluk_id:
-            taluk = taluk_cache.get(taluk_id)
-            if taluk is None:
-                taluk = Taluk.objects.filter(pk=taluk_id).select_related("district").first()
-                if not taluk:
-                    raise LocationAssignmentValidationError(
-                        {f"{prefix}.taluk_id": "Taluk not found."}
-                    )
-                taluk_cache[taluk_id] = taluk
+            taluk = taluks.get(_as_id(taluk_id))
+            if not taluk:
+                raise LocationAssignmentValidationError(
+                    {f"{prefix}.taluk_id": "Taluk not found."}
+                )
             _validate_taluk(taluk, district)
 
         if village_ids:
@@ -328,22 +344,11 @@ def expand_assignment_groups(
                     }
                 )
             for village_id in village_ids:
-                village = village_cache.get(village_id)
-                if village is None:
-                    village = (
-                        Village.objects.filter(pk=village_id)
-                        .select_related("taluk", "taluk__district")
-                        .first()
+                village = villages.get(_as_id(village_id))
+                if not village:
+                    raise LocationAssignmentValidationError(
+                        {f"{prefix}.village_ids": f"Village id {village_id} not found."}
                     )
-                    if not village:
-                        raise LocationAssignmentValidationError(
-                            {
-                                f"{prefix}.village_ids": (
-                                    f"Village id {village_id} not found."
-                                )
-                            }
-                        )
-                    village_cache[village_id] = village
                 _validate_village(village, district, taluk)
                 key = (district.id, taluk.id, village.id)
                 if key not in seen:
@@ -392,6 +397,7 @@ def replace_employee_location_assignments(
                 updated_by=actor,
             )
         )
+    transaction.on_commit(rebuild_assignment_index)
     return created
 
 
@@ -406,21 +412,11 @@ def filter_employees_for_assignment_list(
 ) -> QuerySet[EmployeeProfile]:
     if employee_id:
         qs = qs.filter(pk=employee_id)
-    if district_id:
-        qs = qs.filter(
-            location_assignments__district_id=district_id,
-            location_assignments__is_active=True,
-        )
-    if taluk_id:
-        qs = qs.filter(
-            location_assignments__taluk_id=taluk_id,
-            location_assignments__is_active=True,
-        )
-    if village_id:
-        qs = qs.filter(
-            location_assignments__village_id=village_id,
-            location_assignments__is_active=True,
-        )
+    employee_ids = get_assignment_index().employee_ids_for(
+        district_id=district_id, taluk_id=taluk_id, village_id=village_id
+    )
+    if employee_ids is not None:
+        qs = qs.filter(pk__in=employee_ids)
     if search:
         qs = qs.filter(
             Q(employee_id__icontains=search)
@@ -428,4 +424,4 @@ def filter_employees_for_assignment_list(
             | Q(user__first_name__icontains=search)
             | Q(user__last_name__icontains=search)
         )
-    return qs.distinct()
+    return qs
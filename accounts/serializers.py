@@ -308,6 +308,11 @@ class AdminEmployeeListSerializer(ProfilePhotoUrlMixin, serializers.ModelSeriali
         return self.get_mobile_login_enabled(obj)
 
     def get_device_status(self, obj):
+        # Batched callers (accounts.employee_directory) pass statuses by user id.
+        statuses = self.context.get("device_statuses")
+        if statuses is not None and obj.user_id in statuses:
+            return statuses[obj.user_id]
+
         from accounts.device_sessions import device_status_payload
 
         return device_status_payload(obj.user)
@@ -0,0 +1,49 @@
+"""Keep accounts caches (directory rows, assignment index) in step with writes."""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.assignment_index import invalidate_assignment_index
+from accounts.employee_directory import invalidate_directory_rows
+from accounts.models import EmployeeDeviceSession, EmployeeLocationAssignment, EmployeeProfile
+
+
+# touch_device_session writes these on every authenticated ping; the directory
+# overlays last_seen_at per page instead (attach_live_status).
+_DEVICE_SESSION_TOUCH_FIELDS = frozenset({"last_seen_at", "updated_at"})
+
+
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+@receiver(post_save, sender=EmployeeDeviceSession)
+@receiver(post_delete, sender=EmployeeDeviceSession)
+def directory_row_owner_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    touched_only = update_fields and update_fields <= _DEVICE_SESSION_TOUCH_FIELDS
+    if sender is EmployeeDeviceSession and touched_only:
+        return
+    invalidate_directory_rows([instance.user_id])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def directory_user_changed(sender, instance: User, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_directory_rows([instance.pk])
+
+
+@receiver(post_save, sender=EmployeeLocationAssignment)
+@receiver(post_delete, sender=EmployeeLocationAssignment)
+def directory_assignment_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_assignment_index()
+    user_id = (
+        EmployeeProfile.objects.filter(pk=instance.employee_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    invalidate_directory_rows([user_id])
@@ -0,0 +1,109 @@
+"""Tests for the cached employee location assignment index."""
+
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.assignment_index import current_version, get_assignment_index
+from accounts.location_assignments import (
+    expand_assignment_groups,
+    field_employee_queryset,
+    filter_employees_for_assignment_list,
+    replace_employee_location_assignments,
+)
+from accounts.models import EmployeeLocationAssignment, EmployeeProfile
+from masters.models import District, Taluk, Village
+
+
+class AssignmentIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.d1 = District.objects.create(name="Index D1")
+        self.d2 = District.objects.create(name="Index D2")
+        self.t1 = Taluk.objects.create(name="Index T1", district=self.d1)
+        self.t2 = Taluk.objects.create(name="Index T2", district=self.d1)
+        self.t3 = Taluk.objects.create(name="Index T3", district=self.d2)
+        self.v1 = Village.objects.create(name="V1", district=self.d1, taluk=self.t1)
+        self.v2 = Village.objects.create(name="V2", district=self.d1, taluk=self.t1)
+        self.v3 = Village.objects.create(name="V3", district=self.d1, taluk=self.t2)
+        self.v4 = Village.objects.create(name="V4", district=self.d2, taluk=self.t3)
+        self.emp = [self._employee(i) for i in range(3)]
+
+    def _employee(self, index):
+        user = User.objects.create_user(username=f"idx_emp{index}", password="x")
+        return EmployeeProfile.objects.create(
+            user=user, employee_id=f"IDX-{index:03d}", phone=f"90000770{index:02d}"
+        )
+
+    def _replace(self, employee, groups):
+        with self.captureOnCommitCallbacks(execute=True):
+            replace_employee_location_assignments(employee=employee, assignment_groups=groups)
+
+    def test_effective_villages_and_reverse_lookup(self):
+        self._replace(self.emp[0], [{"district_id": self.d1.pk}])
+        self._replace(self.emp[1], [{"district_id": self.d1.pk, "taluk_id": self.t1.pk}])
+        self._replace(
+            self.emp[2],
+            [
+                {"district_id": self.d1.pk, "taluk_id": self.t2.pk, "village_ids": [self.v3.pk]},
+                {"district_id": self.d2.pk, "taluk_id": self.t3.pk, "village_ids": [self.v4.pk]},
+            ],
+        )
+        with self.assertNumQueries(0):
+            index = get_assignment_index()
+        self.assertEqual(
+            list(index.effective_village_ids(self.emp[0].pk)),
+            sorted([self.v1.pk, self.v2.pk, self.v3.pk]),
+        )
+        self.assertEqual(
+            list(index.effective_village_ids(self.emp[1].pk)), sorted([self.v1.pk, self.v2.pk])
+        )
+        self.assertEqual(
+            list(index.employees_covering_village(self.v3.pk)),
+            sorted([self.emp[0].pk, self.emp[2].pk]),
+        )
+        self.assertEqual(index.employee_ids_for(district_id=self.d2.pk), {self.emp[2].pk})
+        self.assertIsNone(index.employee_ids_for())
+
+    def test_direct_writes_bump_version(self):
+        before = get_assignment_index()
+        EmployeeLocationAssignment.objects.create(
+            employee=self.emp[0], district=self.d2, taluk=self.t3, village=self.v4
+        )
+        self.assertGreater(current_version(), before.version)
+        self.assertEqual(
+            list(get_assignment_index().employees_covering_village(self.v4.pk)), [self.emp[0].pk]
+        )
+
+    def test_assignment_list_filter_is_one_lookup(self):
+        self._replace(self.emp[0], [{"district_id": self.d1.pk, "taluk_id": self.t1.pk}])
+        self._replace(
+            self.emp[1],
+            [{"district_id": self.d1.pk, "taluk_id": self.t1.pk, "village_ids": [self.v1.pk]}],
+        )
+        qs = filter_employees_for_assignment_list(
+            field_employee_queryset(), district_id=self.d1.pk, taluk_id=self.t1.pk
+        )
+        with self.assertNumQueries(1):
+            ids = [p.pk for p in qs]
+        self.assertEqual(ids, [self.emp[0].pk, self.emp[1].pk])
+        only_village = filter_employees_for_assignment_list(
+            field_employee_queryset(), village_id=self.v1.pk
+        )
+        self.assertEqual([p.pk for p in only_village], [self.emp[1].pk])
+
+    def test_expansion_validates_with_one_query_per_level(self):
+        groups = [
+            {
+                "district_id": self.d1.pk,
+                "taluk_id": self.t1.pk,
+                "village_ids": [self.v1.pk, self.v2.pk],
+            },
+            {"district_id": self.d1.pk, "taluk_id": self.t2.pk, "village_ids": [self.v3.pk]},
+            {"district_id": self.d2.pk, "taluk_id": self.t3.pk, "village_ids": [self.v4.pk]},
+        ]
+        with self.assertNumQueries(3):
+            rows = expand_assignment_groups(groups)
+        self.assertEqual(len(rows), 4)
@@ -0,0 +1,130 @@
+"""Tests for the cached admin employee directory rows."""
+
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.device_sessions import (
+    device_status_payload,
+    get_active_device_session,
+    register_device_session,
+    touch_device_session,
+)
+from accounts.employee_directory import attach_live_status, directory_rows
+from accounts.location_assignments import replace_employee_location_assignments
+from accounts.models import EmployeeProfile
+from masters.models import District, Taluk, Village
+from utils.query_budget import query_budget
+
+LIST_URL = "/api/v1/employees/admin/employees/"
+ASSIGNMENTS_URL = "/api/v1/admin/employee-location-assignments/"
+
+
+class EmployeeDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username="dir_admin", password="x", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        self.profiles = []
+        for i in range(3):
+            user = User.objects.create_user(username=f"dir_emp{i}", password="x")
+            self.profiles.append(
+                EmployeeProfile.objects.create(
+                    user=user, employee_id=f"DIR-{i:03d}", phone=f"90000990{i:02d}"
+                )
+            )
+        register_device_session(self.profiles[0].user, request_data={"device_name": "Phone"})
+        district = District.objects.create(name="Dir District")
+        self.taluk = Taluk.objects.create(name="Dir Taluk", district=district)
+        self.villages = [
+            Village.objects.create(name=f"Dir Village {i}", district=district, taluk=self.taluk)
+            for i in range(2)
+        ]
+        self.district = district
+
+    def _assign(self, profile, village_ids):
+        with self.captureOnCommitCallbacks(execute=True):
+            replace_employee_location_assignments(
+                employee=profile,
+                assignment_groups=[
+                    {
+                        "district_id": self.district.pk,
+                        "taluk_id": self.taluk.pk,
+                        "village_ids": village_ids,
+                    }
+                ],
+            )
+
+    def _rows(self):
+        profiles = list(
+            EmployeeProfile.objects.select_related("user", "district").order_by("employee_id")
+        )
+        return {row["employee_id"]: row for row in directory_rows(profiles)}
+
+    def test_rows_are_cached_and_match_per_row_payloads(self):
+        self._assign(self.profiles[1], [v.pk for v in self.villages])
+        rows = self._rows()
+        for profile in self.profiles:
+            self.assertEqual(
+                rows[profile.employee_id]["device_status"], device_status_payload(profile.user)
+            )
+        self.assertEqual(rows["DIR-001"]["location_assignment_summary"]["village_count"], 2)
+        self.assertTrue(rows["DIR-000"]["device_status"]["is_active"])
+
+        with query_budget(1, label="warm directory"):
+            self.assertEqual(self._rows(), rows)
+
+    def test_writes_invalidate_rows(self):
+        self._rows()
+        self._assign(self.profiles[2], [self.villages[0].pk])
+        self.assertEqual(
+            self._rows()["DIR-002"]["location_assignment_summary"]["village_count"], 1
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            register_device_session(self.profiles[2].user, request_data={"device_name": "Tab"})
+        self.assertEqual(self._rows()["DIR-002"]["device_status"]["device_name"], "Tab")
+
+        profile = self.profiles[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.phone = "9111111111"
+            profile.save(update_fields=["phone"])
+        self.assertEqual(self._rows()["DIR-002"]["phone"], "9111111111")
+
+    def test_last_seen_touch_keeps_the_row_and_is_overlaid_at_read(self):
+        rows = self._rows()
+        session = get_active_device_session(self.profiles[0].user)
+        with self.captureOnCommitCallbacks(execute=True):
+            touch_device_session(session)
+
+        with query_budget(1, label="row survives a touch"):
+            cached = self._rows()
+        self.assertEqual(cached, rows)
+        row = attach_live_status([cached["DIR-000"]])[0]
+        self.assertEqual(row["device_status"]["last_seen_at"], session.last_seen_at.isoformat())
+
+    def test_list_endpoints_answer_304_for_matching_etag(self):
+        response = self.client.get(LIST_URL)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["data"]["results"]
+        self.assertIn("live_status", results[0])
+        self.assertIn("location_assignment_preview", results[0])
+        etag = response["ETag"]
+
+        self.assertEqual(self.client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self._assign(self.profiles[0], [self.villages[1].pk])
+        self.assertEqual(self.client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        listing = self.client.get(ASSIGNMENTS_URL)
+        village_counts = {
+            r["employee"]["employee_id"]: r["location_assignment_summary"]["village_count"]
+            for r in listing.json()["data"]["results"]
+        }
+        self.assertEqual(village_counts["DIR-000"], 1)
+        self.assertEqual(
+            self.client.get(ASSIGNMENTS_URL, HTTP_IF_NONE_MATCH=listing["ETag"]).status_code, 304
+        )
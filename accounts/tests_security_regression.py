@@ -91,7 +91,9 @@ class SecurityAuthzRegressionTests(TestCase):
         self.assertEqual(own.name, "Farmer A2")
 
     def test_map_farmers_does_not_leak_unrelated_farmer_gps(self):
-        resp = self.client_a.get("/api/v1/map/farmers/")
+        resp = self.client_a.get(
+            "/api/v1/map/farmers/", {"bbox": "-180,-90,180,90"}
+        )
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         markers = resp.data.get("data") or []
         ids = {m["id"] for m in markers}
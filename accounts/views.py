@@ -6,11 +6,12 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser, FormParser
-from utils.response import success_response, error_response
+from utils.response import success_response, error_response, etag_response
 from utils.permissions import IsStaffAdmin, IsSuperuserOnly
 from rest_framework import status
 
 from .admin_guards import assert_can_mutate_employee_account
+from .employee_directory import attach_live_status, directory_rows
 from .models import EmployeeProfile
 from .serializers import (
     EmployeeCreateSerializer,
@@ -771,7 +772,11 @@ class LogoutAPI(APIView):
     tags=["Employees"],
     methods=["GET"],
     summary="Admin — list employees",
-    description="Paginated employee list with search, role filter, is_active filter, district filter, and ordering.",
+    description=(
+        "Paginated employee list with search, role filter, is_active filter, district filter, "
+        "and ordering. Rows include location assignment summary/preview and live_status. "
+        "Responses carry an ETag; send it back as If-None-Match to get 304 Not Modified."
+    ),
     parameters=[
         *PAGINATION_PARAMS,
         SEARCH_PARAM,
@@ -850,12 +855,10 @@ class AdminEmployeeManagementAPI(APIView):
         paginator = PageNumberPagination()
         paginator.page_size = min(int(request.query_params.get("page_size", 20)), 100)
         page = paginator.paginate_queryset(qs, request)
-        serializer = AdminEmployeeListSerializer(
-            page, many=True, context={"request": request}
-        )
+        rows = attach_live_status(directory_rows(page, request))
         # Custom paginated response
-        paginated_data = paginator.get_paginated_response(serializer.data).data
-        return success_response(data=paginated_data)
+        paginated_data = paginator.get_paginated_response(rows).data
+        return etag_response(request, data=paginated_data)
 
     def post(self, request):
         serializer = AdminEmployeeFullCreateSerializer(data=request.data)
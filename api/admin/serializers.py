@@ -340,7 +340,26 @@ class AdminVisitMediaSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         from visits.media_response import serialize_visit_media
 
-        return serialize_visit_media(instance, self.context.get("request"))
+        return serialize_visit_media(
+            instance, self.context.get("request"), self.context.get("url_cache")
+        )
+
+
+class AdminVisitListSerializer(serializers.ListSerializer):
+    """Load unified evidence for the whole page in one batch (two queries)."""
+
+    def to_representation(self, data):
+        from visits.evidence import EvidenceBatch
+
+        visits = list(data.all() if hasattr(data, "all") else data)
+        batch = EvidenceBatch(
+            visits,
+            self.context.get("request"),
+            url_cache=self.context.setdefault("url_cache", {}),
+        )
+        for visit in visits:
+            visit._evidence_rows = batch.evidence(visit.pk)
+        return super().to_representation(visits)
 
 
 class AdminVisitSerializer(serializers.ModelSerializer):
@@ -372,6 +391,7 @@ class AdminVisitSerializer(serializers.ModelSerializer):
         model = Visit
         exclude = ("status",)
         read_only_fields = ("id", "visit_time")
+        list_serializer_class = AdminVisitListSerializer
 
     def to_representation(self, instance):
         data = strip_visit_status_from_representation(super().to_representation(instance))
@@ -406,7 +426,9 @@ class AdminVisitSerializer(serializers.ModelSerializer):
         # Unified evidence for admin detail (same contract as /attachments/).
         from visits.evidence import list_visit_evidence
 
-        evidence_rows = list_visit_evidence(instance, request)
+        evidence_rows = getattr(instance, "_evidence_rows", None)
+        if evidence_rows is None:
+            evidence_rows = list_visit_evidence(instance, request)
         data["evidence_count"] = len(evidence_rows)
         data["evidence"] = evidence_rows
         # Grouped media for admin UIs (images / audio / videos / documents).
@@ -0,0 +1,85 @@
+"""Shared dashboard headline counters: one statement, stale-while-revalidate."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmployeeProfile
+from dashboard import selectors, services
+from tracking.models import WorkDay
+
+
+class DashboardHeadlineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username="headline.admin", password="x", is_staff=True, is_superuser=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        now = timezone.now()
+        self.users = [self._employee(i) for i in range(3)]
+        self.users[2].is_active = False
+        self.users[2].save(update_fields=["is_active"])
+        WorkDay.objects.create(
+            user=self.users[0],
+            date=timezone.localdate(now),
+            start_time=now - timedelta(hours=1),
+            last_heartbeat=now - timedelta(minutes=1),
+        )
+        WorkDay.objects.create(
+            user=self.users[1],
+            date=timezone.localdate(now),
+            start_time=now - timedelta(hours=10),  # past the 9h limit, not yet swept
+            last_heartbeat=now - timedelta(minutes=1),
+        )
+
+    def _employee(self, index):
+        user = User.objects.create_user(username=f"headline.emp{index}", password="x")
+        EmployeeProfile.objects.create(
+            user=user, employee_id=f"HL-{index:03d}", phone=f"90000880{index:02d}"
+        )
+        return user
+
+    def test_all_counters_in_one_statement(self):
+        with self.assertNumQueries(1):
+            counters = selectors.get_headline_counters()
+        self.assertEqual(counters["employees"], 3)
+        self.assertEqual(counters["active_employees"], 2)
+        self.assertEqual(counters["working_now"], 1)
+        self.assertEqual(counters["online"], 1)
+        self.assertEqual(counters["visits"], 0)
+
+    def test_endpoints_share_counters(self):
+        tracking = self.client.get("/api/v1/tracking/admin/dashboard-stats/").json()
+        self.assertEqual(
+            tracking,
+            {"total_employees": 3, "working_now": 1, "online": 1, "offline": 2, "gps_issues": 0},
+        )
+        with self.assertNumQueries(0):
+            counters = services.get_headline_counters()
+        overview = self.client.get("/api/v1/admin/dashboard/overview/").json()["data"]
+        self.assertEqual(overview["stats"]["active_employees"], counters["active_employees"])
+        summary = self.client.get("/api/v1/dashboard/summary/").json()["data"]
+        self.assertEqual(summary["active_employees"], counters["employees"])
+        stats = self.client.get("/api/v1/admin/dashboard/stats/").json()["data"]
+        self.assertEqual(set(stats), {"farmers", "fields", "visits", "issues_open"})
+
+    def test_stale_counters_served_while_another_reader_revalidates(self):
+        self.assertEqual(services.get_headline_counters()["employees"], 3)
+        self._employee(3)
+        services.invalidate_dashboard_caches()
+
+        cache.add(services.HEADLINE_LOCK_KEY, 1)  # another request is refreshing
+        with self.assertNumQueries(0):
+            self.assertEqual(services.get_headline_counters()["employees"], 3)
+
+        cache.delete(services.HEADLINE_LOCK_KEY)
+        self.assertEqual(services.get_headline_counters()["employees"], 4)
+        self.assertIsNone(cache.get(services.HEADLINE_LOCK_KEY))
@@ -34,13 +34,13 @@ from masters.problem_serializers import (
 )
 from masters.problem_item_utils import db_category_code
 from visits.models import Visit
-from visits.querysets import submitted_visits_with_relations
+from visits.querysets import submitted_visits_with_relations, visits_with_relations
 from visits.submitted import get_visit_cleanup_counts, submitted_visits_qs
 from visits.field_visit_serializers import FieldVisitSubmitSerializer
 from visits.visit_media import attach_visit_media_files
 from visits.visit_response import reload_visit
-from accounts.models import EmployeeProfile
 
+from dashboard.services import get_headline_counters
 from farmers.audit import build_farmer_visit_audit
 
 from .serializers import (
@@ -387,12 +387,8 @@ class DashboardStatsAPI(APIView):
     permission_classes = [IsStaffAdmin]
 
     def get(self, request):
-        data = {
-            "farmers": Farmer.objects.filter(is_active=True).count(),
-            "fields": FarmerField.objects.filter(is_active=True).count(),
-            "visits": submitted_visits_qs().count(),
-            "issues_open": CropIssue.objects.filter(status="open").count(),
-        }
+        counters = get_headline_counters()
+        data = {key: counters[key] for key in ("farmers", "fields", "visits", "issues_open")}
         return success_response(data=data)
 
 
@@ -437,23 +433,16 @@ class DashboardOverviewAPI(APIView):
         recent_limit = _bounded_int(request.query_params.get("recent_limit"), 5)
         issues_limit = _bounded_int(request.query_params.get("issues_limit"), 5)
 
-        from visits.submitted import submitted_visits_qs
-
+        counters = get_headline_counters()
         stats = {
-            "farmers": Farmer.objects.filter(is_active=True).count(),
-            "fields": FarmerField.objects.filter(is_active=True).count(),
-            "visits": submitted_visits_qs().count(),
-            "issues_open": CropIssue.objects.filter(status="open").count(),
-            "active_employees": EmployeeProfile.objects.filter(
-                is_active_employee=True,
-                user__is_active=True,
-            ).count(),
+            key: counters[key]
+            for key in ("farmers", "fields", "visits", "issues_open", "active_employees")
         }
 
         from visits.visit_response import build_visit_employee_block
 
         recent_visits = []
-        for visit in submitted_visits_with_relations().order_by("-created_at")[
+        for visit in submitted_visits_qs(visits_with_relations()).order_by("-created_at")[
             :recent_limit
         ]:
             emp_block = build_visit_employee_block(visit, request)
@@ -1,10 +1,12 @@
 import logging
 
+from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
 
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
+from utils.day_ranges import date_span
 from utils.pagination import StandardPagination
 from utils.permissions import IsSuperuserOnly
 from utils.response import success_response
@@ -92,13 +94,10 @@ class AuditLogListAPI(APIView):
         if entity_id:
             qs = qs.filter(object_id=entity_id)
 
-        date_from = request.query_params.get("date_from")
-        if date_from:
-            qs = qs.filter(created_at__date__gte=date_from)
-
-        date_to = request.query_params.get("date_to")
-        if date_to:
-            qs = qs.filter(created_at__date__lte=date_to)
+        date_from = parse_date(request.query_params.get("date_from") or "")
+        date_to = parse_date(request.query_params.get("date_to") or "")
+        if date_from or date_to:
+            qs = qs.filter(**date_span("created_at", date_from, date_to))
 
         paginator = StandardPagination()
         page = paginator.paginate_queryset(qs, request)
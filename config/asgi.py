@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Mobile heartbeat / GPS pushes are answered by tracking.asgi_ingest ahead of
+the Django stack unless ASGI_INGEST_FAST_PATH is false.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402 - after Django setup
+
+if settings.ASGI_INGEST_FAST_PATH:
+    from tracking.asgi_ingest import IngestFastPath  # noqa: E402
+
+    application = IngestFastPath(django_application)
+else:
+    application = django_application
@@ -7,6 +7,7 @@ Usage (local / production):
 
 Beat schedule (see settings.CELERY_BEAT_SCHEDULE):
     expire-overdue-duties-every-5-minutes → tracking.tasks.expire_overdue_duties_task
+    drain-gps-ingest-stream (GPS_INGEST_MODE=queue) → tracking.tasks.drain_gps_ingest_task
 
 Fallback without beat:
     python manage.py expire_overdue_duties
@@ -0,0 +1,197 @@
+"""
+Per-request query / cache instrumentation.
+
+``RequestMetricsMiddleware`` counts SQL queries, DB time, cache hits and
+misses and repeated SQL shapes for every request, then:
+
+- adds a ``Server-Timing`` header (``db``, ``cache``, ``dup``, ``app``), and
+- logs ``event=request_metrics`` (at REQUEST_METRICS_LOG_LEVEL, INFO by
+  default) keyed by the request id from ``config.request_id``;
+  ``event=n_plus_one_suspected`` is a WARNING once a
+  single SQL shape repeats REQUEST_METRICS_DUPLICATE_THRESHOLD times.
+
+Cache counters come from the ``Instrumented*Cache`` backends in CACHES.
+Tests use ``collect_metrics`` through ``utils.query_budget``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+_MISSING = object()
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def sql_fingerprint(sql: str) -> str:
+    """SQL shape with IN-lists collapsed, so per-row queries group together."""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fingerprints: Counter[str] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[sql_fingerprint(sql)] += 1
+
+    @property
+    def db_ms(self) -> float:
+        return self.db_seconds * 1000
+
+    @property
+    def duplicate_queries(self) -> int:
+        """Queries beyond the first of each SQL shape."""
+        return sum(n - 1 for n in self.fingerprints.values() if n > 1)
+
+    def most_repeated(self) -> tuple[str, int]:
+        if not self.fingerprints:
+            return "", 0
+        return self.fingerprints.most_common(1)[0]
+
+    def server_timing(self, total_seconds: float) -> str:
+        return ", ".join(
+            [
+                f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+                f'cache;desc="{self.cache_hits} hit / {self.cache_misses} miss"',
+                f'dup;desc="{self.duplicate_queries} repeated queries"',
+                f"app;dur={total_seconds * 1000:.1f}",
+            ]
+        )
+
+
+@contextmanager
+def collect_metrics() -> Iterator[RequestMetrics]:
+    """Record queries on every configured database and cache calls in this context."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            yield metrics
+    finally:
+        _current.reset(token)
+
+
+# ──────────────────────────────────────────────────────────────
+# Cache backends
+# ──────────────────────────────────────────────────────────────
+
+
+class CacheMetricsMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        metrics = _current.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        # BaseCache.get_many falls back to get(); count each key once.
+        token = _current.set(None)
+        try:
+            found = super().get_many(keys, version=version)
+        finally:
+            _current.reset(token)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(found)
+            metrics.cache_misses += len(keys) - len(found)
+        return found
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(CacheMetricsMixin, RedisCache):
+    pass
+
+
+# ──────────────────────────────────────────────────────────────
+# Middleware
+# ──────────────────────────────────────────────────────────────
+
+
+class RequestMetricsMiddleware:
+    """Instrument each request; place right after RequestIdMiddleware."""
+
+    SERVER_TIMING_HEADER = "Server-Timing"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_METRICS_ENABLED", True)
+        self.server_timing = getattr(settings, "REQUEST_METRICS_SERVER_TIMING", True)
+        self.duplicate_threshold = getattr(settings, "REQUEST_METRICS_DUPLICATE_THRESHOLD", 10)
+        level = getattr(settings, "REQUEST_METRICS_LOG_LEVEL", "INFO")
+        self.log_level = level if isinstance(level, int) else logging.getLevelName(str(level).upper())
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        if self.server_timing:
+            response[self.SERVER_TIMING_HEADER] = metrics.server_timing(total)
+        self.log_request(request, response, metrics, total)
+        return response
+
+    def log_request(self, request, response, metrics: RequestMetrics, total: float) -> None:
+        request_id = getattr(request, "request_id", "")
+        sql, repeats = metrics.most_repeated()
+        logger.log(
+            self.log_level,
+            "event=request_metrics request_id=%s method=%s path=%s status=%s "
+            "queries=%d db_ms=%.1f cache_hits=%d cache_misses=%d duplicate_queries=%d total_ms=%.1f",
+            request_id,
+            request.method,
+            request.path,
+            response.status_code,
+            metrics.queries,
+            metrics.db_ms,
+            metrics.cache_hits,
+            metrics.cache_misses,
+            metrics.duplicate_queries,
+            total * 1000,
+        )
+        if self.duplicate_threshold and repeats >= self.duplicate_threshold:
+            logger.warning(
+                "event=n_plus_one_suspected request_id=%s method=%s path=%s repeats=%d sql=%s",
+                request_id,
+                request.method,
+                request.path,
+                repeats,
+                sql[:300],
+            )
@@ -295,6 +295,7 @@ except ImportError:
 # --------------------------------------------------
 MIDDLEWARE = [
     "config.request_id.RequestIdMiddleware",
+    "config.request_metrics.RequestMetricsMiddleware",
     "mobile_api.logging.MobileAPILoggingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
@@ -315,11 +316,41 @@ FORCE_APP_UPDATE = os.getenv("FORCE_APP_UPDATE", "false").lower() in (
     "yes",
 )
 
+# Per-request query / cache metrics (config.request_metrics): Server-Timing
+# header plus request_metrics log lines at REQUEST_METRICS_LOG_LEVEL; warn when
+# one SQL shape repeats this many times in a request (0 disables the N+1 warning).
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+REQUEST_METRICS_SERVER_TIMING = os.getenv(
+    "REQUEST_METRICS_SERVER_TIMING", "true"
+).lower() in ("1", "true", "yes")
+REQUEST_METRICS_DUPLICATE_THRESHOLD = int(os.getenv("REQUEST_METRICS_DUPLICATE_THRESHOLD", "10"))
+REQUEST_METRICS_LOG_LEVEL = os.getenv("REQUEST_METRICS_LOG_LEVEL", "INFO")
+
 # Admin Live Tracking: Online / Stale / Offline based on heartbeat freshness.
 # Defaults: Online ≤ 7m, Stale ≤ 15m, then Offline.
 LIVE_TRACKING_ONLINE_SECONDS = int(os.getenv("LIVE_TRACKING_ONLINE_SECONDS", str(7 * 60)))
 LIVE_TRACKING_STALE_SECONDS = int(os.getenv("LIVE_TRACKING_STALE_SECONDS", str(15 * 60)))
 
+# Location-write telemetry (tracking.location_telemetry): LocationReceived is
+# logged for every Nth saved point, at this level.
+LOCATION_TELEMETRY_LOG_EVERY = int(os.getenv("LOCATION_TELEMETRY_LOG_EVERY", "1"))
+LOCATION_TELEMETRY_LOG_LEVEL = os.getenv("LOCATION_TELEMETRY_LOG_LEVEL", "INFO")
+
+# Cached admin employee directory rows (accounts.employee_directory); writes
+# invalidate rows, the TTL only bounds staleness from master renames.
+EMPLOYEE_DIRECTORY_TTL = int(os.getenv("EMPLOYEE_DIRECTORY_TTL", str(60 * 60)))
+
+# Async heartbeat / GPS push path (tracking.asgi_ingest) wrapped around the
+# ASGI application (config.asgi); WSGI deployments never see it.
+ASGI_INGEST_FAST_PATH = os.getenv("ASGI_INGEST_FAST_PATH", "true").lower() in ("1", "true", "yes")
+# Fast-path and live-stream DB work runs on executor threads; tests keep it on
+# the sync thread that owns the test transaction.
+ASGI_INGEST_THREAD_SENSITIVE = "test" in sys.argv
+
+# SystemSetting snapshot (system_settings.utils): each process re-checks the
+# shared version key at most this often, in seconds.
+SYSTEM_SETTINGS_CHECK_SECONDS = float(os.getenv("SYSTEM_SETTINGS_CHECK_SECONDS", "1"))
+
 # Visit media upload limits (images / voice notes / short videos).
 VISIT_MEDIA_IMAGE_MAX_BYTES = int(
     os.getenv("VISIT_MEDIA_IMAGE_MAX_BYTES", str(10 * 1024 * 1024))
@@ -334,6 +365,11 @@ VISIT_MEDIA_BILL_MAX_BYTES = int(
     os.getenv("VISIT_MEDIA_BILL_MAX_BYTES", str(15 * 1024 * 1024))
 )
 VISIT_MEDIA_VIDEO_MAX_SECONDS = int(os.getenv("VISIT_MEDIA_VIDEO_MAX_SECONDS", "60"))
+# WebP renditions generated by visits.media_pipeline (longest edge, px).
+VISIT_MEDIA_THUMBNAIL_PX = int(os.getenv("VISIT_MEDIA_THUMBNAIL_PX", "320"))
+VISIT_MEDIA_PREVIEW_PX = int(os.getenv("VISIT_MEDIA_PREVIEW_PX", "1280"))
+# Lifetime of presigned PUT URLs issued by visits.direct_upload.
+VISIT_DIRECT_UPLOAD_TTL_SECONDS = int(os.getenv("VISIT_DIRECT_UPLOAD_TTL_SECONDS", "900"))
 
 # --------------------------------------------------
 # TEMPLATES (REQUIRED FOR ADMIN)
@@ -667,7 +703,7 @@ if REDIS_URL:
 
         CACHES = {
             "default": {
-                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "BACKEND": "config.request_metrics.InstrumentedRedisCache",
                 "LOCATION": REDIS_URL,
                 "TIMEOUT": 300,
                 "KEY_PREFIX": "agri_clinic",
@@ -676,16 +712,55 @@ if REDIS_URL:
     except ImportError:
         CACHES = {
             "default": {
-                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "BACKEND": "config.request_metrics.InstrumentedLocMemCache",
             }
         }
 else:
     CACHES = {
         "default": {
-            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "BACKEND": "config.request_metrics.InstrumentedLocMemCache",
         }
     }
 
+# --------------------------------------------------
+# GPS INGESTION (tracking.gps_queue)
+# --------------------------------------------------
+# "sync" writes pushes inline; "queue" validates, appends to a stream and lets
+# Celery consumers apply them (drain_gps_ingest_task below).
+GPS_INGEST_MODE = os.getenv("GPS_INGEST_MODE", "sync").strip().lower()
+# Redis stream location; required in queue mode.
+GPS_INGEST_REDIS_URL = os.getenv("GPS_INGEST_REDIS_URL", REDIS_URL).strip()
+# In-process stream stand-in, only under the test runner.
+GPS_INGEST_MEMORY_STREAM = "test" in sys.argv
+if GPS_INGEST_MODE == "queue" and not GPS_INGEST_REDIS_URL and not GPS_INGEST_MEMORY_STREAM:
+    raise RuntimeError(
+        "GPS_INGEST_MODE=queue requires GPS_INGEST_REDIS_URL or REDIS_URL."
+    )
+GPS_INGEST_STREAM_KEY = os.getenv("GPS_INGEST_STREAM_KEY", "agri_clinic:gps:ingest")
+# The stream is never trimmed; drains log at ERROR once the backlog reaches this.
+GPS_INGEST_BACKLOG_ALERT = int(os.getenv("GPS_INGEST_BACKLOG_ALERT", "500000"))
+GPS_INGEST_BATCH_SIZE = int(os.getenv("GPS_INGEST_BATCH_SIZE", "200"))
+# Pending entries idle this long (dead consumer) are claimed by another one.
+GPS_INGEST_CLAIM_IDLE_SECONDS = int(os.getenv("GPS_INGEST_CLAIM_IDLE_SECONDS", "60"))
+GPS_INGEST_MAX_DELIVERIES = int(os.getenv("GPS_INGEST_MAX_DELIVERIES", "5"))
+# Time budget of one drain task run; beat starts one every 5 seconds.
+GPS_INGEST_DRAIN_SECONDS = float(os.getenv("GPS_INGEST_DRAIN_SECONDS", "4"))
+
+# --------------------------------------------------
+# LIVE MAP EVENTS (tracking.live_events)
+# --------------------------------------------------
+# Pub/sub for the admin live map stream; empty uses the in-process broker,
+# which only reaches streams served by the publishing process.
+LIVE_EVENTS_REDIS_URL = os.getenv("LIVE_EVENTS_REDIS_URL", REDIS_URL).strip()
+# The in-process fallback is expected only under DEBUG and the test runner;
+# elsewhere it is logged as a warning when the broker is first built.
+LIVE_EVENTS_IN_PROCESS_OK = DEBUG or "test" in sys.argv
+LIVE_EVENTS_CHANNEL = os.getenv("LIVE_EVENTS_CHANNEL", "agri_clinic:live_map")
+# SSE comment sent on idle streams so proxies keep the connection open.
+LIVE_EVENTS_KEEPALIVE_SECONDS = int(os.getenv("LIVE_EVENTS_KEEPALIVE_SECONDS", "15"))
+# Events buffered per stream before it is told to resync from a snapshot.
+LIVE_EVENTS_QUEUE_SIZE = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "1000"))
+
 # --------------------------------------------------
 # CELERY
 # --------------------------------------------------
@@ -706,7 +781,16 @@ CELERY_BEAT_SCHEDULE = {
         "task": "tracking.tasks.expire_overdue_duties_task",
         "schedule": timedelta(minutes=5),
     },
+    "requeue-stale-visit-media-every-10-minutes": {
+        "task": "visits.tasks.requeue_stale_visit_media",
+        "schedule": timedelta(minutes=10),
+    },
 }
+if GPS_INGEST_MODE == "queue":
+    CELERY_BEAT_SCHEDULE["drain-gps-ingest-stream"] = {
+        "task": "tracking.tasks.drain_gps_ingest_task",
+        "schedule": timedelta(seconds=5),
+    }
 # When true, /readyz/ fails if broker is missing/memory-only (optional gate).
 CELERY_REQUIRED_FOR_READY = os.getenv(
     "CELERY_REQUIRED_FOR_READY", "false"
@@ -0,0 +1,122 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmployeeProfile
+from config.request_metrics import collect_metrics, sql_fingerprint
+from masters.models import Crop, District, Farmer, Village
+from utils.query_budget import QueryBudgetExceeded, query_budget
+from visits.models import Visit
+
+
+class RequestMetricsTests(TestCase):
+    def test_server_timing_and_log_carry_request_id(self):
+        with self.assertLogs("config.request_metrics", level="INFO") as logs:
+            response = self.client.get(reverse("readiness"), HTTP_X_REQUEST_ID="req-42")
+        timing = response.headers["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("cache;desc=", timing)
+        self.assertIn("event=request_metrics request_id=req-42", logs.output[0])
+
+    @override_settings(REQUEST_METRICS_LOG_LEVEL="WARNING")
+    def test_log_level_is_configurable(self):
+        with self.assertLogs("config.request_metrics", level="WARNING") as logs:
+            self.client.get(reverse("readiness"))
+        self.assertTrue(logs.output[0].startswith("WARNING:"))
+
+    def test_cache_hits_and_misses(self):
+        cache.set("metrics-probe", 1)
+        with collect_metrics() as metrics:
+            cache.get("metrics-probe")
+            cache.get("metrics-absent", "fallback")
+            cache.get_many(["metrics-probe", "metrics-absent"])
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (2, 2))
+
+    def test_repeated_sql_shape_is_counted_and_flagged(self):
+        self.assertEqual(
+            sql_fingerprint("SELECT 1 WHERE id IN (%s, %s, %s)"),
+            sql_fingerprint("SELECT 1 WHERE id IN (%s)"),
+        )
+        users = [User.objects.create_user(username=f"n1_{i}") for i in range(3)]
+        with self.assertRaises(QueryBudgetExceeded) as ctx:
+            with query_budget(10, max_duplicates=0, label="per-row lookups") as metrics:
+                for user in users:
+                    User.objects.get(pk=user.pk)
+        self.assertEqual((metrics.queries, metrics.duplicate_queries), (3, 2))
+        self.assertIn("most repeated x3", str(ctx.exception))
+
+        with override_settings(REQUEST_METRICS_DUPLICATE_THRESHOLD=1):
+            with self.assertLogs("config.request_metrics", level="WARNING") as logs:
+                self.client.get(reverse("readiness"))
+        self.assertIn("event=n_plus_one_suspected", logs.output[0])
+
+
+class EndpointQueryBudgetTests(TestCase):
+    """Query ceilings for list / report endpoints; these must not grow per row."""
+
+    ROWS = 6
+
+    def setUp(self):
+        admin = User.objects.create_user(
+            username="budget_admin", password="x", is_staff=True, is_superuser=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        district = District.objects.create(name="Budget District")
+        village = Village.objects.create(name="Budget Village", district=district)
+        self.farmer = Farmer.objects.create(
+            name="Budget Farmer", phone="9000200001", district=district, village=village
+        )
+        crop = Crop.objects.create(name_en="Millet", name_ta="Millet", is_active=True)
+        self.today = timezone.localdate()
+        self.employees = []
+        for i in range(self.ROWS):
+            user = User.objects.create_user(username=f"budget_emp{i}", password="x")
+            EmployeeProfile.objects.create(
+                user=user, employee_id=f"BUD-{i}", phone=f"90003000{i:02d}", is_active_employee=True
+            )
+            self.employees.append(user)
+            for _ in range(2):
+                Visit.objects.create(
+                    employee=user,
+                    farmer=self.farmer,
+                    crop=crop,
+                    latitude=11.0,
+                    longitude=78.0,
+                    district=district,
+                    village=village,
+                    visit_date=self.today,
+                )
+
+    def _get(self, url, *, max_queries, max_duplicates, label):
+        with query_budget(max_queries, max_duplicates=max_duplicates, label=label):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_tracking_status(self):
+        self._get(
+            "/api/v1/tracking/admin/status/",
+            max_queries=10,
+            max_duplicates=0,
+            label="AdminTrackingStatusAPI",
+        )
+
+    def test_farmer_visit_list(self):
+        self._get(
+            f"/api/v1/farmers/{self.farmer.pk}/visits/",
+            max_queries=8,
+            max_duplicates=0,
+            label="FarmerVisitListAPI",
+        )
+
+    def test_employee_day_report(self):
+        self._get(
+            f"/api/v1/tracking/admin/employees/{self.employees[0].pk}/day-report/"
+            f"?date={self.today.isoformat()}",
+            max_queries=35,
+            max_duplicates=8,
+            label="AdminEmployeeDayReportAPI",
+        )
@@ -62,7 +62,8 @@ def readiness(_request):
 
     Checks database. Celery/Redis are reported when configured but do not
     fail readiness unless CELERY_REQUIRED_FOR_READY=true (production beat/worker
-    may be separate services).
+    may be separate services).  With GPS_INGEST_MODE=queue, ``gps_ingest``
+    reports the GPS stream backlog and consumer lag.
     """
     from django.conf import settings
     from django.db import connection
@@ -100,6 +101,14 @@ def readiness(_request):
         payload["status"] = "not_ready"
         http_status = 503
 
+    from tracking.gps_queue import gps_ingest_metrics, queue_mode_enabled
+
+    if queue_mode_enabled():
+        try:
+            payload["gps_ingest"] = gps_ingest_metrics()
+        except Exception:
+            payload["gps_ingest"] = {"status": "error"}
+
     return JsonResponse(payload, status=http_status)
 
 
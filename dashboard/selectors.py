@@ -11,36 +11,88 @@ import logging
 from datetime import date, timedelta
 from typing import Dict, List
 
-from django.db.models import Count, Q
+from django.db import connection
+from django.db.models import Count, Q, QuerySet
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
 
-def get_dashboard_stats() -> Dict:
+def _count_in_one_statement(querysets: Dict[str, QuerySet]) -> Dict[str, int]:
     """
-    Core stats: total farmers, total visits, today visits, active employees.
-    Executed against PostgreSQL – cached by the service layer.
+    COUNT(*) of several querysets as scalar subqueries of one SELECT, so the
+    whole set costs a single round-trip on SQLite and PostgreSQL alike.
     """
-    from visits.models import Visit
-    from masters.models import Farmer
-    from accounts.models import EmployeeProfile
-    from tracking.workday_utils import expire_old_workdays
+    columns, params = [], []
+    for index, (name, qs) in enumerate(querysets.items()):
+        sql, qs_params = qs.order_by().values("pk").query.sql_with_params()
+        columns.append(
+            f"(SELECT COUNT(*) FROM ({sql}) AS c{index}) AS {connection.ops.quote_name(name)}"
+        )
+        params.extend(qs_params)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT " + ", ".join(columns), params)
+        row = cursor.fetchone()
+    return {name: int(value or 0) for name, value in zip(querysets, row)}
 
-    expire_old_workdays()
 
-    today = date.today()
+def get_headline_counters(now=None) -> Dict:
+    """
+    Every headline number on the admin dashboards, in one statement.
 
+    ``working_now`` / ``online`` mirror ``is_session_within_limit``: an active
+    WorkDay counts until DURATION_LIMIT_SECONDS after its start, whether or
+    not the expiry sweep has closed it yet.
+    """
+    from accounts.models import EmployeeProfile
     from farmers.helpers import active_farmers_queryset
+    from masters.models import CropIssue, FarmerField
+    from tracking.duty_timer import DURATION_LIMIT_SECONDS
+    from tracking.live_tracking_service import online_seconds
+    from tracking.models import AvailabilityEvent, WorkDay
     from visits.submitted import submitted_visits_qs
 
-    visit_qs = submitted_visits_qs()
+    now = now or timezone.now()
+    visits = submitted_visits_qs()
+    employees = EmployeeProfile.objects.filter(is_active_employee=True)
+    working = WorkDay.objects.filter(
+        is_active=True,
+        start_time__gt=now - timedelta(seconds=DURATION_LIMIT_SECONDS),
+    )
+    counters = _count_in_one_statement(
+        {
+            "farmers": active_farmers_queryset(),
+            "fields": FarmerField.objects.filter(is_active=True),
+            "visits": visits,
+            "today_visits": visits.filter(visit_date=timezone.localdate(now)),
+            "issues_open": CropIssue.objects.filter(status="open"),
+            "employees": employees,
+            "active_employees": employees.filter(user__is_active=True),
+            "working_now": working,
+            "online": working.filter(
+                last_heartbeat__gte=now - timedelta(seconds=online_seconds())
+            ),
+            "gps_issues": AvailabilityEvent.objects.filter(
+                event_type="GPS_OFF", end_time__isnull=True
+            ),
+        }
+    )
+    counters["computed_at"] = now.isoformat()
+    return counters
+
+
+def get_dashboard_stats(counters: Dict | None = None) -> Dict:
+    """
+    Core stats: total farmers, total visits, today visits, active employees.
+    Built from the headline counters (cached by the service layer).
+    """
+    if counters is None:
+        counters = get_headline_counters()
     return {
-        "total_farmers": active_farmers_queryset().count(),
-        "total_visits": visit_qs.count(),
-        "today_visits": visit_qs.filter(visit_date=today).count(),
-        "active_employees": EmployeeProfile.objects.filter(
-            is_active_employee=True
-        ).count(),
+        "total_farmers": counters["farmers"],
+        "total_visits": counters["visits"],
+        "today_visits": counters["today_visits"],
+        "active_employees": counters["employees"],
     }
 
 
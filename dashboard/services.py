@@ -2,11 +2,19 @@
 dashboard/services.py
 ──────────────────────
 Dashboard business logic + Redis caching layer.
+
+Headline counters (``get_headline_counters``) are shared by every admin
+dashboard endpoint and served stale-while-revalidate: fresh for
+HEADLINE_FRESH_SECONDS, then the first reader (holding a short cache lock)
+recomputes while everyone else keeps getting the previous numbers, for up to
+HEADLINE_MAX_STALE_SECONDS.  Invalidation marks the entry stale instead of
+deleting it, so a burst of writes never sends every reader to the database.
 """
 
 from __future__ import annotations
 
 import logging
+import time
 from typing import Dict, List
 
 from django.core.cache import cache
@@ -16,21 +24,61 @@ from . import selectors
 logger = logging.getLogger(__name__)
 
 # Cache TTLs (seconds)
-STATS_TTL = 60  # 1 minute – near real-time
+HEADLINE_FRESH_SECONDS = 15
+HEADLINE_MAX_STALE_SECONDS = 5 * 60
+HEADLINE_REFRESH_LOCK_SECONDS = 30
 TRENDS_TTL = 5 * 60  # 5 minutes
 PERFORMANCE_TTL = 5 * 60
 
 
-def get_stats() -> Dict:
-    """Return dashboard stats, served from Redis cache when available."""
-    cache_key = "dashboard:stats"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
+HEADLINE_KEY = "dashboard:headline"
+HEADLINE_LOCK_KEY = "dashboard:headline:refresh"
 
-    data = selectors.get_dashboard_stats()
-    cache.set(cache_key, data, timeout=STATS_TTL)
-    return data
+
+def _refresh_headline_counters() -> Dict:
+    from tracking.workday_utils import expire_old_workdays
+
+    expire_old_workdays()
+    counters = selectors.get_headline_counters()
+    cache.set(
+        HEADLINE_KEY,
+        {"counters": counters, "fresh_until": time.time() + HEADLINE_FRESH_SECONDS},
+        timeout=HEADLINE_FRESH_SECONDS + HEADLINE_MAX_STALE_SECONDS,
+    )
+    return counters
+
+
+def get_headline_counters() -> Dict:
+    """Headline counters for all admin dashboards (stale-while-revalidate)."""
+    entry = cache.get(HEADLINE_KEY)
+    if entry is None:
+        return _refresh_headline_counters()
+    if entry["fresh_until"] > time.time():
+        return entry["counters"]
+    if not cache.add(HEADLINE_LOCK_KEY, 1, timeout=HEADLINE_REFRESH_LOCK_SECONDS):
+        return entry["counters"]  # another request is revalidating
+    try:
+        return _refresh_headline_counters()
+    except Exception:
+        logger.warning("event=dashboard_headline_refresh_failed", exc_info=True)
+        return entry["counters"]
+    finally:
+        cache.delete(HEADLINE_LOCK_KEY)
+
+
+def _mark_headline_stale() -> None:
+    entry = cache.get(HEADLINE_KEY)
+    if entry is not None and entry["fresh_until"]:
+        cache.set(
+            HEADLINE_KEY,
+            {**entry, "fresh_until": 0},
+            timeout=HEADLINE_MAX_STALE_SECONDS,
+        )
+
+
+def get_stats() -> Dict:
+    """Return dashboard stats, derived from the shared headline counters."""
+    return selectors.get_dashboard_stats(get_headline_counters())
 
 
 def invalidate_stats_cache() -> None:
@@ -41,6 +89,7 @@ def invalidate_stats_cache() -> None:
 def invalidate_stats_cache_only() -> None:
     """Lightweight invalidation after high-frequency tracking updates."""
     cache.delete("dashboard:stats")
+    _mark_headline_stale()
     logger.debug("Dashboard stats cache invalidated")
 
 
@@ -56,6 +105,7 @@ def invalidate_dashboard_caches() -> None:
     ]
     for key in keys:
         cache.delete(key)
+    _mark_headline_stale()
     for days in (7, 14, 30, 60, 90, 365):
         cache.delete(f"dashboard:visit_trends:{days}")
         cache.delete(f"dashboard:emp_perf:{days}")
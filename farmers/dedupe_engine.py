@@ -0,0 +1,403 @@
+"""
+Blocking-key farmer duplicate detection.
+
+``build_farmer_duplicate_audit`` only finds exact phone and exact
+normalized-name + village groups.  This engine also catches near matches
+(spelling / transliteration variants such as "Murugan" vs "Muruhan" or
+"Sheik Dawood" vs "Shaik Davood") without comparing every farmer pair:
+
+1. Farmers are streamed in chunks as plain tuples.
+2. Each farmer gets blocking keys: phone suffix, and a phonetic name key
+   within its village.  Only farmers sharing a key become candidate pairs;
+   a block larger than ``MAX_BLOCK_SIZE`` is sorted by phonetic key and each
+   farmer is compared with its ``MAX_BLOCK_SIZE`` nearest neighbours.
+3. Candidate pairs are scored (name similarity, phone, village) and pairs
+   at or above the threshold are unioned into clusters with a confidence.
+
+``find_duplicate_clusters(farmer_ids=...)`` runs incrementally: it loads the
+new farmers, then only the existing rows that share one of their blocking
+keys.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from difflib import SequenceMatcher
+from functools import cached_property, reduce
+from itertools import combinations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db.models import Value
+from django.db.models.functions import Replace, Right
+
+from masters.models import Farmer
+
+from .duplicate_audit import normalize_farmer_name
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 2000
+PHONE_SUFFIX_DIGITS = 8
+MAX_BLOCK_SIZE = 60
+CANDIDATE_QUERY_BATCH = 500
+DEFAULT_THRESHOLD = 0.75
+LIKELY_CONFIDENCE = 0.9
+
+_NON_ALPHA_RE = re.compile(r"[^a-z ]+")
+_REPEAT_RE = re.compile(r"(.)\1+")
+_DIGITS_RE = re.compile(r"\D+")
+# Separators stripped in SQL so the stored phone's tail matches ``phone_suffix``.
+_PHONE_SEPARATORS = (" ", "-", "+", "(", ")", ".", "/")
+
+# Common Tamil → Latin transliteration variants, applied in order.
+_PHONETIC_RULES: Tuple[Tuple[str, str], ...] = (
+    ("zh", "l"),
+    ("sh", "s"),
+    ("th", "t"),
+    ("dh", "d"),
+    ("bh", "b"),
+    ("kh", "k"),
+    ("gh", "g"),
+    ("ph", "p"),
+    ("ck", "k"),
+    ("ks", "x"),
+    ("w", "v"),
+    ("z", "s"),
+    ("q", "k"),
+    ("c", "k"),
+    ("g", "k"),
+    ("h", ""),
+    ("y", "i"),
+)
+_VOWELS = set("aeiou")
+
+
+@dataclass(frozen=True)
+class FarmerKeyRow:
+    id: int
+    name: str
+    normalized_name: str
+    phone: str
+    village_id: Optional[int]
+    source_quarter: str
+
+    @cached_property
+    def phonetic_key(self) -> str:
+        # Computed once per farmer; blocking and every pair score reuse it.
+        return phonetic_name_key(self.name)
+
+
+def phone_digits(phone: Optional[str]) -> str:
+    digits = _DIGITS_RE.sub("", phone or "")
+    # Drop an Indian country code so +91 / 0-prefixed numbers line up.
+    if len(digits) > 10 and digits.startswith("91"):
+        digits = digits[-10:]
+    return digits.lstrip("0") if len(digits) == 11 else digits
+
+
+def phone_suffix(phone: Optional[str]) -> str:
+    digits = phone_digits(phone)
+    return digits[-PHONE_SUFFIX_DIGITS:] if len(digits) >= PHONE_SUFFIX_DIGITS else ""
+
+
+def _ascii_fold(value: str) -> str:
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+
+
+def phonetic_token(token: str) -> str:
+    """Consonant skeleton of one name token, tolerant to transliteration variants."""
+    token = _NON_ALPHA_RE.sub("", token)
+    if not token:
+        return ""
+    for old, new in _PHONETIC_RULES:
+        token = token.replace(old, new)
+    token = _REPEAT_RE.sub(r"\1", token)
+    if not token:
+        return ""
+    head, tail = token[0], token[1:]
+    return head + "".join(ch for ch in tail if ch not in _VOWELS)
+
+
+def phonetic_name_key(name: Optional[str]) -> str:
+    """Order-insensitive phonetic key; initials (single letters) are dropped."""
+    folded = _ascii_fold(normalize_farmer_name(name))
+    tokens = [t for t in _NON_ALPHA_RE.sub(" ", folded).split() if len(t) > 1]
+    keys = sorted(k for k in (phonetic_token(t) for t in tokens) if k)
+    return " ".join(keys)
+
+
+def blocking_keys(row: FarmerKeyRow) -> List[Tuple[str, Any]]:
+    keys: List[Tuple[str, Any]] = []
+    suffix = phone_suffix(row.phone)
+    if suffix:
+        keys.append(("phone", suffix))
+    name_key = row.phonetic_key
+    if name_key:
+        keys.append(("name_village", (name_key, row.village_id)))
+        first = name_key.split(" ")[0]
+        keys.append(("first_village", (first, row.village_id)))
+    return keys
+
+
+def name_similarity(a: FarmerKeyRow, b: FarmerKeyRow) -> float:
+    if not a.normalized_name or not b.normalized_name:
+        return 0.0
+    if a.normalized_name == b.normalized_name:
+        return 1.0
+    raw = SequenceMatcher(None, a.normalized_name, b.normalized_name).ratio()
+    ka, kb = a.phonetic_key, b.phonetic_key
+    phonetic = SequenceMatcher(None, ka, kb).ratio() if ka and kb else 0.0
+    return max(raw, phonetic * 0.95)
+
+
+def score_pair(a: FarmerKeyRow, b: FarmerKeyRow) -> Tuple[float, List[str]]:
+    """Weighted 0..1 score plus the reasons that contributed."""
+    reasons: List[str] = []
+    name = name_similarity(a, b)
+    if name == 1.0:
+        reasons.append("same_name")
+    elif name >= 0.8:
+        reasons.append("similar_name")
+
+    pa, pb = phone_digits(a.phone), phone_digits(b.phone)
+    if pa and pb:
+        if pa == pb:
+            phone = 1.0
+            reasons.append("same_phone")
+        elif phone_suffix(pa) and phone_suffix(pa) == phone_suffix(pb):
+            phone = 0.7
+            reasons.append("phone_suffix")
+        else:
+            phone = 0.0
+            reasons.append("different_phone")
+    else:
+        phone = 0.5
+
+    if a.village_id and b.village_id:
+        village = 1.0 if a.village_id == b.village_id else 0.0
+        reasons.append("same_village" if village else "different_village")
+    else:
+        village = 0.5
+
+    score = 0.5 * name + 0.35 * phone + 0.15 * village
+    # A shared phone with a clearly different name is a household, not a duplicate.
+    if phone == 1.0 and name < 0.7:
+        score = min(score, 0.6)
+    return round(score, 3), reasons
+
+
+def _key_row(values: Tuple) -> FarmerKeyRow:
+    pk, name, phone, village_id, source_quarter = values
+    return FarmerKeyRow(
+        id=pk,
+        name=name or "",
+        normalized_name=normalize_farmer_name(name),
+        phone=(phone or "").strip(),
+        village_id=village_id,
+        source_quarter=source_quarter or "",
+    )
+
+
+_ROW_FIELDS = ("id", "name", "phone", "village_id", "source_quarter")
+
+
+def stream_farmer_rows(qs=None, *, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[FarmerKeyRow]:
+    qs = Farmer.objects.all() if qs is None else qs
+    for values in qs.order_by("id").values_list(*_ROW_FIELDS).iterator(chunk_size=chunk_size):
+        yield _key_row(values)
+
+
+def _candidate_querysets(new_rows: List[FarmerKeyRow]) -> Iterator[Any]:
+    """Existing farmers sharing a village or phone suffix with the new rows, in bounded IN-batches."""
+    village_ids = sorted({r.village_id for r in new_rows if r.village_id})
+    suffixes = sorted({s for s in (phone_suffix(r.phone) for r in new_rows) if s})
+    for start in range(0, len(village_ids), CANDIDATE_QUERY_BATCH):
+        yield Farmer.objects.filter(village_id__in=village_ids[start : start + CANDIDATE_QUERY_BATCH])
+    stripped = reduce(lambda expr, sep: Replace(expr, Value(sep), Value("")), _PHONE_SEPARATORS, "phone")
+    by_suffix = Farmer.objects.annotate(phone_tail=Right(stripped, PHONE_SUFFIX_DIGITS))
+    for start in range(0, len(suffixes), CANDIDATE_QUERY_BATCH):
+        yield by_suffix.filter(phone_tail__in=suffixes[start : start + CANDIDATE_QUERY_BATCH])
+
+
+def _candidate_rows(new_rows: List[FarmerKeyRow], *, chunk_size: int) -> Iterator[FarmerKeyRow]:
+    seen = {r.id for r in new_rows}
+    for qs in _candidate_querysets(new_rows):
+        for row in stream_farmer_rows(qs, chunk_size=chunk_size):
+            if row.id not in seen:
+                seen.add(row.id)
+                yield row
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _window_pairs(rows: Dict[int, FarmerKeyRow], ids: List[int]) -> Iterator[Tuple[int, int]]:
+    """Sorted-neighbourhood pairs: each farmer against the next ``MAX_BLOCK_SIZE - 1`` by name."""
+    ordered = sorted(ids, key=lambda i: (rows[i].phonetic_key, rows[i].normalized_name, i))
+    for pos, a in enumerate(ordered):
+        for b in ordered[pos + 1 : pos + MAX_BLOCK_SIZE]:
+            yield (a, b) if a < b else (b, a)
+
+
+def _score_blocks(
+    rows: Dict[int, FarmerKeyRow],
+    blocks: Dict[Tuple[str, Any], List[int]],
+    *,
+    threshold: float,
+    focus: Optional[Set[int]],
+) -> Tuple[Dict[Tuple[int, int], Tuple[float, List[str]]], int]:
+    """Scored pairs at or above ``threshold`` and the number of oversized blocks."""
+    scored: Dict[Tuple[int, int], Tuple[float, List[str]]] = {}
+    oversized = 0
+    for key, ids in blocks.items():
+        if len(ids) < 2:
+            continue
+        ids = sorted(set(ids))
+        if len(ids) <= MAX_BLOCK_SIZE:
+            candidates: Iterable[Tuple[int, int]] = combinations(ids, 2)
+        elif focus is None:
+            oversized += 1
+            logger.warning(
+                "event=farmer_dedupe_block_windowed kind=%s size=%s window=%s",
+                key[0], len(ids), MAX_BLOCK_SIZE,
+            )
+            candidates = _window_pairs(rows, ids)
+        else:
+            # Incremental run: every new farmer is compared; only the existing
+            # rows of an oversized block are truncated.
+            oversized += 1
+            old = [i for i in ids if i not in focus][:MAX_BLOCK_SIZE]
+            candidates = combinations(sorted([i for i in ids if i in focus] + old), 2)
+        for a, b in candidates:
+            if (a, b) in scored:
+                continue
+            if focus is not None and a not in focus and b not in focus:
+                continue
+            score, reasons = score_pair(rows[a], rows[b])
+            if score >= threshold:
+                scored[(a, b)] = (score, reasons)
+    return scored, oversized
+
+
+def find_duplicate_clusters(
+    *,
+    farmer_ids: Optional[Iterable[int]] = None,
+    since: Optional[datetime] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Duplicate clusters with confidence.
+
+    With ``farmer_ids`` or ``since`` only those farmers (and existing rows that
+    share a blocking key with them) are examined; otherwise the whole table is
+    streamed once.
+    """
+    focus: Optional[Set[int]] = None
+    if farmer_ids is not None or since is not None:
+        new_qs = Farmer.objects.all()
+        if farmer_ids is not None:
+            new_qs = new_qs.filter(pk__in=list(farmer_ids))
+        if since is not None:
+            new_qs = new_qs.filter(created_at__gte=since)
+        new_rows = list(stream_farmer_rows(new_qs, chunk_size=chunk_size))
+        focus = {r.id for r in new_rows}
+        source: Iterable[FarmerKeyRow] = new_rows
+        if new_rows:
+            source = list(new_rows) + list(_candidate_rows(new_rows, chunk_size=chunk_size))
+    else:
+        source = stream_farmer_rows(chunk_size=chunk_size)
+
+    rows: Dict[int, FarmerKeyRow] = {}
+    blocks: Dict[Tuple[str, Any], List[int]] = defaultdict(list)
+    for row in source:
+        rows[row.id] = row
+        for key in blocking_keys(row):
+            blocks[key].append(row.id)
+
+    pairs, oversized = _score_blocks(rows, blocks, threshold=threshold, focus=focus)
+
+    uf = _UnionFind()
+    for a, b in pairs:
+        uf.union(a, b)
+    members: Dict[int, Set[int]] = defaultdict(set)
+    edges_by_root: Dict[int, list] = defaultdict(list)
+    for pair, scored in pairs.items():
+        root = uf.find(pair[0])
+        members[root].update(pair)
+        edges_by_root[root].append((pair, scored))
+
+    clusters: List[Dict[str, Any]] = []
+    for root, ids in members.items():
+        edges = edges_by_root[root]
+        confidence = round(sum(s for _, (s, _) in edges) / len(edges), 3)
+        reasons = sorted({r for _, (_, rs) in edges for r in rs})
+        ordered = sorted(ids)
+        cluster_rows = [rows[i] for i in ordered]
+        exact = (
+            len({r.normalized_name for r in cluster_rows}) == 1
+            and len({phone_digits(r.phone) for r in cluster_rows}) == 1
+            and len({r.village_id for r in cluster_rows}) == 1
+        )
+        if exact:
+            classification = "exact"
+        elif confidence >= LIKELY_CONFIDENCE:
+            classification = "likely"
+        else:
+            classification = "review"
+        clusters.append(
+            {
+                "primary_id": ordered[0],
+                "farmer_ids": ordered,
+                "confidence": confidence,
+                "classification": classification,
+                "reasons": reasons,
+                "pairs": [
+                    {"ids": list(pair), "score": score}
+                    for pair, (score, _) in sorted(edges)
+                ],
+                "farmers": [
+                    {
+                        "id": r.id,
+                        "name": r.name,
+                        "phone": r.phone,
+                        "village_id": r.village_id,
+                        "source_quarter": r.source_quarter,
+                    }
+                    for r in cluster_rows
+                ],
+            }
+        )
+
+    clusters.sort(key=lambda c: (-c["confidence"], c["primary_id"]))
+    return {
+        "summary": {
+            "mode": "incremental" if focus is not None else "full",
+            "farmers_scanned": len(rows),
+            "blocks": sum(1 for ids in blocks.values() if len(ids) > 1),
+            "oversized_blocks": oversized,
+            "candidate_pairs": len(pairs),
+            "clusters": len(clusters),
+            "threshold": threshold,
+        },
+        "clusters": clusters,
+    }
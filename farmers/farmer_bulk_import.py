@@ -0,0 +1,372 @@
+"""
+Batched quarter workbook import.
+
+Farmers are matched on phone first, then lower-cased name + village, and the
+whole run is planned in memory:
+
+1. Workbooks are parsed in openpyxl read-only mode, optionally one process
+   per quarter file.
+2. Villages for the district are resolved in one query; missing ones are
+   bulk-created.
+3. Existing farmers are streamed once into a phone / name+village index.
+4. Creates and updates are written with ``bulk_create`` / ``bulk_update`` in
+   chunks.  FARMER_CREATED timeline rows are bulk-created alongside; the
+   per-row audit log is replaced by one summary entry per import.
+
+``plan_bulk_import`` never writes, so a dry run returns the exact diff that
+``apply_bulk_import`` would apply.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from farmers.farmer_quarter_import import (
+    DEFAULT_STATE,
+    ParsedFarmerRow,
+    _merge_source,
+    parse_quarter_workbook,
+)
+from masters.models import District, Farmer, FarmerActivity, Village
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_DIFF_LIMIT = 200
+
+# progress(stage, done, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+_UPDATE_FIELDS = ["source_quarter", "source_file", "state", "phone", "village", "district"]
+
+
+@dataclass
+class ParsedQuarter:
+    quarter_key: str
+    source_file: str
+    farmers: list[ParsedFarmerRow]
+    invalid_rows: list[dict]
+    villages: set[str]
+
+
+@dataclass
+class BulkImportPlan:
+    district: District | None
+    creates: list[Farmer] = field(default_factory=list)
+    updates: dict[int, Farmer] = field(default_factory=dict)
+    new_villages: dict[str, Village] = field(default_factory=dict)
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rows_by_quarter: dict[str, int] = field(default_factory=dict)
+    invalid_rows: list[dict] = field(default_factory=list)
+    village_names: set[str] = field(default_factory=set)
+    diff: list[dict] = field(default_factory=list)
+    diff_limit: int = DEFAULT_DIFF_LIMIT
+
+    @property
+    def villages_created(self) -> int:
+        return len(self.new_villages)
+
+    def record(self, entry: dict) -> None:
+        if len(self.diff) < self.diff_limit:
+            self.diff.append(entry)
+
+    def to_dict(self) -> dict:
+        return {
+            "rows_by_quarter": self.rows_by_quarter,
+            "farmers_created": self.created,
+            "farmers_updated": self.updated,
+            "duplicates_skipped": self.skipped,
+            "villages_created": self.villages_created,
+            "village_count": len(self.village_names),
+            "invalid_rows": self.invalid_rows,
+            "diff": self.diff,
+            "diff_truncated": (self.created + self.updated) > len(self.diff),
+        }
+
+
+def _parse_spec(spec: tuple[str, str]) -> ParsedQuarter:
+    path, quarter_key = spec
+    path = Path(path)
+    farmers, invalid, villages = parse_quarter_workbook(
+        path, quarter_key=quarter_key, source_file=path.name
+    )
+    return ParsedQuarter(quarter_key, path.name, farmers, invalid, villages)
+
+
+def parse_quarter_files(
+    specs: Iterable[tuple[str | Path, str]],
+    *,
+    processes: int = 1,
+) -> list[ParsedQuarter]:
+    """Parse (path, quarter_key) specs in order; processes > 1 parses files in parallel."""
+    specs = [(str(path), quarter_key) for path, quarter_key in specs if path]
+    if processes > 1 and len(specs) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(specs))) as pool:
+            return list(pool.map(_parse_spec, specs))
+    return [_parse_spec(spec) for spec in specs]
+
+
+def build_farmer_index(*, chunk_size: int = 2000) -> dict:
+    """Stream existing farmers once into by_phone / by_name_village maps."""
+    by_phone: dict[str, Farmer] = {}
+    by_name_village: dict[tuple[str, str], Farmer] = {}
+    qs = Farmer.objects.select_related("village").only(
+        "id",
+        "name",
+        "phone",
+        "state",
+        "source_file",
+        "source_quarter",
+        "district_id",
+        "village_id",
+        "village__name",
+    )
+    for farmer in qs.iterator(chunk_size=chunk_size):
+        if farmer.phone:
+            by_phone[farmer.phone] = farmer
+        if farmer.village_id:
+            by_name_village[(farmer.name.lower(), farmer.village.name.lower())] = farmer
+    return {"by_phone": by_phone, "by_name_village": by_name_village}
+
+
+def _village_index(district: District | None) -> dict[str, Village]:
+    if district is None or district.pk is None:
+        return {}
+    index: dict[str, Village] = {}
+    for village in Village.objects.filter(district=district).only("id", "name", "district_id").order_by("id"):
+        index.setdefault(village.name.lower(), village)
+    return index
+
+
+def _snapshot(farmer: Farmer) -> dict:
+    return {
+        "source_quarter": farmer.source_quarter,
+        "source_file": farmer.source_file,
+        "state": farmer.state,
+        "phone": farmer.phone,
+        "village_id": farmer.village_id,
+        "district_id": farmer.district_id,
+    }
+
+
+def plan_bulk_import(
+    parsed: list[ParsedQuarter],
+    *,
+    district: District | None,
+    farmer_index: dict | None = None,
+    diff_limit: int = DEFAULT_DIFF_LIMIT,
+    progress: ProgressCallback | None = None,
+) -> BulkImportPlan:
+    """Match every parsed row against the in-memory index; no DB writes."""
+    plan = BulkImportPlan(district=district, diff_limit=diff_limit)
+    index = farmer_index if farmer_index is not None else {}
+    by_phone: dict[str, Farmer] = index.setdefault("by_phone", {})
+    by_name_village: dict[tuple[str, str], Farmer] = index.setdefault("by_name_village", {})
+    villages = _village_index(district)
+    pending: set[int] = set()  # id() of farmers queued for bulk_create
+
+    total = sum(len(q.farmers) for q in parsed)
+    done = 0
+    for quarter in parsed:
+        plan.rows_by_quarter[quarter.quarter_key] = len(quarter.farmers)
+        plan.invalid_rows.extend(quarter.invalid_rows)
+        plan.village_names |= quarter.villages
+
+        for row in quarter.farmers:
+            done += 1
+            village_key = row.village.lower()
+            village = villages.get(village_key)
+            if village is None and district is not None:
+                village = Village(name=row.village, district=district, is_active=True)
+                villages[village_key] = village
+                plan.new_villages[village_key] = village
+
+            existing = None
+            if row.phone:
+                existing = by_phone.get(row.phone)
+            if existing is None:
+                existing = by_name_village.get((row.name.lower(), village_key))
+
+            if existing is not None:
+                before = _snapshot(existing)
+                changed = _merge_source(existing, quarter.quarter_key, quarter.source_file)
+                if row.phone and not existing.phone:
+                    existing.phone = row.phone
+                    changed = True
+                if existing.village_id is None and existing.village is None and village is not None:
+                    existing.village = village
+                    changed = True
+                if existing.district_id is None and district is not None:
+                    existing.district = district
+                    changed = True
+                if changed:
+                    plan.updated += 1
+                    if id(existing) not in pending:
+                        plan.updates[existing.pk] = existing
+                    after = _snapshot(existing)
+                    plan.record(
+                        {
+                            "action": "update",
+                            "quarter": quarter.quarter_key,
+                            "row": row.row_num,
+                            "farmer_id": existing.pk,
+                            "name": existing.name,
+                            "changes": {
+                                key: [before[key], after[key]]
+                                for key in after
+                                if before[key] != after[key]
+                            },
+                        }
+                    )
+                else:
+                    plan.skipped += 1
+                if row.phone:
+                    by_phone[row.phone] = existing
+                by_name_village[(row.name.lower(), village_key)] = existing
+            else:
+                farmer = Farmer(
+                    name=row.name,
+                    phone=row.phone,
+                    district=district,
+                    village=village,
+                    state=DEFAULT_STATE,
+                    source_file=quarter.source_file,
+                    source_quarter=quarter.quarter_key,
+                    is_active=True,
+                )
+                farmer.farmer_code = farmer._generate_code()
+                plan.creates.append(farmer)
+                pending.add(id(farmer))
+                plan.created += 1
+                plan.record(
+                    {
+                        "action": "create",
+                        "quarter": quarter.quarter_key,
+                        "row": row.row_num,
+                        "name": row.name,
+                        "phone": row.phone or None,
+                        "village": row.village,
+                        "new_village": village_key in plan.new_villages,
+                    }
+                )
+                if row.phone:
+                    by_phone[row.phone] = farmer
+                by_name_village[(row.name.lower(), village_key)] = farmer
+
+            if progress and (done % DEFAULT_CHUNK_SIZE == 0 or done == total):
+                progress("plan", done, total)
+
+    return plan
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@transaction.atomic
+def apply_bulk_import(
+    plan: BulkImportPlan,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+) -> BulkImportPlan:
+    """Write a plan with bulk_create / bulk_update in chunks."""
+    from audit_logs.utils import create_audit_log
+
+    new_villages = list(plan.new_villages.values())
+    if new_villages:
+        Village.objects.bulk_create(new_villages, batch_size=chunk_size)
+
+    for farmer in plan.creates:
+        if farmer.village is not None:
+            farmer.village_id = farmer.village.pk
+    written = 0
+    for batch in _chunks(plan.creates, chunk_size):
+        created = Farmer.objects.bulk_create(batch)
+        FarmerActivity.objects.bulk_create(
+            [
+                FarmerActivity(
+                    farmer=farmer,
+                    activity_type="FARMER_CREATED",
+                    reference_id=farmer.pk,
+                    notes=f"Farmer {farmer.name} registered.",
+                )
+                for farmer in created
+                if farmer.pk
+            ]
+        )
+        written += len(batch)
+        if progress:
+            progress("create", written, len(plan.creates))
+
+    updates = list(plan.updates.values())
+    now = timezone.now()
+    for farmer in updates:
+        if farmer.village is not None and farmer.village_id is None:
+            farmer.village_id = farmer.village.pk
+        farmer.updated_at = now
+    written = 0
+    for batch in _chunks(updates, chunk_size):
+        Farmer.objects.bulk_update(batch, _UPDATE_FIELDS + ["updated_at"])
+        written += len(batch)
+        if progress:
+            progress("update", written, len(updates))
+
+    create_audit_log(
+        actor=None,
+        module="FARMERS",
+        action="CREATE",
+        description=(
+            f"Bulk quarter import: {plan.created} created, {plan.updated} updated, "
+            f"{plan.villages_created} villages created"
+        ),
+        metadata={"rows_by_quarter": plan.rows_by_quarter},
+    )
+    logger.info(
+        "event=farmer_bulk_import created=%s updated=%s skipped=%s villages_created=%s",
+        plan.created,
+        plan.updated,
+        plan.skipped,
+        plan.villages_created,
+    )
+    return plan
+
+
+def run_bulk_import(
+    specs: Iterable[tuple[str | Path | None, str]],
+    *,
+    district: District | None,
+    dry_run: bool = False,
+    preload_existing: bool = True,
+    processes: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    diff_limit: int = DEFAULT_DIFF_LIMIT,
+    progress: ProgressCallback | None = None,
+) -> BulkImportPlan:
+    """Parse, plan and (unless dry_run) apply one batched import run."""
+    parsed = parse_quarter_files(
+        [(path, key) for path, key in specs if path], processes=processes
+    )
+    if progress:
+        progress("parse", len(parsed), len(parsed))
+    index = build_farmer_index() if preload_existing else {}
+    plan = plan_bulk_import(
+        parsed,
+        district=district,
+        farmer_index=index,
+        diff_limit=diff_limit,
+        progress=progress,
+    )
+    if not dry_run:
+        apply_bulk_import(plan, chunk_size=chunk_size, progress=progress)
+    return plan
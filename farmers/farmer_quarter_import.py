@@ -251,38 +251,19 @@ def parse_quarter_workbook(
     return farmers, invalid_rows, villages
 
 
+def _existing_district(name: str = DEFAULT_DISTRICT) -> District | None:
+    return District.objects.filter(name__iexact=name).first()
+
+
 def _get_or_create_district(name: str = DEFAULT_DISTRICT) -> District:
-    district = District.objects.filter(name__iexact=name).first()
+    district = _existing_district(name)
     if district:
         return district
     return District.objects.create(name=name, is_active=True)
 
 
-def _get_or_create_village(name: str, district: District) -> tuple[Village, bool]:
-    village = Village.objects.filter(
-        name__iexact=name, district=district
-    ).first()
-    if village:
-        return village, False
-    return Village.objects.create(name=name, district=district, is_active=True), True
-
-
-def build_existing_farmer_cache() -> dict:
-    """Preload existing farmers for merge-import deduplication."""
-    by_phone: dict[str, Farmer] = {}
-    by_name_village: dict[tuple[str, str], Farmer] = {}
-    for farmer in Farmer.objects.select_related("village").iterator():
-        if farmer.phone:
-            by_phone[farmer.phone] = farmer
-        if farmer.village_id:
-            by_name_village[
-                (farmer.name.lower(), farmer.village.name.lower())
-            ] = farmer
-    return {"by_phone": by_phone, "by_name_village": by_name_village}
-
-
 def _existing_village_names(district: District | None = None) -> set[str]:
-    district = district or District.objects.filter(name__iexact=DEFAULT_DISTRICT).first()
+    district = district or _existing_district()
     if district is None:
         return set()
     return {
@@ -316,109 +297,6 @@ def _merge_source(existing: Farmer, quarter_key: str, source_file: str) -> bool:
     return changed
 
 
-def _find_existing_farmer(
-    row: ParsedFarmerRow,
-    by_phone: dict[str, Farmer],
-    by_name_village: dict[tuple[str, str], Farmer],
-    *,
-    query_db: bool,
-) -> Farmer | None:
-    existing: Farmer | None = None
-    if row.phone:
-        existing = by_phone.get(row.phone)
-        if existing is None and query_db:
-            existing = Farmer.objects.filter(phone=row.phone).first()
-    if existing is None:
-        key = (row.name.lower(), row.village.lower())
-        existing = by_name_village.get(key)
-        if existing is None and query_db:
-            existing = (
-                Farmer.objects.filter(name__iexact=row.name)
-                .filter(village__name__iexact=row.village)
-                .first()
-            )
-    return existing
-
-
-def import_parsed_farmers(
-    rows: list[ParsedFarmerRow],
-    *,
-    quarter_key: str,
-    source_file: str,
-    district: District | None = None,
-    dry_run: bool = False,
-    session_cache: dict | None = None,
-) -> tuple[int, int, int, int]:
-    """
-    Import parsed rows. Returns (created, updated, duplicates_skipped, villages_created).
-    session_cache tracks phone/name+village within a single import run.
-    """
-    district = district or _get_or_create_district()
-    cache = session_cache if session_cache is not None else {}
-    by_phone: dict[str, Farmer] = cache.setdefault("by_phone", {})
-    by_name_village: dict[tuple[str, str], Farmer] = cache.setdefault(
-        "by_name_village", {}
-    )
-
-    created = updated = skipped = villages_created = 0
-
-    for row in rows:
-        village = None
-        if not dry_run:
-            village, village_created = _get_or_create_village(row.village, district)
-            if village_created:
-                villages_created += 1
-
-        existing = _find_existing_farmer(
-            row, by_phone, by_name_village, query_db=not dry_run
-        )
-
-        if existing is not None:
-            if dry_run:
-                skipped += 1
-                continue
-            changed = _merge_source(existing, quarter_key, source_file)
-            if row.phone and not existing.phone:
-                existing.phone = row.phone
-                changed = True
-            if existing.village_id is None and village is not None:
-                existing.village = village
-                changed = True
-            if existing.district_id is None:
-                existing.district = district
-                changed = True
-            if changed:
-                existing.save()
-                updated += 1
-            else:
-                skipped += 1
-            if row.phone:
-                by_phone[row.phone] = existing
-            by_name_village[(row.name.lower(), row.village.lower())] = existing
-            continue
-
-        if dry_run:
-            created += 1
-            continue
-
-        farmer = Farmer.objects.create(
-            name=row.name,
-            phone=row.phone,
-            district=district,
-            village=village,
-            state=DEFAULT_STATE,
-            source_file=source_file,
-            source_quarter=quarter_key,
-            is_active=True,
-        )
-        created += 1
-        if row.phone:
-            by_phone[row.phone] = farmer
-        by_name_village[(row.name.lower(), row.village.lower())] = farmer
-
-    return created, updated, skipped, villages_created
-
-
 def preview_quarter_file(path: str | Path, quarter_key: str) -> dict:
     farmers, invalid, villages = parse_quarter_workbook(
         path, quarter_key=quarter_key
@@ -441,112 +319,90 @@ def preview_quarter_file(path: str | Path, quarter_key: str) -> dict:
     }
 
 
+def _bulk_kwargs(processes: int, chunk_size: int | None, progress) -> dict:
+    from farmers.farmer_bulk_import import DEFAULT_CHUNK_SIZE
+
+    return {
+        "processes": processes,
+        "chunk_size": chunk_size or DEFAULT_CHUNK_SIZE,
+        "progress": progress,
+    }
+
+
 def run_full_import(
     quarter1_path: str | Path | None,
     quarter2_path: str | Path | None,
     *,
     dry_run: bool = False,
+    processes: int = 1,
+    chunk_size: int | None = None,
+    progress=None,
 ) -> ImportSummary:
-    summary = ImportSummary()
-    district = _get_or_create_district() if not dry_run else None
-    if dry_run:
-        district_name = DEFAULT_DISTRICT
-    else:
-        district_name = district.name if district else DEFAULT_DISTRICT
-    summary.district = district_name
-
-    session_cache: dict = {}
-    all_villages: set[str] = set()
-
-    file_specs = [
-        (quarter1_path, "quarter1"),
-        (quarter2_path, "quarter2"),
-    ]
-    for path, quarter_key in file_specs:
-        if not path:
-            continue
-        path = Path(path)
-        farmers, invalid, villages = parse_quarter_workbook(
-            path, quarter_key=quarter_key, source_file=path.name
-        )
-        all_villages |= villages
-        summary.invalid_rows.extend(invalid)
-        if quarter_key == "quarter1":
-            summary.quarter1_rows_processed = len(farmers)
-        else:
-            summary.quarter2_rows_processed = len(farmers)
-
-        created, updated, skipped, villages_created = import_parsed_farmers(
-            farmers,
-            quarter_key=quarter_key,
-            source_file=path.name,
-            district=district,
-            dry_run=dry_run,
-            session_cache=session_cache,
-        )
-        summary.farmers_created += created
-        summary.farmers_updated += updated
-        summary.duplicates_skipped += skipped
-        summary.villages_created += villages_created
+    """Clean Q1/Q2 import through the batched importer (farmer_bulk_import)."""
+    from farmers.farmer_bulk_import import run_bulk_import
 
-    summary.village_count = len(all_villages)
+    summary = ImportSummary()
+    # A dry run resolves the same district without creating it, so existing
+    # villages are matched exactly as the real run would match them.
+    district = _existing_district() if dry_run else _get_or_create_district()
+    summary.district = district.name if district else DEFAULT_DISTRICT
+
+    plan = run_bulk_import(
+        [(quarter1_path, "quarter1"), (quarter2_path, "quarter2")],
+        district=district,
+        dry_run=dry_run,
+        # Dry runs mirror the legacy session-only dedupe (clean import wipes first).
+        preload_existing=not dry_run,
+        **_bulk_kwargs(processes, chunk_size, progress),
+    )
+    summary.quarter1_rows_processed = plan.rows_by_quarter.get("quarter1", 0)
+    summary.quarter2_rows_processed = plan.rows_by_quarter.get("quarter2", 0)
+    summary.farmers_created = plan.created
+    summary.farmers_updated = plan.updated
+    summary.duplicates_skipped = plan.skipped
+    summary.villages_created = plan.villages_created
+    summary.invalid_rows = plan.invalid_rows
+    summary.village_count = len(plan.village_names)
     return summary
 
 
 def preview_merge_import(
     quarter3_path: str | Path | None,
     quarter4_path: str | Path | None,
+    *,
+    processes: int = 1,
+    diff_limit: int | None = None,
 ) -> dict[str, Any]:
-    """Dry-run merge preview for Q3/Q4 without writing to DB."""
-    district = District.objects.filter(name__iexact=DEFAULT_DISTRICT).first()
-    all_villages: set[str] = set()
-    invalid_rows: list[dict] = []
-    q3_parsed = q4_parsed = 0
-
-    session_cache = build_existing_farmer_cache()
-    created = updated = skipped = 0
-
-    file_specs = [
-        (quarter3_path, "quarter3"),
-        (quarter4_path, "quarter4"),
-    ]
-    for path, quarter_key in file_specs:
-        if not path:
-            continue
-        path = Path(path)
-        farmers, invalid, villages = parse_quarter_workbook(
-            path, quarter_key=quarter_key, source_file=path.name
-        )
-        all_villages |= villages
-        invalid_rows.extend(invalid)
-        if quarter_key == "quarter3":
-            q3_parsed = len(farmers)
-        else:
-            q4_parsed = len(farmers)
-
-        c, u, s, _ = import_parsed_farmers(
-            farmers,
-            quarter_key=quarter_key,
-            source_file=path.name,
-            district=district,
-            dry_run=True,
-            session_cache=session_cache,
-        )
-        created += c
-        updated += u
-        skipped += s
-
+    """Dry-run merge preview for Q3/Q4 without writing to DB (includes row diff)."""
+    from farmers.farmer_bulk_import import DEFAULT_DIFF_LIMIT, run_bulk_import
+
+    district = _existing_district()
+    plan = run_bulk_import(
+        [(quarter3_path, "quarter3"), (quarter4_path, "quarter4")],
+        district=district,
+        dry_run=True,
+        processes=processes,
+        diff_limit=DEFAULT_DIFF_LIMIT if diff_limit is None else diff_limit,
+    )
+    q3_parsed = plan.rows_by_quarter.get("quarter3", 0)
+    q4_parsed = plan.rows_by_quarter.get("quarter4", 0)
+    villages_created = (
+        plan.villages_created
+        if district is not None
+        else count_new_villages(plan.village_names, district)
+    )
     return {
         "ready": bool(q3_parsed or q4_parsed),
         "quarter3_parsed": q3_parsed,
         "quarter4_parsed": q4_parsed,
-        "farmers_created": created,
-        "farmers_updated": updated,
-        "duplicates_skipped": skipped,
-        "invalid_rows": invalid_rows,
-        "village_count": len(all_villages),
-        "villages_created": count_new_villages(all_villages, district),
+        "farmers_created": plan.created,
+        "farmers_updated": plan.updated,
+        "duplicates_skipped": plan.skipped,
+        "invalid_rows": plan.invalid_rows,
+        "village_count": len(plan.village_names),
+        "villages_created": villages_created,
         "district": district.name if district else DEFAULT_DISTRICT,
+        "diff": plan.diff,
     }
 
 
@@ -555,13 +411,19 @@ def run_merge_import(
     quarter4_path: str | Path | None,
     *,
     dry_run: bool = False,
+    processes: int = 1,
+    chunk_size: int | None = None,
+    progress=None,
 ) -> MergeImportSummary:
     """Merge Q3/Q4 farmers into existing live data without deleting."""
+    from farmers.farmer_bulk_import import run_bulk_import
+
     summary = MergeImportSummary()
     summary.farmers_before = Farmer.objects.count()
-    district = _get_or_create_district() if not dry_run else None
     if dry_run:
-        preview = preview_merge_import(quarter3_path, quarter4_path)
+        preview = preview_merge_import(
+            quarter3_path, quarter4_path, processes=processes
+        )
         summary.quarter3_rows_processed = preview["quarter3_parsed"]
         summary.quarter4_rows_processed = preview["quarter4_parsed"]
         summary.farmers_created = preview["farmers_created"]
@@ -573,41 +435,20 @@ def run_merge_import(
         summary.district = preview["district"]
         return summary
 
-    district = district or _get_or_create_district()
+    district = _get_or_create_district()
     summary.district = district.name
-    session_cache = build_existing_farmer_cache()
-    all_villages: set[str] = set()
-
-    file_specs = [
-        (quarter3_path, "quarter3"),
-        (quarter4_path, "quarter4"),
-    ]
-    for path, quarter_key in file_specs:
-        if not path:
-            continue
-        path = Path(path)
-        farmers, invalid, villages = parse_quarter_workbook(
-            path, quarter_key=quarter_key, source_file=path.name
-        )
-        all_villages |= villages
-        summary.invalid_rows.extend(invalid)
-        if quarter_key == "quarter3":
-            summary.quarter3_rows_processed = len(farmers)
-        else:
-            summary.quarter4_rows_processed = len(farmers)
-
-        created, updated, skipped, villages_created = import_parsed_farmers(
-            farmers,
-            quarter_key=quarter_key,
-            source_file=path.name,
-            district=district,
-            dry_run=False,
-            session_cache=session_cache,
-        )
-        summary.farmers_created += created
-        summary.farmers_updated += updated
-        summary.duplicates_skipped += skipped
-        summary.villages_created += villages_created
-
-    summary.village_count = len(all_villages)
+    plan = run_bulk_import(
+        [(quarter3_path, "quarter3"), (quarter4_path, "quarter4")],
+        district=district,
+        dry_run=False,
+        **_bulk_kwargs(processes, chunk_size, progress),
+    )
+    summary.quarter3_rows_processed = plan.rows_by_quarter.get("quarter3", 0)
+    summary.quarter4_rows_processed = plan.rows_by_quarter.get("quarter4", 0)
+    summary.farmers_created = plan.created
+    summary.farmers_updated = plan.updated
+    summary.duplicates_skipped = plan.skipped
+    summary.villages_created = plan.villages_created
+    summary.invalid_rows = plan.invalid_rows
+    summary.village_count = len(plan.village_names)
     return summary
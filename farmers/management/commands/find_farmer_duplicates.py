@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from farmers.dedupe_engine import DEFAULT_THRESHOLD, find_duplicate_clusters
+
+
+def _parse_since(raw: str) -> datetime:
+    value = parse_datetime(raw)
+    if value is None:
+        day = parse_date(raw)
+        if day is None:
+            raise CommandError("--since must be YYYY-MM-DD or an ISO datetime.")
+        value = datetime.combine(day, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        "Read-only fuzzy duplicate detection (phone suffix / phonetic name / village "
+        "blocking). Use --since or --ids to check only newly imported farmers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only farmers created on/after this date or datetime.")
+        parser.add_argument("--ids", help="Comma-separated farmer ids to check.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f"Minimum pair score 0..1 (default {DEFAULT_THRESHOLD}).",
+        )
+        parser.add_argument("--top", type=int, default=20, help="Clusters to print (default 20).")
+        parser.add_argument("--json", action="store_true", help="Print full JSON report.")
+
+    def handle(self, *args, **options):
+        farmer_ids = None
+        if options.get("ids"):
+            try:
+                farmer_ids = [int(x) for x in options["ids"].split(",") if x.strip()]
+            except ValueError as exc:
+                raise CommandError("--ids must be comma-separated integers.") from exc
+        since = _parse_since(options["since"]) if options.get("since") else None
+
+        report = find_duplicate_clusters(
+            farmer_ids=farmer_ids, since=since, threshold=options["threshold"]
+        )
+        summary = report["summary"]
+
+        self.stdout.write(self.style.MIGRATE_HEADING("=== Farmer duplicate clusters ===\n"))
+        for key in (
+            "mode", "farmers_scanned", "blocks", "oversized_blocks", "candidate_pairs", "clusters",
+            "threshold",
+        ):
+            self.stdout.write(f"  {key}: {summary[key]}")
+
+        for cluster in report["clusters"][: options["top"]]:
+            self.stdout.write(
+                f"\n  keep id={cluster['primary_id']} ids={cluster['farmer_ids']} "
+                f"confidence={cluster['confidence']} class={cluster['classification']} "
+                f"reasons={','.join(cluster['reasons'])}"
+            )
+            for f in cluster["farmers"]:
+                self.stdout.write(
+                    f"    id={f['id']} name={f['name']!r} phone={f['phone']!r} "
+                    f"village={f['village_id']}"
+                )
+
+        self.stdout.write(self.style.HTTP_INFO("\nNo data was modified."))
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
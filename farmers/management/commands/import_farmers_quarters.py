@@ -18,8 +18,10 @@ from pathlib import Path
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.db.models import F, Q
+from django.utils import timezone
 
 from farmers.db_debug import get_database_connection_info, resolve_quarter_path
+from farmers.dedupe_engine import find_duplicate_clusters
 from farmers.farmer_cleanup import create_db_backup
 from farmers.farmer_quarter_import import (
     preview_merge_import,
@@ -99,12 +101,33 @@ class Command(BaseCommand):
             default=DEFAULT_QUARTER4_PATH,
             help=f'Path to "QUARTER 4GrpSum.xlsx" (default: {DEFAULT_QUARTER4_PATH}).',
         )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Parse Q3/Q4 workbooks in parallel (one process per file).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Rows per bulk_create / bulk_update batch (default 500).",
+        )
+        parser.add_argument(
+            "--show-diff",
+            type=int,
+            default=20,
+            help="Dry-run: print the first N planned creates/updates (default 20).",
+        )
         parser.add_argument(
             "--backup-dir",
             default="",
             help="Directory for pg_dump backup (default: <project>/backups).",
         )
 
+    def _progress(self, stage, done, total):
+        self.stdout.write(f"  [{stage}] {done}/{total}")
+
     def handle(self, *args, **options):
         if not options["merge"]:
             raise CommandError("Pass --merge to run Q3/Q4 merge import.")
@@ -150,6 +173,7 @@ class Command(BaseCommand):
         merge_preview = preview_merge_import(
             q3_path if q3_path.exists() else None,
             q4_path if q4_path.exists() else None,
+            processes=options["processes"],
         )
         if not merge_preview.get("ready"):
             raise CommandError("No farmers parsed from Q3/Q4 Excel files.")
@@ -160,6 +184,9 @@ class Command(BaseCommand):
         self.stdout.write(f"  Q3 parsed: {merge_preview['quarter3_parsed']}")
         self.stdout.write(f"  Q4 parsed: {merge_preview['quarter4_parsed']}")
         self.stdout.write(f"  New farmers expected: {merge_preview['farmers_created']}")
+        self.stdout.write(
+            f"  Existing farmers to update: {merge_preview['farmers_updated']}"
+        )
         self.stdout.write(
             f"  Duplicate farmers expected: {merge_preview['duplicates_skipped']}"
         )
@@ -169,6 +196,25 @@ class Command(BaseCommand):
         self.stdout.write(f"  Invalid rows: {len(merge_preview['invalid_rows'])}")
 
         if dry_run:
+            diff = merge_preview.get("diff") or []
+            if diff and options["show_diff"] > 0:
+                self.stdout.write("")
+                self.stdout.write(self.style.MIGRATE_HEADING("Planned changes (diff)"))
+                for entry in diff[: options["show_diff"]]:
+                    if entry["action"] == "create":
+                        self.stdout.write(
+                            f"  + {entry['quarter']} row {entry['row']}: {entry['name']!r} "
+                            f"phone={entry['phone']!r} village={entry['village']!r}"
+                        )
+                    else:
+                        changes = ", ".join(
+                            f"{key}: {old!r} -> {new!r}"
+                            for key, (old, new) in entry["changes"].items()
+                        )
+                        self.stdout.write(
+                            f"  ~ {entry['quarter']} row {entry['row']}: "
+                            f"farmer id={entry['farmer_id']} {changes}"
+                        )
             self.stdout.write("")
             self.stdout.write(
                 self.style.WARNING(
@@ -201,10 +247,14 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"Backup created: {backup_path}"))
 
         self.stdout.write(self.style.MIGRATE_HEADING("Merging Q3/Q4 farmers"))
+        import_started_at = timezone.now()
         result = run_merge_import(
             q3_path if q3_path.exists() else None,
             q4_path if q4_path.exists() else None,
             dry_run=False,
+            processes=options["processes"],
+            chunk_size=options["chunk_size"],
+            progress=self._progress,
         )
 
         _invalidate_caches()
@@ -225,6 +275,7 @@ class Command(BaseCommand):
             self.stdout.write(style(f"  {path}: HTTP {info['status']}{extra}"))
 
         recent = _recent_merge_farmers(20)
+        dedupe = find_duplicate_clusters(since=import_started_at)
 
         self.stdout.write("")
         self.stdout.write(self.style.MIGRATE_HEADING("Final summary"))
@@ -236,6 +287,10 @@ class Command(BaseCommand):
         self.stdout.write(f"  Invalid rows: {len(result.invalid_rows)}")
         self.stdout.write(f"  Final farmer count: {final_farmer_count}")
         self.stdout.write(f"  Villages before/after: {villages_before} -> {final_village_count}")
+        self.stdout.write(
+            f"  Possible duplicates among new farmers: {dedupe['summary']['clusters']} "
+            "(see find_farmer_duplicates --since)"
+        )
         self.stdout.write("  First 20 imported/updated farmers (Q3/Q4):")
         for row in recent:
             self.stdout.write(
@@ -257,4 +312,5 @@ class Command(BaseCommand):
         summary_dict["villages_after"] = final_village_count
         summary_dict["api_results"] = api_results
         summary_dict["recent_q3_q4_farmers"] = recent
+        summary_dict["new_farmer_duplicate_clusters"] = dedupe["summary"]["clusters"]
         self.stdout.write(json.dumps(summary_dict, indent=2, default=str))
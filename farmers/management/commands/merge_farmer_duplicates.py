@@ -3,7 +3,13 @@ import json
 from django.core.management.base import BaseCommand, CommandError
 
 from farmers.farmer_cleanup import create_db_backup
-from farmers.merge_duplicates import execute_merge, preview_merge
+from farmers.merge_duplicates import (
+    MERGE_BATCH_SIZE,
+    execute_merge,
+    preview_merge,
+    revert_merge,
+)
+from masters.models import FarmerMergeJournal
 
 
 class Command(BaseCommand):
@@ -24,12 +30,24 @@ class Command(BaseCommand):
             action="store_true",
             help="Execute merge after creating a database backup.",
         )
+        group.add_argument(
+            "--revert",
+            type=int,
+            metavar="JOURNAL_ID",
+            help="Undo a previous merge run using its merge journal id.",
+        )
         parser.add_argument(
             "--top",
             type=int,
             default=50,
             help="Max duplicate groups to evaluate (default 50).",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MERGE_BATCH_SIZE,
+            help=f"Duplicates re-pointed per UPDATE statement (default {MERGE_BATCH_SIZE}).",
+        )
         parser.add_argument(
             "--json",
             action="store_true",
@@ -37,6 +55,20 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        if options["revert"] is not None:
+            try:
+                result = revert_merge(options["revert"], batch_size=options["batch_size"])
+            except (ValueError, FarmerMergeJournal.DoesNotExist) as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"=== Reverted merge #{result['journal_id']} ===")
+            )
+            for label, count in result["row_counts"].items():
+                self.stdout.write(f"  {label}: {count}")
+            if options["json"]:
+                self.stdout.write(json.dumps(result, indent=2, default=str))
+            return
+
         if options["dry_run"]:
             preview = preview_merge(group_limit=options["top"])
             summary = preview["audit_summary"]
@@ -68,11 +100,18 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f"Backup saved: {backup_path}"))
 
-        result = execute_merge(group_limit=options["top"])
+        result = execute_merge(group_limit=options["top"], batch_size=options["batch_size"])
         post = result["post_audit_summary"]
 
         self.stdout.write(self.style.MIGRATE_HEADING("\n=== Merge complete ==="))
         self.stdout.write(f"  Merged duplicate rows: {result['merged']}")
+        for label, count in result["row_counts"].items():
+            self.stdout.write(f"  {label}: {count}")
+        if result["journal_id"]:
+            self.stdout.write(
+                f"  Merge journal: {result['journal_id']} "
+                f"(undo with --revert {result['journal_id']})"
+            )
         self.stdout.write(f"  Final farmer count: {post['total_farmers']}")
         self.stdout.write(f"  Duplicate phone groups remaining: {post['duplicate_phone_groups']}")
         self.stdout.write(
@@ -1,19 +1,30 @@
 """
 Safe farmer duplicate merge (used by merge_farmer_duplicates management command).
+
+Merges are set-based: the whole duplicate -> primary mapping is computed up
+front and each related table is re-pointed with batched single-statement
+updates, so locks are held per batch rather than per duplicate.  Every run
+writes a FarmerMergeJournal that ``revert_merge`` can undo.
 """
 
 from __future__ import annotations
 
+import logging
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from django.db import transaction
-from django.db.models import Count
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from masters.models import CropIssue, Farmer, FarmerActivity, FarmerField, FieldCrop
+from masters.models import Farmer, FarmerActivity, FarmerField, FarmerMergeJournal
+from reports.rollups import refresh_for_visit_ids
 from visits.models import Visit
 
 from .duplicate_audit import build_farmer_duplicate_audit, parse_quarter_keys
 
+logger = logging.getLogger(__name__)
+
 
 def _merge_source_fields(primary: Farmer, duplicate: Farmer) -> None:
     quarters: Set[str] = parse_quarter_keys(primary.source_quarter)
@@ -26,34 +37,105 @@ def _merge_source_fields(primary: Farmer, duplicate: Farmer) -> None:
         primary.source_file = ";".join(dict.fromkeys(files))
 
 
-def _move_farmer_relations(primary_id: int, duplicate_id: int) -> Dict[str, int]:
-    moved = {
-        "visits": 0,
-        "farmer_activities": 0,
-        "farmer_fields": 0,
-        "field_crops": 0,
-        "issues_via_visits": 0,
-    }
+# (label, model) for every table that points at masters.Farmer via farmer_id.
+MERGE_RELATIONS: Tuple[Tuple[str, Any], ...] = (
+    ("visits", Visit),
+    ("farmer_activities", FarmerActivity),
+    ("farmer_fields", FarmerField),
+)
 
-    moved["visits"] = Visit.objects.filter(farmer_id=duplicate_id).update(farmer_id=primary_id)
-    moved["farmer_activities"] = FarmerActivity.objects.filter(farmer_id=duplicate_id).update(
-        farmer_id=primary_id
-    )
+MERGE_BATCH_SIZE = 500
 
-    field_ids = list(
-        FarmerField.objects.filter(farmer_id=duplicate_id).values_list("id", flat=True)
-    )
-    if field_ids:
-        moved["farmer_fields"] = FarmerField.objects.filter(id__in=field_ids).update(
-            farmer_id=primary_id
+_FARMER_SNAPSHOT_FIELDS = [f.attname for f in Farmer._meta.concrete_fields]
+
+
+def _chunks(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _bulk_set_column(
+    model, match_column: str, set_column: str, pairs: List[Tuple[int, int]]
+) -> int:
+    """
+    ``UPDATE table SET set_column = new WHERE match_column = old`` for every
+    (old, new) pair in one statement.  PostgreSQL joins a VALUES list;
+    other backends (sqlite in tests) use an equivalent CASE expression.
+
+    Raw SQL: no model signals fire, so derived data kept by signals (visit
+    rollups in ``reports.rollups``) must be refreshed by the caller.
+    """
+    if not pairs:
+        return 0
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    match, target = qn(match_column), qn(set_column)
+    params: List[int] = []
+    if connection.vendor == "postgresql":
+        values = ", ".join(["(%s::bigint, %s::bigint)"] * len(pairs))
+        for old, new in pairs:
+            params.extend((old, new))
+        sql = (
+            f"UPDATE {table} AS t SET {target} = m.new_id "
+            f"FROM (VALUES {values}) AS m(old_id, new_id) "
+            f"WHERE t.{match} = m.old_id"
+        )
+    else:
+        whens = " ".join(["WHEN %s THEN %s"] * len(pairs))
+        for old, new in pairs:
+            params.extend((old, new))
+        placeholders = ", ".join(["%s"] * len(pairs))
+        params.extend(old for old, _ in pairs)
+        sql = (
+            f"UPDATE {table} SET {target} = CASE {match} {whens} END "
+            f"WHERE {match} IN ({placeholders})"
         )
-        moved["field_crops"] = FieldCrop.objects.filter(land_id__in=field_ids).count()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _journal_pks(by_farmer: Optional[Dict[str, List[int]]]) -> List[int]:
+    return [pk for pks in (by_farmer or {}).values() for pk in pks]
+
 
-    visit_ids = list(Visit.objects.filter(farmer_id=primary_id).values_list("id", flat=True))
-    if visit_ids:
-        moved["issues_via_visits"] = CropIssue.objects.filter(visit_id__in=visit_ids).count()
+def _repoint_relation(
+    model, mapping: Dict[int, int], batch_size: int
+) -> Tuple[int, Dict[str, List[int]]]:
+    """Move rows of one table from duplicates to primaries; returns (count, journal)."""
+    moved = 0
+    journal: Dict[str, List[int]] = {}
+    items = sorted(mapping.items())
+    for batch in _chunks(items, batch_size):
+        dup_ids = [dup for dup, _ in batch]
+        for pk, farmer_id in model.objects.filter(farmer_id__in=dup_ids).values_list(
+            "pk", "farmer_id"
+        ):
+            journal.setdefault(str(farmer_id), []).append(pk)
+        moved += _bulk_set_column(model, "farmer_id", "farmer_id", batch)
+    return moved, journal
 
-    return moved
+
+def _plan_mapping(plans: List[Dict[str, Any]]) -> Dict[int, int]:
+    """
+    {duplicate_id: primary_id} for the whole run, resolving chains so a
+    primary that is itself a duplicate elsewhere maps to the final survivor.
+
+    Plans that form a cycle (a -> b, b -> a) would resolve a farmer onto
+    itself and delete it as its own duplicate; those farmers are left alone.
+    """
+    plan_map = {p["duplicate_id"]: p["primary_id"] for p in plans}
+    mapping: Dict[int, int] = {}
+    for dup, target in plan_map.items():
+        seen = {dup}
+        while target in plan_map and target not in seen:
+            seen.add(target)
+            target = plan_map[target]
+        if target == dup:
+            logger.warning("event=farmer_merge_cycle_skipped farmer_id=%s", dup)
+            continue
+        mapping[dup] = target
+    return mapping
 
 
 def _plan_from_audit(audit: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -96,23 +178,136 @@ def preview_merge(*, group_limit: int = 50) -> Dict[str, Any]:
 
 
 @transaction.atomic
-def execute_merge(*, group_limit: int = 50) -> Dict[str, Any]:
+def execute_merge(
+    *,
+    group_limit: int = 50,
+    batch_size: int = MERGE_BATCH_SIZE,
+    user=None,
+) -> Dict[str, Any]:
+    """
+    Merge every safe duplicate group in one pass.
+
+    The full duplicate -> primary mapping is built first; each related table
+    is then re-pointed with one batched UPDATE per ``batch_size`` duplicates,
+    and a FarmerMergeJournal row records what moved so the run can be
+    reverted.
+    """
     preview = preview_merge(group_limit=group_limit)
     plans = preview["merge_plans"]
-    results: List[Dict[str, Any]] = []
+    mapping = _plan_mapping(plans)
+    if not mapping:
+        return {
+            "merged": 0,
+            "results": [],
+            "row_counts": {},
+            "journal_id": None,
+            "post_audit_summary": preview["audit_summary"],
+        }
 
-    for plan in plans:
-        primary = Farmer.objects.select_for_update().get(pk=plan["primary_id"])
-        duplicate = Farmer.objects.select_for_update().get(pk=plan["duplicate_id"])
-        moved = _move_farmer_relations(primary.id, duplicate.id)
-        _merge_source_fields(primary, duplicate)
-        primary.save(update_fields=["source_quarter", "source_file", "updated_at"])
-        duplicate.delete()
-        results.append({**plan, "moved": moved})
+    farmer_ids = set(mapping) | set(mapping.values())
+    farmers = {
+        f.pk: f
+        for f in Farmer.objects.select_for_update().filter(pk__in=farmer_ids).order_by("pk")
+    }
+    mapping = {dup: pri for dup, pri in mapping.items() if dup in farmers and pri in farmers}
+
+    row_counts: Dict[str, int] = {}
+    moved_rows: Dict[str, Dict[str, List[int]]] = {}
+    for label, model in MERGE_RELATIONS:
+        row_counts[label], moved_rows[label] = _repoint_relation(model, mapping, batch_size)
+    # The raw UPDATEs skip the rollup signals; per-farmer counts changed.
+    refresh_for_visit_ids(_journal_pks(moved_rows.get("visits")))
+
+    primaries = {pri: farmers[pri] for pri in set(mapping.values())}
+    primary_sources = {
+        str(pk): {"source_quarter": f.source_quarter, "source_file": f.source_file}
+        for pk, f in primaries.items()
+    }
+    for dup, pri in sorted(mapping.items()):
+        _merge_source_fields(primaries[pri], farmers[dup])
+    now = timezone.now()
+    for farmer in primaries.values():
+        farmer.updated_at = now
+    Farmer.objects.bulk_update(
+        list(primaries.values()),
+        ["source_quarter", "source_file", "updated_at"],
+        batch_size=batch_size,
+    )
+
+    # isoformat() keeps microseconds (DjangoJSONEncoder rounds to milliseconds).
+    deleted_farmers = [
+        {k: v.isoformat() if isinstance(v, datetime) else v for k, v in row.items()}
+        for row in Farmer.objects.filter(pk__in=list(mapping)).values(*_FARMER_SNAPSHOT_FIELDS)
+    ]
+    for batch in _chunks(sorted(mapping), batch_size):
+        Farmer.objects.filter(pk__in=batch).delete()
+    row_counts["farmers_deleted"] = len(deleted_farmers)
+    row_counts["primaries_updated"] = len(primaries)
+
+    journal = FarmerMergeJournal.objects.create(
+        mapping={str(dup): pri for dup, pri in mapping.items()},
+        moved_rows=moved_rows,
+        deleted_farmers=deleted_farmers,
+        primary_sources=primary_sources,
+        row_counts=row_counts,
+        created_by=user,
+    )
 
     post_audit = build_farmer_duplicate_audit(group_limit=group_limit)
     return {
-        "merged": len(results),
-        "results": results,
+        "merged": len(mapping),
+        "results": [p for p in plans if p["duplicate_id"] in mapping],
+        "row_counts": row_counts,
+        "journal_id": journal.pk,
         "post_audit_summary": post_audit["summary"],
     }
+
+
+@transaction.atomic
+def revert_merge(journal_id: int, *, batch_size: int = MERGE_BATCH_SIZE) -> Dict[str, Any]:
+    """Recreate the deleted duplicates and move their rows back."""
+    journal = FarmerMergeJournal.objects.select_for_update().get(pk=journal_id)
+    if journal.reverted_at is not None:
+        raise ValueError(f"Merge journal {journal_id} was already reverted.")
+
+    restored_farmers = Farmer.objects.bulk_create(
+        [Farmer(**snapshot) for snapshot in journal.deleted_farmers],
+        batch_size=batch_size,
+    )
+    # bulk_create stamps auto_now(_add) columns; put the original values back.
+    for farmer, snapshot in zip(restored_farmers, journal.deleted_farmers):
+        farmer.created_at = parse_datetime(snapshot["created_at"])
+        farmer.updated_at = parse_datetime(snapshot["updated_at"])
+    Farmer.objects.bulk_update(
+        restored_farmers, ["created_at", "updated_at"], batch_size=batch_size
+    )
+
+    row_counts: Dict[str, int] = {}
+    models = dict(MERGE_RELATIONS)
+    for label, by_duplicate in (journal.moved_rows or {}).items():
+        pairs = [
+            (pk, int(dup))
+            for dup, pks in by_duplicate.items()
+            for pk in pks
+        ]
+        restored = 0
+        for batch in _chunks(pairs, batch_size):
+            restored += _bulk_set_column(models[label], "id", "farmer_id", batch)
+        row_counts[label] = restored
+    refresh_for_visit_ids(_journal_pks((journal.moved_rows or {}).get("visits")))
+
+    sources = journal.primary_sources or {}
+    primaries = list(Farmer.objects.filter(pk__in=[int(pk) for pk in sources]))
+    now = timezone.now()
+    for farmer in primaries:
+        farmer.source_quarter = sources[str(farmer.pk)]["source_quarter"]
+        farmer.source_file = sources[str(farmer.pk)]["source_file"]
+        farmer.updated_at = now
+    Farmer.objects.bulk_update(
+        primaries, ["source_quarter", "source_file", "updated_at"], batch_size=batch_size
+    )
+    row_counts["farmers_restored"] = len(journal.deleted_farmers)
+
+    journal.reverted_at = now
+    journal.save(update_fields=["reverted_at"])
+    return {"journal_id": journal.pk, "row_counts": row_counts}
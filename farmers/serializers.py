@@ -339,6 +339,21 @@ class FarmerFieldCreateSerializer(serializers.ModelSerializer):
 # ══════════════════════════════════════════════
 
 
+class FarmerVisitListSerializer(serializers.ListSerializer):
+    """Load evidence previews for the whole page in one batch (two queries)."""
+
+    def to_representation(self, data):
+        from visits.evidence import attach_evidence_previews
+
+        visits = list(data.all() if hasattr(data, "all") else data)
+        attach_evidence_previews(
+            visits,
+            self.context.get("request"),
+            url_cache=self.context.setdefault("url_cache", {}),
+        )
+        return super().to_representation(visits)
+
+
 class FarmerVisitSerializer(serializers.ModelSerializer):
     """Lightweight visit serializer for embedding inside farmer detail."""
 
@@ -388,6 +403,7 @@ class FarmerVisitSerializer(serializers.ModelSerializer):
             "evidence_preview",
         ]
         read_only_fields = ("id", "visit_time")
+        list_serializer_class = FarmerVisitListSerializer
 
     def _evidence_bundle(self, obj):
         cached = getattr(obj, "_evidence_preview_bundle", None)
@@ -75,6 +75,19 @@ class FarmerQuarterImportTest(TestCase):
         self.assertEqual(len(no_phone), 1)
         self.assertEqual(no_phone[0].name, "Chandran Agaram")
 
+    def test_dry_run_matches_villages_of_the_existing_district(self):
+        Village.objects.create(name="Ananthapuram", district=self.district, is_active=True)
+        districts_before = District.objects.count()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "quarter1.xlsx"
+            _write_quarter_workbook(path)
+            summary = run_full_import(path, None, dry_run=True)
+
+        self.assertEqual(summary.district, "Villupuram")
+        self.assertEqual(summary.village_count, 2)
+        self.assertEqual(summary.villages_created, 1)
+        self.assertEqual(District.objects.count(), districts_before)
+
     def test_dry_run_command_shows_audit_and_json(self):
         out = StringIO()
         with tempfile.TemporaryDirectory() as tmp:
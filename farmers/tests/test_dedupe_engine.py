@@ -0,0 +1,149 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from farmers.dedupe_engine import (
+    FarmerKeyRow,
+    find_duplicate_clusters,
+    phonetic_name_key,
+    score_pair,
+)
+from masters.models import District, Farmer, Village
+
+
+def _row(pk, name, phone="", village_id=1):
+    return FarmerKeyRow(
+        id=pk,
+        name=name,
+        normalized_name=" ".join(name.lower().split()),
+        phone=phone,
+        village_id=village_id,
+        source_quarter="",
+    )
+
+
+class DedupeScoringTest(TestCase):
+    def test_phonetic_key_folds_spelling_variants(self):
+        self.assertEqual(phonetic_name_key("Sheik Dawood"), phonetic_name_key("Shaik Davood"))
+        self.assertEqual(phonetic_name_key("R. Murugan"), phonetic_name_key("Murugan R"))
+
+    def test_shared_household_phone_with_different_name_stays_below_threshold(self):
+        score, _ = score_pair(
+            _row(1, "Lakshmi", "9876543210"), _row(2, "Latha", "9876543210")
+        )
+        self.assertLess(score, 0.75)
+
+    def test_phonetic_key_is_computed_once_per_farmer(self):
+        rows = [_row(1, "Sheik Dawood"), _row(2, "Shaik Davood"), _row(3, "Sheikh Dawud")]
+        with mock.patch(
+            "farmers.dedupe_engine.phonetic_name_key", wraps=phonetic_name_key
+        ) as keyed:
+            for a in rows:
+                for b in rows:
+                    score_pair(a, b)
+        self.assertEqual(keyed.call_count, len(rows))
+
+
+class FindDuplicateClustersTest(TestCase):
+    def setUp(self):
+        self.district = District.objects.create(name="Villupuram", is_active=True)
+        self.village = Village.objects.create(
+            name="Ananthapuram", district=self.district, is_active=True
+        )
+        self.other_village = Village.objects.create(
+            name="Soorapattu", district=self.district, is_active=True
+        )
+
+    def _farmer(self, name, phone="", village=None):
+        return Farmer.objects.create(
+            name=name,
+            phone=phone,
+            district=self.district,
+            village=village or self.village,
+            state="Tamil Nadu",
+        )
+
+    def test_full_run_clusters_spelling_variants(self):
+        a = self._farmer("Sheik Dawood", "9688953207")
+        b = self._farmer("Shaik Davood", "+91 96889 53207")
+        self._farmer("Kanagaraj", "9000000001", village=self.other_village)
+
+        report = find_duplicate_clusters()
+
+        self.assertEqual(report["summary"]["mode"], "full")
+        self.assertEqual(report["summary"]["clusters"], 1)
+        cluster = report["clusters"][0]
+        self.assertEqual(cluster["farmer_ids"], [a.pk, b.pk])
+        self.assertEqual(cluster["primary_id"], a.pk)
+        self.assertIn(cluster["classification"], {"likely", "review"})
+
+    def test_household_members_sharing_phone_are_not_merged(self):
+        self._farmer("Lakshmi", "9876543210")
+        self._farmer("Latha", "9876543210")
+
+        report = find_duplicate_clusters()
+
+        self.assertEqual(report["summary"]["clusters"], 0)
+
+    def test_incremental_run_only_checks_new_rows_against_existing(self):
+        old_a = self._farmer("Murugan", "9000000010")
+        self._farmer("Murugan", "9000000010")  # pre-existing pair, not in focus
+        existing = self._farmer("Kanagaraj", "9688953207")
+        new = self._farmer("Kanagaraj", "9688953207")
+
+        report = find_duplicate_clusters(farmer_ids=[new.pk])
+
+        self.assertEqual(report["summary"]["mode"], "incremental")
+        self.assertEqual(len(report["clusters"]), 1)
+        cluster = report["clusters"][0]
+        self.assertEqual(cluster["farmer_ids"], [existing.pk, new.pk])
+        self.assertEqual(cluster["classification"], "exact")
+        self.assertNotIn(old_a.pk, cluster["farmer_ids"])
+
+    @mock.patch("farmers.dedupe_engine.MAX_BLOCK_SIZE", 3)
+    def test_incremental_run_keeps_new_rows_in_oversized_blocks(self):
+        existing = [self._farmer("Ravi") for _ in range(5)]
+        new = self._farmer("Ravi")
+
+        report = find_duplicate_clusters(farmer_ids=[new.pk])
+
+        self.assertEqual(len(report["clusters"]), 1)
+        self.assertEqual(
+            report["clusters"][0]["farmer_ids"], [*(f.pk for f in existing[:3]), new.pk]
+        )
+
+    @mock.patch("farmers.dedupe_engine.MAX_BLOCK_SIZE", 3)
+    def test_full_run_windows_oversized_blocks_instead_of_dropping_rows(self):
+        for name in ("Anbu", "Bala", "Chitra", "Durai", "Elango"):
+            self._farmer(name, "9000000042")
+        late = [
+            self._farmer("Velmurugan", "9000000042"),
+            self._farmer("Velmurugan", "9000000042", village=self.other_village),
+        ]
+
+        report = find_duplicate_clusters()
+
+        self.assertEqual(report["summary"]["oversized_blocks"], 1)
+        self.assertEqual([c["farmer_ids"] for c in report["clusters"]], [[f.pk for f in late]])
+
+    def test_incremental_run_matches_formatted_phone_of_existing_farmer(self):
+        existing = self._farmer("Kanagaraj", "98765-43210", village=self.other_village)
+        new = self._farmer("Kanagaraj", "9876543210")
+
+        report = find_duplicate_clusters(farmer_ids=[new.pk])
+
+        self.assertEqual(report["clusters"][0]["farmer_ids"], [existing.pk, new.pk])
+
+    def test_command_reports_without_writing(self):
+        self._farmer("Kanagaraj", "9688953207")
+        self._farmer("Kanagaraj", "9688953207")
+        before = Farmer.objects.count()
+        out = StringIO()
+
+        call_command("find_farmer_duplicates", stdout=out)
+
+        self.assertIn("clusters: 1", out.getvalue())
+        self.assertIn("No data was modified.", out.getvalue())
+        self.assertEqual(Farmer.objects.count(), before)
@@ -0,0 +1,90 @@
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from farmers.farmer_bulk_import import (
+    build_farmer_index,
+    parse_quarter_files,
+    plan_bulk_import,
+    run_bulk_import,
+)
+from farmers.tests.test_clean_and_import_farmers import _write_quarter_workbook
+from masters.models import District, Farmer, FarmerActivity, Village
+
+
+class FarmerBulkImportTest(TestCase):
+    def setUp(self):
+        self.district = District.objects.create(name="Villupuram", is_active=True)
+        self.village = Village.objects.create(
+            name="Ananthapuram", district=self.district, is_active=True
+        )
+        self.existing = Farmer.objects.create(
+            name="Kanagaraj Ananthapuram",
+            phone="9688953207",
+            district=self.district,
+            village=self.village,
+            state="Tamil Nadu",
+            source_quarter="quarter1",
+            source_file="QUARTER 1GrpSum.xlsx",
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.q3 = Path(self.tmp.name) / "QUARTER 3GrpSum.xlsx"
+        self.q4 = Path(self.tmp.name) / "QUARTER 4GrpSum.xlsx"
+        _write_quarter_workbook(self.q3)
+        _write_quarter_workbook(self.q4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _specs(self):
+        return [(self.q3, "quarter3"), (self.q4, "quarter4")]
+
+    def test_dry_run_plans_diff_without_writes(self):
+        before = Farmer.objects.count()
+        plan = run_bulk_import(self._specs(), district=self.district, dry_run=True)
+        self.assertEqual(Farmer.objects.count(), before)
+        self.assertEqual(plan.created, 3)
+        self.assertEqual(plan.villages_created, 1)  # Soorapattu
+        actions = {entry["action"] for entry in plan.diff}
+        self.assertEqual(actions, {"create", "update"})
+        update = next(
+            (e for e in plan.diff if e.get("farmer_id") == self.existing.pk), None
+        )
+        self.assertIsNotNone(update)
+        self.assertIn("source_quarter", update["changes"])
+
+    def test_apply_bulk_writes_farmers_villages_and_timeline(self):
+        plan = run_bulk_import(self._specs(), district=self.district, chunk_size=2)
+        self.assertEqual(Farmer.objects.count(), 4)
+        self.assertTrue(Village.objects.filter(name="Soorapattu", district=self.district).exists())
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.source_quarter, "quarter1,quarter3,quarter4")
+        created = Farmer.objects.exclude(pk=self.existing.pk)
+        self.assertTrue(all(f.farmer_code.startswith("FRM-") for f in created))
+        self.assertEqual(
+            FarmerActivity.objects.filter(
+                activity_type="FARMER_CREATED", farmer__in=created
+            ).count(),
+            plan.created,
+        )
+        # Second quarter re-matches the rows created from the first one.
+        self.assertEqual(
+            set(created.values_list("source_quarter", flat=True)), {"quarter3,quarter4"}
+        )
+
+    def test_planning_queries_do_not_scale_with_rows(self):
+        parsed = parse_quarter_files(self._specs())
+        with CaptureQueriesContext(connection) as ctx:
+            plan_bulk_import(parsed, district=self.district, farmer_index=build_farmer_index())
+        self.assertLessEqual(len(ctx.captured_queries), 2)
+
+    def test_parallel_parse_matches_sequential(self):
+        sequential = parse_quarter_files(self._specs())
+        parallel = parse_quarter_files(self._specs(), processes=2)
+        self.assertEqual(
+            [(q.quarter_key, [r.name for r in q.farmers]) for q in sequential],
+            [(q.quarter_key, [r.name for r in q.farmers]) for q in parallel],
+        )
@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from farmers.merge_duplicates import _plan_mapping, execute_merge, revert_merge
+from masters.models import (
+    District,
+    Farmer,
+    FarmerField,
+    FarmerMergeJournal,
+    Village,
+)
+from visits.models import Visit
+
+
+class SetBasedFarmerMergeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="merge_emp", password="x")
+        district = District.objects.create(name="Merge District")
+        self.village = Village.objects.create(name="Merge Village", district=district)
+        self.primaries = []
+        self.duplicates = []
+        for i in range(3):
+            phone = f"98000000{i:02d}"
+            primary = self._farmer(f"Farmer {i}", phone, "quarter1")
+            duplicate = self._farmer(f"Farmer {i}", phone, "quarter3")
+            self.primaries.append(primary)
+            self.duplicates.append(duplicate)
+            Visit.objects.create(employee=self.user, farmer=duplicate, farmer_name=duplicate.name)
+            FarmerField.objects.create(farmer=duplicate, land_name=f"Plot {i}")
+        self.keeper = self._farmer("Unrelated", "9700000000", "quarter1")
+
+    def _farmer(self, name, phone, quarter):
+        return Farmer.objects.create(
+            name=name,
+            phone=phone,
+            village=self.village,
+            district=self.village.district,
+            source_quarter=quarter,
+        )
+
+    def test_merge_moves_relations_in_batches_and_journals(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = execute_merge(batch_size=2)
+
+        self.assertEqual(result["merged"], 3)
+        counts = result["row_counts"]
+        self.assertEqual(counts["visits"], 3)
+        self.assertEqual(counts["farmer_fields"], 3)
+        self.assertEqual(counts["farmer_activities"], 3)  # FARMER_CREATED rows
+        self.assertEqual(counts["farmers_deleted"], 3)
+        self.assertFalse(Farmer.objects.filter(pk__in=[d.pk for d in self.duplicates]).exists())
+        for primary in self.primaries:
+            primary.refresh_from_db()
+            self.assertEqual(primary.source_quarter, "quarter1,quarter3")
+            self.assertEqual(Visit.objects.filter(farmer=primary).count(), 1)
+            self.assertEqual(FarmerField.objects.filter(farmer=primary).count(), 1)
+
+        # Two batches (2 + 1 duplicates) per relation, not one statement per duplicate.
+        visit_updates = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith("UPDATE")
+            and Visit._meta.db_table in q["sql"]
+            and "CASE" in q["sql"]
+        ]
+        self.assertEqual(len(visit_updates), 2)
+
+        journal = FarmerMergeJournal.objects.get(pk=result["journal_id"])
+        self.assertEqual(len(journal.mapping), 3)
+        self.assertEqual(journal.row_counts["visits"], 3)
+
+    def test_revert_restores_duplicates_and_relations(self):
+        visit_owner = {v.pk: v.farmer_id for v in Visit.objects.all()}
+        created_at = {d.pk: d.created_at for d in self.duplicates}
+        result = execute_merge()
+
+        revert_merge(result["journal_id"])
+
+        for duplicate in self.duplicates:
+            restored = Farmer.objects.get(pk=duplicate.pk)
+            self.assertEqual(restored.farmer_code, duplicate.farmer_code)
+            self.assertEqual(restored.created_at, created_at[duplicate.pk])
+            self.assertEqual(FarmerField.objects.filter(farmer=restored).count(), 1)
+        self.assertEqual({v.pk: v.farmer_id for v in Visit.objects.all()}, visit_owner)
+        self.primaries[0].refresh_from_db()
+        self.assertEqual(self.primaries[0].source_quarter, "quarter1")
+        self.assertIsNotNone(FarmerMergeJournal.objects.get(pk=result["journal_id"]).reverted_at)
+        with self.assertRaises(ValueError):
+            revert_merge(result["journal_id"])
+
+    def test_command_revert_option(self):
+        result = execute_merge()
+        out = StringIO()
+        call_command("merge_farmer_duplicates", "--revert", str(result["journal_id"]), stdout=out)
+        self.assertIn("farmers_restored: 3", out.getvalue())
+        self.assertEqual(Farmer.objects.count(), 7)
+
+    def test_cyclic_plans_never_map_a_farmer_onto_itself(self):
+        plans = [
+            {"duplicate_id": 1, "primary_id": 2},
+            {"duplicate_id": 2, "primary_id": 1},
+            {"duplicate_id": 3, "primary_id": 1},
+            {"duplicate_id": 5, "primary_id": 4},
+            {"duplicate_id": 4, "primary_id": 6},
+        ]
+        with self.assertLogs("farmers.merge_duplicates", level="WARNING"):
+            mapping = _plan_mapping(plans)
+        self.assertEqual(mapping, {3: 1, 5: 6, 4: 6})
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.17 on 2026-10-19 12:57
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('masters', '0026_village_identity_code_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FarmerMergeJournal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mapping', models.JSONField(default=dict, help_text='{duplicate_id: primary_id}')),
+                ('moved_rows', models.JSONField(default=dict, help_text='{relation: {duplicate_id: [row ids]}}')),
+                ('deleted_farmers', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Column snapshots of the deleted duplicate farmers.')),
+                ('primary_sources', models.JSONField(default=dict, help_text='{primary_id: {source_quarter, source_file}} before the merge.')),
+                ('row_counts', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reverted_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='farmer_merge_journals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
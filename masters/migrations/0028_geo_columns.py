@@ -0,0 +1,92 @@
+# Generated by Django 5.2.17 on 2026-10-19 13:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _geohash(lat, lng, precision=7):
+    # Frozen copy of utils.geo.geohash_encode as of this migration.
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            bits = (bits << 1) | (lng >= mid)
+            lng_lo, lng_hi = (mid, lng_hi) if lng >= mid else (lng_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            bits = (bits << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _in_range(lat, lng):
+    return -90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0
+
+
+def _parse_gps_location(gps_location):
+    # Frozen copy of farmers.helpers.parse_gps_location ("lat,lng").
+    parts = str(gps_location or "").split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        return float(parts[0].strip()), float(parts[1].strip())
+    except ValueError:
+        return None
+
+
+def backfill_farmer_geo(apps, schema_editor):
+    Farmer = apps.get_model("masters", "Farmer")
+    batch = []
+    qs = Farmer.objects.exclude(gps_location="").only("id", "gps_location")
+    for farmer in qs.iterator(chunk_size=2000):
+        point = _parse_gps_location(farmer.gps_location)
+        if point is None or not _in_range(*point):
+            continue
+        farmer.latitude, farmer.longitude = point
+        farmer.geohash = _geohash(*point)
+        batch.append(farmer)
+        if len(batch) >= 1000:
+            Farmer.objects.bulk_update(batch, ["latitude", "longitude", "geohash"])
+            batch = []
+    if batch:
+        Farmer.objects.bulk_update(batch, ["latitude", "longitude", "geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('masters', '0027_farmer_merge_journal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farmer',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='farmer',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='farmer',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='farmer',
+            index=models.Index(fields=['latitude', 'longitude'], name='masters_far_latitud_cf8223_idx'),
+        ),
+        migrations.RunPython(backfill_farmer_geo, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 
@@ -349,6 +350,10 @@ class Farmer(BaseMaster):
         default="",
         help_text="Lat,Lng e.g. 12.345678,79.123456",
     )
+    # Typed copies of gps_location, kept in sync by save(); see utils.geo.
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default="", db_index=True)
     total_land_area = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -396,13 +401,27 @@ class Farmer(BaseMaster):
             models.Index(fields=["assigned_employee"]),
             models.Index(fields=["phone"]),
             models.Index(fields=["is_active", "name"]),
+            models.Index(fields=["latitude", "longitude"]),
         ]
 
     def save(self, *args, **kwargs):
         if not self.farmer_code:
             self.farmer_code = self._generate_code()
+        self.sync_location_columns()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "gps_location" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "latitude", "longitude", "geohash"}
         super().save(*args, **kwargs)
 
+    def sync_location_columns(self):
+        """Derive latitude / longitude / geohash from gps_location."""
+        from farmers.helpers import parse_gps_location
+        from utils.geo import location_columns
+
+        self.latitude, self.longitude, self.geohash = location_columns(
+            *parse_gps_location(self.gps_location)
+        )
+
     def _generate_code(self):
         import uuid as _uuid
 
@@ -641,3 +660,49 @@ class FarmerActivity(models.Model):
 
     def __str__(self):
         return f"{self.farmer.name} | {self.activity_type} | {self.created_at}"
+
+
+# ==========================================================
+# FARMER MERGE JOURNAL
+# ==========================================================
+
+
+class FarmerMergeJournal(models.Model):
+    """
+    One set-based duplicate merge run: enough to put every moved row and
+    deleted farmer back (see farmers.merge_duplicates.revert_merge).
+    """
+
+    mapping = models.JSONField(
+        default=dict,
+        help_text="{duplicate_id: primary_id}",
+    )
+    moved_rows = models.JSONField(
+        default=dict,
+        help_text="{relation: {duplicate_id: [row ids]}}",
+    )
+    deleted_farmers = models.JSONField(
+        default=list,
+        encoder=DjangoJSONEncoder,
+        help_text="Column snapshots of the deleted duplicate farmers.",
+    )
+    primary_sources = models.JSONField(
+        default=dict,
+        help_text="{primary_id: {source_quarter, source_file}} before the merge.",
+    )
+    row_counts = models.JSONField(default=dict)
+    created_by = models.ForeignKey(
+        "auth.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="farmer_merge_journals",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    reverted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Farmer merge #{self.pk} | {len(self.mapping)} duplicates | {self.created_at}"
@@ -1,5 +1,6 @@
 from drf_spectacular.utils import extend_schema
 from rest_framework.permissions import IsAuthenticated
+from utils.geo import apply_viewport, parse_viewport
 from utils.response import success_response
 from utils.schema import SIMPLE_SUCCESS
 from visits.submitted import submitted_visits_qs
@@ -8,13 +9,16 @@ from visits.visit_response import crop_display_name
 from .device_session import MobileEmployeeAPIView
 from .permissions import IsEmployeeUser
 
+MAX_MARKERS = 500
+
 
 @extend_schema(
     tags=["Mobile", "Map"],
     summary="Mobile visit map markers",
     description=(
         "GPS markers from the employee's submitted visits (not farmer master pins). "
-        "Use for field map on the mobile tracking/visits screens."
+        "Use for field map on the mobile tracking/visits screens. Optional viewport: "
+        "bbox=west,south,east,north, or lat/lng with radius_km and/or nearest."
     ),
     responses={200: SIMPLE_SUCCESS},
 )
@@ -22,26 +26,31 @@ class MobileVisitMapAPI(MobileEmployeeAPIView):
     permission_classes = [IsAuthenticated, IsEmployeeUser]
 
     def get(self, request):
+        viewport = parse_viewport(request.query_params)
         visits = (
             submitted_visits_qs()
             .filter(employee=request.user)
             .select_related("farmer", "crop", "village")
-            .order_by("-visit_date", "-id")[:500]
+            .order_by("-visit_date", "-id")
         )
+        if any(viewport.values()):
+            visits = visits.filter(latitude__isnull=False, longitude__isnull=False)
+        hits = apply_viewport(visits, viewport, limit=MAX_MARKERS)
         markers = []
-        for visit in visits:
-            markers.append(
-                {
-                    "visit_id": visit.id,
-                    "farmer_id": visit.farmer_id,
-                    "farmer_name": visit.farmer_name or (
-                        visit.farmer.name if visit.farmer_id else None
-                    ),
-                    "latitude": visit.latitude,
-                    "longitude": visit.longitude,
-                    "visit_date": str(visit.visit_date) if visit.visit_date else None,
-                    "crop": crop_display_name(visit),
-                    "village": visit.village.name if visit.village_id else None,
-                }
-            )
+        for visit, distance in hits:
+            marker = {
+                "visit_id": visit.id,
+                "farmer_id": visit.farmer_id,
+                "farmer_name": visit.farmer_name or (
+                    visit.farmer.name if visit.farmer_id else None
+                ),
+                "latitude": visit.latitude,
+                "longitude": visit.longitude,
+                "visit_date": str(visit.visit_date) if visit.visit_date else None,
+                "crop": crop_display_name(visit),
+                "village": visit.village.name if visit.village_id else None,
+            }
+            if distance is not None:
+                marker["distance_km"] = round(distance, 3)
+            markers.append(marker)
         return success_response(data={"markers": markers}, message="Map markers fetched")
@@ -48,6 +48,21 @@ urlpatterns = [
         views.MobileVisitAttachmentDeleteAPI.as_view(),
         name="mobile-visit-attachment-delete",
     ),
+    path(
+        "visits/<int:visit_id>/uploads/",
+        views.DirectUploadIssueAPI.as_view(),
+        name="mobile-direct-upload-issue",
+    ),
+    path(
+        "visits/<int:visit_id>/uploads/<str:client_upload_id>/finalize/",
+        views.DirectUploadFinalizeAPI.as_view(),
+        name="mobile-direct-upload-finalize",
+    ),
+    path(
+        "uploads/direct/<str:token>/",
+        views.DirectUploadPutView.as_view(),
+        name="mobile-direct-upload-put",
+    ),
     path("farmers/", views.MobileFarmerListAPI.as_view(), name="mobile-farmers"),
     path(
         "farmers/<int:pk>/",
@@ -12,6 +12,11 @@ from visits.attachment_views import (
     MobileVisitAttachmentListCreateAPI,
     MobileVisitAttachmentDeleteAPI,
 )
+from visits.direct_upload_views import (
+    DirectUploadIssueAPI,
+    DirectUploadFinalizeAPI,
+    DirectUploadPutView,
+)
 from mobile_api.profile import MobileProfilePhotoAPI
 from farmers.photo_views import MobileFarmerPhotoAPI
 from .farmers import MobileFarmerListAPI, MobileFarmerDetailAPI
@@ -334,7 +334,7 @@ def test_tracking(session: requests.Session, base: str):
     # 6a. Map farmers
     endpoint = "/map/farmers/"
     info(f"GET {endpoint}")
-    r = get(session, base + endpoint)
+    r = get(session, base + endpoint + "?bbox=76.0,8.0,80.5,13.6")
     passed = _check(r, (200,), "Map farmers (with coordinates)")
     record("Map Farmers", endpoint, passed)
     if passed:
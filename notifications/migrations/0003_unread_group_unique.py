@@ -0,0 +1,40 @@
+# Generated by Django 5.2.17 on 2026-10-19 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seal_duplicate_open_groups(apps, schema_editor):
+    """Keep the newest unread row per (user, group_key); clear the key on older ones."""
+    Notification = apps.get_model("notifications", "Notification")
+    seen = set()
+    stale = []
+    rows = (
+        Notification.objects.filter(is_read=False)
+        .exclude(group_key="")
+        .order_by("user_id", "group_key", "-created_at", "-id")
+        .values_list("id", "user_id", "group_key")
+    )
+    for row_id, user_id, group_key in rows.iterator():
+        if (user_id, group_key) in seen:
+            stale.append(row_id)
+        else:
+            seen.add((user_id, group_key))
+    for start in range(0, len(stale), 500):
+        Notification.objects.filter(pk__in=stale[start : start + 500]).update(group_key="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_grouping'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(seal_duplicate_open_groups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_read', False), models.Q(('group_key', ''), _negated=True)), fields=('user', 'group_key'), name='uniq_unread_notification_group'),
+        ),
+    ]
@@ -28,5 +28,25 @@ class Notification(models.Model):
 
     is_read = models.BooleanField(default=False)
 
+    # Burst coalescing: unread rows sharing a group_key within the coalesce
+    # window are folded into one row ("12 new visits by X").  At most one
+    # unread row per (user, group_key); rows past the window are sealed by
+    # clearing their key.
+    group_key = models.CharField(max_length=100, blank=True, default="")
+    group_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "is_read"]),
+            models.Index(fields=["user", "group_key", "is_read"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "group_key"],
+                condition=models.Q(is_read=False) & ~models.Q(group_key=""),
+                name="uniq_unread_notification_group",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.notification_type} - {self.created_at}"
@@ -2,20 +2,59 @@
 notifications/services.py
 ──────────────────────────
 Business logic for creating and managing in-app notifications.
+
+Fan-out writes one row per recipient with ``bulk_create``.  Per-user unread
+counts live in the cache (Redis in production) and are adjusted after commit
+on create / mark-read; a missing key is rebuilt from the database on the next
+read.  Rows created with a ``group_key`` coalesce: while an unread row for
+the same key is younger than COALESCE_WINDOW it is updated in place instead
+of adding another row.  The open row is locked while it is bumped, and a
+unique constraint keeps one unread row per (user, group_key); a writer that
+loses the insert race retries and bumps the winner's row.
 """
 
 from __future__ import annotations
 
 import logging
-from typing import List, Optional
+from collections import defaultdict
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
 
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
 
 from .models import Notification
 
 logger = logging.getLogger(__name__)
 
+UNREAD_COUNT_TTL = 24 * 60 * 60
+COALESCE_WINDOW = timedelta(minutes=10)
+
+
+def _unread_key(user_id: int) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def _adjust_unread(user_ids: Iterable[int], delta: int) -> None:
+    """Shift cached unread counters; absent keys are left for lazy rebuild."""
+    for user_id in user_ids:
+        key = _unread_key(user_id)
+        try:
+            value = cache.incr(key, delta)
+        except ValueError:
+            continue
+        if value < 0:
+            cache.delete(key)
+
+
+def _adjust_unread_on_commit(user_ids: Iterable[int], delta: int) -> None:
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _adjust_unread(user_ids, delta))
+
 
 # ──────────────────────────────────────────────────────────────
 # Creation helpers
@@ -37,6 +76,8 @@ def create_notification(
         notification_type=notification_type,
         message=message,
     )
+    if user is not None:
+        _adjust_unread_on_commit([user.pk], 1)
     logger.debug(
         "Notification created: type=%s user_id=%s",
         notification_type,
@@ -45,18 +86,129 @@ def create_notification(
     return notification
 
 
-def broadcast_to_admins(*, notification_type: str, message: str) -> List[Notification]:
+def fan_out_notification(
+    *,
+    user_ids: Iterable[int],
+    notification_type: str,
+    message: str,
+    group_key: str = "",
+    group_message: Optional[Callable[[int], str]] = None,
+) -> List[Notification]:
+    """
+    Deliver one notification to many users with a single bulk insert.
+
+    With ``group_key``, recipients that still have a recent unread row for the
+    key get that row bumped (``group_count`` + 1, message from
+    ``group_message(count)``) instead of a new row.  Returns the new rows.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return []
+    if not group_key:
+        return _insert(user_ids, notification_type, message, group_key)
+
+    for attempt in (1, 2):
+        try:
+            with transaction.atomic():
+                coalesced = _bump_open_groups(
+                    user_ids, notification_type, message, group_key, group_message
+                )
+                return _insert(
+                    [uid for uid in user_ids if uid not in coalesced],
+                    notification_type,
+                    message,
+                    group_key,
+                    coalesced=len(coalesced),
+                )
+        except IntegrityError:
+            # A concurrent fan-out opened the group first; bump its row instead.
+            if attempt == 2:
+                raise
+    return []
+
+
+def _bump_open_groups(
+    user_ids: List[int],
+    notification_type: str,
+    message: str,
+    group_key: str,
+    group_message: Optional[Callable[[int], str]],
+) -> Dict[int, int]:
+    """Bump each recipient's open row for ``group_key``; returns {user_id: row_id}."""
+    open_rows = Notification.objects.filter(
+        user_id__in=user_ids, group_key=group_key, is_read=False
+    )
+    # Past the window: seal so the next event opens a fresh row.
+    open_rows.filter(created_at__lt=timezone.now() - COALESCE_WINDOW).update(group_key="")
+    coalesced = {
+        user_id: row_id
+        for row_id, user_id in open_rows.select_for_update().values_list("id", "user_id")
+    }
+    if not coalesced:
+        return coalesced
+    bumped = Notification.objects.filter(pk__in=list(coalesced.values()))
+    bumped.update(
+        group_count=F("group_count") + 1,
+        notification_type=notification_type,
+        message=message,
+    )
+    if group_message:
+        by_count: Dict[int, List[int]] = defaultdict(list)
+        for row_id, count in bumped.values_list("id", "group_count"):
+            by_count[count].append(row_id)
+        for count, row_ids in by_count.items():
+            Notification.objects.filter(pk__in=row_ids).update(message=group_message(count))
+    return coalesced
+
+
+def _insert(
+    user_ids: List[int],
+    notification_type: str,
+    message: str,
+    group_key: str,
+    *,
+    coalesced: int = 0,
+) -> List[Notification]:
+    created = Notification.objects.bulk_create(
+        [
+            Notification(
+                user_id=uid,
+                notification_type=notification_type,
+                message=message,
+                group_key=group_key,
+            )
+            for uid in user_ids
+        ]
+    )
+    _adjust_unread_on_commit(user_ids, 1)
+    logger.debug(
+        "Notification fan-out: type=%s created=%s coalesced=%s",
+        notification_type,
+        len(created),
+        coalesced,
+    )
+    return created
+
+
+def admin_user_ids() -> List[int]:
+    return list(User.objects.filter(is_staff=True, is_active=True).values_list("pk", flat=True))
+
+
+def broadcast_to_admins(
+    *,
+    notification_type: str,
+    message: str,
+    group_key: str = "",
+    group_message: Optional[Callable[[int], str]] = None,
+) -> List[Notification]:
     """Send the same notification to all active staff users."""
-    admins = User.objects.filter(is_staff=True, is_active=True)
-    notifications = [
-        create_notification(
-            user=admin,
-            notification_type=notification_type,
-            message=message,
-        )
-        for admin in admins
-    ]
-    return notifications
+    return fan_out_notification(
+        user_ids=admin_user_ids(),
+        notification_type=notification_type,
+        message=message,
+        group_key=group_key,
+        group_message=group_message,
+    )
 
 
 # ──────────────────────────────────────────────────────────────
@@ -65,16 +217,21 @@ def broadcast_to_admins(*, notification_type: str, message: str) -> List[Notific
 
 
 def mark_as_read(*, notification_id: int, user: User) -> bool:
-    """Mark a single notification as read. Returns True if updated."""
-    updated = Notification.objects.filter(pk=notification_id, user=user).update(
-        is_read=True
-    )
+    """Mark a single unread notification as read. Returns True if updated."""
+    updated = Notification.objects.filter(
+        pk=notification_id, user=user, is_read=False
+    ).update(is_read=True)
+    if updated:
+        _adjust_unread_on_commit([user.pk], -updated)
     return bool(updated)
 
 
 def mark_all_as_read(*, user: User) -> int:
     """Mark all of a user's unread notifications as read. Returns count."""
-    return Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+    updated = Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+    key = _unread_key(user.pk)
+    transaction.on_commit(lambda: cache.set(key, 0, timeout=UNREAD_COUNT_TTL))
+    return updated
 
 
 # ──────────────────────────────────────────────────────────────
@@ -83,4 +240,10 @@ def mark_all_as_read(*, user: User) -> int:
 
 
 def get_unread_count(user: User) -> int:
-    return Notification.objects.filter(user=user, is_read=False).count()
+    key = _unread_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    count = Notification.objects.filter(user=user, is_read=False).count()
+    cache.add(key, count, timeout=UNREAD_COUNT_TTL)
+    return count
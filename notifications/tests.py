@@ -1,3 +1,97 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from notifications import services
+from notifications.models import Notification
+
+
+class NotificationFanOutTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admins = [
+            User.objects.create_user(username=f"admin{i}", password="x", is_staff=True)
+            for i in range(3)
+        ]
+        User.objects.create_user(username="field", password="x")
+
+    def test_broadcast_bulk_inserts_one_row_per_admin(self):
+        with self.assertNumQueries(2):  # staff ids + bulk insert
+            rows = services.broadcast_to_admins(notification_type="ONLINE", message="hi")
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_burst_coalesces_into_one_unread_row(self):
+        for _ in range(5):
+            services.broadcast_to_admins(
+                notification_type="VISIT_CREATED",
+                message="New visit by emp",
+                group_key="visit_created:7",
+                group_message=lambda n: f"{n} new visits by emp.",
+            )
+        rows = Notification.objects.filter(user=self.admins[0])
+        self.assertEqual(rows.count(), 1)
+        self.assertEqual(rows.get().message, "5 new visits by emp.")
+
+        services.mark_all_as_read(user=self.admins[0])
+        services.broadcast_to_admins(
+            notification_type="VISIT_CREATED",
+            message="New visit by emp",
+            group_key="visit_created:7",
+        )
+        self.assertEqual(Notification.objects.filter(user=self.admins[0]).count(), 2)
+
+    def test_unread_counter_follows_create_and_mark_read(self):
+        admin = self.admins[0]
+        self.assertEqual(services.get_unread_count(admin), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            rows = services.broadcast_to_admins(notification_type="ONLINE", message="a")
+            services.broadcast_to_admins(notification_type="ONLINE", message="b")
+        with self.assertNumQueries(0):
+            self.assertEqual(services.get_unread_count(admin), 2)
+
+        mine = next(r for r in rows if r.user_id == admin.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(services.mark_as_read(notification_id=mine.pk, user=admin))
+            # Already read: the API answers 404.
+            self.assertFalse(services.mark_as_read(notification_id=mine.pk, user=admin))
+        self.assertEqual(services.get_unread_count(admin), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.mark_all_as_read(user=admin)
+        self.assertEqual(services.get_unread_count(admin), 0)
+
+    def test_group_past_window_is_sealed_and_lost_insert_race_bumps_winner(self):
+        admin = self.admins[0]
+        kwargs = dict(
+            user_ids=[admin.pk],
+            notification_type="VISIT_CREATED",
+            message="New visit by emp",
+            group_key="visit_created:9",
+            group_message=lambda n: f"{n} new visits by emp.",
+        )
+        old = services.fan_out_notification(**kwargs)[0]
+        Notification.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - services.COALESCE_WINDOW - timedelta(minutes=1)
+        )
+        fresh = services.fan_out_notification(**kwargs)[0]
+        old.refresh_from_db()
+        self.assertEqual((old.group_key, old.group_count), ("", 1))
+
+        # Another worker opened the group between our lookup and our insert.
+        real_bump = services._bump_open_groups
+        calls = []
+
+        def racing_bump(*args):
+            calls.append(1)
+            return {} if len(calls) == 1 else real_bump(*args)
 
-# Create your tests here.
+        with mock.patch("notifications.services._bump_open_groups", side_effect=racing_bump):
+            self.assertEqual(services.fan_out_notification(**kwargs), [])
+        fresh.refresh_from_db()
+        self.assertEqual((fresh.group_count, fresh.message), (2, "2 new visits by emp."))
+        self.assertEqual(Notification.objects.filter(user=admin, is_read=False).count(), 2)
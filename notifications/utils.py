@@ -1,8 +1,8 @@
-from .models import Notification
+from . import services
 
 
 def create_notification(user, notification_type, message):
-    Notification.objects.create(
+    services.create_notification(
         user=user,
         notification_type=notification_type,
         message=message,
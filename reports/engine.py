@@ -0,0 +1,302 @@
+"""
+reports/engine.py
+──────────────────
+Report generation for ``Report`` rows in PDF, XLSX and CSV.
+
+- Row sources are lazy iterators, so a report is never materialized as one
+  list.  PDF output is split into tables of PDF_ROWS_PER_TABLE rows, and the
+  story is filled from the iterator as pages are laid out, so memory stays
+  bounded for any date range.  XLSX and CSV reuse the streaming writers in
+  ``reports.exports`` (openpyxl write-only mode).
+- Each request is keyed by ``(report_type, normalized parameters, format,
+  data version)``.  The data version is a cheap count / last-update
+  fingerprint of the source rows.  A finished report with the same key is
+  reused instead of regenerated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, timedelta
+from typing import IO, Iterable, Iterator, Optional
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from reports.exports import write_export
+from reports.models import Report
+
+PDF_ROWS_PER_TABLE = 200
+DEFAULT_RANGE_DAYS = 30
+
+_DATE_RANGE_TYPES = ("employee_performance", "daily_summary", "visit_summary", "monthly_summary")
+
+
+class ReportError(ValueError):
+    """Unknown output format for a report."""
+
+
+def _parse_date(value, default: date) -> date:
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(str(value))
+    except (ValueError, TypeError):
+        return default
+
+
+def normalize_parameters(report_type: str, params: Optional[dict]) -> dict:
+    """Resolve defaults so equal requests hash equally (e.g. 'last 30 days')."""
+    params = params or {}
+    if report_type in _DATE_RANGE_TYPES:
+        today = timezone.localdate()
+        return {
+            "date_from": _parse_date(
+                params.get("date_from"), today - timedelta(days=DEFAULT_RANGE_DAYS)
+            ).isoformat(),
+            "date_to": _parse_date(params.get("date_to"), today).isoformat(),
+        }
+    if report_type == "village_summary":
+        return {"top_n": 50}
+    if report_type == "visit":
+        return {"object_id": int(params.get("object_id") or 0)}
+    return {}
+
+
+# ──────────────────────────────────────────────────────────────
+# Row sources: (columns, lazy row iterator)
+# columns follow reports.exports: [(header, lookup), ...]
+# ──────────────────────────────────────────────────────────────
+
+
+def _date_range(params: dict) -> tuple[date, date]:
+    return date.fromisoformat(params["date_from"]), date.fromisoformat(params["date_to"])
+
+
+def _visit_rows(visit_id: int) -> Iterator[tuple]:
+    from visits.models import Visit
+    from visits.visit_response import crop_display_name
+
+    visit = (
+        Visit.objects.select_related("employee", "farmer", "village", "district", "crop")
+        .filter(pk=visit_id)
+        .first()
+    )
+    if visit is None:
+        return iter(())
+    fields = [
+        ("Visit ID", visit.pk),
+        ("Date", visit.visit_date),
+        ("Time", visit.visit_time),
+        ("Employee", visit.employee.username if visit.employee_id else ""),
+        ("Farmer", visit.farmer_name or (visit.farmer.name if visit.farmer_id else "")),
+        ("Phone", visit.farmer_phone),
+        ("District", visit.district.name if visit.district_id else ""),
+        ("Village", visit.village.name if visit.village_id else ""),
+        ("Crop", crop_display_name(visit)),
+        ("Crop stage", visit.crop_stage),
+        ("Latitude", visit.latitude),
+        ("Longitude", visit.longitude),
+        ("Notes", visit.notes),
+    ]
+    return ((label, "" if value is None else value) for label, value in fields)
+
+
+def report_source(report_type: str, params: dict):
+    """Return (columns, row iterator) for normalized parameters."""
+    if report_type == "employee_performance":
+        from visits.selectors import get_employee_performance
+
+        date_from, date_to = _date_range(params)
+        qs = get_employee_performance(date_from=date_from, date_to=date_to)
+        columns = [
+            ("Employee", "employee__username"),
+            ("Employee ID", "employee__employee_profile__employee_id"),
+            ("Visits", "visit_count"),
+        ]
+        return columns, (
+            (r["employee__username"], r.get("employee__employee_profile__employee_id") or "", r["visit_count"])
+            for r in qs.iterator()
+        )
+
+    if report_type in ("daily_summary", "visit_summary", "monthly_summary"):
+        from visits.selectors import get_visit_trends
+
+        date_from, date_to = _date_range(params)
+        qs = get_visit_trends(date_from=date_from, date_to=date_to)
+        columns = [("Date", "visit_date"), ("Total Visits", "count")]
+        return columns, ((str(r["visit_date"]), r["count"]) for r in qs.iterator())
+
+    if report_type == "village_summary":
+        from dashboard.selectors import get_village_heatmap
+
+        columns = [("Village", "village__name"), ("Total Visits", "count")]
+        data = get_village_heatmap(top_n=params.get("top_n", 50))
+        return columns, ((r["village__name"], r["count"]) for r in data)
+
+    if report_type == "visit":
+        return [("Field", "field"), ("Value", "value")], _visit_rows(params.get("object_id"))
+
+    return [], iter(())
+
+
+def data_version(report_type: str, params: dict) -> str:
+    """Count + last update of the visits a report reads (one aggregate query)."""
+    from visits.models import Visit
+    from visits.submitted import submitted_visits_qs
+
+    if report_type in _DATE_RANGE_TYPES:
+        date_from, date_to = _date_range(params)
+        qs = Visit.objects.filter(visit_date__gte=date_from, visit_date__lte=date_to)
+    elif report_type == "village_summary":
+        qs = submitted_visits_qs().filter(village__isnull=False)
+    elif report_type == "visit":
+        qs = Visit.objects.filter(pk=params.get("object_id"))
+    else:
+        return ""
+    row = qs.order_by().aggregate(n=Count("id"), changed=Max("updated_at"))
+    changed = row["changed"].isoformat() if row["changed"] else ""
+    return f"{row['n']}:{changed}"
+
+
+def report_cache_key(report_type: str, params: Optional[dict], fmt: str) -> str:
+    normalized = normalize_parameters(report_type, params)
+    payload = json.dumps(
+        {
+            "type": report_type,
+            "params": normalized,
+            "format": fmt,
+            "version": data_version(report_type, normalized),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def find_reusable(cache_key: str, *, exclude_pk: Optional[int] = None) -> Optional[Report]:
+    """Latest finished report with this key whose file is still stored."""
+    if not cache_key:
+        return None
+    qs = Report.objects.filter(cache_key=cache_key, status=Report.STATUS_DONE).exclude(file="")
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    for candidate in qs.order_by("-completed_at")[:3]:
+        try:
+            if candidate.file.storage.exists(candidate.file.name):
+                return candidate
+        except Exception:  # noqa: BLE001 - storage hiccup: just regenerate
+            return None
+    return None
+
+
+# ──────────────────────────────────────────────────────────────
+# Writers
+# ──────────────────────────────────────────────────────────────
+
+
+class _StreamingStory(list):
+    """
+    Story list that refills itself from a flowable iterator.
+
+    reportlab's ``build`` consumes the story from the front (``len`` /
+    ``[0]`` / ``del [0]``), so only a handful of flowables exist at once.
+    """
+
+    def __init__(self, flowables: Iterator, low_water: int = 4):
+        super().__init__()
+        self._source = flowables
+        self._low_water = low_water
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._low_water:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def _pdf_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def iter_pdf_tables(columns, rows: Iterable[tuple], *, rows_per_table: int = PDF_ROWS_PER_TABLE):
+    """Yield one styled reportlab Table per ``rows_per_table`` rows."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2d7a3a")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f7f0")]),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ]
+    )
+    header = [h for h, _ in columns]
+    chunk: list = []
+    for row in rows:
+        chunk.append([_pdf_cell(v) for v in row])
+        if len(chunk) >= rows_per_table:
+            yield Table([header, *chunk], repeatRows=1, style=style)
+            chunk = []
+    if chunk:
+        yield Table([header, *chunk], repeatRows=1, style=style)
+
+
+def write_pdf(title: str, columns, rows: Iterable[tuple], handle: IO[bytes]) -> None:
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+    except ImportError:
+        handle.write(b"%PDF-1.4 stub")
+        return
+
+    styles = getSampleStyleSheet()
+
+    def flowables():
+        yield Paragraph(f"Agri Clinic – {title}", styles["Title"])
+        yield Spacer(1, 12)
+        yield Paragraph(f"Generated: {timezone.localtime():%Y-%m-%d %H:%M}", styles["Normal"])
+        yield Spacer(1, 12)
+        if columns:
+            yield from iter_pdf_tables(columns, rows)
+
+    SimpleDocTemplate(handle, pagesize=A4).build(_StreamingStory(flowables()))
+
+
+def write_report(report: Report, handle: IO[bytes]) -> None:
+    """Render ``report`` into a binary handle in its output_format."""
+    fmt = report.output_format or Report.FORMAT_PDF
+    params = normalize_parameters(report.report_type, report.parameters)
+    columns, rows = report_source(report.report_type, params)
+    title = report.get_report_type_display()
+    if fmt == Report.FORMAT_PDF:
+        write_pdf(title, columns, rows, handle)
+    elif fmt in (Report.FORMAT_XLSX, Report.FORMAT_CSV):
+        write_export(fmt, columns, rows, handle, title=report.report_type)
+    else:
+        raise ReportError(f"Unsupported report format: {fmt!r}")
+
+
+def report_filename(report: Report) -> str:
+    fmt = report.output_format or Report.FORMAT_PDF
+    return f"report_{report.pk}_{report.report_type}_{timezone.now():%Y%m%d_%H%M%S}.{fmt}"
@@ -0,0 +1,283 @@
+"""
+reports/exports.py
+───────────────────
+Streaming visit / farmer exports (NDJSON, CSV, XLSX).
+
+Rows are read with server-side cursors (``QuerySet.iterator``) and written
+one at a time, so memory stays flat regardless of the date range.  NDJSON and
+CSV are streamed straight to the HTTP client; XLSX is built with openpyxl's
+write-only workbook in a temporary file and then streamed from disk.
+
+Very large ranges go through ``reports.tasks.export_dataset_to_storage``,
+which writes the same output to default storage and records it on a Report.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import IO, Callable, Iterable, Iterator
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_XLSX = "xlsx"
+EXPORT_FORMATS = (FORMAT_NDJSON, FORMAT_CSV, FORMAT_XLSX)
+
+DATASET_VISITS = "visits"
+DATASET_FARMERS = "farmers"
+EXPORT_DATASETS = (DATASET_VISITS, DATASET_FARMERS)
+# Report.report_type of a queued export job, per dataset.
+EXPORT_REPORT_TYPES = {DATASET_VISITS: "visit_export", DATASET_FARMERS: "farmer_export"}
+
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# (header, values() lookup)
+VISIT_EXPORT_COLUMNS = [
+    ("visit_id", "id"),
+    ("visit_date", "visit_date"),
+    ("visit_time", "visit_time"),
+    ("employee_username", "employee__username"),
+    ("employee_code", "employee__employee_profile__employee_id"),
+    ("farmer_id", "farmer_id"),
+    ("farmer_name", "farmer_name"),
+    ("farmer_phone", "farmer_phone"),
+    ("district", "district__name"),
+    ("village", "village__name"),
+    ("crop", "crop__name_en"),
+    ("crop_stage", "crop_stage"),
+    ("land_area", "land_area"),
+    ("latitude", "latitude"),
+    ("longitude", "longitude"),
+    ("status", "status"),
+    ("created_at", "created_at"),
+]
+
+FARMER_EXPORT_COLUMNS = [
+    ("farmer_id", "id"),
+    ("farmer_code", "farmer_code"),
+    ("name", "name"),
+    ("phone", "phone"),
+    ("district", "district__name"),
+    ("taluk", "taluk__name"),
+    ("village", "village__name"),
+    ("gps_location", "gps_location"),
+    ("total_land_area", "total_land_area"),
+    ("irrigation_type", "irrigation_type"),
+    ("soil_type", "soil_type"),
+    ("is_active", "is_active"),
+    ("created_at", "created_at"),
+]
+
+
+class ExportError(ValueError):
+    """Unknown dataset / format or invalid export filter."""
+
+
+def _headers(columns) -> list[str]:
+    return [header for header, _ in columns]
+
+
+def _lookups(columns) -> list[str]:
+    return [lookup for _, lookup in columns]
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _cell_value(value):
+    """CSV/XLSX cell: blanks for null, ISO strings for temporal values."""
+    if value is None:
+        return ""
+    return _json_value(value)
+
+
+# ──────────────────────────────────────────────────────────────
+# Row sources (server-side cursors)
+# ──────────────────────────────────────────────────────────────
+
+
+def visit_export_rows(
+    *,
+    start: date | None = None,
+    end: date | None = None,
+    employee=None,
+    district=None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[tuple]:
+    """Submitted visits as value tuples in VISIT_EXPORT_COLUMNS order."""
+    from reports.summary import filtered_submitted_visits
+
+    qs = filtered_submitted_visits(
+        start=start, end=end, employee=employee, district=district
+    )
+    return (
+        qs.order_by("id")
+        .values_list(*_lookups(VISIT_EXPORT_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def farmer_export_rows(
+    *,
+    district=None,
+    village=None,
+    include_inactive: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[tuple]:
+    """Farmers as value tuples in FARMER_EXPORT_COLUMNS order."""
+    from masters.models import Farmer
+
+    qs = Farmer.objects.all()
+    if not include_inactive:
+        qs = qs.filter(is_active=True)
+    if district is not None and str(district).strip():
+        d = str(district).strip()
+        qs = qs.filter(district_id=int(d)) if d.isdigit() else qs.filter(district__name__iexact=d)
+    if village is not None and str(village).strip():
+        v = str(village).strip()
+        if not v.isdigit():
+            raise ExportError("village must be a numeric id.")
+        qs = qs.filter(village_id=int(v))
+    return (
+        qs.order_by("id")
+        .values_list(*_lookups(FARMER_EXPORT_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def export_source(dataset: str, filters: dict | None = None):
+    """Return (columns, row iterator) for a dataset and its filter dict."""
+    from visits.date_filters import parse_optional_iso_date
+
+    filters = dict(filters or {})
+    if dataset == DATASET_VISITS:
+        start = filters.get("start")
+        end = filters.get("end")
+        if not isinstance(start, date):
+            start = parse_optional_iso_date(start, field_name="from")
+        if not isinstance(end, date):
+            end = parse_optional_iso_date(end, field_name="to")
+        rows = visit_export_rows(
+            start=start,
+            end=end,
+            employee=filters.get("employee"),
+            district=filters.get("district"),
+        )
+        return VISIT_EXPORT_COLUMNS, rows
+    if dataset == DATASET_FARMERS:
+        rows = farmer_export_rows(
+            district=filters.get("district"),
+            village=filters.get("village"),
+            include_inactive=bool(filters.get("include_inactive")),
+        )
+        return FARMER_EXPORT_COLUMNS, rows
+    raise ExportError(f"Unknown export dataset: {dataset!r}")
+
+
+# ──────────────────────────────────────────────────────────────
+# Writers
+# ──────────────────────────────────────────────────────────────
+
+
+class _LineBuffer:
+    """csv.writer target that hands back each written line."""
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(columns, rows: Iterable[tuple]) -> Iterator[str]:
+    headers = _headers(columns)
+    for row in rows:
+        record = {h: _json_value(v) for h, v in zip(headers, row)}
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_csv(columns, rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(_headers(columns))
+    for row in rows:
+        yield writer.writerow([_cell_value(v) for v in row])
+
+
+def write_xlsx(columns, rows: Iterable[tuple], handle: IO[bytes], *, title: str = "Export") -> int:
+    """Write rows with openpyxl write-only mode; returns the data row count."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(_headers(columns))
+    count = 0
+    for row in rows:
+        sheet.append([_cell_value(v) for v in row])
+        count += 1
+    workbook.save(handle)
+    return count
+
+
+def write_export(fmt: str, columns, rows: Iterable[tuple], handle: IO[bytes], *, title: str = "Export") -> None:
+    """Write a whole export to a binary file handle (commands / Celery)."""
+    if fmt == FORMAT_XLSX:
+        write_xlsx(columns, rows, handle, title=title)
+        return
+    chunks = iter_ndjson(columns, rows) if fmt == FORMAT_NDJSON else iter_csv(columns, rows)
+    for chunk in chunks:
+        handle.write(chunk.encode("utf-8"))
+
+
+def export_filename(dataset: str, fmt: str) -> str:
+    return f"{dataset}_export_{timezone.localtime():%Y%m%d_%H%M%S}.{fmt}"
+
+
+def _validate(dataset: str, fmt: str) -> None:
+    if dataset not in EXPORT_DATASETS:
+        raise ExportError(f"Unknown export dataset: {dataset!r}")
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(
+            f"Unsupported export format: {fmt!r}. Use one of {', '.join(EXPORT_FORMATS)}."
+        )
+
+
+def build_export_response(dataset: str, fmt: str, filters: dict | None = None):
+    """StreamingHttpResponse (NDJSON/CSV) or FileResponse over a temp XLSX."""
+    _validate(dataset, fmt)
+    columns, rows = export_source(dataset, filters)
+    filename = export_filename(dataset, fmt)
+
+    if fmt == FORMAT_XLSX:
+        handle = tempfile.TemporaryFile()
+        write_xlsx(columns, rows, handle, title=dataset)
+        handle.seek(0)
+        return FileResponse(
+            handle,
+            as_attachment=True,
+            filename=filename,
+            content_type=CONTENT_TYPES[fmt],
+        )
+
+    writer: Callable = iter_ndjson if fmt == FORMAT_NDJSON else iter_csv
+    response = StreamingHttpResponse(
+        writer(columns, rows),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
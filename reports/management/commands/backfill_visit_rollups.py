@@ -0,0 +1,58 @@
+"""Rebuild VisitDailyRollup rows from submitted visits, one day at a time."""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from reports.models import VisitDailyRollup
+from reports.rollups import rebuild_range, rollup_day
+from visits.models import Visit
+
+
+def _parse(raw, flag):
+    value = parse_date(raw)
+    if value is None:
+        raise CommandError(f"{flag} must be YYYY-MM-DD.")
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute daily visit rollups for the admin report summary "
+        "(default: from the first visit through today)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First day to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="end", help="Last day to rebuild (YYYY-MM-DD, default today).")
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Do nothing when rollup rows already exist (safe to run on every deploy).",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_empty"] and VisitDailyRollup.objects.exists():
+            self.stdout.write("Rollups already present; nothing to do.")
+            return
+        end = _parse(options["end"], "--to") if options.get("end") else timezone.localdate()
+        if options.get("start"):
+            start = _parse(options["start"], "--from")
+        else:
+            first = Visit.objects.aggregate(day=Min("visit_date"), created=Min("created_at"))
+            candidates = [
+                d for d in (first["day"], rollup_day(None, first["created"])) if d is not None
+            ]
+            if not candidates:
+                self.stdout.write("No visits to roll up.")
+                return
+            start = min(candidates)
+        if start > end:
+            raise CommandError("--from must be on or before --to.")
+
+        written = rebuild_range(start, end)
+        days = (end - start).days + 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {written} rollup row(s) across {days} day(s).")
+        )
@@ -0,0 +1,70 @@
+"""Stream visits or farmers to NDJSON / CSV / XLSX without loading the table."""
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from reports.exports import (
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    ExportError,
+    export_filename,
+    export_source,
+    write_export,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export submitted visits or farmers using server-side cursors. "
+        "Use --queue to run as a Celery job that writes to default storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=EXPORT_DATASETS)
+        parser.add_argument("--format", dest="fmt", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", help="File path (default: <dataset>_export_<ts>.<fmt>)")
+        parser.add_argument("--from", dest="start", help="Visits: start date YYYY-MM-DD")
+        parser.add_argument("--to", dest="end", help="Visits: end date YYYY-MM-DD")
+        parser.add_argument("--employee", help="Visits: user id or employee_id")
+        parser.add_argument("--district", help="District id or name")
+        parser.add_argument("--village", help="Farmers: village id")
+        parser.add_argument(
+            "--include-inactive",
+            action="store_true",
+            help="Farmers: include inactive rows.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Enqueue reports.tasks.export_dataset_to_storage instead of writing locally.",
+        )
+
+    def handle(self, *args, **options):
+        dataset = options["dataset"]
+        fmt = options["fmt"]
+        filters = {
+            "start": options.get("start"),
+            "end": options.get("end"),
+            "employee": options.get("employee"),
+            "district": options.get("district"),
+            "village": options.get("village"),
+            "include_inactive": options["include_inactive"],
+        }
+
+        if options["queue"]:
+            from reports.tasks import queue_dataset_export
+
+            report = queue_dataset_export(
+                dataset=dataset, fmt=fmt, filters=filters, requested_by_user_id=None
+            )
+            self.stdout.write(self.style.SUCCESS(f"Queued export report_id={report.pk}"))
+            return
+
+        output = options.get("output") or export_filename(dataset, fmt)
+        try:
+            columns, rows = export_source(dataset, filters)
+            with open(output, "wb") as handle:
+                write_export(fmt, columns, rows, handle, title=dataset)
+        except (ExportError, ValidationError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f"Exported {dataset} ({fmt}) to {output}"))
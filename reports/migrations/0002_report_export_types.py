@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('visit_summary', 'Visit Summary'), ('employee_performance', 'Employee Performance'), ('village_summary', 'Village Summary'), ('farmer_history', 'Farmer History'), ('daily_summary', 'Daily Summary'), ('monthly_summary', 'Monthly Summary'), ('visit_export', 'Visit Export'), ('farmer_export', 'Farmer Export')], max_length=50),
+        ),
+    ]
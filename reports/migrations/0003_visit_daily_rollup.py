@@ -0,0 +1,40 @@
+# Generated by Django 5.2.17 on 2026-10-19 14:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('masters', '0028_geo_columns'),
+        ('reports', '0002_report_export_types'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('visits', models.IntegerField(default=0)),
+                ('farmers', models.IntegerField(default=0)),
+                ('gps_compliant', models.IntegerField(default=0)),
+                ('visits_with_evidence', models.IntegerField(default=0)),
+                ('media_files', models.IntegerField(default=0)),
+                ('attachment_files', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('crop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='masters.crop')),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='masters.district')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('village', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='masters.village')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='reports_vis_date_0a86b4_idx'), models.Index(fields=['employee', 'date'], name='reports_vis_employe_a63483_idx'), models.Index(fields=['district', 'date'], name='reports_vis_distric_f432c9_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'employee', 'district', 'village', 'crop'), name='uniq_visit_daily_rollup_cell', nulls_distinct=False)],
+            },
+        ),
+    ]
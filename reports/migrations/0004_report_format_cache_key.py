@@ -0,0 +1,28 @@
+# Generated by Django 5.2.17 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_visit_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='Hash of (report_type, parameters, format, data version); equal keys share one file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='output_format',
+            field=models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel'), ('csv', 'CSV')], default='pdf', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('visit_summary', 'Visit Summary'), ('employee_performance', 'Employee Performance'), ('village_summary', 'Village Summary'), ('farmer_history', 'Farmer History'), ('daily_summary', 'Daily Summary'), ('monthly_summary', 'Monthly Summary'), ('visit_export', 'Visit Export'), ('farmer_export', 'Farmer Export'), ('visit', 'Visit Report')], max_length=50),
+        ),
+    ]
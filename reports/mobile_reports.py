@@ -8,6 +8,7 @@ from django.utils import timezone
 from django.db.models import Sum
 
 from drf_spectacular.utils import extend_schema
+from utils.day_ranges import date_span, day_range
 from utils.schema import SIMPLE_SUCCESS
 
 
@@ -32,7 +33,7 @@ class DailyReportAPI(APIView):
         total_visits = visit_qs.count()
         total_work_hours = WorkLog.objects.filter(
             employee=request.user,
-            start_time__date=today,
+            **day_range("start_time", today),
             is_active=False,
         ).aggregate(hours=Sum("total_duration"))["hours"]
         return Response(
@@ -66,8 +67,7 @@ class MonthlyReportAPI(APIView):
         total_visits = visit_qs.count()
         total_work_hours = WorkLog.objects.filter(
             employee=request.user,
-            start_time__date__gte=month_start,
-            start_time__date__lte=today,
+            **date_span("start_time", month_start, today),
             is_active=False,
         ).aggregate(hours=Sum("total_duration"))["hours"]
         return Response(
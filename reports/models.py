@@ -27,6 +27,18 @@ class Report(models.Model):
         ("farmer_history", "Farmer History"),
         ("daily_summary", "Daily Summary"),
         ("monthly_summary", "Monthly Summary"),
+        ("visit_export", "Visit Export"),
+        ("farmer_export", "Farmer Export"),
+        ("visit", "Visit Report"),
+    ]
+
+    FORMAT_PDF = "pdf"
+    FORMAT_XLSX = "xlsx"
+    FORMAT_CSV = "csv"
+    FORMAT_CHOICES = [
+        (FORMAT_PDF, "PDF"),
+        (FORMAT_XLSX, "Excel"),
+        (FORMAT_CSV, "CSV"),
     ]
 
     requested_by = models.ForeignKey(
@@ -40,6 +52,16 @@ class Report(models.Model):
     parameters = models.JSONField(
         default=dict, blank=True, help_text="Filter params used"
     )
+    output_format = models.CharField(
+        max_length=10, choices=FORMAT_CHOICES, default=FORMAT_PDF
+    )
+    cache_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="Hash of (report_type, parameters, format, data version); equal keys share one file",
+    )
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True
     )
@@ -58,3 +80,55 @@ class Report(models.Model):
 
     def __str__(self):
         return f"{self.report_type} | {self.status} | {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class VisitDailyRollup(models.Model):
+    """
+    Submitted-visit aggregates per day x employee x district x village x crop.
+
+    ``date`` is the visit's local day (visit_date, else created_at date).
+    Maintained by reports.rollups on visit / media / attachment writes and
+    rebuilt with ``manage.py backfill_visit_rollups``.  ``farmers`` counts
+    distinct farmers within the cell only, so it is not additive across cells.
+    """
+
+    date = models.DateField()
+    employee = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    district = models.ForeignKey(
+        "masters.District", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    village = models.ForeignKey(
+        "masters.Village", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    crop = models.ForeignKey(
+        "masters.Crop", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+
+    visits = models.IntegerField(default=0)
+    farmers = models.IntegerField(default=0)
+    gps_compliant = models.IntegerField(default=0)
+    visits_with_evidence = models.IntegerField(default=0)
+    media_files = models.IntegerField(default=0)
+    attachment_files = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "employee", "district", "village", "crop"],
+                name="uniq_visit_daily_rollup_cell",
+                nulls_distinct=False,
+            )
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+            models.Index(fields=["employee", "date"]),
+            models.Index(fields=["district", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} | employee={self.employee_id} | {self.visits} visit(s)"
@@ -0,0 +1,218 @@
+"""
+Daily visit rollups (VisitDailyRollup) behind the admin report summary.
+
+A cell is one day x employee x district x village x crop.  Writes refresh
+the affected (day, employee) slice: its rows are deleted and recomputed from
+that employee's submitted visits for the day with a single grouped query.
+
+- Visit save/delete                    -> ``refresh_for_visit``
+- VisitMedia / VisitAttachment create  -> ``refresh_for_evidence``
+- VisitMedia / VisitAttachment delete  -> ``refresh_for_evidence``
+
+Queryset ``update()`` calls that move visits between farmers / villages skip
+the signals; those call sites refresh explicitly (``refresh_for_visit_ids``).
+
+Refreshes run after the writer's transaction commits, so the write itself
+never waits on them.  Refreshes of one employee serialize on a lock of that
+employee's user row, so two refreshes cannot interleave delete and insert of
+the same slice.
+
+``rebuild_range`` recomputes whole days (``manage.py backfill_visit_rollups``;
+deploys run it with ``--if-empty`` to fill the table the first time).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from reports.models import VisitDailyRollup
+from visits.date_filters import apply_visit_date_range
+from visits.models import Visit, VisitAttachment, VisitMedia
+from visits.submitted import submitted_visits_qs
+
+logger = logging.getLogger(__name__)
+
+CELL_DIMENSIONS = ("employee_id", "district_id", "village_id", "crop_id")
+MEASURES = (
+    "visits",
+    "farmers",
+    "gps_compliant",
+    "visits_with_evidence",
+    "media_files",
+    "attachment_files",
+)
+
+
+def rollup_day(visit_date: Optional[date], created_at) -> Optional[date]:
+    """Local day a visit is reported under (visit_date, else created_at date)."""
+    if visit_date:
+        return visit_date
+    if created_at:
+        return timezone.localdate(created_at)
+    return None
+
+
+def _file_count(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(visit_id=OuterRef("pk"))
+            .order_by()
+            .values("visit_id")
+            .annotate(n=Count("id"))
+            .values("n")[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def compute_cells(visits) -> list[dict]:
+    """
+    Group submitted visits from ``visits`` into rollup cells (one query).
+
+    Returns dicts with ``date``, the CELL_DIMENSIONS ids and every MEASURE.
+    """
+    qs = (
+        submitted_visits_qs(visits)
+        .order_by()
+        .annotate(
+            _day=Coalesce("visit_date", TruncDate("created_at")),
+            _has_evidence=Exists(VisitMedia.objects.filter(visit_id=OuterRef("pk")))
+            | Exists(VisitAttachment.objects.filter(visit_id=OuterRef("pk"))),
+            _media=_file_count(VisitMedia),
+            _attachments=_file_count(VisitAttachment),
+        )
+        .values("_day", *CELL_DIMENSIONS)
+        .annotate(
+            visits=Count("id"),
+            farmers=Count("farmer_id", distinct=True),
+            gps_compliant=Count("id", filter=Q(latitude__isnull=False, longitude__isnull=False)),
+            visits_with_evidence=Count("id", filter=Q(_has_evidence=True)),
+            media_files=Sum("_media"),
+            attachment_files=Sum("_attachments"),
+        )
+    )
+    cells = []
+    for row in qs:
+        if row["_day"] is None:
+            continue
+        cell = {"date": row["_day"], **{dim: row[dim] for dim in CELL_DIMENSIONS}}
+        cell.update({m: row[m] or 0 for m in MEASURES})
+        cells.append(cell)
+    return cells
+
+
+def _replace(rows_qs, cells: list[dict]) -> int:
+    rows_qs.delete()
+    VisitDailyRollup.objects.bulk_create(VisitDailyRollup(**cell) for cell in cells)
+    return len(cells)
+
+
+def _lock_employees(employee_ids) -> None:
+    """Serialize slice writers per employee (lock order: ascending pk)."""
+    list(
+        get_user_model()
+        .objects.select_for_update()
+        .filter(pk__in=employee_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+@transaction.atomic
+def refresh_slice(day: date, employee_id: int) -> int:
+    """Recompute every cell for one employee on one day."""
+    _lock_employees([employee_id])
+    # Computed after the lock, so a writer that waited sees the winner's visits.
+    visits = apply_visit_date_range(Visit.objects.filter(employee_id=employee_id), day, day)
+    return _replace(
+        VisitDailyRollup.objects.filter(date=day, employee_id=employee_id),
+        compute_cells(visits),
+    )
+
+
+def rebuild_range(start: date, end: date) -> int:
+    """Recompute all cells for ``start``..``end`` (inclusive), one transaction per day."""
+    written = 0
+    day = start
+    while day <= end:
+        visits = apply_visit_date_range(Visit.objects.all(), day, day)
+        with transaction.atomic():
+            _lock_employees(visits.order_by().values("employee_id").distinct())
+            written += _replace(VisitDailyRollup.objects.filter(date=day), compute_cells(visits))
+        day += timedelta(days=1)
+    return written
+
+
+def refresh_slices(keys: Iterable[tuple]) -> None:
+    """Refresh the (day, employee_id) slices once the current transaction commits."""
+    keys = {key for key in keys if key[0] is not None and key[1]}
+    if keys:
+        transaction.on_commit(lambda: _refresh_now(keys))
+
+
+def _refresh_now(keys: set[tuple]) -> None:
+    for day, employee_id in keys:
+        try:
+            refresh_slice(day, employee_id)
+        except Exception:  # noqa: BLE001 - rollups are repairable; never fail the write
+            logger.warning(
+                "event=visit_rollup_refresh_failed date=%s employee_id=%s",
+                day,
+                employee_id,
+                exc_info=True,
+            )
+
+
+# ──────────────────────────────────────────────────────────────
+# Write-path hooks (called from reports.signals)
+# ──────────────────────────────────────────────────────────────
+
+
+def slice_key(visit: Visit) -> tuple:
+    return rollup_day(visit.visit_date, visit.created_at), visit.employee_id
+
+
+def stored_slice_key(visit_id) -> Optional[tuple]:
+    """Slice key currently in the database for ``visit_id`` (before a save)."""
+    row = (
+        Visit.objects.filter(pk=visit_id)
+        .values_list("visit_date", "created_at", "employee_id")
+        .first()
+    )
+    if row is None:
+        return None
+    return rollup_day(row[0], row[1]), row[2]
+
+
+def refresh_for_visit(visit: Visit, previous: Optional[tuple] = None) -> None:
+    keys = [slice_key(visit)]
+    if previous is not None:
+        keys.append(previous)
+    refresh_slices(keys)
+
+
+def refresh_for_visit_ids(visit_ids: Iterable[int], batch_size: int = 500) -> None:
+    """Refresh the slices of visits changed by a queryset ``update()``."""
+    ids = sorted(set(visit_ids))
+    keys = set()
+    for start in range(0, len(ids), batch_size):
+        for visit_date, created_at, employee_id in Visit.objects.filter(
+            pk__in=ids[start : start + batch_size]
+        ).values_list("visit_date", "created_at", "employee_id"):
+            keys.add((rollup_day(visit_date, created_at), employee_id))
+    refresh_slices(keys)
+
+
+def refresh_for_evidence(visit_id) -> None:
+    key = stored_slice_key(visit_id)
+    if key is not None:
+        refresh_slices([key])
@@ -0,0 +1,50 @@
+"""Keep VisitDailyRollup current on visit / evidence writes (reports.rollups)."""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from visits.models import Visit, VisitAttachment, VisitMedia
+
+
+@receiver(pre_save, sender=Visit)
+def visit_remember_rollup_slice(sender, instance: Visit, raw=False, **kwargs):
+    if raw or not instance.pk:
+        return
+    from reports.rollups import stored_slice_key
+
+    # A date or employee change must also refresh the slice the visit leaves.
+    instance._rollup_previous_slice = stored_slice_key(instance.pk)
+
+
+@receiver(post_save, sender=Visit)
+def visit_saved_refresh_rollups(sender, instance: Visit, raw=False, **kwargs):
+    if raw:
+        return
+    from reports.rollups import refresh_for_visit
+
+    refresh_for_visit(instance, getattr(instance, "_rollup_previous_slice", None))
+
+
+@receiver(post_delete, sender=Visit)
+def visit_deleted_refresh_rollups(sender, instance: Visit, **kwargs):
+    from reports.rollups import refresh_for_visit
+
+    refresh_for_visit(instance)
+
+
+@receiver(post_save, sender=VisitMedia)
+@receiver(post_save, sender=VisitAttachment)
+def evidence_created_refresh_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    from reports.rollups import refresh_for_evidence
+
+    refresh_for_evidence(instance.visit_id)
+
+
+@receiver(post_delete, sender=VisitMedia)
+@receiver(post_delete, sender=VisitAttachment)
+def evidence_deleted_refresh_rollups(sender, instance, **kwargs):
+    from reports.rollups import refresh_for_evidence
+
+    refresh_for_evidence(instance.visit_id)
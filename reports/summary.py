@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-from datetime import date
+from collections import defaultdict
+from datetime import date, timedelta
 
-from django.db.models import Count, Exists, OuterRef, Q
-from django.db.models.functions import Coalesce, TruncDate
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 
 from accounts.models import EmployeeProfile
+from masters.models import Crop, District
+from reports.models import VisitDailyRollup
+from reports.rollups import MEASURES, compute_cells
 from visits.date_filters import apply_visit_date_range
-from visits.models import Visit, VisitAttachment, VisitMedia
+from visits.models import Visit
 from visits.submitted import submitted_visits_qs
 
 
@@ -68,6 +73,68 @@ def filtered_submitted_visits(
     )
 
 
+_ADDITIVE = tuple(m for m in MEASURES if m != "farmers")
+
+
+def _split_at_today(start: date | None, end: date | None, today: date):
+    """
+    (rollup_range, live_range): closed days come from VisitDailyRollup, today
+    (and anything after it) is counted live from visits.  Either may be None.
+    """
+    yesterday = today - timedelta(days=1)
+    rollup_range = None
+    if start is None or start <= yesterday:
+        rollup_range = (start, min(end, yesterday) if end else yesterday)
+    live_range = None
+    if end is None or end >= today:
+        live_range = (max(start, today) if start else today, end)
+    return rollup_range, live_range
+
+
+def _filtered_rollups(rollup_range, *, employee=None, district=None):
+    start, end = rollup_range
+    qs = VisitDailyRollup.objects.all()
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    emp_q = _resolve_employee_filter(employee)
+    if emp_q is not None:
+        qs = qs.filter(emp_q)
+    if district is not None and str(district).strip():
+        d = str(district).strip()
+        if d.isdigit():
+            qs = qs.filter(district_id=int(d))
+        else:
+            qs = qs.filter(district__name__iexact=d)
+    return qs
+
+
+def _group(rollups, cells: list[dict], dims: tuple) -> dict[tuple, dict]:
+    """Sum additive measures by ``dims`` over rollup rows plus live cells."""
+    out: dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(_ADDITIVE, 0))
+    if rollups is not None:
+        rows = (
+            rollups.values(*dims).annotate(**{m: Sum(m) for m in _ADDITIVE})
+            if dims
+            else [rollups.aggregate(**{m: Sum(m) for m in _ADDITIVE})]
+        )
+        for row in rows:
+            bucket = out[tuple(row[d] for d in dims)]
+            for m in _ADDITIVE:
+                bucket[m] += row[m] or 0
+    for cell in cells:
+        bucket = out[tuple(cell[d] for d in dims)]
+        for m in _ADDITIVE:
+            bucket[m] += cell[m]
+    return {key: sums for key, sums in out.items() if sums["visits"] or not dims}
+
+
+def _top(groups: dict[tuple, dict], limit: int = 50) -> list[tuple]:
+    ordered = sorted(groups.items(), key=lambda kv: (-kv[1]["visits"], kv[0][0] is None, kv[0]))
+    return [(key[0], sums["visits"]) for key, sums in ordered[:limit]]
+
+
 def build_admin_report_summary(
     *,
     start: date | None = None,
@@ -75,96 +142,94 @@ def build_admin_report_summary(
     employee=None,
     district=None,
 ) -> dict:
-    qs = filtered_submitted_visits(
-        start=start, end=end, employee=employee, district=district
-    )
+    """
+    Summary for the Admin Reports page.
 
-    has_media = VisitMedia.objects.filter(visit_id=OuterRef("pk"))
-    has_att = VisitAttachment.objects.filter(visit_id=OuterRef("pk"))
-    qs = qs.annotate(_has_evidence=Exists(has_media) | Exists(has_att))
-
-    totals_row = qs.aggregate(
-        visits=Count("id"),
-        farmers=Count("farmer_id", distinct=True),
-        employees=Count("employee_id", distinct=True),
-        gps_compliant=Count(
-            "id",
-            filter=Q(latitude__isnull=False, longitude__isnull=False),
-        ),
-        visits_with_evidence=Count("id", filter=Q(_has_evidence=True)),
+    Additive measures come from VisitDailyRollup for closed days plus one
+    live grouped query for today.  Distinct farmer counts are not additive
+    across cells and are taken from visits directly.
+    """
+    rollup_range, live_range = _split_at_today(start, end, timezone.localdate())
+    rollups = (
+        _filtered_rollups(rollup_range, employee=employee, district=district)
+        if rollup_range
+        else None
+    )
+    cells = (
+        compute_cells(
+            filtered_submitted_visits(
+                start=live_range[0], end=live_range[1], employee=employee, district=district
+            )
+        )
+        if live_range
+        else []
     )
 
-    visit_ids = qs.values_list("id", flat=True)
-    media_files = VisitMedia.objects.filter(visit_id__in=visit_ids).count()
-    attachment_files = VisitAttachment.objects.filter(visit_id__in=visit_ids).count()
+    totals_row = _group(rollups, cells, ())[()]
+    by_day = _group(rollups, cells, ("date",))
+    by_employee = _group(rollups, cells, ("employee_id",))
+    by_district = _group(rollups, cells, ("district_id",))
+    by_crop = _group(rollups, cells, ("crop_id",))
+    by_village = _group(rollups, cells, ("village_id",))
 
     visits_by_day = [
-        {
-            "date": row["day"].isoformat() if row["day"] else None,
-            "count": row["count"],
-        }
-        for row in (
-            qs.annotate(day=Coalesce("visit_date", TruncDate("created_at")))
-            .values("day")
-            .annotate(count=Count("id"))
-            .order_by("day")
-        )
-        if row["day"] is not None
+        {"date": key[0].isoformat(), "count": sums["visits"]}
+        for key, sums in sorted(by_day.items())
     ]
 
-    visits_by_employee = [
-        {
-            "employee_id": row["employee_id"],
-            "employee_code": row["employee__employee_profile__employee_id"],
-            "employee_name": _display_employee_name(
-                row["employee__username"],
-                row["employee__first_name"],
-                row["employee__last_name"],
-            ),
-            "count": row["count"],
-        }
-        for row in (
-            qs.values(
-                "employee_id",
-                "employee__username",
-                "employee__first_name",
-                "employee__last_name",
-                "employee__employee_profile__employee_id",
-            )
-            .annotate(count=Count("id"))
-            .order_by("-count")[:50]
+    top_employees = _top(by_employee)
+    people = {
+        row["id"]: row
+        for row in User.objects.filter(pk__in=[pk for pk, _ in top_employees]).values(
+            "id", "username", "first_name", "last_name", "employee_profile__employee_id"
+        )
+    }
+    visits_by_employee = []
+    for employee_id, count in top_employees:
+        person = people.get(employee_id, {})
+        visits_by_employee.append(
+            {
+                "employee_id": employee_id,
+                "employee_code": person.get("employee_profile__employee_id"),
+                "employee_name": _display_employee_name(
+                    person.get("username"), person.get("first_name"), person.get("last_name")
+                ),
+                "count": count,
+            }
         )
-    ]
 
+    top_districts = _top(by_district)
+    district_names = dict(
+        District.objects.filter(pk__in=[pk for pk, _ in top_districts if pk]).values_list("id", "name")
+    )
     visits_by_district = [
         {
-            "district_id": row["district_id"],
-            "district_name": row["district__name"] or "—",
-            "count": row["count"],
+            "district_id": district_id,
+            "district_name": district_names.get(district_id) or "—",
+            "count": count,
         }
-        for row in (
-            qs.values("district_id", "district__name")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:50]
-        )
+        for district_id, count in top_districts
     ]
 
+    top_crops = _top(by_crop)
+    crop_names = dict(
+        Crop.objects.filter(pk__in=[pk for pk, _ in top_crops if pk]).values_list("id", "name_en")
+    )
     visits_by_crop = [
         {
-            "crop_id": row["crop_id"],
-            "crop_name": row["crop__name_en"] or "—",
-            "count": row["count"],
+            "crop_id": crop_id,
+            "crop_name": crop_names.get(crop_id) or "—",
+            "count": count,
         }
-        for row in (
-            qs.values("crop_id", "crop__name_en")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:50]
-        )
+        for crop_id, count in top_crops
     ]
 
-    villages_covered = (
-        qs.exclude(village_id=None).values("village_id").distinct().count()
-    )
+    villages_covered = sum(1 for key in by_village if key[0] is not None)
+
+    farmer_qs = filtered_submitted_visits(
+        start=start, end=end, employee=employee, district=district
+    ).exclude(farmer_id=None)
+    farmers = farmer_qs.order_by().values("farmer_id").distinct().count()
     farmer_coverage_by_village = [
         {
             "village_id": row["village_id"],
@@ -172,17 +237,17 @@ def build_admin_report_summary(
             "farmers": row["farmers"],
         }
         for row in (
-            qs.exclude(Q(village_id=None) | Q(farmer_id=None))
+            farmer_qs.exclude(village_id=None)
             .values("village_id", "village__name")
             .annotate(farmers=Count("farmer_id", distinct=True))
             .order_by("-farmers")[:20]
         )
     ]
 
-    visits = totals_row["visits"] or 0
-    gps_compliant = totals_row["gps_compliant"] or 0
-    with_evidence = totals_row["visits_with_evidence"] or 0
-    evidence_files = media_files + attachment_files
+    visits = totals_row["visits"]
+    gps_compliant = totals_row["gps_compliant"]
+    with_evidence = totals_row["visits_with_evidence"]
+    evidence_files = totals_row["media_files"] + totals_row["attachment_files"]
 
     return {
         "period": {
@@ -192,8 +257,8 @@ def build_admin_report_summary(
         "totals": {
             "visits": visits,
             "submitted_visits": visits,
-            "employees": totals_row["employees"] or 0,
-            "farmers": totals_row["farmers"] or 0,
+            "employees": len(by_employee),
+            "farmers": farmers,
             "villages_covered": villages_covered,
             "gps_compliant": gps_compliant,
             "gps_compliance_pct": round((gps_compliant / visits) * 100) if visits else 0,
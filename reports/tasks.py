@@ -1,14 +1,13 @@
 """
 reports/tasks.py
 ─────────────────
-Celery tasks for background report generation and PDF building.
+Celery tasks for background report generation (PDF / XLSX / CSV via
+reports.engine) and dataset exports.
 """
 
 from __future__ import annotations
 
-import io
 import logging
-from datetime import date, timedelta
 from typing import Any, Dict, Optional
 
 from celery import shared_task
@@ -25,9 +24,15 @@ logger = logging.getLogger(__name__)
 @shared_task(bind=True, max_retries=2, default_retry_delay=30)
 def generate_report(self, report_id: int) -> None:
     """
-    Entry-point task.  Looks up the Report record, routes to the
-    correct builder, saves the file, and marks the report done.
+    Entry-point task.  Looks up the Report record, reuses a finished report
+    with the same cache key when one exists, otherwise renders the file
+    (reports.engine) through a temporary file and marks the report done.
     """
+    import tempfile
+
+    from django.core.files import File
+
+    from reports.engine import find_reusable, report_cache_key, report_filename, write_report
     from reports.models import Report
 
     try:
@@ -40,12 +45,26 @@ def generate_report(self, report_id: int) -> None:
     report.save(update_fields=["status"])
 
     try:
-        buffer = _build_pdf(report)
-        _save_report_file(report, buffer)
+        if not report.cache_key:
+            report.cache_key = report_cache_key(
+                report.report_type, report.parameters, report.output_format
+            )
+        reused = find_reusable(report.cache_key, exclude_pk=report.pk)
+        if reused is not None:
+            _point_at_file(report, reused.file.name)
+            logger.info("Report %s reused file of report %s", report_id, reused.pk)
+        else:
+            with tempfile.TemporaryFile() as handle:
+                write_report(report, handle)
+                handle.seek(0)
+                report.file.save(report_filename(report), File(handle), save=False)
+            _point_at_file(report, report.file.name)
+            logger.info("Report %s generated successfully", report_id)
         report.status = Report.STATUS_DONE
         report.completed_at = timezone.now()
-        report.save(update_fields=["status", "completed_at", "file", "file_url"])
-        logger.info("Report %s generated successfully", report_id)
+        report.save(
+            update_fields=["status", "completed_at", "file", "file_url", "cache_key"]
+        )
     except Exception as exc:
         report.status = Report.STATUS_FAILED
         report.error_message = str(exc)
@@ -54,165 +73,139 @@ def generate_report(self, report_id: int) -> None:
         raise self.retry(exc=exc)
 
 
-# ──────────────────────────────────────────────────────────────
-# Internal helpers
-# ──────────────────────────────────────────────────────────────
-
-
-def _build_pdf(report) -> io.BytesIO:
-    """
-    Build a PDF using reportlab and return a BytesIO buffer.
-    Falls back to a plain text stub if reportlab is not installed.
+@shared_task(bind=True, max_retries=1, default_retry_delay=60, acks_late=True)
+def export_dataset_to_storage(self, report_id: int) -> None:
     """
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import (
-            SimpleDocTemplate,
-            Paragraph,
-            Spacer,
-            Table,
-            TableStyle,
-        )
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.lib import colors
-    except ImportError:
-        logger.warning("reportlab not installed – generating stub PDF")
-        buf = io.BytesIO(b"%PDF-1.4 stub")
-        buf.seek(0)
-        return buf
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Title
-    story.append(
-        Paragraph(f"Agri Clinic – {report.get_report_type_display()}", styles["Title"])
-    )
-    story.append(Spacer(1, 12))
-    story.append(
-        Paragraph(f"Generated: {timezone.now():%Y-%m-%d %H:%M}", styles["Normal"])
-    )
-    story.append(Spacer(1, 12))
-
-    # Route to content builder
-    rows = _get_report_rows(report)
-    if rows:
-        table = Table(rows)
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2d7a3a")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    (
-                        "ROWBACKGROUNDS",
-                        (0, 1),
-                        (-1, -1),
-                        [colors.white, colors.HexColor("#f0f7f0")],
-                    ),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ]
-            )
-        )
-        story.append(table)
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+    Write a large visit/farmer export to default storage.
 
+    Report.parameters carries ``dataset``, ``format`` and ``filters``; rows
+    stream through a temporary file so worker memory stays bounded.
+    """
+    import tempfile
 
-def _get_report_rows(report) -> list:
-    """Route to the correct data fetcher based on report_type."""
-    params = report.parameters or {}
+    from django.core.files import File
 
-    if report.report_type == "employee_performance":
-        from visits.selectors import get_employee_performance
+    from reports.exports import export_filename, export_source, write_export
+    from reports.models import Report
 
-        date_from = _parse_date(
-            params.get("date_from"), date.today() - timedelta(days=30)
-        )
-        date_to = _parse_date(params.get("date_to"), date.today())
-        qs = get_employee_performance(date_from=date_from, date_to=date_to)
-        headers = ["Employee", "Employee ID", "Visits"]
-        rows = [headers] + [
-            [
-                r["employee__username"],
-                r.get("employee__employee_profile__employee_id", ""),
-                r["visit_count"],
-            ]
-            for r in qs
-        ]
-        return rows
-
-    elif report.report_type in ("daily_summary", "visit_summary", "monthly_summary"):
-        from visits.selectors import get_visit_trends
-
-        date_from = _parse_date(
-            params.get("date_from"), date.today() - timedelta(days=30)
-        )
-        date_to = _parse_date(params.get("date_to"), date.today())
-        qs = get_visit_trends(date_from=date_from, date_to=date_to)
-        headers = ["Date", "Total Visits"]
-        rows = [headers] + [[str(r["visit_date"]), r["count"]] for r in qs]
-        return rows
+    try:
+        report = Report.objects.get(pk=report_id)
+    except Report.DoesNotExist:
+        logger.error("export_dataset_to_storage: Report %s not found", report_id)
+        return
 
-    elif report.report_type == "village_summary":
-        from dashboard.selectors import get_village_heatmap
+    params = report.parameters or {}
+    dataset = params.get("dataset")
+    fmt = params.get("format")
 
-        data = get_village_heatmap(top_n=50)
-        headers = ["Village", "Total Visits"]
-        rows = [headers] + [[r["village__name"], r["count"]] for r in data]
-        return rows
+    report.status = Report.STATUS_PROCESSING
+    report.save(update_fields=["status"])
 
-    return []
+    try:
+        columns, rows = export_source(dataset, params.get("filters"))
+        with tempfile.TemporaryFile() as handle:
+            write_export(fmt, columns, rows, handle, title=dataset)
+            handle.seek(0)
+            report.file.save(export_filename(dataset, fmt), File(handle), save=False)
+        try:
+            report.file_url = report.file.url
+        except Exception:
+            report.file_url = ""
+        report.status = Report.STATUS_DONE
+        report.completed_at = timezone.now()
+        report.save(update_fields=["status", "completed_at", "file", "file_url"])
+        logger.info("Export report %s (%s/%s) stored", report_id, dataset, fmt)
+    except Exception as exc:
+        report.status = Report.STATUS_FAILED
+        report.error_message = str(exc)
+        report.save(update_fields=["status", "error_message"])
+        logger.exception("Export report %s failed", report_id)
+        raise self.retry(exc=exc)
 
 
-def _save_report_file(report, buffer: io.BytesIO) -> None:
-    """Save the PDF buffer as a Django FileField (works with S3 and local)."""
-    from django.core.files.base import ContentFile
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
 
-    filename = (
-        f"report_{report.pk}_{report.report_type}_{timezone.now():%Y%m%d_%H%M%S}.pdf"
-    )
-    report.file.save(filename, ContentFile(buffer.read()), save=False)
 
-    # Derive a public URL
+def _point_at_file(report, name: str) -> None:
+    """Set report.file to an already-stored file and derive a public URL."""
+    report.file.name = name
     try:
         report.file_url = report.file.url
     except Exception:
         report.file_url = ""
 
 
-def _parse_date(value: Optional[str], default: date) -> date:
-    if not value:
-        return default
-    try:
-        return date.fromisoformat(value)
-    except (ValueError, TypeError):
-        return default
-
-
 # ──────────────────────────────────────────────────────────────
 # Utility callable (used by visits/tasks.py)
 # ──────────────────────────────────────────────────────────────
 
 
+def request_report(
+    *,
+    report_type: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    fmt: str = "pdf",
+    requested_by_user_id: Optional[int],
+):
+    """
+    Create a Report record for the requester.  When an identical report
+    (same report type, parameters, format and data version) is already stored
+    the new record points at that file and no task is queued.
+    """
+    from reports.engine import find_reusable, report_cache_key
+    from reports.models import Report
+
+    parameters = parameters or {}
+    cache_key = report_cache_key(report_type, parameters, fmt)
+    report = Report(
+        report_type=report_type,
+        requested_by_id=requested_by_user_id,
+        parameters=parameters,
+        output_format=fmt,
+        cache_key=cache_key,
+        status=Report.STATUS_PENDING,
+    )
+    reused = find_reusable(cache_key)
+    if reused is not None:
+        _point_at_file(report, reused.file.name)
+        report.status = Report.STATUS_DONE
+        report.completed_at = timezone.now()
+        report.save()
+        return report
+    report.save()
+    generate_report.delay(report.pk)
+    return report
+
+
 def build_and_store_pdf(
     *, report_type: str, object_id: int, requested_by_user_id: int
-) -> None:
+):
     """
-    Create a Report record and enqueue a generation task.
+    Request a PDF for one object (reusing a stored identical report).
     Called from other task modules to avoid circular imports.
     """
+    return request_report(
+        report_type=report_type,
+        parameters={"object_id": object_id},
+        fmt="pdf",
+        requested_by_user_id=requested_by_user_id,
+    )
+
+
+def queue_dataset_export(
+    *, dataset: str, fmt: str, filters: dict, requested_by_user_id: Optional[int]
+):
+    """Create an export Report and enqueue export_dataset_to_storage."""
+    from reports.exports import EXPORT_REPORT_TYPES
     from reports.models import Report
 
     report = Report.objects.create(
-        report_type=report_type,
+        report_type=EXPORT_REPORT_TYPES[dataset],
         requested_by_id=requested_by_user_id,
-        parameters={"object_id": object_id},
+        parameters={"dataset": dataset, "format": fmt, "filters": filters},
         status=Report.STATUS_PENDING,
     )
-    generate_report.delay(report.pk)
+    export_dataset_to_storage.delay(report.pk)
+    return report
@@ -0,0 +1,105 @@
+"""Report engine: chunked PDF tables, XLSX/CSV output, cache-key reuse."""
+
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from masters.models import Crop, Farmer
+from reports import engine
+from reports.models import Report
+from reports.tasks import generate_report, request_report
+from visits.models import Visit
+
+_MEDIA_ROOT = tempfile.mkdtemp(prefix="report_engine_")
+
+
+@override_settings(MEDIA_ROOT=_MEDIA_ROOT)
+class ReportEngineTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="engine_admin", password="x", is_staff=True)
+        self.emp = User.objects.create_user(username="engine_emp", password="x")
+        farmer = Farmer.objects.create(name="Engine Farmer", phone="9555000001")
+        crop = Crop.objects.create(name_en="Maize", name_ta="Maize", is_active=True)
+        self.today = timezone.localdate()
+        self.visit = Visit.objects.create(
+            employee=self.emp, farmer=farmer, crop=crop, latitude=11.0, longitude=78.0,
+            visit_date=self.today,
+        )
+        self.params = {"date_from": self.today.isoformat(), "date_to": self.today.isoformat()}
+
+    def _request(self, fmt="pdf", report_type="employee_performance", params=None):
+        with mock.patch.object(
+            generate_report, "delay", side_effect=lambda pk: generate_report(pk)
+        ) as delay:
+            report = request_report(
+                report_type=report_type,
+                parameters=self.params if params is None else params,
+                fmt=fmt,
+                requested_by_user_id=self.admin.pk,
+            )
+        report.refresh_from_db()
+        return report, delay.call_count
+
+    def _read(self, report):
+        with report.file.open("rb") as handle:
+            return handle.read()
+
+    def test_pdf_rows_are_split_into_bounded_tables(self):
+        rows = ((f"user{i}", f"EMP{i}", i) for i in range(450))
+        columns = [("Employee", "a"), ("Employee ID", "b"), ("Visits", "c")]
+        tables = list(engine.iter_pdf_tables(columns, rows, rows_per_table=200))
+        self.assertEqual([len(t._cellvalues) for t in tables], [201, 201, 51])
+
+        out = io.BytesIO()
+        engine.write_pdf("Employee Performance", columns, iter([("u", "E", 1)] * 500), out)
+        self.assertTrue(out.getvalue().startswith(b"%PDF"))
+
+    def test_xlsx_and_csv_outputs(self):
+        xlsx, _ = self._request(fmt="xlsx")
+        self.assertEqual(xlsx.status, Report.STATUS_DONE)
+        self.assertTrue(xlsx.file.name.endswith(".xlsx"))
+        sheet = load_workbook(io.BytesIO(self._read(xlsx)), read_only=True).active
+        self.assertEqual(
+            [list(r) for r in sheet.iter_rows(values_only=True)],
+            [["Employee", "Employee ID", "Visits"], ["engine_emp", None, 1]],
+        )
+
+        csv_report, _ = self._request(fmt="csv", report_type="visit", params={"object_id": self.visit.pk})
+        text = self._read(csv_report).decode("utf-8")
+        self.assertIn("Employee,engine_emp", text)
+        self.assertIn(f"Date,{self.today.isoformat()}", text)
+
+    def test_identical_request_reuses_stored_file_until_data_changes(self):
+        first, queued = self._request()
+        self.assertEqual((first.status, queued), (Report.STATUS_DONE, 1))
+        self.assertTrue(self._read(first).startswith(b"%PDF"))
+
+        again, queued = self._request()
+        self.assertEqual(queued, 0)
+        self.assertNotEqual(again.pk, first.pk)
+        self.assertEqual(again.status, Report.STATUS_DONE)
+        self.assertEqual(again.file.name, first.file.name)
+        self.assertEqual(again.cache_key, first.cache_key)
+
+        # Another format is a different report.
+        _, queued = self._request(fmt="csv")
+        self.assertEqual(queued, 1)
+
+        Visit.objects.filter(pk=self.visit.pk).update(updated_at=timezone.now())
+        fresh, queued = self._request()
+        self.assertEqual(queued, 1)
+        self.assertNotEqual(fresh.cache_key, first.cache_key)
+        self.assertNotEqual(fresh.file.name, first.file.name)
@@ -0,0 +1,131 @@
+"""Streaming visit / farmer exports (NDJSON, CSV, XLSX, background job)."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.models import EmployeeProfile
+from masters.models import Crop, District, Farmer, Village
+from reports.models import Report
+from visits.models import Visit
+
+
+class StreamingExportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="export_admin", password="x", is_staff=True, is_superuser=True
+        )
+        self.emp = User.objects.create_user(username="export_emp", password="x")
+        EmployeeProfile.objects.create(
+            user=self.emp, employee_id="EXP-1", phone="9000000011", is_active_employee=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        district = District.objects.create(name="Export District")
+        village = Village.objects.create(name="Export Village", district=district)
+        self.farmer = Farmer.objects.create(
+            name="Export Farmer", phone="9444000001", district=district, village=village
+        )
+        Farmer.objects.create(name="Gone Farmer", phone="9444000002", is_active=False)
+        crop = Crop.objects.create(name_en="Rice", name_ta="Rice", is_active=True)
+        self.today = timezone.localdate()
+        for offset in (0, 0, 20):
+            Visit.objects.create(
+                employee=self.emp,
+                farmer=self.farmer,
+                farmer_name=self.farmer.name,
+                crop=crop,
+                latitude=11.0,
+                longitude=78.0,
+                district=district,
+                village=village,
+                visit_date=self.today - timedelta(days=offset),
+            )
+
+    def _body(self, response) -> str:
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_visits_ndjson_streams_filtered_rows(self):
+        r = self.client.get(
+            "/api/v1/reports/export/visits/ndjson/",
+            {"from": self.today.isoformat(), "to": self.today.isoformat()},
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        self.assertEqual(r["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in self._body(r).splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["employee_code"], "EXP-1")
+        self.assertEqual(lines[0]["visit_date"], self.today.isoformat())
+
+    def test_farmers_csv_skips_inactive(self):
+        r = self.client.get("/api/v1/reports/export/farmers/csv/")
+        self.assertEqual(r.status_code, 200)
+        rows = list(csv.reader(io.StringIO(self._body(r))))
+        self.assertEqual(rows[0][:3], ["farmer_id", "farmer_code", "name"])
+        self.assertEqual([row[2] for row in rows[1:]], ["Export Farmer"])
+
+    def test_visits_xlsx_write_only_workbook(self):
+        from openpyxl import load_workbook
+
+        r = self.client.get("/api/v1/reports/export/visits/xlsx/")
+        self.assertEqual(r.status_code, 200)
+        workbook = load_workbook(io.BytesIO(b"".join(r.streaming_content)), read_only=True)
+        sheet_rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(sheet_rows[0][0], "visit_id")
+        self.assertEqual(len(sheet_rows), 4)
+
+    def test_unknown_format_rejected(self):
+        r = self.client.get("/api/v1/reports/export/visits/pdf/")
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.data["code"], "INVALID_EXPORT")
+
+    def test_non_staff_blocked(self):
+        client = APIClient()
+        client.force_authenticate(user=self.emp)
+        r = client.get("/api/v1/reports/export/visits/csv/")
+        self.assertIn(r.status_code, (401, 403))
+
+    def test_queued_export_writes_report_file(self):
+        from reports.tasks import export_dataset_to_storage
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with mock.patch.object(
+                export_dataset_to_storage,
+                "delay",
+                side_effect=lambda pk: export_dataset_to_storage(pk),
+            ):
+                r = self.client.post("/api/v1/reports/export/farmers/ndjson/")
+            self.assertEqual(r.status_code, 202)
+            report = Report.objects.get(pk=r.data["data"]["report_id"])
+            self.assertEqual(report.status, Report.STATUS_DONE)
+            self.assertEqual(report.report_type, "farmer_export")
+            self.assertTrue(report.file.path.startswith(media_root))
+            with report.file.open("rb") as handle:
+                lines = handle.read().decode("utf-8").splitlines()
+            self.assertEqual(len(lines), 1)
+
+        status_r = self.client.get(f"/api/v1/reports/export-jobs/{report.pk}/")
+        self.assertEqual(status_r.data["data"]["status"], Report.STATUS_DONE)
+
+    def test_management_command_writes_csv(self):
+        import os
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "visits.csv")
+            call_command("export_report_data", "visits", "--format", "csv", "--output", path, stdout=io.StringIO())
+            with open(path, encoding="utf-8") as handle:
+                rows = list(csv.reader(handle))
+        self.assertEqual(len(rows), 4)
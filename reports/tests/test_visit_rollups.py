@@ -0,0 +1,185 @@
+"""Daily visit rollups: incremental maintenance, backfill, summary read path."""
+
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from masters.models import Crop, District, Farmer, Village
+from reports.models import VisitDailyRollup
+from reports.rollups import compute_cells, refresh_for_visit_ids
+from reports.summary import build_admin_report_summary
+from visits.models import Visit, VisitAttachment, VisitMedia
+
+_MEDIA_ROOT = tempfile.mkdtemp(prefix="visit_rollups_")
+
+
+@override_settings(MEDIA_ROOT=_MEDIA_ROOT)
+class VisitDailyRollupTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.emp = User.objects.create_user(username="rollup_emp", password="x")
+        self.district = District.objects.create(name="Rollup District")
+        self.village = Village.objects.create(name="Rollup Village", district=self.district)
+        self.farmer = Farmer.objects.create(
+            name="Rollup Farmer", phone="9444000001", district=self.district, village=self.village
+        )
+        self.crop = Crop.objects.create(name_en="Paddy", name_ta="Paddy", is_active=True)
+        self.today = timezone.localdate()
+        self.past = self.today - timedelta(days=3)
+
+    def _visit(self, day, **extra):
+        return self._committed(Visit.objects.create, **self._visit_values(day, **extra))
+
+    def _visit_values(self, day, **extra):
+        return {
+            "employee": self.emp,
+            "farmer": self.farmer,
+            "farmer_name": self.farmer.name,
+            "crop": self.crop,
+            "latitude": 11.0,
+            "longitude": 78.0,
+            "district": self.district,
+            "village": self.village,
+            "visit_date": day,
+            **extra,
+        }
+
+    def _media(self, visit):
+        return self._committed(
+            VisitMedia.objects.create,
+            visit=visit,
+            media_type="image",
+            mime_type="image/png",
+            file=SimpleUploadedFile("x.png", b"\x89PNG\r\n\x1a\n", content_type="image/png"),
+        )
+
+    def _committed(self, fn, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return fn(*args, **kwargs)
+
+    def _cell(self, day):
+        return VisitDailyRollup.objects.get(date=day, employee=self.emp)
+
+    def test_writes_keep_rollups_in_step_with_visits(self):
+        first = self._visit(self.past)
+        self._visit(self.past)
+        cell = self._cell(self.past)
+        self.assertEqual((cell.visits, cell.farmers, cell.gps_compliant), (2, 1, 2))
+        self.assertEqual(cell.visits_with_evidence, 0)
+
+        media = self._media(first)
+        self._committed(
+            VisitAttachment.objects.create,
+            visit=first,
+            employee=self.emp,
+            attachment_type="text",
+            text_content="n",
+        )
+        cell = self._cell(self.past)
+        self.assertEqual(
+            (cell.visits_with_evidence, cell.media_files, cell.attachment_files), (1, 1, 1)
+        )
+
+        self._committed(media.delete)
+        self.assertEqual(self._cell(self.past).media_files, 0)
+
+        # Moving a visit to another day refreshes both slices.
+        first.visit_date = self.past - timedelta(days=1)
+        self._committed(first.save)
+        self.assertEqual(self._cell(self.past).visits, 1)
+        self.assertEqual(self._cell(first.visit_date).visits, 1)
+
+        self._committed(first.delete)
+        self.assertFalse(VisitDailyRollup.objects.filter(date=first.visit_date).exists())
+
+    def test_backfill_matches_live_cells(self):
+        for day in (self.past, self.past, self.today):
+            self._media(self._visit(day))
+        expected = sorted(compute_cells(Visit.objects.all()), key=lambda c: c["date"])
+        VisitDailyRollup.objects.all().delete()
+
+        out = io.StringIO()
+        call_command("backfill_visit_rollups", "--from", self.past.isoformat(), stdout=out)
+        self.assertIn("Rebuilt 2 rollup row(s) across 4 day(s).", out.getvalue())
+        rows = list(
+            VisitDailyRollup.objects.order_by("date").values("date", "visits", "media_files")
+        )
+        self.assertEqual(
+            rows, [{k: c[k] for k in ("date", "visits", "media_files")} for c in expected]
+        )
+
+    def test_queryset_updates_refresh_explicitly(self):
+        other = Farmer.objects.create(name="Other Farmer", phone="9444000002")
+        moved = self._visit(self.past, farmer=other)
+        self._visit(self.past)
+        self.assertEqual(self._cell(self.past).farmers, 2)
+
+        # Farmer merges re-point visits with update(), which skips the signals.
+        Visit.objects.filter(pk=moved.pk).update(farmer=self.farmer)
+        self.assertEqual(self._cell(self.past).farmers, 2)
+        self._committed(refresh_for_visit_ids, [moved.pk])
+        self.assertEqual(self._cell(self.past).farmers, 1)
+
+    def test_refresh_waits_for_the_write_to_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Visit.objects.create(**self._visit_values(self.past))
+            self.assertFalse(VisitDailyRollup.objects.exists())
+        self.assertEqual(self._cell(self.past).visits, 1)
+
+    def test_backfill_if_empty_only_fills_an_empty_table(self):
+        self._visit(self.past)
+        self._visit(self.today)
+        out = io.StringIO()
+        VisitDailyRollup.objects.filter(date=self.today).delete()
+        call_command("backfill_visit_rollups", "--if-empty", stdout=out)
+        self.assertIn("nothing to do", out.getvalue())
+        self.assertFalse(VisitDailyRollup.objects.filter(date=self.today).exists())
+
+        VisitDailyRollup.objects.all().delete()
+        call_command("backfill_visit_rollups", "--if-empty", stdout=out)
+        self.assertEqual(
+            list(VisitDailyRollup.objects.order_by("date").values_list("date", "visits")),
+            [(self.past, 1), (self.today, 1)],
+        )
+
+    def test_summary_reads_rollups_for_closed_days_and_live_today(self):
+        self._media(self._visit(self.past))
+        self._visit(self.past, latitude=None, longitude=None)
+        self._visit(self.today)
+        raw_today = Visit.objects.filter(visit_date=self.today).count()
+
+        # Rollups are authoritative for closed days: tamper to prove the read path.
+        VisitDailyRollup.objects.filter(date=self.past).update(visits=10)
+        data = build_admin_report_summary(start=self.past, end=self.today)
+        self.assertEqual(data["totals"]["visits"], 10 + raw_today)
+        self.assertEqual(
+            [row["count"] for row in data["visits_by_day"]], [10, raw_today]
+        )
+
+        VisitDailyRollup.objects.filter(date=self.past).update(visits=2)
+        data = build_admin_report_summary(start=self.past, end=self.past)
+        totals = data["totals"]
+        self.assertEqual(
+            (totals["visits"], totals["gps_compliant"], totals["visits_with_evidence"]), (2, 1, 1)
+        )
+        self.assertEqual(totals["evidence_files"], 1)
+        self.assertEqual((totals["employees"], totals["farmers"], totals["villages_covered"]), (1, 1, 1))
+        self.assertEqual(data["visits_by_employee"][0]["employee_name"], "rollup_emp")
+        self.assertEqual(data["visits_by_crop"][0]["crop_name"], "Paddy")
+        self.assertEqual(
+            VisitDailyRollup.objects.aggregate(n=Sum("visits"))["n"], 2 + raw_today
+        )
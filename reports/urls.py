@@ -4,6 +4,8 @@ from .views import (
     VillageVisitReportAPI,
     CropProblemReportAPI,
     AdminReportSummaryAPI,
+    ReportExportAPI,
+    ReportExportJobAPI,
 )
 from .mobile_reports import DailyReportAPI, MonthlyReportAPI
 
@@ -14,4 +16,14 @@ urlpatterns = [
     path("crop-problems/", CropProblemReportAPI.as_view()),
     path("daily/", DailyReportAPI.as_view(), name="daily-report"),
     path("monthly/", MonthlyReportAPI.as_view(), name="monthly-report"),
+    path(
+        "export/<str:dataset>/<str:fmt>/",
+        ReportExportAPI.as_view(),
+        name="report-export",
+    ),
+    path(
+        "export-jobs/<int:pk>/",
+        ReportExportJobAPI.as_view(),
+        name="report-export-job",
+    ),
 ]
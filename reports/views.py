@@ -1,10 +1,11 @@
+from rest_framework import status
 from rest_framework.views import APIView
 from utils.permissions import IsStaffAdmin
 
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from utils.response import success_response
+from utils.response import error_response, success_response
 from utils.schema import SIMPLE_SUCCESS
 
 from .services import (
@@ -12,6 +13,13 @@ from .services import (
     village_wise_visits,
     crop_problem_report,
 )
+from .exports import (
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    EXPORT_REPORT_TYPES,
+    ExportError,
+    build_export_response,
+)
 from .summary import build_admin_report_summary
 from visits.date_filters import parse_report_date_params
 
@@ -105,3 +113,116 @@ class AdminReportSummaryAPI(APIView):
             district=request.query_params.get("district"),
         )
         return success_response(data=data)
+
+
+def _export_filters(dataset, params) -> dict:
+    if dataset == "visits":
+        start, end = parse_report_date_params(params)
+        return {
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "employee": params.get("employee"),
+            "district": params.get("district"),
+        }
+    return {
+        "district": params.get("district"),
+        "village": params.get("village"),
+        "include_inactive": str(params.get("include_inactive", "")).lower()
+        in ("1", "true", "yes"),
+    }
+
+
+@extend_schema(
+    tags=["Reports"],
+    summary="Stream visit / farmer export",
+    description=(
+        "GET streams the export (ndjson, csv or xlsx) using server-side cursors. "
+        "POST queues the same export as a background job that writes to storage "
+        "(use for very large ranges); poll export-jobs/<id>/ for the file URL. "
+        "Visits accept from/to (or start_date/end_date), employee, district; "
+        "farmers accept district, village, include_inactive."
+    ),
+    parameters=[
+        OpenApiParameter("from", OpenApiTypes.DATE, description="Start date YYYY-MM-DD"),
+        OpenApiParameter("to", OpenApiTypes.DATE, description="End date YYYY-MM-DD"),
+        OpenApiParameter("employee", OpenApiTypes.STR, description="User id or employee_id"),
+        OpenApiParameter("district", OpenApiTypes.STR, description="District id or name"),
+        OpenApiParameter("village", OpenApiTypes.INT, description="Village id (farmers)"),
+    ],
+    responses={200: {"description": "File download"}, 202: SIMPLE_SUCCESS},
+)
+class ReportExportAPI(APIView):
+    permission_classes = [IsStaffAdmin]
+
+    def _check(self, dataset, fmt):
+        if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+            return error_response(
+                message="Unknown export dataset or format.",
+                errors={"datasets": list(EXPORT_DATASETS), "formats": list(EXPORT_FORMATS)},
+                code="INVALID_EXPORT",
+            )
+        return None
+
+    def get(self, request, dataset, fmt):
+        invalid = self._check(dataset, fmt)
+        if invalid:
+            return invalid
+        try:
+            return build_export_response(
+                dataset, fmt, _export_filters(dataset, request.query_params)
+            )
+        except ExportError as exc:
+            return error_response(message=str(exc), code="INVALID_EXPORT")
+
+    def post(self, request, dataset, fmt):
+        from .tasks import queue_dataset_export
+
+        invalid = self._check(dataset, fmt)
+        if invalid:
+            return invalid
+        report = queue_dataset_export(
+            dataset=dataset,
+            fmt=fmt,
+            filters=_export_filters(dataset, request.query_params),
+            requested_by_user_id=request.user.pk,
+        )
+        return success_response(
+            data={"report_id": report.pk, "status": report.status},
+            message="Export queued",
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+
+
+@extend_schema(
+    tags=["Reports"],
+    summary="Background export job status",
+    responses={200: SIMPLE_SUCCESS},
+)
+class ReportExportJobAPI(APIView):
+    permission_classes = [IsStaffAdmin]
+
+    def get(self, request, pk):
+        from .models import Report
+
+        report = (
+            Report.objects.filter(pk=pk, report_type__in=EXPORT_REPORT_TYPES.values())
+            .only("id", "status", "file", "file_url", "error_message", "parameters", "completed_at")
+            .first()
+        )
+        if report is None:
+            return error_response(
+                message="Export job not found.",
+                code="NOT_FOUND",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        return success_response(
+            data={
+                "report_id": report.pk,
+                "status": report.status,
+                "dataset": (report.parameters or {}).get("dataset"),
+                "format": (report.parameters or {}).get("format"),
+                "file_url": report.file_url or None,
+                "error_message": report.error_message or None,
+                "completed_at": report.completed_at,
+            }
+        )
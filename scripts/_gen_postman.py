@@ -711,7 +711,7 @@ def build_admin_collection():
                 "Village Heatmap (Top 10)", "GET", "/dashboard/village-heatmap/?top=10"
             ),
             req("Admin Dashboard Stats", "GET", "/admin/dashboard/stats/"),
-            req("Map — Farmers GeoJSON", "GET", "/map/farmers/"),
+            req("Map — Farmers GeoJSON", "GET", "/map/farmers/?bbox=76.0,8.0,80.5,13.6"),
         ],
     )
 
@@ -255,6 +255,7 @@ log "Importing idempotent Phase 1 master data"
 "$PYTHON" manage.py import_business_locations
 "$PYTHON" manage.py import_crop_pests
 "$PYTHON" manage.py resolve_backfill_review
+"$PYTHON" manage.py backfill_visit_rollups --if-empty
 
 log "Verifying visits.0029_visitmedia_canonical_metadata is applied"
 "$PYTHON" <<'PY'
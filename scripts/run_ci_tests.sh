@@ -18,6 +18,8 @@ python manage.py test \
   mobile_api.tests \
   accounts.test_admin_security \
   accounts.tests_location_assignments \
+  accounts.tests_employee_directory \
+  accounts.tests_assignment_index \
   farmers.tests \
   masters.tests.test_problem_master_list \
   masters.tests.test_problem_item_import \
@@ -27,6 +29,13 @@ python manage.py test \
   masters.tests.test_resolve_backfill_review \
   system_settings.tests.test_clean_test_data \
   system_settings.tests.test_terminate_test_db_connections \
+  system_settings.tests.test_setting_cache \
+  api.admin.tests.test_dashboard_headline \
+  notifications.tests \
+  reports.tests.test_admin_report_summary \
+  reports.tests.test_report_engine \
+  reports.tests.test_streaming_exports \
+  reports.tests.test_visit_rollups \
   "$@"
 TEST_EXIT=$?
 
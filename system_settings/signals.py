@@ -0,0 +1,15 @@
+"""Publish SystemSetting changes to every worker's settings snapshot."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from system_settings.models import SystemSetting
+from system_settings.utils import invalidate_settings_cache
+
+
+@receiver(post_save, sender=SystemSetting)
+@receiver(post_delete, sender=SystemSetting)
+def system_setting_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_settings_cache()
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from system_settings import utils
+from system_settings.models import SystemSetting
+from system_settings.utils import (
+    get_bool_setting,
+    get_float_setting,
+    get_int_setting,
+    get_setting,
+    get_str_setting,
+)
+
+
+class SettingCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SystemSetting.objects.create(key="GPS_PING_INTERVAL_SECONDS", value=30)
+        SystemSetting.objects.create(key="ENABLE_GPS_TRACKING", value="false")
+        SystemSetting.objects.create(key="MAX_VISIT_RADIUS_KM", value="2.5")
+        SystemSetting.objects.create(key="RETIRED", value=1, is_active=False)
+
+    def _forget_local(self):
+        """Simulate another worker: no process-local snapshot."""
+        utils._local = utils._Snapshot(version=0, checked_at=-1.0)
+
+    def test_one_query_loads_every_setting(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_int_setting("GPS_PING_INTERVAL_SECONDS"), 30)
+            self.assertFalse(get_bool_setting("ENABLE_GPS_TRACKING", True))
+            self.assertEqual(get_float_setting("MAX_VISIT_RADIUS_KM"), 2.5)
+            self.assertEqual(get_str_setting("MISSING", "x"), "x")
+            self.assertIsNone(get_setting("RETIRED"))
+
+        self._forget_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_setting("GPS_PING_INTERVAL_SECONDS"), 30)
+
+    @override_settings(SYSTEM_SETTINGS_CHECK_SECONDS=0)
+    def test_save_and_delete_reach_other_workers(self):
+        self.assertEqual(get_setting("GPS_PING_INTERVAL_SECONDS"), 30)
+        setting = SystemSetting.objects.get(key="GPS_PING_INTERVAL_SECONDS")
+        setting.value = 60
+        setting.save(update_fields=["value", "updated_at"])
+
+        self._forget_local()
+        self.assertEqual(get_int_setting("GPS_PING_INTERVAL_SECONDS"), 60)
+        setting.delete()
+        self.assertIsNone(get_setting("GPS_PING_INTERVAL_SECONDS"))
+
+    def test_snapshot_is_reused_within_check_interval(self):
+        get_setting("GPS_PING_INTERVAL_SECONDS")
+        cache.incr(utils.VERSION_KEY)  # a change published elsewhere
+        with self.assertNumQueries(0):
+            self.assertEqual(get_setting("GPS_PING_INTERVAL_SECONDS"), 30)
@@ -1,9 +1,138 @@
+"""
+SystemSetting lookups served from a process-local snapshot.
+
+All active settings are loaded with one query into a ``{key: value}``
+snapshot, shared through the cache (Redis in production) under a version
+key.  Each process keeps its own copy and re-checks the version at most
+every SYSTEM_SETTINGS_CHECK_SECONDS (default 1s) — one cache read, no query.
+
+Saving or deleting a SystemSetting bumps the version (system_settings.signals),
+so every worker picks the change up within the check interval.  A worker that
+sees a new version reads the new snapshot from the cache; only the first one
+to miss it queries the table.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
 from .models import SystemSetting
 
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "system_settings:version"
+SNAPSHOT_TTL = 24 * 60 * 60
+DEFAULT_CHECK_SECONDS = 1.0
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off", ""}
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    version: int
+    values: dict[str, Any] = field(default_factory=dict)
+    checked_at: float = 0.0
+
+
+_local = _Snapshot(version=0, checked_at=-1.0)
+_lock = threading.Lock()
+
+
+def _snapshot_key(version: int) -> str:
+    return f"system_settings:values:v{version}"
+
+
+def _check_seconds() -> float:
+    return float(getattr(settings, "SYSTEM_SETTINGS_CHECK_SECONDS", DEFAULT_CHECK_SECONDS))
+
+
+def _shared_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return int(version)
+
+
+def _load_values(version: int) -> dict[str, Any]:
+    values = cache.get(_snapshot_key(version))
+    if values is None:
+        values = dict(SystemSetting.objects.filter(is_active=True).values_list("key", "value"))
+        cache.set(_snapshot_key(version), values, timeout=SNAPSHOT_TTL)
+        logger.debug("event=system_settings_loaded version=%s keys=%s", version, len(values))
+    return values
+
+
+def _current_values() -> dict[str, Any]:
+    global _local
+    snapshot = _local
+    now = time.monotonic()
+    if snapshot.checked_at >= 0 and now - snapshot.checked_at < _check_seconds():
+        return snapshot.values
+    with _lock:
+        snapshot = _local
+        version = _shared_version()
+        values = snapshot.values if version == snapshot.version else _load_values(version)
+        _local = _Snapshot(version=version, values=values, checked_at=now)
+        return values
+
+
+def invalidate_settings_cache() -> None:
+    """Publish a new version (now and after commit) and drop this process's copy."""
+
+    def _bump():
+        global _local
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, 1, timeout=None)
+        _local = _Snapshot(version=0, checked_at=-1.0)
+
+    _bump()
+    transaction.on_commit(_bump)
+
 
 def get_setting(key, default=None):
+    return _current_values().get(key, default)
+
+
+def get_int_setting(key, default: int = 0) -> int:
+    try:
+        return int(get_setting(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_float_setting(key, default: float = 0.0) -> float:
     try:
-        setting = SystemSetting.objects.get(key=key, is_active=True)
-        return setting.value
-    except SystemSetting.DoesNotExist:
+        return float(get_setting(key, default))
+    except (TypeError, ValueError):
         return default
+
+
+def get_bool_setting(key, default: bool = False) -> bool:
+    value = get_setting(key, default)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    return default
+
+
+def get_str_setting(key, default: str = "") -> str:
+    value = get_setting(key, default)
+    return default if value is None else str(value)
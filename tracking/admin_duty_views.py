@@ -69,49 +69,27 @@ def _build_route_payload(*, emp, user_id: int, target_date, request) -> dict:
     )
 
 
-@extend_schema(
-    tags=["Tracking"],
-    summary="Admin: live employee map",
-    responses={200: SIMPLE_SUCCESS},
-)
-class AdminTrackingLiveAPI(APIView):
-    permission_classes = [IsStaffAdmin]
-
-    def get(self, request):
-        expire_old_workdays()
-        now = timezone.now()
+def build_live_tracking_payload(request, *, user_ids=None, now=None) -> dict:
+    """
+    Live map rows for employees on an active duty (optionally only ``user_ids``),
+    sorted Online first, with per-status counts.
+    """
+    from tracking.live_tracking_service import (
+        TRACKING_ONLINE,
+        resolve_duty_display_status,
+        tracking_status_sort_key,
+    )
 
-        from tracking.live_tracking_service import (
-            TRACKING_ONLINE,
-            resolve_duty_display_status,
-            tracking_status_sort_key,
-        )
-
-        # Active duties only — ended employees leave the live list.
-        active_duties = {
-            d.user_id: d
-            for d in DutySession.objects.filter(is_active=True).select_related(
-                "workday", "user"
-            )
-        }
-        active_duty_user_ids = list(active_duties.keys())
-        if not active_duty_user_ids:
-            return _no_store_response(
-                success_response(
-                    data={
-                        "updated_at": now.isoformat(),
-                        "server_now": now.isoformat(),
-                        "count": 0,
-                        "employees": [],
-                        "online_count": 0,
-                        "stale_count": 0,
-                        "offline_count": 0,
-                        "no_location_count": 0,
-                    },
-                    message="Live tracking loaded",
-                )
-            )
+    now = now or timezone.now()
+    # Active duties only — ended employees leave the live list.
+    duties = DutySession.objects.filter(is_active=True).select_related("workday", "user")
+    if user_ids is not None:
+        duties = duties.filter(user_id__in=user_ids)
+    active_duties = {d.user_id: d for d in duties}
+    active_duty_user_ids = list(active_duties.keys())
 
+    features = []
+    if active_duty_user_ids:
         employees = {
             e.user_id: e
             for e in EmployeeProfile.objects.filter(
@@ -132,7 +110,6 @@ class AdminTrackingLiveAPI(APIView):
         device_status_map = batch_device_status_map(active_duty_user_ids)
         gps_off_user_ids = batch_gps_off_user_ids(active_duty_user_ids)
 
-        features = []
         for user_id, duty in active_duties.items():
             emp = employees.get(user_id)
             if emp is None:
@@ -241,39 +218,45 @@ class AdminTrackingLiveAPI(APIView):
                 }
             )
 
-        features.sort(
-            key=lambda row: (
-                tracking_status_sort_key(row.get("tracking_status") or ""),
-                (row.get("employee_name") or row.get("username") or "").lower(),
-            )
+    features.sort(
+        key=lambda row: (
+            tracking_status_sort_key(row.get("tracking_status") or ""),
+            (row.get("employee_name") or row.get("username") or "").lower(),
         )
+    )
+    return {
+        "updated_at": now.isoformat(),
+        "server_now": now.isoformat(),
+        "count": len(features),
+        "employees": features,
+        "online_count": sum(
+            1 for row in features if row.get("tracking_status") == TRACKING_ONLINE
+        ),
+        "stale_count": sum(
+            1 for row in features if row.get("tracking_status") == "STALE"
+        ),
+        "offline_count": sum(
+            1 for row in features if row.get("tracking_status") == "OFFLINE"
+        ),
+        "no_location_count": sum(
+            1 for row in features if row.get("tracking_status") == "NO_LOCATION_YET"
+        ),
+    }
+
 
+@extend_schema(
+    tags=["Tracking"],
+    summary="Admin: live employee map",
+    responses={200: SIMPLE_SUCCESS},
+)
+class AdminTrackingLiveAPI(APIView):
+    permission_classes = [IsStaffAdmin]
+
+    def get(self, request):
+        expire_old_workdays()
         return _no_store_response(
             success_response(
-                data={
-                    "updated_at": now.isoformat(),
-                    "server_now": now.isoformat(),
-                    "count": len(features),
-                    "employees": features,
-                    "online_count": sum(
-                        1
-                        for row in features
-                        if row.get("tracking_status") == TRACKING_ONLINE
-                    ),
-                    "stale_count": sum(
-                        1 for row in features if row.get("tracking_status") == "STALE"
-                    ),
-                    "offline_count": sum(
-                        1
-                        for row in features
-                        if row.get("tracking_status") == "OFFLINE"
-                    ),
-                    "no_location_count": sum(
-                        1
-                        for row in features
-                        if row.get("tracking_status") == "NO_LOCATION_YET"
-                    ),
-                },
+                data=build_live_tracking_payload(request),
                 message="Live tracking loaded",
             )
         )
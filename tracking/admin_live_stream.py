@@ -0,0 +1,179 @@
+"""
+Admin live map over server-sent events: GET /api/admin/tracking/live/stream/.
+
+Replaces polling ``live/`` and the GeoJSON endpoint.  The stream subscribes to
+``tracking.live_events`` first and then sends:
+
+- ``snapshot``: the ``live/`` payload plus the Online/Stale thresholds, so the
+  browser can age statuses between events;
+- ``delta``: compact position / heartbeat / status fields of one employee;
+- ``upsert``: the full ``live/`` row of an employee who started duty;
+- ``remove``: an employee whose duty ended;
+- a ``: ping`` comment every LIVE_EVENTS_KEEPALIVE_SECONDS when idle.
+
+Deltas waiting together are coalesced to the latest one per employee, and a
+stream that falls behind gets a fresh ``snapshot``.  Authentication is the
+admin JWT in the Authorization header (fetch-based SSE clients), checked like
+``IsStaffAdmin`` views.
+
+The view is async and only streams under ASGI (docker-compose ``ingest``
+service); WSGI workers answer 501 rather than holding a thread per map.
+Snapshots and row lookups run on the event loop's executor (as in
+``tracking.asgi_ingest``), so open maps do not queue behind each other on
+Django's single sync thread.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, PermissionDenied
+
+from accounts.authentication import AdminJWTAuthentication
+from config.exception_handler import custom_exception_handler
+from tracking import live_events
+from tracking.admin_duty_views import build_live_tracking_payload
+from tracking.live_tracking_service import online_seconds, stale_seconds
+from tracking.workday_utils import expire_old_workdays
+from utils.permissions import IsStaffAdmin
+from utils.response import error_response
+
+logger = logging.getLogger(__name__)
+
+# Events read in one go before coalescing and writing them out.
+_MAX_BATCH = 500
+
+
+def _authenticate_admin(request):
+    """Staff user for the request's JWT, or the JSON error response to send."""
+    try:
+        result = AdminJWTAuthentication().authenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+        if not result[0].is_staff:
+            raise PermissionDenied(IsStaffAdmin.message)
+    except APIException as exc:
+        response = custom_exception_handler(exc, {})
+        return None, JsonResponse(response.data, status=response.status_code)
+    return result[0], None
+
+
+async def _on_executor(func, *args, **kwargs):
+    """Run ORM work off Django's shared sync thread; that thread's connection is aged out after."""
+    thread_sensitive = settings.ASGI_INGEST_THREAD_SENSITIVE
+
+    def call():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if not thread_sensitive:
+                close_old_connections()
+
+    return await sync_to_async(call, thread_sensitive=thread_sensitive)()
+
+
+def _snapshot(request) -> dict:
+    expire_old_workdays()
+    payload = build_live_tracking_payload(request)
+    payload["online_seconds"] = online_seconds()
+    payload["stale_seconds"] = stale_seconds()
+    return payload
+
+
+def _frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _coalesce(messages: list[str]) -> list[dict]:
+    """Decode events, keeping only the latest ``employee`` delta per user."""
+    events: dict[tuple, dict] = {}
+    for index, message in enumerate(messages):
+        event = json.loads(message)
+        if event.get("type") == live_events.EVENT_EMPLOYEE:
+            key = (live_events.EVENT_EMPLOYEE, event.get("user_id"))
+            events.pop(key, None)
+        else:
+            key = (event.get("type"), index)
+        events[key] = event
+    return list(events.values())
+
+
+async def _event_stream(request):
+    keepalive = settings.LIVE_EVENTS_KEEPALIVE_SECONDS
+    # Subscribe before the snapshot so no event falls between the two.
+    subscription = await live_events.get_live_event_broker().subscribe()
+    try:
+        snapshot = await _on_executor(_snapshot, request)
+        known = {row["user_id"] for row in snapshot["employees"]}
+        yield "retry: 3000\n\n" + _frame("snapshot", snapshot)
+        while True:
+            message = await subscription.get(keepalive)
+            if message is None:
+                yield ": ping\n\n"
+                continue
+            messages = [message]
+            while len(messages) < _MAX_BATCH:
+                message = await subscription.get(0)
+                if message is None:
+                    break
+                messages.append(message)
+
+            frames = []
+            for event in _coalesce(messages):
+                event_type = event.pop("type", None)
+                user_id = event.get("user_id")
+                if event_type == live_events.EVENT_RESYNC:
+                    snapshot = await _on_executor(_snapshot, request)
+                    known = {row["user_id"] for row in snapshot["employees"]}
+                    frames.append(_frame("snapshot", snapshot))
+                elif event_type == live_events.EVENT_DUTY_STARTED:
+                    rows = (
+                        await _on_executor(
+                            build_live_tracking_payload, request, user_ids=[user_id]
+                        )
+                    )["employees"]
+                    if rows:
+                        known.add(user_id)
+                        frames.append(_frame("upsert", rows[0]))
+                elif event_type == live_events.EVENT_DUTY_ENDED:
+                    if user_id in known:
+                        known.discard(user_id)
+                        frames.append(_frame("remove", event))
+                elif event_type == live_events.EVENT_EMPLOYEE and user_id in known:
+                    frames.append(_frame("delta", event))
+            if frames:
+                yield "".join(frames)
+    finally:
+        await subscription.aclose()
+
+
+class AdminTrackingLiveStreamView(View):
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            response = error_response(
+                message="Live stream is only served by the ASGI application",
+                code="ASGI_REQUIRED",
+                status_code=501,
+            )
+            return JsonResponse(response.data, status=response.status_code)
+
+        user, error = await _on_executor(_authenticate_admin, request)
+        if error is not None:
+            return error
+
+        logger.info("event=live_stream_opened user_id=%s", user.pk)
+        response = StreamingHttpResponse(
+            _event_stream(request), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache, no-store"
+        # Disable response buffering at nginx so events are flushed immediately.
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -3,6 +3,7 @@ from django.urls import path
 from .admin_report_views import (
     AdminEmployeeDayReportAPI,
     AdminEmployeeDaySummaryAPI,
+    AdminEmployeeDaySummaryBatchAPI,
     AdminEmployeeVisitsByDateAPI,
 )
 
@@ -14,6 +15,10 @@ urlpatterns = [
 ]
 
 employee_urlpatterns = [
+    path(
+        "day-summaries/",
+        AdminEmployeeDaySummaryBatchAPI.as_view(),
+    ),
     path(
         "<int:employee_id>/day-summary/",
         AdminEmployeeDaySummaryAPI.as_view(),
@@ -10,6 +10,7 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
 
 from tracking.admin_duty_views import _resolve_target_date
+from tracking.day_summary_batch import build_day_summaries
 from tracking.employee_report import (
     EmployeeNotFoundError,
     build_employee_day_report,
@@ -88,6 +89,58 @@ class AdminEmployeeDaySummaryAPI(APIView):
         return success_response(data=data, message="Day summary loaded")
 
 
+def _parse_id_list(raw: str | None) -> tuple[list[int] | None, bool]:
+    """Comma-separated ids -> (ids, ok); (None, True) when absent."""
+    if not raw:
+        return None, True
+    try:
+        return [int(part) for part in raw.split(",") if part.strip()], True
+    except ValueError:
+        return None, False
+
+
+@extend_schema(
+    tags=["Tracking"],
+    summary="Admin: day summaries for many employees",
+    parameters=[
+        OpenApiParameter("date", OpenApiTypes.DATE, description="YYYY-MM-DD"),
+        OpenApiParameter(
+            "user_ids", OpenApiTypes.STR, description="Comma-separated user ids (default: all)"
+        ),
+        OpenApiParameter("district_id", OpenApiTypes.INT, description="Employee district"),
+    ],
+    responses={200: SIMPLE_SUCCESS, 400: error_schema("InvalidFilter")},
+)
+class AdminEmployeeDaySummaryBatchAPI(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        expire_old_workdays()
+        target_date, err = _resolve_target_date(request)
+        if err:
+            return err
+
+        user_ids, ok = _parse_id_list(request.GET.get("user_ids"))
+        district_id = request.GET.get("district_id")
+        if not ok or (district_id and not district_id.isdigit()):
+            return error_response(
+                message="user_ids and district_id must be numeric.",
+                code="INVALID_FILTER",
+                status_code=400,
+            )
+
+        summaries = build_day_summaries(
+            target_date,
+            employee_ids=user_ids,
+            district_id=int(district_id) if district_id else None,
+            request=request,
+        )
+        return success_response(
+            data={"date": str(target_date), "count": len(summaries), "results": summaries},
+            message="Day summaries loaded",
+        )
+
+
 @extend_schema(
     tags=["Tracking"],
     summary="Admin: employee day report",
@@ -6,9 +6,11 @@ from .admin_duty_views import (
     AdminEmployeeTodayRouteAPI,
     AdminTrackingLiveAPI,
 )
+from .admin_live_stream import AdminTrackingLiveStreamView
 
 urlpatterns = [
     path("live/", AdminTrackingLiveAPI.as_view()),
+    path("live/stream/", AdminTrackingLiveStreamView.as_view()),
     path(
         "employee/<int:user_id>/today-route/",
         AdminEmployeeTodayRouteAPI.as_view(),
@@ -0,0 +1,263 @@
+"""
+Async fast path for heartbeat and GPS push requests.
+
+``IngestFastPath`` wraps Django's ASGI application (config/asgi.py).  A POST
+that resolves to ``HeartbeatAPI``, ``PushLocationAPI`` or
+``BulkPushLocationAPI``, carrying a field employee's JWT and a JSON body, is
+answered here instead of going through Django's middleware and DRF:
+
+- the JWT is verified in the event loop (no I/O);
+- on an executor thread: loading the user, the X-Device-Session check, the
+  REST_FRAMEWORK DEFAULT_THROTTLE_CLASSES (same cache keys as the DRF views)
+  and the shared handler in ``tracking.ingest``; its ``Response`` is rendered
+  with DRF's JSON renderer;
+- the response carries X-Request-ID and Server-Timing and is logged like
+  ``RequestIdMiddleware`` / ``RequestMetricsMiddleware`` do.  (The remaining
+  middleware does not apply: MobileAPILoggingMiddleware only logs
+  /api/v1/mobile/, and nothing else touches a JSON API POST.)
+
+Anything else — other paths and methods, admin or invalid tokens, inactive
+employees, non-JSON or oversized bodies — is replayed to Django untouched, so
+those requests get exactly the DRF responses.
+
+Served by uvicorn workers (docker-compose ``ingest`` service), pings no longer
+wait for a gthread slot behind slow admin reports.  ASGI_INGEST_FAST_PATH=false
+turns the wrapper off.
+
+Concurrency: the sync part runs with ``thread_sensitive=False``, so pings are
+spread over the event loop's default executor (min(32, CPUs + 4) threads per
+uvicorn worker) instead of queuing on Django's single sync thread.  Each of
+those threads holds its own database connection; request_started /
+request_finished are sent on that thread so ``close_old_connections`` ages
+them out (CONN_MAX_AGE) like any request.  Size the database pool for
+workers x executor threads.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+import uuid
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signals
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from accounts.admin_security import is_admin_user
+from accounts.authentication import AdminJWTAuthentication
+from accounts.device_sessions import SessionCheckResult, check_device_session
+from accounts.employee_access import field_employee_may_authenticate
+from config.exception_handler import custom_exception_handler
+from config.request_id import RequestIdMiddleware
+from config.request_metrics import RequestMetricsMiddleware, collect_metrics
+from mobile_api.device_session import session_replaced_response
+
+from . import ingest
+
+logger = logging.getLogger(__name__)
+
+_renderer = JSONRenderer()
+_jwt = AdminJWTAuthentication()
+
+
+@lru_cache(maxsize=256)
+def _handler_for(path: str) -> Optional[Callable]:
+    from tracking.views import BulkPushLocationAPI, HeartbeatAPI, PushLocationAPI
+
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    return {
+        HeartbeatAPI: ingest.heartbeat,
+        PushLocationAPI: ingest.push_location,
+        BulkPushLocationAPI: ingest.bulk_push_locations,
+    }.get(getattr(match.func, "view_class", None))
+
+
+async def _read_body(receive) -> tuple[Optional[bytes], list[dict]]:
+    messages, chunks = [], []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            return None, messages
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks), messages
+
+
+def _replay(messages: list[dict], receive):
+    pending = list(messages)
+
+    async def replay():
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay
+
+
+def _parse_json(body: bytes, content_type: bytes):
+    """Decoded body, or ``...`` when Django should parse it instead."""
+    if not body:
+        return {}
+    if not content_type.split(b";")[0].strip().endswith(b"json"):
+        return ...
+    try:
+        return json.loads(body)
+    except ValueError:
+        return ...
+
+
+def _token_user_id(authorization: Optional[bytes]):
+    """User id claim of a valid access token (no I/O), or None to let Django answer."""
+    if not authorization:
+        return None
+    raw_token = _jwt.get_raw_token(authorization)
+    if raw_token is None:
+        return None
+    try:
+        token = _jwt.get_validated_token(raw_token)
+        return token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, AuthenticationFailed, KeyError):
+        return None
+
+
+def _field_employee(user_id):
+    """Authenticated active field employee, or None to let Django answer."""
+    user = (
+        get_user_model()
+        .objects.select_related("employee_profile")
+        .filter(**{jwt_settings.USER_ID_FIELD: user_id})
+        .first()
+    )
+    if user is None or is_admin_user(user) or not field_employee_may_authenticate(user):
+        return None
+    return user
+
+
+def _check_throttles(user) -> None:
+    """APIView.check_throttles for the default throttles, keyed by the user."""
+    request = SimpleNamespace(user=user, META={})
+    waits = []
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            waits.append(throttle.wait())
+    if waits:
+        raise Throttled(wait=max((w for w in waits if w is not None), default=None))
+
+
+def _respond(handler: Callable, user, data, session_id: Optional[str]):
+    result = check_device_session(user, session_id)
+    if result != SessionCheckResult.OK:
+        logger.info("SESSION_REPLACED user_id=%s result=%s", user.pk, result.value)
+        return session_replaced_response()
+    try:
+        _check_throttles(user)
+        return handler(user, data)
+    except Exception as exc:  # noqa: BLE001 - same mapping as the DRF views
+        return custom_exception_handler(exc, {})
+
+
+def _respond_measured(scope, handler: Callable, user_id, data, session_id: Optional[str]):
+    """
+    Runs on an executor thread: the request signals are sent here so
+    ``close_old_connections`` manages this thread's database connection.
+    Returns (None, None, None) when the user must go through Django.
+    """
+    signals.request_started.send(sender=IngestFastPath, scope=scope)
+    try:
+        started = time.perf_counter()
+        with collect_metrics() as metrics:
+            user = _field_employee(user_id)
+            if user is None:
+                return None, None, None
+            response = _respond(handler, user, data, session_id)
+        return (response, user), metrics, time.perf_counter() - started
+    finally:
+        signals.request_finished.send(sender=IngestFastPath)
+
+
+class IngestFastPath:
+    """ASGI wrapper answering mobile heartbeat / GPS pushes without Django's stack."""
+
+    def __init__(self, django_application):
+        self.django_application = django_application
+        self.metrics = RequestMetricsMiddleware(django_application)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.django_application(scope, receive, send)
+        handler = _handler_for(scope["path"])
+        if handler is None:
+            return await self.django_application(scope, receive, send)
+
+        body, messages = await _read_body(receive)
+        receive = _replay(messages, receive)
+        if body is None or len(body) > settings.DATA_UPLOAD_MAX_MEMORY_SIZE:
+            return await self.django_application(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        data = _parse_json(body, headers.get(b"content-type", b""))
+        if data is ...:
+            return await self.django_application(scope, receive, send)
+
+        user_id = _token_user_id(headers.get(b"authorization"))
+        if user_id is None:
+            return await self.django_application(scope, receive, send)
+        session_id = headers.get(b"x-device-session", b"").decode("latin-1") or None
+        answered, metrics, total = await sync_to_async(
+            _respond_measured, thread_sensitive=settings.ASGI_INGEST_THREAD_SENSITIVE
+        )(scope, handler, user_id, data, session_id)
+        if answered is None:
+            return await self.django_application(scope, receive, send)
+        response, user = answered
+
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or str(uuid.uuid4())
+        content = _renderer.render(response.data)
+        response_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(content)).encode()),
+            (RequestIdMiddleware.RESPONSE_HEADER.encode(), request_id.encode("latin-1")),
+        ]
+        if self.metrics.enabled:
+            if self.metrics.server_timing:
+                response_headers.append(
+                    (
+                        RequestMetricsMiddleware.SERVER_TIMING_HEADER.encode(),
+                        metrics.server_timing(total).encode(),
+                    )
+                )
+            self.metrics.log_request(
+                SimpleNamespace(request_id=request_id, method="POST", path=scope["path"]),
+                response,
+                metrics,
+                total,
+            )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": response_headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+        logger.debug(
+            "event=ingest_fast_path request_id=%s path=%s user_id=%s status=%s",
+            request_id,
+            scope["path"],
+            user.pk,
+            response.status_code,
+        )
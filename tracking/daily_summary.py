@@ -16,6 +16,7 @@ from tracking.route_utils import (
     distance_km,
     get_route_queryset,
 )
+from tracking.segmentation import day_segments, idle_minutes_from_segments
 from tracking.status_utils import (
     MOVEMENT_MIN_DISTANCE_KM,
     MOVEMENT_MIN_SPEED_KMH,
@@ -114,6 +115,20 @@ def compute_idle_minutes(route: list[dict]) -> int:
     return int(idle_seconds // 60)
 
 
+def route_idle_minutes(
+    user_id: int, target_date: date, route: list[dict], segments=None
+) -> int:
+    """
+    Idle minutes for the day: stop time from duty RouteSegments when the day
+    has any, else the point-pair walk over legacy LocationLog routes.
+    """
+    if segments is None:
+        segments = day_segments(user_id, target_date)
+    if segments:
+        return idle_minutes_from_segments(segments)
+    return compute_idle_minutes(route)
+
+
 def _visit_timestamp(visit) -> datetime | None:
     if visit.visit_date and visit.visit_time:
         return datetime.combine(
@@ -191,7 +206,7 @@ def build_employee_daily_summary(
 
     work_seconds = compute_work_hours_seconds(workdays, target_date, now=now)
     distance_km = compute_route_distance_km(route)
-    idle_minutes = compute_idle_minutes(route)
+    idle_minutes = route_idle_minutes(user_id, target_date, route)
 
     visits_qs = submitted_visits_qs().filter(
         employee_id=user_id,
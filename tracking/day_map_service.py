@@ -9,15 +9,14 @@ from __future__ import annotations
 
 import logging
 import math
-from datetime import datetime, time, timedelta
 from typing import Any
 
 from django.contrib.auth.models import User
-from django.utils import timezone
 
 from tracking.duty_service import serialize_duty_status
 from tracking.models import DutySession, EmployeeLiveLocation, EmployeeRoutePoint, LocationLog
 from tracking.route_utils import compute_route_distance_km, is_valid_coordinate
+from utils.day_ranges import day_range
 from visits.models import Visit
 from visits.submitted import submitted_visits_qs
 
@@ -220,10 +219,7 @@ def _legacy_location_log_points(duty: DutySession) -> list[dict[str, Any]]:
     if duty.workday_id:
         qs = qs.filter(workday_id=duty.workday_id)
     else:
-        tz = timezone.get_current_timezone()
-        start = timezone.make_aware(datetime.combine(duty.date, time.min), tz)
-        end = start + timedelta(days=1)
-        qs = qs.filter(recorded_at__gte=start, recorded_at__lt=end)
+        qs = qs.filter(**day_range("recorded_at", duty.date))
     rows = list(
         qs.order_by("recorded_at", "id").only(
             "id", "latitude", "longitude", "accuracy", "recorded_at", "created_at"
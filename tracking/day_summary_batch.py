@@ -0,0 +1,206 @@
+"""
+Batched admin day summaries: ``build_employee_day_summary`` for many employees.
+
+The per-employee builder issues a dozen queries per employee (route, counts,
+duty, live row, GPS state, device session).  This module builds the same
+payload for a whole team with a fixed number of queries:
+
+1. active employee profiles (optionally filtered),
+2. the day's WorkDays (with their DutySession),
+3. the day's DutySessions,
+4. one EmployeeRoutePoint scan for the day, ordered by user,
+5. one grouped visit aggregate (completed / pending / farmers / villages),
+6. live rows, 7. GPS state rows, 8. GPS_OFF events, 9. device sessions.
+
+Route math (distance, point count, idle minutes) runs per user on plain
+tuples, serially in the request: web workers are threads, and forking a
+process pool from one is neither safe nor cheaper than the math itself.
+
+Idle minutes follow ``daily_summary.route_idle_minutes``: stop time from
+segmenting each duty's points (computed in memory; nothing is written), else
+the legacy point-pair walk.  Only the day's points are scanned, so a duty
+running past midnight is segmented on its same-day part.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date
+from itertools import groupby
+from typing import Iterable, Optional
+
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.device_sessions import batch_device_status_map
+from accounts.models import EmployeeProfile
+from tracking.daily_summary import compute_idle_minutes, compute_work_hours_seconds
+from tracking.employee_report import _duty_block, _employee_block
+from tracking.employee_status import batch_gps_off_user_ids, build_status_for_live_employee
+from tracking.models import (
+    DutySession,
+    EmployeeGpsState,
+    EmployeeLiveLocation,
+    EmployeeRoutePoint,
+    WorkDay,
+)
+from tracking.route_utils import compute_route_distance_km
+from tracking.segmentation import idle_minutes_from_segments, segment_points
+from utils.day_ranges import day_range
+from visits.models import Visit
+from visits.submitted import incomplete_visit_filter, submitted_visit_filter
+
+logger = logging.getLogger(__name__)
+
+# (duty_session_id, latitude, longitude, recorded_at)
+RoutePoint = tuple
+
+
+def route_metrics(job: tuple[list[RoutePoint], frozenset]) -> tuple[float, int, int]:
+    """
+    (distance_km, point_count, idle_minutes) for one user's day.
+
+    ``job`` is the user's time-ordered points and the ids of their duties on
+    the day.
+    """
+    points, duty_ids = job
+    route = [{"latitude": lat, "longitude": lng, "recorded_at": at} for _, lat, lng, at in points]
+    by_duty: dict[int, list[tuple]] = defaultdict(list)
+    for duty_id, lat, lng, at in points:
+        if duty_id in duty_ids:
+            by_duty[duty_id].append((lat, lng, at))
+    segments = [s for duty_points in by_duty.values() for s in segment_points(duty_points)]
+    idle = idle_minutes_from_segments(segments) if segments else compute_idle_minutes(route)
+    return compute_route_distance_km(route), len(route), idle
+
+
+def _profiles(employee_ids: Optional[Iterable[int]], district_id: Optional[int]):
+    qs = EmployeeProfile.objects.filter(is_active_employee=True).select_related(
+        "user", "village", "village__district"
+    )
+    if employee_ids is not None:
+        qs = qs.filter(user_id__in=list(employee_ids))
+    if district_id is not None:
+        qs = qs.filter(district_id=district_id)
+    return list(qs.order_by("employee_id", "pk"))
+
+
+def _route_points_by_user(user_ids: list[int], target_date: date) -> dict[int, list[RoutePoint]]:
+    rows = (
+        EmployeeRoutePoint.objects.filter(
+            user_id__in=user_ids, **day_range("recorded_at", target_date)
+        )
+        .order_by("user_id", "recorded_at", "id")
+        .values_list("user_id", "duty_session_id", "latitude", "longitude", "recorded_at")
+    )
+    return {
+        user_id: [(duty_id, float(lat), float(lng), at) for _, duty_id, lat, lng, at in group]
+        for user_id, group in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[0])
+    }
+
+
+def _visit_counts(user_ids: list[int], target_date: date) -> dict[int, dict]:
+    submitted = submitted_visit_filter()
+    rows = (
+        Visit.objects.filter(employee_id__in=user_ids, visit_date=target_date)
+        .values("employee_id")
+        .annotate(
+            completed=Count("id", filter=submitted),
+            pending=Count("id", filter=incomplete_visit_filter()),
+            farmers=Count("farmer_id", filter=submitted, distinct=True),
+            villages=Count("village_id", filter=submitted, distinct=True),
+        )
+        .order_by()
+    )
+    return {row["employee_id"]: row for row in rows}
+
+
+def build_day_summaries(
+    target_date: date,
+    *,
+    employee_ids: Optional[Iterable[int]] = None,
+    district_id: Optional[int] = None,
+    request=None,
+    now=None,
+) -> list[dict]:
+    """
+    ``build_employee_day_summary`` payloads for active employees on
+    ``target_date``, ordered by employee code.  ``employee_ids`` are user ids.
+    """
+    now = now or timezone.now()
+    profiles = _profiles(employee_ids, district_id)
+    if not profiles:
+        return []
+    user_ids = [emp.user_id for emp in profiles]
+
+    workdays: dict[int, list[WorkDay]] = defaultdict(list)
+    for wd in (
+        WorkDay.objects.filter(user_id__in=user_ids, date=target_date)
+        .select_related("duty_session")
+        .order_by("start_time")
+    ):
+        workdays[wd.user_id].append(wd)
+
+    duties: dict[int, list[DutySession]] = defaultdict(list)
+    for duty in DutySession.objects.filter(user_id__in=user_ids, date=target_date).order_by(
+        "-start_time"
+    ):
+        duties[duty.user_id].append(duty)
+
+    points = _route_points_by_user(user_ids, target_date)
+    visits = _visit_counts(user_ids, target_date)
+    live_rows = {
+        live.user_id: live
+        for live in EmployeeLiveLocation.objects.filter(user_id__in=user_ids).select_related(
+            "duty_session"
+        )
+    }
+    gps_states = {s.user_id: s for s in EmployeeGpsState.objects.filter(user_id__in=user_ids)}
+    gps_off = batch_gps_off_user_ids(user_ids)
+    device_status = batch_device_status_map(user_ids)
+
+    metrics = [
+        route_metrics((points.get(uid, []), frozenset(d.pk for d in duties[uid])))
+        for uid in user_ids
+    ]
+
+    summaries = []
+    for emp, (distance_km, point_count, idle_minutes) in zip(profiles, metrics):
+        user_id = emp.user_id
+        duty = duties[user_id][0] if duties[user_id] else None
+        status = build_status_for_live_employee(
+            user_id=user_id,
+            live_row=live_rows.get(user_id),
+            gps_state_row=gps_states.get(user_id),
+            has_active_duty=bool(duty and duty.is_active),
+            device_status=device_status.get(user_id),
+            gps_off=user_id in gps_off,
+            last_heartbeat_at=duty.last_heartbeat if duty else None,
+            now=now,
+        )
+        work_seconds = compute_work_hours_seconds(workdays[user_id], target_date, now=now)
+        hours, remainder = divmod(max(work_seconds, 0), 3600)
+        counts = visits.get(user_id, {})
+        summaries.append(
+            {
+                "date": str(target_date),
+                "employee": _employee_block(emp, request),
+                "user_id": user_id,
+                "employee_id": emp.employee_id,
+                **status,
+                "status": status,
+                "duty": _duty_block(duty),
+                "work_hours_seconds": work_seconds,
+                "work_hours": f"{hours}h {remainder // 60}m",
+                "distance_km": distance_km,
+                "route_point_count": point_count,
+                "visits_completed": counts.get("completed", 0),
+                "pending_visits": counts.get("pending", 0),
+                "farmers_covered": counts.get("farmers", 0),
+                "villages_covered": counts.get("villages", 0),
+                "idle_minutes": idle_minutes,
+                "workday_count": len(workdays[user_id]),
+            }
+        )
+    return summaries
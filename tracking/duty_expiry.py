@@ -9,6 +9,7 @@ from django.contrib.auth.models import User
 from django.db import transaction
 from django.utils import timezone
 
+from tracking import employee_kpis
 from tracking.duty_timer import (
     COMPLETION_AUTO_EXPIRED,
     DURATION_LIMIT_SECONDS,
@@ -16,6 +17,7 @@ from tracking.duty_timer import (
     is_duty_overdue,
 )
 from tracking.models import DutySession, WorkDay
+from tracking.segmentation import enqueue_duty_segmentation
 from tracking.workday_utils import clear_live_tracking_for_user
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,7 @@ def _sync_workday_auto_complete(duty: DutySession, ended_at: datetime) -> None:
         is_active=False,
         auto_ended=True,
     )
+    employee_kpis.refresh_workday_on_commit(duty.workday_id)
 
 
 def complete_duty_as_auto_expired(
@@ -61,6 +64,7 @@ def complete_duty_as_auto_expired(
         ]
     )
     _sync_workday_auto_complete(duty, ended_at)
+    enqueue_duty_segmentation(duty)
     try:
         from tracking.live_tracking_service import finalize_live_state_on_duty_end
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 
@@ -16,6 +16,7 @@ from django.utils.dateparse import parse_datetime
 from rest_framework import serializers
 
 from accounts.models import EmployeeProfile
+from tracking import employee_kpis, live_events
 from tracking.models import (
     DutySession,
     EmployeeLiveLocation,
@@ -25,6 +26,7 @@ from tracking.models import (
 )
 from tracking.gps_state import gps_state_defaults_from_payload, upsert_employee_gps_state
 from tracking.route_point_filter import should_save_route_point
+from tracking.segmentation import enqueue_duty_segmentation
 from tracking.services import refresh_workday_live_state
 from tracking.workday_utils import (
     WORKDAY_EXPIRED_MESSAGE,
@@ -37,6 +39,7 @@ from tracking.duty_timer import (
     empty_duty_timer,
 )
 from tracking.duty_expiry import expire_overdue_duty_for_user
+from utils.day_ranges import day_range
 from utils.gps import validate_latitude_longitude
 
 logger = logging.getLogger(__name__)
@@ -232,6 +235,9 @@ def start_duty(
         duty.latitude is not None and duty.longitude is not None,
     )
     _ensure_start_route_point(user, duty, latitude, longitude)
+    live_events.publish_live_event(
+        live_events.EVENT_DUTY_STARTED, user.pk, duty_session_id=duty.pk
+    )
     return DutyStartResult(duty=duty, created=True)
 
 
@@ -597,8 +603,10 @@ def end_duty(
             is_active=False,
             auto_ended=False,
         )
+        employee_kpis.refresh_workday_on_commit(duty.workday_id)
 
     _ensure_end_route_point(user, duty, latitude, longitude)
+    enqueue_duty_segmentation(duty)
     from tracking.live_tracking_service import finalize_live_state_on_duty_end
 
     finalize_live_state_on_duty_end(user, duty)
@@ -711,14 +719,10 @@ def save_permanent_place_point(
 
 
 def get_route_points_for_date(user_id: int, target_date: date) -> list[EmployeeRoutePoint]:
-    tz = timezone.get_current_timezone()
-    start = timezone.make_aware(datetime.combine(target_date, time.min), tz)
-    end = start + timedelta(days=1)
     return list(
         EmployeeRoutePoint.objects.filter(
             user_id=user_id,
-            recorded_at__gte=start,
-            recorded_at__lt=end,
+            **day_range("recorded_at", target_date),
         ).order_by("recorded_at", "id")
     )
 
@@ -0,0 +1,254 @@
+"""
+Per-employee, per-day KPI counters (EmployeeDayKpi).
+
+Dashboards read one keyed row instead of re-counting visits and walking the
+day's GPS points.  Rows are created lazily on first read (``get_day_kpis``)
+and then kept current by signals:
+
+- Visit save/delete      -> ``refresh_visit_counters`` (one aggregate query
+  per affected row, including the day / employee a visit moved away from)
+- LocationLog create     -> ``record_location`` (adds one route segment with
+  a compare-and-swap update, no row lock)
+- WorkDay save           -> ``refresh_workday`` (status / displayed workday);
+  duty end / auto-expiry update WorkDay in bulk and call
+  ``refresh_workday_on_commit`` themselves
+
+Route distance follows ``route_utils.compute_route_distance_km`` exactly via
+``route_utils.advance_route_tail`` (shared with ``location_telemetry``):
+segments longer than MAX_ROUTE_SEGMENT_KM are skipped and invalid points
+break the chain.  Out-of-order points fall back to a full walk of the
+workday.  ``rebuild_day`` recomputes a row from source tables.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date
+from typing import Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q, Subquery
+from django.utils import timezone
+
+from tracking.models import EmployeeDayKpi, LocationLog, WorkDay
+from tracking.route_utils import advance_route_tail
+
+logger = logging.getLogger(__name__)
+
+_ROUTE_FIELDS = [
+    "workday",
+    "distance_km",
+    "route_points",
+    "last_latitude",
+    "last_longitude",
+    "last_recorded_at",
+]
+
+
+def display_workday(user_id: int, day: date) -> Tuple[Optional[WorkDay], str]:
+    """The workday the dashboard shows for ``day`` and its work_status."""
+    workday = (
+        WorkDay.objects.filter(user_id=user_id, date=day)
+        .order_by("-is_active", "-start_time")
+        .first()
+    )
+    if workday:
+        if workday.is_active:
+            return workday, "started"
+        if workday.auto_ended:
+            return workday, "expired"
+        return workday, "stopped"
+    if WorkDay.objects.filter(user_id=user_id, auto_ended=True).exists():
+        return None, "expired"
+    return None, "not_started"
+
+
+def visit_counters(user_id: int, day: date) -> dict:
+    from visits.kpi_status import COMPLETED_STATUSES
+    from visits.models import Visit
+    from visits.submitted import submitted_visits_qs
+
+    submitted = submitted_visits_qs().filter(employee_id=user_id).aggregate(
+        total_visits=Count("id"),
+        visits_today=Count("id", filter=Q(visit_date=day)),
+        farmers_covered=Count("farmer_id", filter=Q(visit_date=day), distinct=True),
+    )
+    recorded = Visit.objects.filter(employee_id=user_id, visit_date=day).aggregate(
+        recorded_visits=Count("id"),
+        completed_visits=Count("id", filter=Q(status__in=COMPLETED_STATUSES)),
+    )
+    return {**submitted, **recorded}
+
+
+def _walk_route(row: EmployeeDayKpi, workday: Optional[WorkDay]) -> None:
+    row.workday = workday
+    row.distance_km = 0.0
+    row.route_points = 0
+    row.last_latitude = row.last_longitude = row.last_recorded_at = None
+    if workday is None:
+        return
+    points = (
+        LocationLog.objects.filter(workday_id=workday.pk)
+        .order_by("recorded_at", "id")
+        .values_list("latitude", "longitude", "recorded_at")
+    )
+    for lat, lng, recorded_at in points.iterator(chunk_size=2000):
+        advance_route_tail(row, lat, lng, recorded_at)
+
+
+def rebuild_day(user_id: int, day: date) -> EmployeeDayKpi:
+    """Recompute one row from visits, workdays and location logs."""
+    workday, status = display_workday(user_id, day)
+    row = EmployeeDayKpi(user_id=user_id, date=day, work_status=status, **visit_counters(user_id, day))
+    _walk_route(row, workday)
+    values = {
+        f.attname: getattr(row, f.attname)
+        for f in EmployeeDayKpi._meta.concrete_fields
+        if f.attname not in ("id", "user_id", "date", "updated_at")
+    }
+    row, _ = EmployeeDayKpi.objects.update_or_create(user_id=user_id, date=day, defaults=values)
+    return row
+
+
+def get_day_kpis(user, day: Optional[date] = None) -> EmployeeDayKpi:
+    day = day or timezone.localdate()
+    row = EmployeeDayKpi.objects.filter(user_id=user.pk, date=day).first()
+    return row if row is not None else rebuild_day(user.pk, day)
+
+
+# ──────────────────────────────────────────────────────────────
+# Write-path hooks (called from tracking.signals)
+# ──────────────────────────────────────────────────────────────
+
+
+def refresh_visit_counters(
+    user_id: int, visit_date: Optional[date], previous: Optional[Tuple[int, Optional[date]]] = None
+) -> None:
+    """
+    Re-count visits for existing rows on the visit's day and today.
+
+    ``previous`` is the stored (employee_id, visit_date) before a save; when
+    the visit moved day or employee, the rows it left are re-counted too.
+    """
+    today = timezone.localdate()
+    keys = {(user_id, today), (user_id, visit_date)}
+    if previous is not None and previous[0]:
+        keys |= {(previous[0], today), (previous[0], previous[1])}
+    for key_user_id, day in keys:
+        if day is None:
+            continue
+        rows = EmployeeDayKpi.objects.filter(user_id=key_user_id, date=day)
+        if rows.exists():
+            rows.update(**visit_counters(key_user_id, day), updated_at=timezone.now())
+
+
+# Lock-free appends that lose a race to another writer re-read and retry;
+# after this many the point is applied under a row lock instead.
+_APPEND_ATTEMPTS = 3
+
+
+def record_location(location: LocationLog) -> None:
+    """
+    Add one ingested point to its day's row (constant work for in-order points).
+
+    The row is read without a lock (the day comes from a subquery, so the
+    workday is not fetched) and written back with a compare-and-swap on
+    ``route_points`` / ``last_recorded_at``, which every applied point changes.
+    """
+    day = WorkDay.objects.filter(pk=location.workday_id).values("date")[:1]
+    for _ in range(_APPEND_ATTEMPTS):
+        row = EmployeeDayKpi.objects.filter(user_id=location.user_id, date=Subquery(day)).first()
+        if row is None:
+            return  # built (including this point) on first read
+        if row.workday_id != location.workday_id:
+            _switch_workday(location)
+            return
+        seen = {"route_points": row.route_points, "last_recorded_at": row.last_recorded_at}
+        if not advance_route_tail(row, location.latitude, location.longitude, location.recorded_at):
+            _walk_route(row, row.workday)
+        values = {field: getattr(row, field) for field in _ROUTE_FIELDS if field != "workday"}
+        if EmployeeDayKpi.objects.filter(pk=row.pk, **seen).update(
+            **values, updated_at=timezone.now()
+        ):
+            return
+    _record_location_locked(location)
+
+
+@transaction.atomic
+def _record_location_locked(location: LocationLog) -> None:
+    row = (
+        EmployeeDayKpi.objects.select_for_update()
+        .filter(user_id=location.user_id, date=location.workday.date)
+        .first()
+    )
+    if row is None:
+        return
+    if row.workday_id != location.workday_id:
+        _switch_workday(location)
+        return
+    if not advance_route_tail(row, location.latitude, location.longitude, location.recorded_at):
+        _walk_route(row, location.workday)
+    row.save(update_fields=[*_ROUTE_FIELDS, "updated_at"])
+
+
+@transaction.atomic
+def _switch_workday(location: LocationLog) -> None:
+    """The point belongs to a workday the row does not show yet (rare)."""
+    workday = location.workday
+    row = (
+        EmployeeDayKpi.objects.select_for_update()
+        .filter(user_id=location.user_id, date=workday.date)
+        .first()
+    )
+    if row is None:
+        return
+    shown, status = display_workday(location.user_id, workday.date)
+    if shown is None or shown.pk != workday.pk:
+        return
+    row.work_status = status
+    _walk_route(row, shown)
+    row.save(update_fields=[*_ROUTE_FIELDS, "work_status", "updated_at"])
+
+
+def refresh_workday(workday: WorkDay) -> None:
+    """Keep work_status and the displayed workday current after a WorkDay save."""
+    for day in {workday.date, timezone.localdate()}:
+        row = EmployeeDayKpi.objects.filter(user_id=workday.user_id, date=day).first()
+        if row is None:
+            continue
+        shown, status = display_workday(workday.user_id, day)
+        fields = ["work_status", "updated_at"]
+        row.work_status = status
+        if (shown.pk if shown else None) != row.workday_id:
+            _walk_route(row, shown)
+            fields += _ROUTE_FIELDS
+        row.save(update_fields=fields)
+
+
+def refresh_workday_on_commit(workday_id: int) -> None:
+    """``refresh_workday`` for queryset updates, which skip the post_save hook."""
+
+    def _refresh():
+        workday = WorkDay.objects.filter(pk=workday_id).first()
+        if workday is not None:
+            refresh_workday(workday)
+
+    transaction.on_commit(_refresh)
+
+
+def kpi_payload(row: EmployeeDayKpi) -> dict:
+    """Mobile dashboard response shape."""
+    return {
+        "visits_today": row.visits_today,
+        "today_visits": row.visits_today,
+        "total_visits": row.total_visits,
+        "completed_visits": row.total_visits,
+        "farmers_covered": row.farmers_covered,
+        "distance_today_km": round(row.distance_km, 2),
+        "route_points_today": row.route_points,
+        "pending_sync": 0,
+        "pending_visits": 0,
+        "active_visit": None,
+        "work_status": row.work_status,
+        "workday_id": row.workday_id,
+    }
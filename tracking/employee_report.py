@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, time, timedelta
+from datetime import date
 
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -12,14 +12,17 @@ from accounts.device_sessions import device_status_payload
 from tracking.daily_summary import (
     _visit_timestamp,
     build_visit_stops,
-    compute_idle_minutes,
     compute_work_hours_seconds,
+    route_idle_minutes,
 )
 from tracking.duty_service import get_route_points_for_date, serialize_route_point_model
 from tracking.employee_status import build_status_for_live_employee
 from tracking.models import DutySession, EmployeeLiveLocation, EmployeeRoutePoint, WorkDay
 from tracking.route_utils import build_route_polyline, compute_route_distance_km
+from tracking.segmentation import day_segments, serialize_segment
+from utils.day_ranges import day_range
 from utils.photo_urls import build_profile_photo_url
+from visits.evidence import EvidenceBatch
 from visits.field_notes import resolved_recommendation, stored_observation
 from visits.models import Visit
 from visits.submitted import incomplete_visits_qs, submitted_visits_qs
@@ -130,7 +133,13 @@ def _serialize_crop_fields(visit: Visit) -> dict:
     }
 
 
-def _serialize_visit_row(visit: Visit, request) -> dict:
+def _serialize_visit_row(
+    visit: Visit,
+    request,
+    *,
+    evidence: EvidenceBatch | None = None,
+    is_submitted: bool | None = None,
+) -> dict:
     farmer_name = visit.farmer_name
     if not farmer_name and visit.farmer_id:
         farmer_name = visit.farmer.name
@@ -145,39 +154,30 @@ def _serialize_visit_row(visit: Visit, request) -> dict:
     ]
     remarks = "\n".join(p.strip() for p in remarks_parts if p and str(p).strip()) or None
 
+    if evidence is None:
+        evidence = EvidenceBatch([visit], request)
     photos = []
-    for att in visit.attachments.all():
-        url = None
-        if att.file:
-            try:
-                url = request.build_absolute_uri(att.file.url) if request else att.file.url
-            except (ValueError, AttributeError):
-                url = None
+    for att in evidence.attachments_for(visit.pk):
         photos.append(
             {
                 "id": att.id,
                 "type": att.attachment_type,
-                "url": url,
+                "url": evidence.url(att.file),
                 "caption": att.text_content or att.original_filename or "",
             }
         )
-    for media in visit.media_files.all():
-        url = None
-        if media.file:
-            try:
-                url = request.build_absolute_uri(media.file.url) if request else media.file.url
-            except (ValueError, AttributeError):
-                url = None
+    for media in evidence.media_for(visit.pk):
         photos.append(
             {
                 "id": media.id,
                 "type": media.media_type,
-                "url": url,
+                "url": evidence.url(media.file),
                 "caption": media.caption or "",
             }
         )
 
-    is_submitted = submitted_visits_qs(Visit.objects.filter(pk=visit.pk)).exists()
+    if is_submitted is None:
+        is_submitted = submitted_visits_qs(Visit.objects.filter(pk=visit.pk)).exists()
 
     return {
         "visit_id": visit.id,
@@ -214,32 +214,37 @@ def build_employee_visits_for_date(
     target_date: date,
     request,
 ) -> dict:
-    base_qs = (
-        Visit.objects.filter(employee_id=user_id, visit_date=target_date)
-        .select_related("farmer", "village", "crop", "duty_session", "workday")
-        .prefetch_related("attachments", "media_files")
+    """
+    Day visit list split into completed / pending.
+
+    Each visit is loaded and serialized once and evidence comes from one
+    EvidenceBatch, so the query count does not grow with the visit count.
+    """
+    day_qs = Visit.objects.filter(employee_id=user_id, visit_date=target_date)
+    visits = list(
+        day_qs.select_related("farmer", "village", "crop", "duty_session", "workday")
         .order_by("visit_time", "created_at", "id")
     )
-    submitted = list(submitted_visits_qs(base_qs))
-    submitted_ids = {v.id for v in submitted}
-    pending_qs = incomplete_visits_qs().filter(
-        employee_id=user_id, visit_date=target_date
-    ).select_related("farmer", "village", "crop").prefetch_related(
-        "attachments", "media_files"
-    ).order_by("visit_time", "created_at", "id")
-    pending = list(pending_qs)
+    submitted_ids = set(submitted_visits_qs(day_qs).values_list("pk", flat=True))
+    pending_ids = set(incomplete_visits_qs(day_qs).values_list("pk", flat=True))
+    evidence = EvidenceBatch(visits, request)
 
-    visit_list = [_serialize_visit_row(v, request) for v in base_qs]
+    rows = [
+        _serialize_visit_row(
+            v, request, evidence=evidence, is_submitted=v.pk in submitted_ids
+        )
+        for v in visits
+    ]
 
     return {
         "date": str(target_date),
         "user_id": user_id,
-        "total_visits": base_qs.count(),
-        "completed_visits": len(submitted),
-        "pending_visits": len(pending),
-        "visits": visit_list,
-        "completed": [_serialize_visit_row(v, request) for v in submitted],
-        "pending": [_serialize_visit_row(v, request) for v in pending],
+        "total_visits": len(visits),
+        "completed_visits": len(submitted_ids),
+        "pending_visits": len(pending_ids),
+        "visits": rows,
+        "completed": [row for row in rows if row["visit_id"] in submitted_ids],
+        "pending": [row for row in rows if row["visit_id"] in pending_ids],
     }
 
 
@@ -377,11 +382,12 @@ def build_employee_day_summary(
     target_date: date,
     request=None,
     now=None,
+    segments=None,
 ) -> dict:
-    """Day summary using duty route points + visit counts."""
+    """Day summary using duty route points, stop/trip segments + visit counts."""
     user_id = emp.user_id
     route, _polyline, distance_km = _build_route_for_date(user_id, target_date)
-    idle_minutes = compute_idle_minutes(route)
+    idle_minutes = route_idle_minutes(user_id, target_date, route, segments)
 
     workdays = list(
         WorkDay.objects.filter(user_id=user_id, date=target_date).order_by("start_time")
@@ -465,6 +471,7 @@ def build_employee_day_report(
         user_id=user_id, target_date=target_date, request=request
     )
     stops = build_visit_stops(user_id, target_date)
+    segments = day_segments(user_id, target_date)
     locations = _location_endpoints(duty=duty, route=route, live=live)
 
     day_map = None
@@ -474,18 +481,14 @@ def build_employee_day_report(
         day_map = build_duty_day_map(duty, include_live_location=False)
 
     offline_visit_count = sum(1 for v in visits_payload["visits"] if v.get("is_offline_sync"))
-    tz = timezone.get_current_timezone()
-    day_start = timezone.make_aware(datetime.combine(target_date, time.min), tz)
-    day_end = day_start + timedelta(days=1)
     permanent_stops = EmployeeRoutePoint.objects.filter(
         user_id=user_id,
-        recorded_at__gte=day_start,
-        recorded_at__lt=day_end,
+        **day_range("recorded_at", target_date),
         is_permanent=True,
     ).count()
 
     summary = build_employee_day_summary(
-        emp=emp, target_date=target_date, request=request, now=now
+        emp=emp, target_date=target_date, request=request, now=now, segments=segments
     )
 
     return {
@@ -501,6 +504,7 @@ def build_employee_day_report(
             "distance_km": distance_km,
             "points": route,
             "stops": stops,
+            "segments": [serialize_segment(s) for s in segments],
         },
         "locations": locations,
         "day_map": day_map,
@@ -0,0 +1,404 @@
+"""
+Queue-backed GPS ingestion (GPS_INGEST_MODE=queue).
+
+Push endpoints validate points against the caller's active duty and append
+them to a stream.  They then answer 202 with the accepted ids, and no route,
+live-location or workday writes happen inside the request.  Celery workers
+(``tracking.tasks.drain_gps_ingest_task``) drain the stream in batches through
+``gps_service.apply_gps_point``, the same writer as synchronous mode.
+
+Delivery is at-least-once:
+
+- Each entry is acknowledged (and deleted) as soon as its point is applied
+  or rejected by validation, so a consumer dying mid-batch replays at most
+  the entry it was working on.
+- Entries left pending by a dead consumer are claimed again after
+  GPS_INGEST_CLAIM_IDLE_SECONDS.
+- Replays are absorbed by apply_gps_point's idempotency on
+  (duty_session, client_point_id); a replayed point without an id sits on
+  the route point it already wrote, which the route-point throttle skips.
+- After GPS_INGEST_MAX_DELIVERIES failed attempts an entry is logged at ERROR
+  and dropped.
+
+The stream is never trimmed.  Each drain logs ``gps_ingest_backlog_high`` at
+ERROR once the backlog reaches GPS_INGEST_BACKLOG_ALERT.
+
+Each entry is applied against the duty it was queued for.  A point drained
+after that duty ended is still kept as a route point when its recorded_at is
+inside the duty's window, so the last pings before Stop are not lost.  The
+ended duty's segments are then rebuilt once per batch.
+
+The stream is a Redis stream with one consumer group, at GPS_INGEST_REDIS_URL
+(default REDIS_URL).  Queue mode without it is ImproperlyConfigured: web and
+Celery processes would each hold their own stream.  ``MemoryGpsStream``, an
+in-process stand-in with the same semantics, is only used under the test
+runner (GPS_INGEST_MEMORY_STREAM).
+
+``gps_ingest_metrics`` reports backlog, pending entries and the age of the
+oldest unprocessed point.  It is exposed on /readyz/ and logged by every
+drain.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from tracking.gps_service import (
+    MAX_BULK_LOCATION_POINTS,
+    GpsTrackingError,
+    _bulk_sort_key,
+    _ensure_field_employee,
+    apply_gps_point,
+    extract_client_point_id,
+    get_active_duty_for_gps,
+    validate_gps_point,
+)
+from tracking.models import DutySession
+from tracking.segmentation import enqueue_duty_segmentation
+
+logger = logging.getLogger(__name__)
+
+GROUP = "gps-writers"
+
+
+def queue_mode_enabled() -> bool:
+    return getattr(settings, "GPS_INGEST_MODE", "sync") == "queue"
+
+
+@dataclass(frozen=True)
+class StreamEntry:
+    id: str
+    data: str
+    deliveries: int = 1
+
+
+def _id_ms(entry_id: str) -> int:
+    return int(entry_id.split("-", 1)[0])
+
+
+class MemoryGpsStream:
+    """In-process stand-in for the Redis stream + consumer group."""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = {}
+        self._undelivered: list[str] = []
+        self._pending: dict[str, tuple[float, int]] = {}  # id -> (delivered_at, deliveries)
+        self._seq = 0
+
+    def add(self, data: str) -> str:
+        with self._lock:
+            self._seq += 1
+            entry_id = f"{int(time.time() * 1000)}-{self._seq}"
+            self._entries[entry_id] = data
+            self._undelivered.append(entry_id)
+            return entry_id
+
+    def read(self, consumer: str, count: int) -> list[StreamEntry]:
+        with self._lock:
+            ids, self._undelivered = self._undelivered[:count], self._undelivered[count:]
+            now = time.monotonic()
+            for entry_id in ids:
+                self._pending[entry_id] = (now, 1)
+            return [StreamEntry(entry_id, self._entries[entry_id]) for entry_id in ids]
+
+    def claim_stale(self, consumer: str, min_idle_ms: int, count: int) -> list[StreamEntry]:
+        with self._lock:
+            now = time.monotonic()
+            claimed = []
+            for entry_id, (delivered_at, deliveries) in list(self._pending.items()):
+                if len(claimed) >= count:
+                    break
+                if (now - delivered_at) * 1000 >= min_idle_ms:
+                    self._pending[entry_id] = (now, deliveries + 1)
+                    claimed.append(StreamEntry(entry_id, self._entries[entry_id], deliveries + 1))
+            return claimed
+
+    def ack(self, ids: list[str]) -> None:
+        with self._lock:
+            for entry_id in ids:
+                self._pending.pop(entry_id, None)
+                self._entries.pop(entry_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            oldest = next(iter(self._entries), None)
+            return {"backlog": len(self._entries), "pending": len(self._pending), "oldest_id": oldest}
+
+
+class RedisGpsStream:
+    """Redis stream with one consumer group; processed entries are deleted."""
+
+    backend = "redis"
+
+    def __init__(self, url: str, key: str):
+        import redis
+
+        self.key = key
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        try:
+            self.client.xgroup_create(key, GROUP, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def add(self, data: str) -> str:
+        # No MAXLEN: trimming would silently discard points nobody applied.
+        return self.client.xadd(self.key, {"data": data})
+
+    def read(self, consumer: str, count: int) -> list[StreamEntry]:
+        response = self.client.xreadgroup(GROUP, consumer, {self.key: ">"}, count=count)
+        return [
+            StreamEntry(entry_id, fields["data"])
+            for _stream, entries in response or []
+            for entry_id, fields in entries
+        ]
+
+    def claim_stale(self, consumer: str, min_idle_ms: int, count: int) -> list[StreamEntry]:
+        stale = self.client.xpending_range(
+            self.key, GROUP, min="-", max="+", count=count, idle=min_idle_ms
+        )
+        if not stale:
+            return []
+        deliveries = {row["message_id"]: row["times_delivered"] + 1 for row in stale}
+        claimed = self.client.xclaim(self.key, GROUP, consumer, min_idle_ms, list(deliveries))
+        return [
+            StreamEntry(entry_id, fields["data"], deliveries.get(entry_id, 2))
+            for entry_id, fields in claimed
+            if fields
+        ]
+
+    def ack(self, ids: list[str]) -> None:
+        if ids:
+            pipe = self.client.pipeline()
+            pipe.xack(self.key, GROUP, *ids)
+            pipe.xdel(self.key, *ids)
+            pipe.execute()
+
+    def stats(self) -> dict[str, Any]:
+        first = self.client.xrange(self.key, "-", "+", count=1)
+        return {
+            "backlog": self.client.xlen(self.key),
+            "pending": self.client.xpending(self.key, GROUP)["pending"],
+            "oldest_id": first[0][0] if first else None,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_gps_stream():
+    url = getattr(settings, "GPS_INGEST_REDIS_URL", "")
+    if url:
+        return RedisGpsStream(url, settings.GPS_INGEST_STREAM_KEY)
+    if getattr(settings, "GPS_INGEST_MEMORY_STREAM", False):
+        return MemoryGpsStream()
+    raise ImproperlyConfigured(
+        "GPS_INGEST_MODE=queue needs GPS_INGEST_REDIS_URL (or REDIS_URL): "
+        "an in-process stream is not shared with the Celery consumers."
+    )
+
+
+# ──────────────────────────────────────────────────────────────
+# Producer (request path)
+# ──────────────────────────────────────────────────────────────
+
+
+def enqueue_gps_points(
+    user: User,
+    points: list[dict[str, Any]],
+    *,
+    device_model: str | None = None,
+    app_version: str | None = None,
+) -> dict[str, Any]:
+    """Validate and append points for the user's active duty; nothing is written to the DB."""
+    _ensure_field_employee(user)
+    duty = get_active_duty_for_gps(user)
+    if len(points) > MAX_BULK_LOCATION_POINTS:
+        raise GpsTrackingError(
+            f"Max {MAX_BULK_LOCATION_POINTS} points per request",
+            "BULK_LIMIT_EXCEEDED",
+        )
+
+    stream = get_gps_stream()
+    received_at = timezone.now().isoformat()
+    accepted_ids: list[str] = []
+    failed_items: list[dict[str, Any]] = []
+    queued = 0
+    for index, point in enumerate(points):
+        client_point_id = extract_client_point_id(point)
+        try:
+            validate_gps_point(user, duty, point)
+        except GpsTrackingError as exc:
+            failed_items.append(
+                {
+                    "index": index,
+                    "client_point_id": client_point_id,
+                    "local_point_id": client_point_id,
+                    "code": exc.code,
+                    "message": exc.message,
+                    "retryable": exc.code in {"NO_ACTIVE_DUTY", "OUTSIDE_DUTY_WINDOW"},
+                }
+            )
+            continue
+        stream.add(
+            json.dumps(
+                {
+                    "user_id": user.pk,
+                    "duty_session_id": duty.pk,
+                    "payload": point,
+                    "device_model": device_model,
+                    "app_version": app_version,
+                    "received_at": received_at,
+                },
+                cls=DjangoJSONEncoder,
+            )
+        )
+        queued += 1
+        if client_point_id:
+            accepted_ids.append(client_point_id)
+
+    return {
+        "queued_count": queued,
+        "failed_count": len(failed_items),
+        "accepted_ids": accepted_ids,
+        "failed_items": failed_items,
+        "duty_session_id": duty.pk,
+        "workday_id": duty.workday_id,
+    }
+
+
+# ──────────────────────────────────────────────────────────────
+# Consumer (Celery)
+# ──────────────────────────────────────────────────────────────
+
+
+def drain_gps_stream(*, consumer: str, stream=None) -> dict[str, int]:
+    """Apply one batch (stale claims first, then new entries); returns outcome counts."""
+    stream = stream or get_gps_stream()
+    batch_size = settings.GPS_INGEST_BATCH_SIZE
+    entries = stream.claim_stale(
+        consumer, settings.GPS_INGEST_CLAIM_IDLE_SECONDS * 1000, batch_size
+    )
+    if len(entries) < batch_size:
+        entries += stream.read(consumer, batch_size - len(entries))
+    counts = {"read": len(entries), "applied": 0, "rejected": 0, "retry": 0, "dropped": 0}
+    if not entries:
+        return counts
+
+    items = [(entry, json.loads(entry.data)) for entry in entries]
+    users = User.objects.select_related("employee_profile").in_bulk(
+        {item["user_id"] for _, item in items}
+    )
+    duties = DutySession.objects.select_related("workday").in_bulk(
+        {item["duty_session_id"] for _, item in items}
+    )
+    items.sort(key=lambda pair: (pair[1]["user_id"], _bulk_sort_key(pair[1]["payload"])))
+
+    late_duties: dict[int, DutySession] = {}
+    for entry, item in items:
+        user, duty = users.get(item["user_id"]), duties.get(item["duty_session_id"])
+        try:
+            if user is None or duty is None:
+                raise GpsTrackingError("Duty session no longer exists", "NO_ACTIVE_DUTY")
+            with transaction.atomic():
+                result = apply_gps_point(
+                    user,
+                    duty,
+                    item["payload"],
+                    device_model=item.get("device_model"),
+                    app_version=item.get("app_version"),
+                    allow_ended=True,
+                )
+            stream.ack([entry.id])
+            counts["applied"] += 1
+            if not duty.is_active and result["route_point_saved"]:
+                late_duties[duty.pk] = duty
+        except GpsTrackingError as exc:
+            stream.ack([entry.id])
+            counts["rejected"] += 1
+            logger.info(
+                "event=gps_ingest_rejected user_id=%s duty_session_id=%s code=%s",
+                item["user_id"],
+                item["duty_session_id"],
+                exc.code,
+            )
+        except Exception:
+            if entry.deliveries >= settings.GPS_INGEST_MAX_DELIVERIES:
+                stream.ack([entry.id])
+                counts["dropped"] += 1
+                logger.exception("event=gps_ingest_dropped entry_id=%s data=%s", entry.id, entry.data)
+            else:
+                counts["retry"] += 1
+                logger.warning(
+                    "event=gps_ingest_retry entry_id=%s deliveries=%s",
+                    entry.id,
+                    entry.deliveries,
+                    exc_info=True,
+                )
+    for duty in late_duties.values():
+        # The ended duty's segments were finalized without these points.
+        enqueue_duty_segmentation(duty)
+    return counts
+
+
+def drain_until_idle(*, consumer: str, budget_seconds: Optional[float] = None) -> dict[str, int]:
+    """Drain batches until the stream is empty or the time budget is spent."""
+    budget = settings.GPS_INGEST_DRAIN_SECONDS if budget_seconds is None else budget_seconds
+    deadline = time.monotonic() + budget
+    totals = {"read": 0, "applied": 0, "rejected": 0, "retry": 0, "dropped": 0}
+    while True:
+        counts = drain_gps_stream(consumer=consumer)
+        for key, value in counts.items():
+            totals[key] += value
+        if counts["read"] < settings.GPS_INGEST_BATCH_SIZE or time.monotonic() >= deadline:
+            break
+    metrics = gps_ingest_metrics()
+    if metrics["backlog"] >= settings.GPS_INGEST_BACKLOG_ALERT:
+        logger.error(
+            "event=gps_ingest_backlog_high backlog=%s alert_at=%s lag_seconds=%s",
+            metrics["backlog"],
+            settings.GPS_INGEST_BACKLOG_ALERT,
+            metrics["lag_seconds"],
+        )
+    logger.info(
+        "event=gps_ingest_drain consumer=%s read=%s applied=%s rejected=%s retry=%s dropped=%s "
+        "backlog=%s pending=%s lag_seconds=%s",
+        consumer,
+        totals["read"],
+        totals["applied"],
+        totals["rejected"],
+        totals["retry"],
+        totals["dropped"],
+        metrics["backlog"],
+        metrics["pending"],
+        metrics["lag_seconds"],
+    )
+    return totals
+
+
+def gps_ingest_metrics() -> dict[str, Any]:
+    """Backlog (unacknowledged entries), pending (delivered, unacked) and consumer lag."""
+    stream = get_gps_stream()
+    stats = stream.stats()
+    oldest = stats.pop("oldest_id")
+    lag = max(0.0, time.time() - _id_ms(oldest) / 1000) if oldest else 0.0
+    return {
+        "mode": getattr(settings, "GPS_INGEST_MODE", "sync"),
+        "backend": stream.backend,
+        **stats,
+        "lag_seconds": round(lag, 1),
+    }
@@ -77,13 +77,15 @@ def extract_client_point_id(payload: dict[str, Any]) -> str | None:
     return value or None
 
 
-def _validate_duty_ownership(user: User, duty: DutySession, payload: dict[str, Any]) -> None:
+def _validate_duty_ownership(
+    user: User, duty: DutySession, payload: dict[str, Any], *, allow_ended: bool = False
+) -> None:
     if duty.user_id != user.pk:
         raise GpsTrackingError(
             "DutySession belongs to another employee",
             "WRONG_DUTY_OWNER",
         )
-    if not duty.is_active:
+    if not duty.is_active and not allow_ended:
         raise GpsTrackingError(WORKDAY_EXPIRED_MESSAGE, "NO_ACTIVE_DUTY")
 
     duty_session_id = payload.get("duty_session_id")
@@ -202,23 +204,16 @@ def _mirror_location_log(
     )
 
 
-@transaction.atomic
-def apply_gps_point(
-    user: User,
-    duty: DutySession,
-    payload: dict[str, Any],
-    *,
-    device_model: str | None = None,
-    app_version: str | None = None,
-) -> dict[str, Any]:
+def validate_gps_point(
+    user: User, duty: DutySession, payload: dict[str, Any], *, allow_ended: bool = False
+) -> tuple[float, float, datetime]:
     """
-    Canonical single-point write.
+    Ownership, coordinate and duty-window checks, without writes.
 
-    - Always updates EmployeeLiveLocation + GPS state.
-    - Persists EmployeeRoutePoint when throttled OR client_point_id is present.
-    - Idempotent on (duty_session, client_point_id).
+    ``allow_ended`` accepts an ended duty; the window check still limits the
+    point to the duty's start..end_time.
     """
-    _validate_duty_ownership(user, duty, payload)
+    _validate_duty_ownership(user, duty, payload, allow_ended=allow_ended)
 
     if "latitude" not in payload or "longitude" not in payload:
         raise GpsTrackingError("latitude and longitude are required", "VALIDATION_ERROR")
@@ -244,13 +239,50 @@ def apply_gps_point(
         raise GpsTrackingError("Invalid recorded_at timestamp", "INVALID_TIMESTAMP") from exc
 
     _validate_recorded_at_within_duty(duty, recorded_at)
+    return lat, lng, recorded_at
+
+
+@transaction.atomic
+def apply_gps_point(
+    user: User,
+    duty: DutySession,
+    payload: dict[str, Any],
+    *,
+    device_model: str | None = None,
+    app_version: str | None = None,
+    allow_ended: bool = False,
+) -> dict[str, Any]:
+    """
+    Canonical single-point write.
+
+    - Always updates EmployeeLiveLocation + GPS state.
+    - Persists EmployeeRoutePoint when throttled OR client_point_id is present.
+    - Idempotent on (duty_session, client_point_id).
+
+    With ``allow_ended`` (queued points drained after their duty ended) a
+    point inside the ended duty's window is kept as a route point only; live
+    presence and heartbeats are left alone.
+    """
+    lat, lng, recorded_at = validate_gps_point(
+        user, duty, payload, allow_ended=allow_ended
+    )
+    if not duty.is_active:
+        return _apply_to_ended_duty(
+            user,
+            duty,
+            payload,
+            lat=lat,
+            lng=lng,
+            recorded_at=recorded_at,
+            device_model=device_model,
+            app_version=app_version,
+        )
 
     client_point_id = extract_client_point_id(payload)
     accuracy = payload.get("accuracy")
     speed = payload.get("speed")
     heading = payload.get("heading")
     battery = payload.get("battery_level")
-    lat_dec, lng_dec = _quantize(lat, lng)
     gps_defaults = gps_state_defaults_from_payload(payload)
 
     # Idempotent replay: return existing route point, still refresh live presence.
@@ -334,29 +366,18 @@ def apply_gps_point(
     route_point = None
     location_log = None
     if save_route:
-        try:
-            with transaction.atomic():
-                route_point = EmployeeRoutePoint.objects.create(
-                    user=user,
-                    duty_session=duty,
-                    latitude=lat_dec,
-                    longitude=lng_dec,
-                    accuracy=accuracy,
-                    speed=speed,
-                    heading=heading,
-                    recorded_at=recorded_at,
-                    point_type=EmployeeRoutePoint.POINT_GPS,
-                    client_point_id=client_point_id,
-                )
-        except IntegrityError:
-            # Concurrent replay won the unique race — treat as duplicate.
-            existing = (
-                _find_existing_by_client_id(duty, client_point_id)
-                if client_point_id
-                else None
-            )
-            if existing is None:
-                raise
+        route_point, location_log, existing = _write_route_point(
+            user,
+            duty,
+            payload,
+            lat=lat,
+            lng=lng,
+            recorded_at=recorded_at,
+            client_point_id=client_point_id,
+            device_model=device_model,
+            app_version=app_version,
+        )
+        if existing is not None:
             return _serialize_point_result(
                 live=live,
                 route_point=existing,
@@ -367,21 +388,6 @@ def apply_gps_point(
                 client_point_id=client_point_id,
             )
 
-        location_log = _mirror_location_log(
-            user=user,
-            duty=duty,
-            lat_dec=lat_dec,
-            lng_dec=lng_dec,
-            accuracy=accuracy,
-            speed=speed,
-            heading=heading,
-            battery=battery,
-            payload=payload,
-            recorded_at=recorded_at,
-            device_model=device_model,
-            app_version=app_version,
-        )
-
     if duty.workday_id:
         refresh_workday_live_state(
             user=user,
@@ -408,6 +414,134 @@ def apply_gps_point(
     )
 
 
+def _write_route_point(
+    user: User,
+    duty: DutySession,
+    payload: dict[str, Any],
+    *,
+    lat: float,
+    lng: float,
+    recorded_at: datetime,
+    client_point_id: str | None,
+    device_model: str | None,
+    app_version: str | None,
+) -> tuple[EmployeeRoutePoint | None, LocationLog | None, EmployeeRoutePoint | None]:
+    """
+    Insert the route point and its LocationLog mirror.
+
+    Returns (route_point, location_log, existing); ``existing`` is the row a
+    concurrent replay inserted first, in which case nothing was written.
+    """
+    lat_dec, lng_dec = _quantize(lat, lng)
+    accuracy = payload.get("accuracy")
+    speed = payload.get("speed")
+    heading = payload.get("heading")
+    try:
+        with transaction.atomic():
+            route_point = EmployeeRoutePoint.objects.create(
+                user=user,
+                duty_session=duty,
+                latitude=lat_dec,
+                longitude=lng_dec,
+                accuracy=accuracy,
+                speed=speed,
+                heading=heading,
+                recorded_at=recorded_at,
+                point_type=EmployeeRoutePoint.POINT_GPS,
+                client_point_id=client_point_id,
+            )
+    except IntegrityError:
+        # Concurrent replay won the unique race — treat as duplicate.
+        existing = (
+            _find_existing_by_client_id(duty, client_point_id)
+            if client_point_id
+            else None
+        )
+        if existing is None:
+            raise
+        return None, None, existing
+
+    location_log = _mirror_location_log(
+        user=user,
+        duty=duty,
+        lat_dec=lat_dec,
+        lng_dec=lng_dec,
+        accuracy=accuracy,
+        speed=speed,
+        heading=heading,
+        battery=payload.get("battery_level"),
+        payload=payload,
+        recorded_at=recorded_at,
+        device_model=device_model,
+        app_version=app_version,
+    )
+    return route_point, location_log, None
+
+
+def _apply_to_ended_duty(
+    user: User,
+    duty: DutySession,
+    payload: dict[str, Any],
+    *,
+    lat: float,
+    lng: float,
+    recorded_at: datetime,
+    device_model: str | None,
+    app_version: str | None,
+) -> dict[str, Any]:
+    client_point_id = extract_client_point_id(payload)
+    result = {
+        "live_location_id": None,
+        "route_point_saved": False,
+        "route_point_id": None,
+        "location_log_id": None,
+        "recorded_at": recorded_at.isoformat(),
+        "duplicate": False,
+        "client_point_id": client_point_id,
+        "duty_session_id": duty.pk,
+    }
+    if client_point_id:
+        existing = _find_existing_by_client_id(duty, client_point_id)
+        if existing is not None:
+            return {**result, "route_point_id": existing.pk, "duplicate": True}
+
+    # Same throttle and writer as a live point; only live presence is skipped.
+    save_route = bool(client_point_id) or should_save_route_point(
+        duty_session_id=duty.pk,
+        latitude=lat,
+        longitude=lng,
+        recorded_at=recorded_at,
+        force=False,
+    )
+    if not save_route:
+        return result
+    route_point, location_log, existing = _write_route_point(
+        user,
+        duty,
+        payload,
+        lat=lat,
+        lng=lng,
+        recorded_at=recorded_at,
+        client_point_id=client_point_id,
+        device_model=device_model,
+        app_version=app_version,
+    )
+    if existing is not None:
+        return {**result, "route_point_id": existing.pk, "duplicate": True}
+    logger.info(
+        "event=gps_point_applied_to_ended_duty user_id=%s duty_id=%s recorded_at=%s",
+        user.pk,
+        duty.pk,
+        recorded_at.isoformat(),
+    )
+    return {
+        **result,
+        "route_point_saved": True,
+        "route_point_id": route_point.pk,
+        "location_log_id": location_log.pk if location_log else None,
+    }
+
+
 def get_active_duty_for_gps(user: User) -> DutySession:
     """Resolve active duty after lazy expiry; raise if none."""
     expire_overlong_workdays_for_user(user)
@@ -0,0 +1,168 @@
+"""
+Heartbeat and GPS push request handling shared by the DRF views
+(``HeartbeatAPI``, ``PushLocationAPI``, ``BulkPushLocationAPI``) and the
+async ingest path (``tracking.asgi_ingest``).
+
+Callers authenticate the user and check the device session first; these
+functions take the user and the decoded body and return a DRF ``Response``
+(not yet rendered).  Validation errors raise DRF exceptions, which both
+callers pass through ``config.exception_handler``.
+
+With GPS_INGEST_MODE=queue, location pushes are validated and queued
+(``tracking.gps_queue``) and answered 202 instead of being written inline.
+"""
+
+from __future__ import annotations
+
+from rest_framework.response import Response
+
+from utils.response import error_response, success_response
+
+from . import gps_queue
+from .serializers import BulkLocationPushSerializer, HeartbeatSerializer
+from .workday_utils import expire_overlong_workdays_for_user
+
+
+def heartbeat(user, data) -> Response:
+    from tracking.live_tracking_service import LiveTrackingError, apply_heartbeat
+
+    if user.is_staff:
+        return error_response(
+            message="Admin heartbeat not allowed",
+            code="FORBIDDEN",
+            status_code=403,
+        )
+
+    expire_overlong_workdays_for_user(user)
+    serializer = HeartbeatSerializer(data=data if data else {"gps_enabled": True})
+    if not serializer.is_valid():
+        errors = serializer.errors
+        code = "VALIDATION_ERROR"
+        message = "Invalid heartbeat payload"
+        if isinstance(errors, dict):
+            detail = errors.get("detail")
+            if isinstance(detail, list) and detail:
+                message = str(detail[0])
+            elif isinstance(detail, str):
+                message = detail
+            if isinstance(errors.get("detail"), dict) and errors["detail"].get("code"):
+                code = errors["detail"]["code"]
+        return error_response(
+            message=message,
+            code=code,
+            errors=errors,
+            status_code=400,
+        )
+    try:
+        result = apply_heartbeat(user, serializer.validated_data)
+    except LiveTrackingError as exc:
+        status_code = 403 if exc.code == "FORBIDDEN" else 400
+        return error_response(message=exc.message, code=exc.code, status_code=status_code)
+    return success_response(data=result, message="Heartbeat received")
+
+
+def push_location(user, data) -> Response:
+    from tracking.gps_service import GpsTrackingError, update_gps_point
+
+    if user.is_staff:
+        return Response({"detail": "Admin cannot push location"}, status=403)
+
+    if gps_queue.queue_mode_enabled():
+        return _queued_response(user, [dict(data)])
+
+    try:
+        result = update_gps_point(user, dict(data))
+    except GpsTrackingError as exc:
+        code = 403 if exc.code in {"FORBIDDEN", "ACCOUNT_DISABLED"} else 400
+        return Response({"detail": exc.message, "code": exc.code}, status=code)
+
+    out = {
+        "id": result.get("location_log_id") or result.get("route_point_id"),
+        "route_point_id": result.get("route_point_id"),
+        "duty_session_id": result.get("duty_session_id"),
+        "latitude": data.get("latitude"),
+        "longitude": data.get("longitude"),
+        "recorded_at": result.get("recorded_at"),
+        "duplicate": result.get("duplicate", False),
+        "client_point_id": result.get("client_point_id"),
+    }
+    return Response(
+        {"message": "Location saved", "location": out, "data": result},
+        status=201,
+    )
+
+
+def bulk_push_locations(user, data) -> Response:
+    from tracking.gps_service import GpsTrackingError, bulk_update_gps_points
+
+    if user.is_staff:
+        return Response({"detail": "Admin cannot push location"}, status=403)
+
+    if isinstance(data, list):
+        points = data
+        device_model = None
+        app_version = None
+    else:
+        serializer = BulkLocationPushSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        points = serializer.validated_data["locations"]
+        device_model = serializer.validated_data.get("device_model")
+        app_version = serializer.validated_data.get("app_version")
+
+    if gps_queue.queue_mode_enabled():
+        return _queued_response(
+            user, list(points), device_model=device_model, app_version=app_version
+        )
+
+    try:
+        result = bulk_update_gps_points(
+            user,
+            points,
+            device_model=device_model,
+            app_version=app_version,
+            request_meta={},
+        )
+    except GpsTrackingError as exc:
+        code = 403 if exc.code in {"FORBIDDEN", "ACCOUNT_DISABLED"} else 400
+        return Response({"detail": exc.message, "code": exc.code}, status=code)
+
+    status_code = 201 if result["failed_count"] == 0 else 207
+    return Response(
+        {
+            "message": f"{result['success_count']} locations saved",
+            "saved": result["success_count"],
+            "failed": result["failed_count"],
+            "duplicate_count": result.get("duplicate_count", 0),
+            "route_points_saved": result.get("route_points_saved", 0),
+            "accepted_ids": result.get("accepted_ids"),
+            "failed_items": result.get("failed_items"),
+            "duty_session_id": result.get("duty_session_id"),
+        },
+        status=status_code,
+    )
+
+
+def _queued_response(user, points, *, device_model=None, app_version=None) -> Response:
+    from tracking.gps_service import GpsTrackingError
+
+    try:
+        result = gps_queue.enqueue_gps_points(
+            user, points, device_model=device_model, app_version=app_version
+        )
+    except GpsTrackingError as exc:
+        code = 403 if exc.code in {"FORBIDDEN", "ACCOUNT_DISABLED"} else 400
+        return Response({"detail": exc.message, "code": exc.code}, status=code)
+    if len(points) == 1 and result["failed_items"]:
+        first = result["failed_items"][0]
+        return Response({"detail": first["message"], "code": first["code"]}, status=400)
+    return Response(
+        {
+            "message": f"{result['queued_count']} locations accepted",
+            "queued": result["queued_count"],
+            "failed": result["failed_count"],
+            "accepted_ids": result["accepted_ids"],
+            "failed_items": result["failed_items"],
+            "duty_session_id": result["duty_session_id"],
+        },
+        status=202 if result["failed_count"] == 0 else 207,
+    )
@@ -0,0 +1,197 @@
+"""
+Live map events: compact per-employee deltas pushed to admin map streams.
+
+Writers publish after their transaction commits:
+
+- ``live_tracking_service.update_live_state_from_gps`` (new position) and
+  ``apply_heartbeat`` publish an ``employee`` delta built from the live row;
+- ``duty_service.start_duty`` publishes ``duty_started``;
+- ``live_tracking_service.finalize_live_state_on_duty_end`` publishes
+  ``duty_ended`` (manual, admin and auto-expired ends).
+
+``AdminTrackingLiveStreamView`` subscribes, sends one snapshot and then
+forwards these events over server-sent events, so the admin map no longer
+polls the live/geojson endpoints.
+
+The broker is Redis pub/sub when LIVE_EVENTS_REDIS_URL (default REDIS_URL) is
+set, so events reach streams on every ASGI worker.  Otherwise it is
+``InProcessLiveEventBroker``, which fans out to subscribers in this process
+only (tests and single-process development); outside DEBUG and the test
+runner that fallback is logged as a warning.  Publishing never raises: a
+lost delta is repaired by the next one or by the client reconnecting.
+
+Both brokers tell a subscriber that lost events to resync: the in-process
+queue when it overflows, the Redis subscription when Redis drops it (its
+pub/sub output buffer limit, or a connection loss).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+EVENT_EMPLOYEE = "employee"
+EVENT_DUTY_STARTED = "duty_started"
+EVENT_DUTY_ENDED = "duty_ended"
+# Sent to a subscriber that fell too far behind; the stream re-sends a snapshot.
+EVENT_RESYNC = "resync"
+
+_RESYNC_MESSAGE = json.dumps({"type": EVENT_RESYNC})
+
+
+class _QueueSubscription:
+    """One in-process subscriber: an asyncio queue fed from any thread."""
+
+    def __init__(self, broker: "InProcessLiveEventBroker"):
+        self._broker = broker
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[str] = asyncio.Queue(
+            maxsize=settings.LIVE_EVENTS_QUEUE_SIZE
+        )
+
+    def deliver(self, message: str) -> None:
+        self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: str) -> None:
+        if self._queue.full():
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            message = _RESYNC_MESSAGE
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        try:
+            if timeout <= 0:
+                return self._queue.get_nowait()
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+
+    async def aclose(self) -> None:
+        self._broker._unsubscribe(self)
+
+
+class InProcessLiveEventBroker:
+    """Fan-out to subscribers of this process only."""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: set[_QueueSubscription] = set()
+
+    def publish(self, message: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.deliver(message)
+            except RuntimeError:
+                # Event loop already closed; the stream is going away.
+                self._unsubscribe(subscriber)
+
+    async def subscribe(self) -> _QueueSubscription:
+        subscription = _QueueSubscription(self)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: _QueueSubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class _RedisSubscription:
+    def __init__(self, url: str, channel: str):
+        import redis.asyncio as aioredis
+
+        self._channel = channel
+        self._client = aioredis.Redis.from_url(url, decode_responses=True)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+
+    async def start(self) -> None:
+        await self._pubsub.subscribe(self._channel)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        try:
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=timeout
+            )
+        except RedisConnectionError:
+            # Redis disconnects subscribers that overflow their output buffer;
+            # whatever was published meanwhile is gone, so resubscribe and
+            # have the stream rebuild from a snapshot.
+            logger.warning(
+                "event=live_event_subscriber_resync channel=%s", self._channel, exc_info=True
+            )
+            await self._pubsub.aclose()
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            await self.start()
+            return _RESYNC_MESSAGE
+        return message["data"] if message else None
+
+    async def aclose(self) -> None:
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RedisLiveEventBroker:
+    """Redis pub/sub channel shared by every web, ingest and Celery process."""
+
+    backend = "redis"
+
+    def __init__(self, url: str, channel: str):
+        import redis
+
+        self.url = url
+        self.channel = channel
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def publish(self, message: str) -> None:
+        self.client.publish(self.channel, message)
+
+    async def subscribe(self) -> _RedisSubscription:
+        subscription = _RedisSubscription(self.url, self.channel)
+        await subscription.start()
+        return subscription
+
+
+@lru_cache(maxsize=1)
+def get_live_event_broker():
+    url = getattr(settings, "LIVE_EVENTS_REDIS_URL", "")
+    if url:
+        return RedisLiveEventBroker(url, settings.LIVE_EVENTS_CHANNEL)
+    if not getattr(settings, "LIVE_EVENTS_IN_PROCESS_OK", False):
+        logger.warning(
+            "event=live_events_in_process_broker reason=no_redis_url "
+            "detail=admin map streams only see events published by their own process; "
+            "set LIVE_EVENTS_REDIS_URL or REDIS_URL"
+        )
+    return InProcessLiveEventBroker()
+
+
+def _send(message: str) -> None:
+    try:
+        get_live_event_broker().publish(message)
+    except Exception:  # noqa: BLE001 - live map push is best effort
+        logger.warning("event=live_event_publish_failed", exc_info=True)
+
+
+def publish_live_event(event_type: str, user_id: int, **fields: Any) -> None:
+    """Publish one event once the current transaction commits."""
+    message = json.dumps(
+        {"type": event_type, "user_id": user_id, **fields}, cls=DjangoJSONEncoder
+    )
+    transaction.on_commit(lambda: _send(message))
@@ -13,6 +13,7 @@ from django.db import transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from tracking import live_events
 from tracking.gps_state import (
     is_mobile_gps_off,
     parse_mobile_gps_state,
@@ -362,6 +363,7 @@ def apply_heartbeat(
             ).update(end_time=recorded_at)
 
     live.refresh_from_db()
+    publish_live_delta(live)
     logger.info(
         "event=heartbeat_accepted user_id=%s duty_id=%s recorded_at=%s",
         user.pk,
@@ -410,6 +412,32 @@ def _heartbeat_response(
     }
 
 
+def publish_live_delta(live: EmployeeLiveLocation) -> None:
+    """Push the live row's map fields to admin live streams (after commit)."""
+    live_events.publish_live_event(
+        live_events.EVENT_EMPLOYEE,
+        live.user_id,
+        duty_session_id=live.duty_session_id,
+        latitude=float(live.latitude) if live.latitude is not None else None,
+        longitude=float(live.longitude) if live.longitude is not None else None,
+        accuracy=live.accuracy,
+        speed=live.speed,
+        battery_level=live.battery_level,
+        location_recorded_at=live.recorded_at,
+        last_heartbeat_at=live.last_heartbeat_at,
+        gps_enabled=live.gps_enabled,
+        tracking_status=resolve_tracking_status(
+            has_active_duty=live.duty_session_id is not None,
+            last_heartbeat_at=live.last_heartbeat_at,
+            latitude=live.latitude,
+            longitude=live.longitude,
+            gps_enabled=live.gps_enabled,
+            location_permission_status=live.location_permission_status,
+            background_tracking_enabled=live.background_tracking_enabled,
+        ),
+    )
+
+
 def update_live_state_from_gps(
     *,
     user: User,
@@ -456,6 +484,7 @@ def update_live_state_from_gps(
                 **gps_defaults,
             )
             live.save()
+            publish_live_delta(live)
             logger.info(
                 "event=live_state_updated user_id=%s duty_id=%s reason=gps_create",
                 user.pk,
@@ -493,6 +522,8 @@ def update_live_state_from_gps(
         for key, value in gps_defaults.items():
             setattr(live, key, value)
         live.save()
+        if location_updated:
+            publish_live_delta(live)
         return live, location_updated
 
 
@@ -501,6 +532,12 @@ def finalize_live_state_on_duty_end(user: User, duty: DutySession) -> None:
     EmployeeLiveLocation.objects.filter(user=user, duty_session=duty).update(
         duty_session=None
     )
+    live_events.publish_live_event(
+        live_events.EVENT_DUTY_ENDED,
+        user.pk,
+        duty_session_id=duty.pk,
+        duty_display_status=resolve_duty_display_status(duty),
+    )
     logger.info(
         "event=live_state_finalized user_id=%s duty_id=%s",
         user.pk,
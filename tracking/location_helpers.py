@@ -8,6 +8,7 @@ from decimal import Decimal
 from django.utils import timezone
 from rest_framework import serializers
 
+from tracking.location_telemetry import emit_location_received, record_location_point
 from tracking.models import LocationLog, WorkDay
 from tracking.workday_utils import expire_overlong_workdays_for_user
 
@@ -128,18 +129,17 @@ def log_location_saved(
     location: LocationLog,
     recorded_at,
 ) -> int:
-    """Structured debug log after a LocationLog row is created."""
-    total = LocationLog.objects.filter(workday_id=workday_id).count()
-    distance_km = workday_distance_km(workday_id)
-    logger.info(
-        "LocationReceived source=%s employee_id=%s workday_id=%s "
-        "location_log_id=%s timestamp=%s total_points=%s distance_km=%s",
-        source,
-        user_id,
-        workday_id,
-        location.id,
-        recorded_at,
-        total,
-        distance_km,
+    """
+    Advance the workday's running telemetry and emit ``LocationReceived``.
+
+    Constant cost per in-order point; see ``tracking.location_telemetry``.
+    """
+    telemetry = record_location_point(location)
+    emit_location_received(
+        source=source,
+        user_id=user_id,
+        location=location,
+        recorded_at=recorded_at,
+        telemetry=telemetry,
     )
-    return total
+    return telemetry.route_points
@@ -0,0 +1,134 @@
+"""
+Location-write telemetry: running per-workday counters kept in cache.
+
+Every saved LocationLog advances its workday's counters (points, route
+distance, last point) with one cache read and one cache write, and emits a
+``LocationReceived`` log line.  No query touches the workday's other points.
+
+- Points are appended with ``route_utils.advance_route_tail``, the same
+  tracker as the EmployeeDayKpi route fields, so distance follows
+  ``route_utils.compute_route_distance_km`` exactly.
+- An out-of-order point is counted (``out_of_order``) and, as for the KPI
+  row, the counters are re-walked from the table in time order.
+- A cache miss re-seeds the counters from the table once.
+- ``recompute_workday_telemetry`` is the exact full walk, for audits
+  (``manage.py audit_route_logs --recompute-telemetry``).
+
+Counters are diagnostics, not source data: concurrent pushes for one
+workday may drop an increment; a recompute repairs them.
+
+Settings: LOCATION_TELEMETRY_LOG_EVERY (emit every Nth point, 1 = all),
+LOCATION_TELEMETRY_LOG_LEVEL (skip formatting when the level is disabled),
+LOCATION_TELEMETRY_TTL (seconds).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from tracking.models import LocationLog
+from tracking.route_utils import advance_route_tail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 36 * 60 * 60
+
+
+@dataclass
+class WorkdayTelemetry:
+    route_points: int = 0
+    distance_km: float = 0.0
+    last_latitude: Optional[float] = None
+    last_longitude: Optional[float] = None
+    last_recorded_at: Optional[datetime] = None
+    out_of_order: int = 0
+
+
+def _cache_key(workday_id: int) -> str:
+    return f"tracking:telemetry:workday:{workday_id}"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "LOCATION_TELEMETRY_TTL", DEFAULT_TTL))
+
+
+def get_workday_telemetry(workday_id: int) -> Optional[WorkdayTelemetry]:
+    raw = cache.get(_cache_key(workday_id))
+    return WorkdayTelemetry(**raw) if raw else None
+
+
+def store_workday_telemetry(workday_id: int, telemetry: WorkdayTelemetry) -> None:
+    cache.set(_cache_key(workday_id), asdict(telemetry), timeout=_ttl())
+
+
+def recompute_workday_telemetry(workday_id: int, *, store: bool = True) -> WorkdayTelemetry:
+    """Walk every point of the workday in time order (exact; O(points))."""
+    telemetry = WorkdayTelemetry()
+    points = (
+        LocationLog.objects.filter(workday_id=workday_id)
+        .order_by("recorded_at", "id")
+        .values_list("latitude", "longitude", "recorded_at")
+    )
+    for lat, lng, recorded_at in points.iterator(chunk_size=2000):
+        advance_route_tail(telemetry, lat, lng, recorded_at)
+    if store:
+        store_workday_telemetry(workday_id, telemetry)
+    return telemetry
+
+
+def record_location_point(location: LocationLog) -> WorkdayTelemetry:
+    """Advance the workday's counters by one saved point."""
+    telemetry = get_workday_telemetry(location.workday_id)
+    if telemetry is None:
+        # Seeding reads the table, which already holds ``location``.
+        return recompute_workday_telemetry(location.workday_id)
+    if not advance_route_tail(
+        telemetry, location.latitude, location.longitude, location.recorded_at
+    ):
+        out_of_order = telemetry.out_of_order + 1
+        telemetry = recompute_workday_telemetry(location.workday_id, store=False)
+        telemetry.out_of_order = out_of_order
+    store_workday_telemetry(location.workday_id, telemetry)
+    return telemetry
+
+
+def _log_level() -> int:
+    level = getattr(settings, "LOCATION_TELEMETRY_LOG_LEVEL", "INFO")
+    return level if isinstance(level, int) else logging.getLevelName(str(level).upper())
+
+
+def should_emit(points: int) -> bool:
+    every = max(int(getattr(settings, "LOCATION_TELEMETRY_LOG_EVERY", 1)), 1)
+    return points == 1 or points % every == 0
+
+
+def emit_location_received(
+    *,
+    source: str,
+    user_id: int,
+    location: LocationLog,
+    recorded_at,
+    telemetry: WorkdayTelemetry,
+) -> None:
+    level = _log_level()
+    if not logger.isEnabledFor(level) or not should_emit(telemetry.route_points):
+        return
+    logger.log(
+        level,
+        "LocationReceived source=%s employee_id=%s workday_id=%s "
+        "location_log_id=%s timestamp=%s total_points=%s distance_km=%.2f out_of_order=%s",
+        source,
+        user_id,
+        location.workday_id,
+        location.id,
+        recorded_at,
+        telemetry.route_points,
+        telemetry.distance_km,
+        telemetry.out_of_order,
+    )
@@ -7,6 +7,7 @@ from django.db.models import Count, F
 
 from tracking.models import DutySession, EmployeeRoutePoint, LocationLog
 from tracking.route_utils import is_valid_coordinate
+from utils.day_ranges import day_range
 from visits.models import Visit
 from visits.submitted import submitted_visits_qs
 
@@ -131,7 +132,7 @@ class Command(BaseCommand):
             if workday_id:
                 if logs.filter(workday_id=workday_id).exists():
                     legacy_only += 1
-            elif logs.filter(recorded_at__date=ddate).exists():
+            elif logs.filter(**day_range("recorded_at", ddate)).exists():
                 legacy_only += 1
         report["legacy_only_route_duties"] = legacy_only
 
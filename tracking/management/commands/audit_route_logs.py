@@ -4,7 +4,9 @@ from django.core.management.base import BaseCommand
 from django.utils.dateparse import parse_date
 
 from accounts.models import EmployeeProfile
+from tracking.location_telemetry import get_workday_telemetry, recompute_workday_telemetry
 from tracking.models import LocationLog, WorkDay
+from utils.day_ranges import day_range
 
 
 class Command(BaseCommand):
@@ -17,6 +19,11 @@ class Command(BaseCommand):
             type=str,
             help="YYYY-MM-DD (default: today)",
         )
+        parser.add_argument(
+            "--recompute-telemetry",
+            action="store_true",
+            help="Walk each workday's points and overwrite its cached location telemetry.",
+        )
 
     def handle(self, *args, **options):
         user_id = options["user_id"]
@@ -26,11 +33,10 @@ class Command(BaseCommand):
         emp = EmployeeProfile.objects.filter(user_id=user_id).first()
         employee_id = emp.employee_id if emp else "(no profile)"
 
-        workday_count = WorkDay.objects.filter(
-            user_id=user_id, date=target_date
-        ).count()
+        workdays = WorkDay.objects.filter(user_id=user_id, date=target_date).order_by("start_time")
+        workday_count = workdays.count()
         logs = LocationLog.objects.filter(
-            user_id=user_id, recorded_at__date=target_date
+            user_id=user_id, **day_range("recorded_at", target_date)
         ).order_by("recorded_at")
         log_count = logs.count()
         first = logs.first()
@@ -53,3 +59,14 @@ class Command(BaseCommand):
             )
         else:
             self.stdout.write("last_point=(none)")
+
+        if options["recompute_telemetry"]:
+            for workday_id in workdays.values_list("id", flat=True):
+                cached = get_workday_telemetry(workday_id)
+                exact = recompute_workday_telemetry(workday_id)
+                self.stdout.write(
+                    f"telemetry workday_id={workday_id} "
+                    f"cached_points={cached.route_points if cached else '(none)'} "
+                    f"cached_distance_km={f'{cached.distance_km:.2f}' if cached else '(none)'} "
+                    f"points={exact.route_points} distance_km={exact.distance_km:.2f}"
+                )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from tracking.employee_kpis import rebuild_day
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute EmployeeDayKpi rows from visits, workdays and location logs "
+        "(default: today, every user with activity)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Last day to rebuild (YYYY-MM-DD, default today).")
+        parser.add_argument("--days", type=int, default=1, help="Number of days ending at --date.")
+        parser.add_argument("--user", help="Username or user id (default: all employees).")
+
+    def handle(self, *args, **options):
+        end = timezone.localdate()
+        if options.get("date"):
+            end = parse_date(options["date"])
+            if end is None:
+                raise CommandError("--date must be YYYY-MM-DD.")
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+        days = [end - timedelta(days=offset) for offset in range(options["days"])]
+
+        users = User.objects.filter(is_active=True)
+        if options.get("user"):
+            raw = options["user"]
+            users = users.filter(pk=int(raw)) if raw.isdigit() else users.filter(username=raw)
+            if not users.exists():
+                raise CommandError(f"User not found: {raw}")
+        else:
+            users = users.filter(is_staff=False)
+
+        rebuilt = 0
+        for user_id in users.values_list("pk", flat=True).iterator():
+            for day in days:
+                rebuild_day(user_id, day)
+                rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} employee day KPI row(s)."))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.17 on 2026-10-19 13:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0015_employee_live_location_heartbeat_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeDayKpi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('visits_today', models.IntegerField(default=0, help_text='Submitted visits on date')),
+                ('total_visits', models.IntegerField(default=0, help_text='All submitted visits up to now')),
+                ('farmers_covered', models.IntegerField(default=0)),
+                ('recorded_visits', models.IntegerField(default=0, help_text='All visit rows on date')),
+                ('completed_visits', models.IntegerField(default=0)),
+                ('work_status', models.CharField(default='not_started', max_length=20)),
+                ('distance_km', models.FloatField(default=0)),
+                ('route_points', models.IntegerField(default=0)),
+                ('last_latitude', models.FloatField(blank=True, null=True)),
+                ('last_longitude', models.FloatField(blank=True, null=True)),
+                ('last_recorded_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_kpis', to=settings.AUTH_USER_MODEL)),
+                ('workday', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tracking.workday')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='uniq_employee_day_kpi')],
+            },
+        ),
+    ]
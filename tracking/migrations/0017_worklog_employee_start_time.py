@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-10-19 14:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0016_employee_day_kpi'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worklog',
+            index=models.Index(fields=['employee', 'start_time'], name='tracking_wo_employe_f6a2e1_idx'),
+        ),
+    ]
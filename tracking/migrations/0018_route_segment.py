@@ -0,0 +1,39 @@
+# Generated by Django 5.2.17 on 2026-10-19 15:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0017_worklog_employee_start_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('kind', models.CharField(choices=[('stop', 'Stop'), ('trip', 'Trip'), ('gap', 'GPS gap')], max_length=10)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('duration_seconds', models.IntegerField(default=0)),
+                ('point_count', models.IntegerField(default=0)),
+                ('distance_km', models.FloatField(default=0)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('is_open', models.BooleanField(default=False, help_text='Trailing segment of an active duty; recomputed on the next pass.')),
+                ('duty_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='tracking.dutysession')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['duty_session', 'sequence'],
+                'indexes': [models.Index(fields=['user', 'start_time'], name='tracking_ro_user_id_aab22a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('duty_session', 'sequence'), name='uniq_route_segment_sequence')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0018_route_segment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dutysession',
+            name='segmented_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -142,6 +142,54 @@ class EmployeeDailySummary(models.Model):
         return f"{self.user.username} | {self.date} | {self.total_distance_km} km"
 
 
+class EmployeeDayKpi(models.Model):
+    """
+    Materialized mobile/dashboard counters per employee per day.
+
+    Maintained by tracking.employee_kpis on visit save and GPS ingest; rebuilt
+    from source rows with ``manage.py rebuild_employee_kpis``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="day_kpis",
+    )
+    date = models.DateField()
+
+    visits_today = models.IntegerField(default=0, help_text="Submitted visits on date")
+    total_visits = models.IntegerField(default=0, help_text="All submitted visits up to now")
+    farmers_covered = models.IntegerField(default=0)
+    recorded_visits = models.IntegerField(default=0, help_text="All visit rows on date")
+    completed_visits = models.IntegerField(default=0)
+
+    workday = models.ForeignKey(
+        WorkDay,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    work_status = models.CharField(max_length=20, default="not_started")
+    distance_km = models.FloatField(default=0)
+    route_points = models.IntegerField(default=0)
+    # Tail of the route, for adding the next segment without re-reading the day.
+    last_latitude = models.FloatField(null=True, blank=True)
+    last_longitude = models.FloatField(null=True, blank=True)
+    last_recorded_at = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="uniq_employee_day_kpi"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} | {self.date} | {self.visits_today} visits"
+
+
 class AvailabilityEvent(models.Model):
     """
     Employee availability state changes
@@ -210,6 +258,8 @@ class DutySession(models.Model):
     longitude = models.DecimalField(
         max_digits=9, decimal_places=6, null=True, blank=True
     )
+    # Last tracking.segmentation pass; a final pass also marks duties without points.
+    segmented_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-start_time"]
@@ -381,3 +431,60 @@ class EmployeeRoutePoint(models.Model):
 
     def __str__(self):
         return f"Route {self.user_id} @ {self.recorded_at}"
+
+
+class RouteSegment(models.Model):
+    """Stop / trip / GPS gap derived from a duty's route points.
+
+    Written by tracking.segmentation: incrementally while the duty is active
+    (only the trailing ``is_open`` segment is recomputed) and finalized when
+    it ends.  Day reports and route replay read these rows, not raw points.
+    """
+
+    KIND_STOP = "stop"
+    KIND_TRIP = "trip"
+    KIND_GAP = "gap"
+    KIND_CHOICES = (
+        (KIND_STOP, "Stop"),
+        (KIND_TRIP, "Trip"),
+        (KIND_GAP, "GPS gap"),
+    )
+
+    duty_session = models.ForeignKey(
+        DutySession,
+        on_delete=models.CASCADE,
+        related_name="segments",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    sequence = models.PositiveIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    duration_seconds = models.IntegerField(default=0)
+    point_count = models.IntegerField(default=0)
+    distance_km = models.FloatField(default=0)
+    # Stop centroid; null for trips and gaps.
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    is_open = models.BooleanField(
+        default=False,
+        help_text="Trailing segment of an active duty; recomputed on the next pass.",
+    )
+
+    class Meta:
+        ordering = ["duty_session", "sequence"]
+        indexes = [
+            models.Index(fields=["user", "start_time"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["duty_session", "sequence"], name="uniq_route_segment_sequence"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.duty_session_id}#{self.sequence}"
@@ -9,6 +9,8 @@ from typing import Any
 
 from django.db.models import Q, QuerySet
 
+from utils.day_ranges import date_span_q
+
 from .models import LocationLog
 
 # Max segment length counted toward distance (filters GPS jumps).
@@ -90,7 +92,8 @@ def get_route_queryset(*, user_id: int, target_date: date) -> QuerySet:
     return (
         LocationLog.objects.filter(user_id=user_id)
         .filter(
-            Q(recorded_at__date=target_date) | Q(workday__date=target_date)
+            date_span_q("recorded_at", target_date, target_date)
+            | Q(workday__date=target_date)
         )
         .order_by("recorded_at", "id")
     )
@@ -136,6 +139,33 @@ def compute_route_distance_km(
     return round(total, 2)
 
 
+def advance_route_tail(tail, lat, lng, recorded_at) -> bool:
+    """
+    Append one point to a running route tail, matching
+    ``compute_route_distance_km`` segment for segment.
+
+    ``tail`` is any object with ``route_points``, ``distance_km``,
+    ``last_latitude``, ``last_longitude`` and ``last_recorded_at``
+    (EmployeeDayKpi rows, location telemetry).  A point older than the tail's
+    last point cannot be appended: the tail is left unchanged and False is
+    returned so the caller re-walks the points in time order.
+    """
+    if tail.last_recorded_at is not None and recorded_at < tail.last_recorded_at:
+        return False
+    tail.route_points += 1
+    tail.last_recorded_at = recorded_at
+    if not is_valid_coordinate(lat, lng):
+        tail.last_latitude = tail.last_longitude = None
+        return True
+    lat, lng = float(lat), float(lng)
+    if tail.last_latitude is not None and tail.last_longitude is not None:
+        segment = distance_km(tail.last_latitude, tail.last_longitude, lat, lng)
+        if segment <= MAX_ROUTE_SEGMENT_KM:
+            tail.distance_km += segment
+    tail.last_latitude, tail.last_longitude = lat, lng
+    return True
+
+
 def simplify_route_uniform(
     route: list[dict[str, Any]], *, max_points: int
 ) -> list[dict[str, Any]]:
@@ -226,6 +256,7 @@ def build_admin_route_data(
     display_meta: dict[str, Any] | None = None,
     raw_route: list[dict[str, Any]] | None = None,
     stops: list[dict[str, Any]] | None = None,
+    segments: list[dict[str, Any]] | None = None,
 ) -> dict[str, Any]:
     """Payload for admin route API (includes legacy keys + polyline)."""
     meta = display_meta or {}
@@ -307,4 +338,5 @@ def build_admin_route_data(
         "locations": route,
         "polyline": build_route_polyline(route),
         "stops": stops if stops is not None else [],
+        "segments": segments if segments is not None else [],
     }
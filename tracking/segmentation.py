@@ -0,0 +1,341 @@
+"""
+Stop / trip / GPS-gap segmentation of a duty's route (RouteSegment rows).
+
+The engine is a single forward pass over time-ordered points:
+
+- A **stop** is a dwell cluster: consecutive points within STOP_RADIUS_KM of
+  the point that opened it, spanning at least STOP_MIN_SECONDS.
+- A **gap** is a silence longer than GAP_SECONDS between two points that are
+  not in the same cluster (the phone went quiet while moving).
+- Everything else is a **trip**, with its path length.
+
+Coordinates are projected once per point onto a local plane (equirectangular,
+metres-accurate at district scale), so each comparison is a subtraction and a
+hypot instead of a haversine on raw lat/lng.
+
+``segment_duty`` keeps a duty's rows current: while the duty is active only
+the trailing open segment is rebuilt from its first point onward, so each
+pass touches a bounded tail; once the duty has ended every segment is closed.
+Every pass stamps ``DutySession.segmented_at``.
+
+Reads (``day_segments``) never write or lock: they use the stored rows and
+segment only the open tail in memory, queueing ``segment_duty_task`` at most
+once per ACTIVE_PASS_INTERVAL_SECONDS per duty to persist it.  The final pass
+after a duty ends is a full rebuild; a finalized duty without points is
+recognised by its stamp.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterable, Optional, Sequence
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from tracking.models import DutySession, EmployeeRoutePoint, RouteSegment
+from tracking.route_utils import MAX_ROUTE_SEGMENT_KM, is_valid_coordinate
+
+logger = logging.getLogger(__name__)
+
+STOP_RADIUS_KM = 0.1
+STOP_MIN_SECONDS = 5 * 60
+GAP_SECONDS = 15 * 60
+# Reads re-segment an active duty's open tail at most this often.
+ACTIVE_PASS_INTERVAL_SECONDS = 60
+
+_EARTH_RADIUS_KM = 6371.0088
+
+
+@dataclass
+class Segment:
+    kind: str
+    start_time: datetime
+    end_time: datetime
+    point_count: int = 0
+    distance_km: float = 0.0
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    @property
+    def duration_seconds(self) -> int:
+        return max(int((self.end_time - self.start_time).total_seconds()), 0)
+
+
+def _project(points: Sequence[tuple]) -> tuple[list[float], list[float], list[float]]:
+    """Plane coordinates in km (x east, y north) and epoch seconds, per point."""
+    lat0 = math.radians(points[0][0])
+    kx = _EARTH_RADIUS_KM * math.cos(lat0) * math.pi / 180
+    ky = _EARTH_RADIUS_KM * math.pi / 180
+    xs = [lng * kx for _, lng, _ in points]
+    ys = [lat * ky for lat, _, _ in points]
+    ts = [t.timestamp() for _, _, t in points]
+    return xs, ys, ts
+
+
+def segment_points(
+    points: Iterable[tuple], *, anchor: Optional[tuple] = None
+) -> list[Segment]:
+    """
+    Split ``(latitude, longitude, recorded_at)`` points (time-ordered) into
+    segments.  Each point belongs to one stop or trip.  ``anchor`` is the
+    point before ``points`` (end of an already-stored segment); it is never
+    clustered again, but the hop from it counts towards the first trip (or
+    opens a gap).
+    """
+    pts = [
+        (float(lat), float(lng), t)
+        for lat, lng, t in points
+        if t is not None and is_valid_coordinate(lat, lng)
+    ]
+    if not pts:
+        return []
+    offset = 0
+    if anchor is not None and is_valid_coordinate(anchor[0], anchor[1]):
+        pts.insert(0, (float(anchor[0]), float(anchor[1]), anchor[2]))
+        offset = 1
+    xs, ys, ts = _project(pts)
+    n = len(pts)
+
+    def hop(a: int, b: int) -> float:
+        return math.hypot(xs[b] - xs[a], ys[b] - ys[a])
+
+    segments: list[Segment] = []
+    trip: Optional[Segment] = None
+
+    def transit(a: int, b: int, *, arriving: bool) -> None:
+        """Travel from point ``a`` (-1: none) to point ``b``; ``b`` opens a stop if arriving."""
+        nonlocal trip
+        if a >= 0 and ts[b] - ts[a] > GAP_SECONDS:
+            if trip is not None:
+                segments.append(trip)
+                trip = None
+            segments.append(
+                Segment(RouteSegment.KIND_GAP, pts[a][2], pts[b][2], distance_km=hop(a, b))
+            )
+            a = -1
+        if trip is None and (a >= 0 or not arriving):
+            # Stop-to-stop with no point in between still records the hop.
+            start = pts[a][2] if arriving else pts[b][2]
+            trip = Segment(RouteSegment.KIND_TRIP, start, pts[b][2])
+        if a >= 0:
+            step = hop(a, b)
+            if step <= MAX_ROUTE_SEGMENT_KM:
+                trip.distance_km += step
+        if arriving:
+            if trip is not None:
+                if not trip.point_count:
+                    trip.end_time = pts[b][2]
+                segments.append(trip)
+                trip = None
+            return
+        trip.point_count += 1
+        trip.end_time = pts[b][2]
+
+    last = offset - 1
+    i = offset
+    while i < n:
+        j = i
+        while j + 1 < n and hop(i, j + 1) <= STOP_RADIUS_KM:
+            j += 1
+        if ts[j] - ts[i] >= STOP_MIN_SECONDS:
+            transit(last, i, arriving=True)
+            count = j - i + 1
+            segments.append(
+                Segment(
+                    RouteSegment.KIND_STOP,
+                    pts[i][2],
+                    pts[j][2],
+                    point_count=count,
+                    latitude=sum(p[0] for p in pts[i : j + 1]) / count,
+                    longitude=sum(p[1] for p in pts[i : j + 1]) / count,
+                )
+            )
+            last, i = j, j + 1
+            continue
+        transit(last, i, arriving=False)
+        last, i = i, i + 1
+    if trip is not None:
+        segments.append(trip)
+    return segments
+
+
+# ──────────────────────────────────────────────────────────────
+# Persistence
+# ──────────────────────────────────────────────────────────────
+
+
+def _route_points(duty_id: int):
+    return EmployeeRoutePoint.objects.filter(duty_session_id=duty_id).order_by("recorded_at", "id")
+
+
+def _tail(duty: DutySession, rows) -> tuple[int, list[Segment]]:
+    """
+    (first sequence to rewrite, segments from there on) for ``duty``'s stored
+    ``rows``: resumes at the trailing open segment, else after the last row.
+
+    The point before an open segment is an anchor only when a stop precedes
+    it (the hop out of a stop belongs to the next trip).  A closed trip or
+    gap already ends on the open segment's first point, so anchoring there
+    would count that hop twice.
+    """
+    open_row = rows.filter(is_open=True).order_by("sequence").first()
+    last_row = rows.order_by("-sequence").first()
+    points = _route_points(duty.pk)
+    anchor_qs = None
+    next_sequence = 0
+    if open_row is not None:
+        next_sequence = open_row.sequence
+        previous = rows.filter(sequence__lt=open_row.sequence).order_by("-sequence").first()
+        if previous is not None and previous.kind == RouteSegment.KIND_STOP:
+            anchor_qs = points.filter(recorded_at__lt=open_row.start_time)
+        points = points.filter(recorded_at__gte=open_row.start_time)
+    elif last_row is not None:
+        next_sequence = last_row.sequence + 1
+        anchor_qs = points.filter(recorded_at__lte=last_row.end_time)
+        points = points.filter(recorded_at__gt=last_row.end_time)
+    anchor = None
+    if anchor_qs is not None:
+        anchor = anchor_qs.values_list("latitude", "longitude", "recorded_at").last()
+    segments = segment_points(
+        points.values_list("latitude", "longitude", "recorded_at").iterator(chunk_size=2000),
+        anchor=anchor,
+    )
+    return next_sequence, segments
+
+
+def _segment_rows(
+    duty: DutySession, first_sequence: int, segments: list[Segment], *, final: bool
+) -> list[RouteSegment]:
+    return [
+        RouteSegment(
+            duty_session_id=duty.pk,
+            user_id=duty.user_id,
+            sequence=first_sequence + index,
+            kind=segment.kind,
+            start_time=segment.start_time,
+            end_time=segment.end_time,
+            duration_seconds=segment.duration_seconds,
+            point_count=segment.point_count,
+            distance_km=round(segment.distance_km, 3),
+            latitude=segment.latitude,
+            longitude=segment.longitude,
+            is_open=not final and index == len(segments) - 1,
+        )
+        for index, segment in enumerate(segments)
+    ]
+
+
+@transaction.atomic
+def segment_duty(
+    duty: DutySession, *, final: Optional[bool] = None, rebuild: bool = False
+) -> int:
+    """
+    Bring ``duty``'s RouteSegment rows up to date; returns rows (re)written.
+
+    Only points from the start of the trailing open segment are read, so
+    points replayed late (older than that) wait for a rebuild.  ``final``
+    defaults to "duty has ended"; final passes always rebuild and leave no
+    open rows.
+    """
+    duty = DutySession.objects.select_for_update().get(pk=duty.pk)
+    final = not duty.is_active if final is None else final
+
+    rows = RouteSegment.objects.filter(duty_session_id=duty.pk)
+    if rebuild or final:
+        rows.delete()
+    next_sequence, segments = _tail(duty, rows)
+    rows.filter(sequence__gte=next_sequence).delete()
+    RouteSegment.objects.bulk_create(_segment_rows(duty, next_sequence, segments, final=final))
+    _stamp(duty)
+    return len(segments)
+
+
+def _stamp(duty: DutySession) -> None:
+    duty.segmented_at = timezone.now()
+    DutySession.objects.filter(pk=duty.pk).update(segmented_at=duty.segmented_at)
+
+
+def _send_segmentation(duty_id: int) -> None:
+    try:
+        from tracking.tasks import segment_duty_task
+
+        segment_duty_task.delay(duty_id)
+    except Exception as exc:  # noqa: BLE001 - reads segment the tail in memory meanwhile
+        logger.warning(
+            "event=duty_segmentation_enqueue_failed duty_session_id=%s error=%s", duty_id, exc
+        )
+
+
+def enqueue_duty_segmentation(duty: DutySession) -> None:
+    """Finalize segments after the duty-end transaction commits."""
+    transaction.on_commit(lambda: _send_segmentation(duty.pk))
+
+
+# ──────────────────────────────────────────────────────────────
+# Read path
+# ──────────────────────────────────────────────────────────────
+
+
+def _finalized(duty: DutySession) -> bool:
+    stamp = duty.segmented_at
+    if duty.is_active or stamp is None:
+        return False
+    return duty.end_time is None or stamp >= duty.end_time
+
+
+def _pass_due(duty: DutySession) -> bool:
+    stamp = duty.segmented_at
+    if not duty.is_active or stamp is None:
+        return True
+    return (timezone.now() - stamp).total_seconds() >= ACTIVE_PASS_INTERVAL_SECONDS
+
+
+def _queue_pass(duty: DutySession) -> None:
+    # One queued pass per duty per interval, however many admins are reading.
+    if cache.add(f"tracking:segments:queued:{duty.pk}", 1, ACTIVE_PASS_INTERVAL_SECONDS):
+        _send_segmentation(duty.pk)
+
+
+def day_segments(user_id: int, target_date: date) -> list[RouteSegment]:
+    """
+    Segments of every duty on ``target_date``, in time order, without writing.
+
+    Stored rows are used up to the open tail; the tail is segmented in memory
+    (unsaved rows) and persisting it is left to ``segment_duty_task``, queued
+    here when a pass is due.
+    """
+    segments: list[RouteSegment] = []
+    for duty in DutySession.objects.filter(user_id=user_id, date=target_date):
+        rows = RouteSegment.objects.filter(duty_session_id=duty.pk)
+        if _finalized(duty):
+            segments.extend(rows)
+            continue
+        next_sequence, tail = _tail(duty, rows)
+        segments.extend(rows.filter(sequence__lt=next_sequence))
+        segments.extend(_segment_rows(duty, next_sequence, tail, final=not duty.is_active))
+        if _pass_due(duty):
+            _queue_pass(duty)
+    return sorted(segments, key=lambda s: (s.start_time, s.duty_session_id, s.sequence))
+
+
+def idle_minutes_from_segments(segments: Iterable[RouteSegment]) -> int:
+    return sum(s.duration_seconds for s in segments if s.kind == RouteSegment.KIND_STOP) // 60
+
+
+def serialize_segment(segment: RouteSegment) -> dict:
+    return {
+        "type": segment.kind,
+        "start_time": segment.start_time.isoformat(),
+        "end_time": segment.end_time.isoformat(),
+        "duration_seconds": segment.duration_seconds,
+        "point_count": segment.point_count,
+        "distance_km": round(segment.distance_km, 2),
+        "latitude": segment.latitude,
+        "longitude": segment.longitude,
+        "is_open": segment.is_open,
+    }
@@ -6,10 +6,10 @@ This signal is a compatibility safety net only — it never creates a second
 point when the service already wrote one, and prefers the service helper.
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from tracking.models import EmployeeRoutePoint
+from tracking.models import EmployeeRoutePoint, LocationLog, WorkDay
 from visits.models import Visit
 from visits.submitted import visit_has_submitted_details
 
@@ -36,3 +36,56 @@ def visit_save_permanent_route_point(sender, instance: Visit, raw=False, **kwarg
     from visits.services.field_visit_service import ensure_visit_route_point
 
     ensure_visit_route_point(instance)
+
+
+# ── Employee day KPI counters (tracking.employee_kpis) ──
+
+
+@receiver(pre_save, sender=Visit)
+def visit_remember_day_kpi_key(sender, instance: Visit, raw=False, **kwargs):
+    if raw or not instance.pk:
+        return
+    # A visit_date or employee change must also re-count the row the visit leaves.
+    instance._kpi_previous_key = (
+        Visit.objects.filter(pk=instance.pk).values_list("employee_id", "visit_date").first()
+    )
+
+
+@receiver(post_save, sender=Visit)
+def visit_saved_refresh_day_kpis(sender, instance: Visit, raw=False, **kwargs):
+    if raw or not instance.employee_id:
+        return
+    from tracking.employee_kpis import refresh_visit_counters
+
+    refresh_visit_counters(
+        instance.employee_id,
+        instance.visit_date,
+        getattr(instance, "_kpi_previous_key", None),
+    )
+
+
+@receiver(post_delete, sender=Visit)
+def visit_deleted_refresh_day_kpis(sender, instance: Visit, **kwargs):
+    if not instance.employee_id:
+        return
+    from tracking.employee_kpis import refresh_visit_counters
+
+    refresh_visit_counters(instance.employee_id, instance.visit_date)
+
+
+@receiver(post_save, sender=LocationLog)
+def location_saved_update_day_kpis(sender, instance: LocationLog, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    from tracking.employee_kpis import record_location
+
+    record_location(instance)
+
+
+@receiver(post_save, sender=WorkDay)
+def workday_saved_refresh_day_kpis(sender, instance: WorkDay, raw=False, **kwargs):
+    if raw:
+        return
+    from tracking.employee_kpis import refresh_workday
+
+    refresh_workday(instance)
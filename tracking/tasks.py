@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import os
 
 from celery import shared_task
 
@@ -35,3 +36,42 @@ def expire_overdue_duties_task(self) -> int:
     except Exception as exc:
         logger.exception("event=duty_auto_expiry_task_failed")
         raise self.retry(exc=exc)
+
+
+@shared_task(
+    name="tracking.tasks.segment_duty_task",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    acks_late=True,
+)
+def segment_duty_task(self, duty_id: int) -> int:
+    """Stop/trip segmentation pass: the open tail while active, a full rebuild once ended."""
+    from tracking.models import DutySession
+    from tracking.segmentation import segment_duty
+
+    duty = DutySession.objects.filter(pk=duty_id).first()
+    if duty is None:
+        return 0
+    try:
+        return segment_duty(duty)
+    except Exception as exc:
+        logger.exception("event=duty_segmentation_failed duty_session_id=%s", duty_id)
+        raise self.retry(exc=exc)
+
+
+@shared_task(
+    name="tracking.tasks.drain_gps_ingest_task",
+    bind=True,
+    ignore_result=True,
+)
+def drain_gps_ingest_task(self) -> int:
+    """
+    Apply queued GPS points (GPS_INGEST_MODE=queue) until the stream is empty
+    or GPS_INGEST_DRAIN_SECONDS pass.  Concurrent runs share the consumer
+    group, so every worker in the pool can drain at once.
+    """
+    from tracking.gps_queue import drain_until_idle
+
+    consumer = f"{self.request.hostname or 'worker'}-{os.getpid()}"
+    return drain_until_idle(consumer=consumer)["applied"]
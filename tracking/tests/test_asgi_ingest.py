@@ -0,0 +1,173 @@
+"""Async heartbeat / GPS push fast path (tracking.asgi_ingest)."""
+
+import json
+import threading
+import uuid
+
+from asgiref.sync import async_to_sync, sync_to_async
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import User
+from django.core import signals
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import EmployeeProfile
+from tracking.asgi_ingest import IngestFastPath
+from tracking.models import DutySession, EmployeeLiveLocation, EmployeeRoutePoint
+
+
+class _DjangoStandIn:
+    """Records requests the fast path hands back to Django."""
+
+    def __init__(self):
+        self.bodies = []
+
+    async def __call__(self, scope, receive, send):
+        message = await receive()
+        self.bodies.append(message.get("body", b""))
+        await send({"type": "http.response.start", "status": 418, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+class IngestFastPathTests(TestCase):
+    def setUp(self):
+        # As django.test.Client does: keep the test transaction's connection.
+        for signal in (signals.request_started, signals.request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        self.employee = User.objects.create_user(username="ingest_emp", password="secret123")
+        EmployeeProfile.objects.create(
+            user=self.employee,
+            employee_id="ING-001",
+            phone="9000000801",
+            is_active_employee=True,
+            can_login=True,
+        )
+        client = APIClient()
+        login = client.post(
+            "/api/v1/mobile/auth/login/",
+            {"employee_id": "ING-001", "password": "secret123", "platform": "android"},
+            format="json",
+        )
+        self.assertEqual(login.status_code, 200, login.data)
+        self.token = login.data["access"]
+        self.session = login.data["device_session_id"]
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.token}", HTTP_X_DEVICE_SESSION=self.session
+        )
+        client.post(
+            "/api/v1/tracking/duty/start/",
+            {"latitude": 12.9716, "longitude": 77.5946},
+            format="json",
+        )
+        self.duty = DutySession.objects.get(user=self.employee, is_active=True)
+        self.django = _DjangoStandIn()
+        self.app = IngestFastPath(self.django)
+
+    def _post(
+        self, path, payload, *, token=None, session=None, content_type=b"application/json", extra=()
+    ):
+        headers = [(b"content-type", content_type), *extra]
+        headers.append((b"authorization", f"Bearer {token or self.token}".encode()))
+        headers.append((b"x-device-session", (session or self.session).encode()))
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+
+        async def run():
+            communicator = ApplicationCommunicator(
+                self.app,
+                {"type": "http", "method": "POST", "path": path, "headers": headers},
+            )
+            await communicator.send_input({"type": "http.request", "body": body})
+            start = await communicator.receive_output(5)
+            content = (await communicator.receive_output(5))["body"]
+            self.response_headers = dict(start.get("headers") or [])
+            return start["status"], json.loads(content) if content else None
+
+        return async_to_sync(run)()
+
+    def test_heartbeat_answered_without_django(self):
+        status_code, body = self._post(
+            "/api/v1/tracking/heartbeat/",
+            {"duty_session_id": self.duty.pk, "gps_enabled": True, "client_heartbeat_id": "a1"},
+        )
+        self.assertEqual(status_code, 200, body)
+        self.assertEqual(body["message"], "Heartbeat received")
+        self.assertEqual(self.django.bodies, [])
+        self.assertIsNotNone(EmployeeLiveLocation.objects.get(user=self.employee).last_heartbeat_at)
+
+    @override_settings(ASGI_INGEST_THREAD_SENSITIVE=False)
+    def test_sync_work_runs_off_the_shared_sync_thread_with_its_request_signals(self):
+        modes, threads = [], []
+
+        def run_on_sync_thread(func, *, thread_sensitive):
+            # The test transaction lives on the sync thread; record the mode only.
+            modes.append(thread_sensitive)
+            return sync_to_async(func, thread_sensitive=True)
+
+        def record_thread(**kwargs):
+            threads.append(threading.get_ident())
+
+        for signal in (signals.request_started, signals.request_finished):
+            signal.connect(record_thread)
+            self.addCleanup(signal.disconnect, record_thread)
+        with mock.patch("tracking.asgi_ingest.sync_to_async", side_effect=run_on_sync_thread):
+            status_code, body = self._post("/api/v1/tracking/heartbeat/", {})
+        self.assertEqual(status_code, 200, body)
+        self.assertEqual(modes, [False])
+        # Sent where the DB work ran (here: the test's sync thread), not on the event loop.
+        self.assertEqual(threads, [threading.get_ident()] * 2)
+
+    def test_location_push_and_bulk_validation(self):
+        status_code, body = self._post(
+            "/api/v1/tracking/location/push/",
+            {"latitude": 12.9721, "longitude": 77.5951, "accuracy": 8},
+        )
+        self.assertEqual(status_code, 201, body)
+        self.assertEqual(body["message"], "Location saved")
+        self.assertTrue(EmployeeRoutePoint.objects.filter(duty_session=self.duty).exists())
+
+        status_code, body = self._post(
+            "/api/v1/tracking/locations/bulk-push/", {"locations": "not-a-list"}
+        )
+        self.assertEqual(status_code, 400)
+        self.assertFalse(body["success"])
+        self.assertEqual(self.django.bodies, [])
+
+    def test_replaced_device_session_is_rejected(self):
+        status_code, body = self._post(
+            "/api/v1/tracking/heartbeat/", {}, session=str(uuid.uuid4())
+        )
+        self.assertEqual(status_code, 409)
+        self.assertEqual(body["code"], "SESSION_REPLACED")
+
+    def test_everything_else_is_replayed_to_django(self):
+        admin = User.objects.create_user(username="ingest_admin", password="x", is_staff=True)
+        admin_token = str(RefreshToken.for_user(admin).access_token)
+        self.assertEqual(self._post("/api/v1/tracking/heartbeat/", {}, token=admin_token)[0], 418)
+        self.assertEqual(self._post("/api/v1/tracking/heartbeat/", {}, token="bad")[0], 418)
+        self.assertEqual(
+            self._post("/api/v1/tracking/heartbeat/", b"gps_enabled=1", content_type=b"text/plain")[0],
+            418,
+        )
+        self.assertEqual(self._post("/api/v1/tracking/duty/start/", {})[0], 418)
+        self.assertEqual(self.django.bodies[-2], b"gps_enabled=1")
+
+    def test_user_throttle_and_request_id_apply(self):
+        cache.clear()
+        path = "/api/v1/tracking/heartbeat/"
+        with mock.patch.dict(UserRateThrottle.THROTTLE_RATES, {"user": "2/minute"}):
+            self.assertEqual(self._post(path, {}, extra=[(b"x-request-id", b"req-1")])[0], 200)
+            self.assertEqual(self.response_headers[b"X-Request-ID"], b"req-1")
+            self.assertIn(b"Server-Timing", self.response_headers)
+            self.assertEqual(self._post(path, {})[0], 200)
+            status_code, body = self._post(path, {})
+        self.assertEqual(status_code, 429)
+        self.assertEqual(body["code"], "throttled")
+        self.assertEqual(self.django.bodies, [])
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmployeeProfile
+from masters.models import Crop, District, Farmer, Village
+from tracking.day_summary_batch import build_day_summaries
+from tracking.employee_report import build_employee_day_summary
+from tracking.models import DutySession, EmployeeLiveLocation, EmployeeRoutePoint, WorkDay
+from utils.query_budget import query_budget
+from visits.models import Visit
+
+STEP = 0.0045  # ~500 m
+
+
+class DaySummaryBatchTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+        self.t0 = self.now - timedelta(hours=2)
+        district = District.objects.create(name="Batch District")
+        self.village = Village.objects.create(name="Batch Village", district=district)
+        self.crop = Crop.objects.create(name_en="Paddy", name_ta="Paddy", is_active=True)
+        self.farmers = [
+            Farmer.objects.create(
+                name=f"Batch Farmer {i}",
+                phone=f"94000000{i:02d}",
+                district=district,
+                village=self.village,
+            )
+            for i in range(2)
+        ]
+        self.profiles = [self._employee(i) for i in range(3)]
+
+    def _employee(self, index):
+        user = User.objects.create_user(username=f"batch_emp{index}", password="x")
+        profile = EmployeeProfile.objects.create(
+            user=user,
+            employee_id=f"BAT-{index:03d}",
+            phone=f"90000880{index:02d}",
+            is_active_employee=True,
+            village=self.village,
+        )
+        if index == 0:
+            return profile  # no duty, no points
+        workday = WorkDay.objects.create(
+            user=user, date=self.today, start_time=self.t0, is_active=index == 1
+        )
+        duty = DutySession.objects.create(
+            user=user,
+            workday=workday,
+            date=self.today,
+            start_time=self.t0,
+            end_time=None if index == 1 else self.t0 + timedelta(minutes=40),
+            is_active=index == 1,
+            latitude=Decimal("11.900000"),
+            longitude=Decimal("79.300000"),
+        )
+        legs = [(m, 11.9, 79.3) for m in range(0, 11, 2)]
+        legs += [(12 + m, 11.9 + STEP * (m + 1), 79.3) for m in range(3 * index)]
+        for minutes, lat, lng in legs:
+            EmployeeRoutePoint.objects.create(
+                user=user,
+                duty_session=duty,
+                latitude=Decimal(str(round(lat, 6))),
+                longitude=Decimal(str(round(lng, 6))),
+                recorded_at=self.t0 + timedelta(minutes=minutes),
+            )
+        EmployeeLiveLocation.objects.create(
+            user=user,
+            duty_session=duty,
+            latitude=Decimal("11.900000"),
+            longitude=Decimal("79.300000"),
+            recorded_at=self.t0 + timedelta(minutes=10),
+        )
+        for farmer in self.farmers[:index]:
+            Visit.objects.create(
+                employee=user,
+                visit_date=self.today,
+                visit_time=self.now.time(),
+                farmer=farmer,
+                farmer_name=farmer.name,
+                village=self.village,
+                crop=self.crop,
+                latitude=11.9,
+                longitude=79.3,
+            )
+        Visit.objects.create(
+            employee=user, visit_date=self.today, farmer_name="Draft", status="pending"
+        )
+        return profile
+
+    def test_matches_per_employee_summary(self):
+        batch = build_day_summaries(self.today, now=self.now)
+        self.assertEqual([row["employee_id"] for row in batch], ["BAT-000", "BAT-001", "BAT-002"])
+        for row, emp in zip(batch, self.profiles):
+            single = build_employee_day_summary(emp=emp, target_date=self.today, now=self.now)
+            self.assertEqual(row, single, emp.employee_id)
+        self.assertEqual(batch[2]["visits_completed"], 2)
+        self.assertEqual(batch[2]["pending_visits"], 1)
+        self.assertGreater(batch[2]["idle_minutes"], 0)
+
+    def test_query_count_does_not_grow_with_team_size(self):
+        with query_budget(12, max_duplicates=0, label="three employees") as small:
+            build_day_summaries(self.today, now=self.now)
+        self.profiles += [self._employee(i) for i in range(3, 8)]
+        with query_budget(12, max_duplicates=0, label="eight employees") as large:
+            rows = build_day_summaries(self.today, now=self.now)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(small.queries, large.queries)
+
+    def test_api_filters_by_user_ids(self):
+        admin = User.objects.create_user(username="batch_admin", password="x", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        ids = f"{self.profiles[1].user_id},{self.profiles[2].user_id}"
+        for url in (
+            "/api/admin/employees/day-summaries/",
+            "/api/v1/tracking/admin/employees/day-summaries/",
+        ):
+            data = client.get(url, {"date": str(self.today), "user_ids": ids}).json()["data"]
+            self.assertEqual(data["count"], 2)
+            self.assertEqual([r["employee_id"] for r in data["results"]], ["BAT-001", "BAT-002"])
+
+        bad = client.get("/api/admin/employees/day-summaries/", {"user_ids": "1,x"})
+        self.assertEqual(bad.status_code, 400)
@@ -0,0 +1,172 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from masters.models import Crop, Farmer
+from mobile_api.dashboard_metrics import mobile_dashboard_metrics
+from tracking.duty_expiry import expire_overdue_duties
+from tracking import employee_kpis
+from tracking.duty_service import end_duty
+from tracking.employee_kpis import get_day_kpis
+from tracking.location_helpers import workday_distance_km
+from tracking.models import DutySession, EmployeeDayKpi, LocationLog, WorkDay
+from visits.models import Visit
+
+
+class EmployeeDayKpiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="kpi_emp", password="x")
+        self.today = timezone.localdate()
+        self.start = timezone.now() - timedelta(hours=2)
+        self.workday = WorkDay.objects.create(
+            user=self.user, date=self.today, start_time=self.start, is_active=True
+        )
+        self.crop = Crop.objects.create(name_en="Paddy", name_ta="Paddy")
+        self.farmer = Farmer.objects.create(name="KPI Farmer")
+
+    def _point(self, minutes, lat, lng):
+        return LocationLog.objects.create(
+            user=self.user,
+            workday=self.workday,
+            latitude=Decimal(lat),
+            longitude=Decimal(lng),
+            recorded_at=self.start + timedelta(minutes=minutes),
+        )
+
+    def _visit(self, day=None):
+        return Visit.objects.create(
+            employee=self.user,
+            farmer=self.farmer,
+            crop=self.crop,
+            latitude=11.9,
+            longitude=79.3,
+            visit_date=day or self.today,
+        )
+
+    def test_dashboard_is_one_keyed_read_after_first_build(self):
+        self._point(0, "11.900000", "79.300000")
+        self._visit()
+        first = mobile_dashboard_metrics(self.user)
+        self.assertEqual(first["visits_today"], 1)
+        self.assertEqual(first["work_status"], "started")
+
+        with self.assertNumQueries(1):
+            mobile_dashboard_metrics(self.user)
+
+    def test_visit_and_gps_writes_keep_row_current(self):
+        get_day_kpis(self.user, self.today)
+        self._point(0, "11.900000", "79.300000")
+        self._point(5, "11.910000", "79.300000")
+        self._point(10, "11.920000", "79.310000")
+        self._point(3, "11.905000", "79.300000")  # late arrival -> full walk
+        self._visit()
+        self._visit(self.today - timedelta(days=3))
+
+        row = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+        self.assertEqual(row.route_points, 4)
+        self.assertAlmostEqual(round(row.distance_km, 2), workday_distance_km(self.workday.pk))
+        self.assertEqual(row.visits_today, 1)
+        self.assertEqual(row.total_visits, 2)
+        self.assertEqual(row.farmers_covered, 1)
+
+        self.workday.is_active = False
+        self.workday.end_time = timezone.now()
+        self.workday.save()
+        row.refresh_from_db()
+        self.assertEqual(row.work_status, "stopped")
+
+    def test_gps_points_are_appended_without_locking_the_row(self):
+        get_day_kpis(self.user, self.today)
+        self._point(0, "11.900000", "79.300000")
+        with mock.patch.object(
+            QuerySet, "select_for_update", autospec=True, side_effect=QuerySet.select_for_update
+        ) as locked, self.assertNumQueries(3):
+            self._point(5, "11.910000", "79.300000")
+        locked.assert_not_called()
+        row = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+        self.assertEqual(row.route_points, 2)
+        self.assertAlmostEqual(round(row.distance_km, 2), workday_distance_km(self.workday.pk))
+
+    def test_lost_append_race_is_retried(self):
+        get_day_kpis(self.user, self.today)
+        self._point(0, "11.900000", "79.300000")
+        real_advance = employee_kpis.advance_route_tail
+
+        def racing_advance(row, *args):
+            if not racing_advance.raced:
+                racing_advance.raced = True
+                self._point(2, "11.905000", "79.300000")  # another writer wins first
+            return real_advance(row, *args)
+
+        racing_advance.raced = False
+        with mock.patch("tracking.employee_kpis.advance_route_tail", side_effect=racing_advance):
+            self._point(5, "11.910000", "79.300000")
+        row = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+        self.assertEqual(row.route_points, 3)
+        self.assertAlmostEqual(round(row.distance_km, 2), workday_distance_km(self.workday.pk))
+
+    def test_moving_a_visit_to_another_day_recounts_both_days(self):
+        past = self.today - timedelta(days=2)
+        visit = self._visit(past)
+        get_day_kpis(self.user, past)
+        get_day_kpis(self.user, past - timedelta(days=1))
+
+        visit.visit_date = past - timedelta(days=1)
+        visit.save()
+
+        self.assertEqual(EmployeeDayKpi.objects.get(user=self.user, date=past).visits_today, 0)
+        self.assertEqual(
+            EmployeeDayKpi.objects.get(user=self.user, date=visit.visit_date).visits_today, 1
+        )
+
+    def test_rebuild_command_matches_incremental_row(self):
+        get_day_kpis(self.user, self.today)
+        self._point(0, "11.900000", "79.300000")
+        self._point(5, "11.950000", "79.350000")
+        self._visit()
+        before = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+
+        EmployeeDayKpi.objects.update(visits_today=0, distance_km=0)
+        call_command("rebuild_employee_kpis", "--user", "kpi_emp", stdout=StringIO())
+
+        after = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+        self.assertEqual(after.visits_today, before.visits_today)
+        self.assertAlmostEqual(after.distance_km, before.distance_km)
+        self.assertEqual(after.route_points, 2)
+
+    def _duty(self, start_time):
+        return DutySession.objects.create(
+            user=self.user,
+            workday=self.workday,
+            date=self.today,
+            start_time=start_time,
+            is_active=True,
+            last_heartbeat=start_time,
+        )
+
+    def test_manual_duty_end_marks_row_stopped(self):
+        self._duty(self.start)
+        self.assertEqual(get_day_kpis(self.user, self.today).work_status, "started")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            end_duty(self.user)
+
+        row = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+        self.assertEqual(row.work_status, "stopped")
+
+    def test_auto_expiry_marks_row_expired(self):
+        self._duty(timezone.now() - timedelta(hours=10))
+        self.assertEqual(get_day_kpis(self.user, self.today).work_status, "started")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expire_overdue_duties(trigger="test"), 1)
+
+        row = EmployeeDayKpi.objects.get(user=self.user, date=self.today)
+        self.assertEqual(row.work_status, "expired")
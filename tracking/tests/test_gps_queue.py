@@ -0,0 +1,150 @@
+"""Queue-backed GPS ingestion: 202 ack, batched consumer, at-least-once replay."""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmployeeProfile
+from tracking import gps_queue
+from tracking.duty_service import end_duty
+from tracking.models import DutySession, EmployeeLiveLocation, EmployeeRoutePoint
+
+
+@override_settings(GPS_INGEST_MODE="queue", GPS_INGEST_REDIS_URL="")
+class GpsQueueIngestTests(TestCase):
+    def setUp(self):
+        gps_queue.get_gps_stream.cache_clear()
+        self.addCleanup(gps_queue.get_gps_stream.cache_clear)
+        self.employee = User.objects.create_user(username="queue_emp", password="secret123")
+        EmployeeProfile.objects.create(
+            user=self.employee,
+            employee_id="GQ-001",
+            phone="9000000901",
+            is_active_employee=True,
+            can_login=True,
+        )
+        self.client = APIClient()
+        login = self.client.post(
+            "/api/v1/mobile/auth/login/",
+            {"employee_id": "GQ-001", "password": "secret123", "platform": "android"},
+            format="json",
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {login.data['access']}",
+            HTTP_X_DEVICE_SESSION=login.data["device_session_id"],
+        )
+        self.client.post(
+            "/api/v1/tracking/duty/start/",
+            {"latitude": 12.9716, "longitude": 77.5946},
+            format="json",
+        )
+        self.duty = DutySession.objects.get(user=self.employee, is_active=True)
+
+    def _point(self, client_point_id, lat=12.9720):
+        return {
+            "latitude": lat,
+            "longitude": 77.5950,
+            "recorded_at": timezone.now().isoformat(),
+            "client_point_id": client_point_id,
+        }
+
+    def _route_points(self):
+        return EmployeeRoutePoint.objects.filter(
+            duty_session=self.duty, client_point_id__startswith="q-"
+        )
+
+    def test_push_is_acknowledged_then_applied_by_consumer(self):
+        r = self.client.post("/api/v1/tracking/location/push/", self._point("q-1"), format="json")
+        self.assertEqual(r.status_code, 202, r.data)
+        self.assertEqual(r.data["accepted_ids"], ["q-1"])
+        self.assertFalse(self._route_points().exists())
+        self.assertEqual(gps_queue.gps_ingest_metrics()["backlog"], 1)
+
+        counts = gps_queue.drain_gps_stream(consumer="test")
+        self.assertEqual(counts["applied"], 1)
+        self.assertEqual(list(self._route_points().values_list("client_point_id", flat=True)), ["q-1"])
+        live = EmployeeLiveLocation.objects.get(user=self.employee)
+        self.assertEqual(live.last_client_point_id, "q-1")
+        metrics = gps_queue.gps_ingest_metrics()
+        self.assertEqual((metrics["backlog"], metrics["pending"]), (0, 0))
+
+    @override_settings(GPS_INGEST_CLAIM_IDLE_SECONDS=0)
+    def test_entries_of_a_dead_consumer_are_replayed_once(self):
+        points = [self._point("q-1"), self._point("q-2", lat=12.9730)]
+        r = self.client.post("/api/v1/tracking/location/bulk-push/", points, format="json")
+        self.assertEqual(r.status_code, 202, r.data)
+
+        # A consumer takes the batch and dies before acknowledging it.
+        self.assertEqual(len(gps_queue.get_gps_stream().read("crashed", 10)), 2)
+        self.assertEqual(gps_queue.gps_ingest_metrics()["pending"], 2)
+
+        self.assertEqual(gps_queue.drain_gps_stream(consumer="test")["applied"], 2)
+        # The phone retries the same batch: replays are absorbed by client_point_id.
+        self.client.post("/api/v1/tracking/location/bulk-push/", points, format="json")
+        self.assertEqual(gps_queue.drain_gps_stream(consumer="test")["applied"], 2)
+        self.assertEqual(self._route_points().count(), 2)
+        self.assertEqual(gps_queue.gps_ingest_metrics()["backlog"], 0)
+
+    def test_invalid_points_are_rejected_before_queueing(self):
+        r = self.client.post(
+            "/api/v1/tracking/location/bulk-push/",
+            [self._point("q-1"), self._point("q-bad", lat=123.0)],
+            format="json",
+        )
+        self.assertEqual(r.status_code, 207, r.data)
+        self.assertEqual(r.data["queued"], 1)
+        self.assertEqual(r.data["failed_items"][0]["client_point_id"], "q-bad")
+
+        r = self.client.post(
+            "/api/v1/tracking/location/push/", self._point("q-bad", lat=123.0), format="json"
+        )
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.data["code"], "INVALID_COORDS")
+        self.assertEqual(gps_queue.gps_ingest_metrics()["backlog"], 1)
+
+    def test_consumer_killed_mid_batch_replays_only_the_unapplied_entry(self):
+        points = [self._point("q-1"), self._point("q-2", lat=12.9730)]
+        self.client.post("/api/v1/tracking/location/bulk-push/", points, format="json")
+        real_apply = gps_queue.apply_gps_point
+
+        def apply_then_die(user, duty, payload, **kwargs):
+            if payload["client_point_id"] == "q-2":
+                raise SystemExit("worker killed")
+            return real_apply(user, duty, payload, **kwargs)
+
+        with mock.patch.object(gps_queue, "apply_gps_point", side_effect=apply_then_die):
+            with self.assertRaises(SystemExit):
+                gps_queue.drain_gps_stream(consumer="test")
+        metrics = gps_queue.gps_ingest_metrics()
+        self.assertEqual((metrics["backlog"], metrics["pending"]), (1, 1))
+
+    def test_points_drained_after_duty_end_are_kept_and_resegmented(self):
+        r = self.client.post("/api/v1/tracking/location/push/", self._point("q-1"), format="json")
+        self.assertEqual(r.status_code, 202, r.data)
+        # Without a client id the usual route-point throttle applies: this
+        # ping repeats q-1's position seconds later and is not stored.
+        repeat = {**self._point(None), "client_point_id": None}
+        self.client.post("/api/v1/tracking/location/push/", repeat, format="json")
+        end_duty(self.employee)
+
+        with mock.patch.object(gps_queue, "enqueue_duty_segmentation") as resegment:
+            counts = gps_queue.drain_gps_stream(consumer="test")
+        self.assertEqual((counts["applied"], counts["rejected"]), (2, 0))
+        self.assertEqual(list(self._route_points().values_list("client_point_id", flat=True)), ["q-1"])
+        self.assertFalse(
+            EmployeeRoutePoint.objects.filter(
+                duty_session=self.duty, point_type=EmployeeRoutePoint.POINT_GPS,
+                client_point_id__isnull=True,
+            ).exists()
+        )
+        self.assertEqual([c.args[0].pk for c in resegment.call_args_list], [self.duty.pk])
+
+    @override_settings(GPS_INGEST_MEMORY_STREAM=False)
+    def test_queue_mode_requires_redis_outside_tests(self):
+        gps_queue.get_gps_stream.cache_clear()
+        with self.assertRaises(ImproperlyConfigured):
+            gps_queue.get_gps_stream()
@@ -0,0 +1,144 @@
+"""Admin live map stream: snapshot + pub/sub deltas over SSE (tracking.admin_live_stream)."""
+
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import EmployeeProfile
+from tracking import live_events
+from tracking.duty_service import end_duty
+from tracking.live_tracking_service import apply_heartbeat
+
+STREAM_URL = "/api/admin/tracking/live/stream/"
+
+
+def _parse(chunk: bytes) -> list[tuple[str, dict]]:
+    events = []
+    for block in chunk.decode().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if line.startswith(("event", "data"))
+        )
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class AdminLiveStreamTests(TestCase):
+    def setUp(self):
+        live_events.get_live_event_broker.cache_clear()
+        self.addCleanup(live_events.get_live_event_broker.cache_clear)
+        self.admin = User.objects.create_user(username="stream_admin", password="x", is_staff=True)
+        self.admin_token = str(RefreshToken.for_user(self.admin).access_token)
+        self.employee = User.objects.create_user(username="stream_emp", password="secret123")
+        EmployeeProfile.objects.create(
+            user=self.employee,
+            employee_id="LS-001",
+            phone="9000000951",
+            is_active_employee=True,
+            can_login=True,
+        )
+        client = APIClient()
+        login = client.post(
+            "/api/v1/mobile/auth/login/",
+            {"employee_id": "LS-001", "password": "secret123", "platform": "android"},
+            format="json",
+        )
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {login.data['access']}",
+            HTTP_X_DEVICE_SESSION=login.data["device_session_id"],
+        )
+        client.post(
+            "/api/v1/tracking/duty/start/",
+            {"latitude": 12.9716, "longitude": 77.5946},
+            format="json",
+        )
+
+    def _committed(self, fn, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return fn(*args, **kwargs)
+
+    def test_snapshot_then_coalesced_deltas_then_remove(self):
+        async def run():
+            response = await AsyncClient().get(
+                STREAM_URL, headers={"Authorization": f"Bearer {self.admin_token}"}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            stream = response.streaming_content.__aiter__()
+
+            [(name, snapshot)] = _parse(await stream.__anext__())
+            self.assertEqual(name, "snapshot")
+            self.assertEqual([row["user_id"] for row in snapshot["employees"]], [self.employee.pk])
+            self.assertIn("stale_seconds", snapshot)
+
+            # Two heartbeats waiting together reach the map as one delta.
+            for lat in (12.9720, 12.9730):
+                await sync_to_async(self._committed)(
+                    apply_heartbeat,
+                    self.employee,
+                    {"latitude": lat, "longitude": 77.5950, "gps_enabled": True},
+                )
+            [(name, delta)] = _parse(await stream.__anext__())
+            self.assertEqual(name, "delta")
+            self.assertEqual(delta["user_id"], self.employee.pk)
+            self.assertEqual(delta["latitude"], 12.973)
+            self.assertEqual(delta["tracking_status"], "ONLINE")
+
+            await sync_to_async(self._committed)(end_duty, self.employee)
+            [(name, removed)] = _parse(await stream.__anext__())
+            self.assertEqual((name, removed["user_id"]), ("remove", self.employee.pk))
+            await stream.aclose()
+
+        async_to_sync(run)()
+
+    def test_requires_staff_jwt_and_asgi(self):
+        async def get(token):
+            return await AsyncClient().get(STREAM_URL, headers={"Authorization": f"Bearer {token}"})
+
+        employee_token = str(RefreshToken.for_user(self.employee).access_token)
+        self.assertEqual(async_to_sync(get)("bad").status_code, 401)
+        self.assertEqual(async_to_sync(get)(employee_token).status_code, 403)
+
+        response = self.client.get(STREAM_URL, HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(response.json()["code"], "ASGI_REQUIRED")
+
+
+class LiveEventBrokerTests(SimpleTestCase):
+    def setUp(self):
+        live_events.get_live_event_broker.cache_clear()
+        self.addCleanup(live_events.get_live_event_broker.cache_clear)
+
+    @override_settings(LIVE_EVENTS_REDIS_URL="", LIVE_EVENTS_IN_PROCESS_OK=False)
+    def test_in_process_fallback_is_logged_outside_debug(self):
+        with self.assertLogs("tracking.live_events", level="WARNING") as logs:
+            broker = live_events.get_live_event_broker()
+        self.assertIsInstance(broker, live_events.InProcessLiveEventBroker)
+        self.assertIn("event=live_events_in_process_broker", logs.output[0])
+
+    def test_redis_subscriber_dropped_by_redis_is_told_to_resync(self):
+        dropped, fresh = mock.AsyncMock(), mock.AsyncMock()
+        dropped.get_message.side_effect = RedisConnectionError("output buffer limit")
+        fresh.get_message.return_value = {"data": '{"type": "employee", "user_id": 1}'}
+        client = mock.Mock(aclose=mock.AsyncMock())
+        client.pubsub.side_effect = [dropped, fresh]
+
+        async def run():
+            broker = live_events.RedisLiveEventBroker("redis://localhost:6379/0", "live")
+            with mock.patch("redis.asyncio.Redis.from_url", return_value=client):
+                sub = await broker.subscribe()
+            with self.assertLogs("tracking.live_events", level="WARNING"):
+                first = await sub.get(1)
+            return first, await sub.get(1)
+
+        first, second = async_to_sync(run)()
+        self.assertEqual(json.loads(first), {"type": live_events.EVENT_RESYNC})
+        self.assertEqual(json.loads(second)["type"], "employee")
+        dropped.aclose.assert_awaited()
+        fresh.subscribe.assert_awaited_with("live")
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracking.employee_kpis import get_day_kpis
+from tracking.location_helpers import log_location_saved, workday_distance_km
+from tracking.location_telemetry import get_workday_telemetry, recompute_workday_telemetry
+from tracking.models import LocationLog, WorkDay
+
+
+class LocationTelemetryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="telemetry_emp", password="x")
+        self.start = timezone.now() - timedelta(hours=2)
+        self.workday = WorkDay.objects.create(
+            user=self.user, date=timezone.localdate(), start_time=self.start, is_active=True
+        )
+
+    def _save(self, minutes, lat, lng):
+        location = LocationLog.objects.create(
+            user=self.user,
+            workday=self.workday,
+            latitude=Decimal(lat),
+            longitude=Decimal(lng),
+            recorded_at=self.start + timedelta(minutes=minutes),
+        )
+        total = log_location_saved(
+            source="test",
+            user_id=self.user.pk,
+            workday_id=self.workday.pk,
+            location=location,
+            recorded_at=location.recorded_at,
+        )
+        return location, total
+
+    def test_each_point_costs_no_queries_once_seeded(self):
+        _, total = self._save(0, "11.900000", "79.300000")
+        self.assertEqual(total, 1)
+        for minute, lat in ((5, "11.910000"), (10, "11.920000"), (15, "11.930000")):
+            location = LocationLog.objects.create(
+                user=self.user,
+                workday=self.workday,
+                latitude=Decimal(lat),
+                longitude=Decimal("79.300000"),
+                recorded_at=self.start + timedelta(minutes=minute),
+            )
+            with self.assertNumQueries(0):
+                total = log_location_saved(
+                    source="test",
+                    user_id=self.user.pk,
+                    workday_id=self.workday.pk,
+                    location=location,
+                    recorded_at=location.recorded_at,
+                )
+        telemetry = get_workday_telemetry(self.workday.pk)
+        self.assertEqual((total, telemetry.route_points), (4, 4))
+        self.assertAlmostEqual(telemetry.distance_km, workday_distance_km(self.workday.pk), places=2)
+
+    def test_out_of_order_point_is_counted_and_rewalked_like_kpis(self):
+        self._save(0, "11.900000", "79.300000")
+        self._save(10, "11.920000", "79.300000")
+        self._save(5, "11.950000", "79.300000")
+        telemetry = get_workday_telemetry(self.workday.pk)
+        self.assertEqual((telemetry.route_points, telemetry.out_of_order), (3, 1))
+        self.assertAlmostEqual(telemetry.distance_km, workday_distance_km(self.workday.pk), places=2)
+
+        # Same tracker as the dashboard row, so both report the same route.
+        kpis = get_day_kpis(self.user, self.workday.date)
+        self.assertEqual(kpis.route_points, telemetry.route_points)
+        self.assertAlmostEqual(kpis.distance_km, telemetry.distance_km, places=6)
+
+        exact = recompute_workday_telemetry(self.workday.pk)
+        self.assertEqual((exact.route_points, exact.out_of_order), (3, 0))
+        self.assertAlmostEqual(exact.distance_km, telemetry.distance_km, places=6)
+
+    @override_settings(LOCATION_TELEMETRY_LOG_EVERY=2)
+    def test_sampling_and_level_gating(self):
+        with self.assertLogs("tracking.location_telemetry", level="INFO") as logs:
+            for minute in range(4):
+                self._save(minute, "11.900000", "79.300000")
+        self.assertEqual(len(logs.output), 3)  # points 1, 2 and 4
+        self.assertIn("total_points=4 distance_km=0.00", logs.output[-1])
+
+        with override_settings(LOCATION_TELEMETRY_LOG_LEVEL="DEBUG"):
+            with self.assertNoLogs("tracking.location_telemetry", level="INFO"):
+                self._save(5, "11.900000", "79.300000")
+        self.assertEqual(get_workday_telemetry(self.workday.pk).route_points, 5)
+
+    def test_audit_command_recomputes_telemetry(self):
+        self._save(0, "11.900000", "79.300000")
+        cache.clear()
+        out = StringIO()
+        call_command(
+            "audit_route_logs",
+            "--user-id",
+            str(self.user.pk),
+            "--date",
+            self.workday.date.isoformat(),
+            "--recompute-telemetry",
+            stdout=out,
+        )
+        self.assertIn(
+            f"telemetry workday_id={self.workday.pk} cached_points=(none) "
+            "cached_distance_km=(none) points=1 distance_km=0.00",
+            out.getvalue(),
+        )
+        self.assertEqual(get_workday_telemetry(self.workday.pk).route_points, 1)
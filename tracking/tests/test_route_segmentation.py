@@ -0,0 +1,202 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmployeeProfile
+from tracking.models import DutySession, EmployeeRoutePoint, RouteSegment
+from tracking.segmentation import (
+    day_segments,
+    segment_duty,
+    segment_points,
+)
+from tracking.tasks import segment_duty_task
+
+STEP = 0.0045  # ~500 m
+
+
+def _track(t0, *legs):
+    """legs: (minutes, lat, lng) tuples relative to t0."""
+    return [(lat, lng, t0 + timedelta(minutes=m)) for m, lat, lng in legs]
+
+
+class SegmentPointsTests(TestCase):
+    def setUp(self):
+        self.t0 = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def test_stop_trip_gap_stop(self):
+        points = _track(
+            self.t0,
+            *[(m, 11.9, 79.3) for m in range(0, 11, 2)],  # 10 min dwell
+            *[(12 + m, 11.9 + STEP * (m + 1), 79.3) for m in range(4)],  # drive north
+            (60, 11.98, 79.3),  # 45 min silence while moving
+            *[(60 + m, 11.98, 79.3001) for m in range(1, 9)],  # dwell again
+        )
+        segments = segment_points(points)
+        self.assertEqual([s.kind for s in segments], ["stop", "trip", "gap", "stop"])
+        stop, trip, gap, last = segments
+        self.assertEqual((stop.point_count, stop.duration_seconds), (6, 600))
+        self.assertEqual(trip.point_count, 4)
+        self.assertAlmostEqual(trip.distance_km, 2.0, delta=0.05)
+        self.assertEqual(gap.start_time, points[9][2])
+        self.assertEqual(last.point_count, 9)
+        self.assertAlmostEqual(last.latitude, 11.98, places=4)
+
+    def test_short_pause_stays_in_trip(self):
+        points = _track(
+            self.t0,
+            (0, 11.9, 79.3),
+            (2, 11.9, 79.3),  # 2 min pause: below STOP_MIN_SECONDS
+            (4, 11.9 + STEP, 79.3),
+        )
+        self.assertEqual([(s.kind, s.point_count) for s in segment_points(points)], [("trip", 3)])
+
+
+class DutySegmentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="seg_emp", password="x")
+        self.t0 = timezone.now() - timedelta(hours=3)
+        self.duty = DutySession.objects.create(
+            user=self.user, date=timezone.localdate(self.t0), start_time=self.t0, is_active=True
+        )
+
+    def _points(self, *legs):
+        for m, lat, lng in legs:
+            EmployeeRoutePoint.objects.create(
+                user=self.user,
+                duty_session=self.duty,
+                latitude=Decimal(str(round(lat, 6))),
+                longitude=Decimal(str(round(lng, 6))),
+                recorded_at=self.t0 + timedelta(minutes=m),
+            )
+
+    def _rows(self):
+        return list(
+            RouteSegment.objects.filter(duty_session=self.duty)
+            .order_by("sequence")
+            .values_list("kind", "point_count", "is_open")
+        )
+
+    def test_incremental_passes_keep_closed_rows_and_match_rebuild(self):
+        self._points(*[(m, 11.9, 79.3) for m in range(0, 11, 2)])
+        segment_duty(self.duty)
+        self.assertEqual(self._rows(), [("stop", 6, True)])
+
+        self._points(*[(12 + m, 11.9 + STEP * (m + 1), 79.3) for m in range(3)])
+        segment_duty(self.duty)
+        stop_pk = RouteSegment.objects.get(duty_session=self.duty, sequence=0).pk
+        self.assertEqual(self._rows(), [("stop", 6, False), ("trip", 3, True)])
+
+        self._points(*[(15 + m, 11.9 + STEP * 3, 79.3) for m in range(1, 8)])
+        segment_duty(self.duty)
+        self.assertEqual(RouteSegment.objects.get(duty_session=self.duty, sequence=0).pk, stop_pk)
+        incremental = self._rows()
+        self.assertEqual(incremental, [("stop", 6, False), ("trip", 2, False), ("stop", 8, True)])
+
+        self.duty.is_active = False
+        self.duty.end_time = self.t0 + timedelta(minutes=30)
+        self.duty.save()
+        segment_duty_task(self.duty.pk)
+        self.assertEqual(self._rows(), [(k, n, False) for k, n, _ in incremental])
+
+    def test_day_report_and_route_replay_read_segments(self):
+        admin = User.objects.create_user(username="seg_admin", password="x", is_staff=True)
+        EmployeeProfile.objects.create(
+            user=self.user, employee_id="SEG-1", phone="9000077001", is_active_employee=True
+        )
+        self._points(
+            *[(m, 11.9, 79.3) for m in range(0, 21, 2)],
+            *[(22 + m, 11.9 + STEP * (m + 1), 79.3) for m in range(3)],
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        day = self.duty.date.isoformat()
+
+        report = client.get(
+            f"/api/v1/tracking/admin/employees/{self.user.pk}/day-report/?date={day}"
+        ).json()["data"]
+        kinds = [s["type"] for s in report["route"]["segments"]]
+        self.assertEqual(kinds, ["stop", "trip"])
+        self.assertEqual(report["summary"]["idle_minutes"], 20)
+
+        route = client.get(
+            f"/api/v1/tracking/admin/employee/{self.user.pk}/route/?date={day}"
+        ).json()["data"]
+        self.assertEqual([s["type"] for s in route["segments"]], kinds)
+
+    def _full_rows(self):
+        with transaction.atomic():
+            segment_duty(self.duty, final=False, rebuild=True)
+            rows = self._rows_with_distance()
+            transaction.set_rollback(True)
+        return rows
+
+    def _rows_with_distance(self):
+        return list(
+            RouteSegment.objects.filter(duty_session=self.duty)
+            .order_by("sequence")
+            .values_list("kind", "point_count", "distance_km")
+        )
+
+    def test_incremental_passes_resuming_at_open_stop_or_after_gap_match_rebuild(self):
+        # Trip of five points, then a stop that is still open at the first pass.
+        self._points(*[(m, 11.9 + STEP * m / 5, 79.3) for m in range(5)])
+        self._points(*[(5 + m, 11.9 + STEP, 79.3) for m in range(6)])
+        segment_duty(self.duty)
+        self.assertEqual([k for k, _, _ in self._rows_with_distance()], ["trip", "stop"])
+
+        self._points((11, 11.9 + STEP, 79.3), (12, 11.9 + STEP, 79.3))
+        segment_duty(self.duty)
+        segment_duty(self.duty)
+        self.assertEqual(self._rows_with_distance(), self._full_rows())
+
+        # Silence, then moving again: the open trip resumes after a closed gap.
+        self._points(*[(40 + m, 11.9 + STEP * (2 + m), 79.3) for m in range(2)])
+        segment_duty(self.duty)
+        self._points((42, 11.9 + STEP * 4, 79.3))
+        segment_duty(self.duty)
+        self.assertEqual(
+            [k for k, _, _ in self._rows_with_distance()], ["trip", "stop", "gap", "trip"]
+        )
+        self.assertEqual(self._rows_with_distance(), self._full_rows())
+
+    def test_reads_segment_the_tail_in_memory_without_writing(self):
+        self._points(*[(m, 11.9, 79.3) for m in range(0, 11, 2)])
+        with mock.patch("tracking.segmentation._send_segmentation") as queued:
+            with CaptureQueriesContext(connection) as ctx:
+                kinds = [s.kind for s in day_segments(self.user.pk, self.duty.date)]
+            queued.assert_called_once_with(self.duty.pk)
+            self.assertEqual(kinds, ["stop"])
+            self.assertFalse(RouteSegment.objects.filter(duty_session=self.duty).exists())
+            self.assertFalse(
+                [q for q in ctx.captured_queries if "FOR UPDATE" in q["sql"] or "DELETE" in q["sql"]]
+            )
+
+            segment_duty_task(self.duty.pk)
+            self._points(*[(12 + m, 11.9 + STEP * (m + 1), 79.3) for m in range(3)])
+            kinds = [s.kind for s in day_segments(self.user.pk, self.duty.date)]
+        self.assertEqual(kinds, ["stop", "trip"])
+
+    def test_finalized_empty_duty_is_not_segmented_again(self):
+        empty = DutySession.objects.create(
+            user=self.user,
+            date=self.duty.date,
+            start_time=self.t0,
+            end_time=self.t0 + timedelta(minutes=5),
+            is_active=False,
+        )
+        self.duty.delete()
+        segment_duty_task(empty.pk)
+        empty.refresh_from_db()
+        self.assertIsNotNone(empty.segmented_at)
+        with mock.patch("tracking.segmentation._send_segmentation") as queued:
+            self.assertEqual(day_segments(self.user.pk, empty.date), [])
+        queued.assert_not_called()
@@ -36,7 +36,7 @@ from .views import (
     AdminEmployeeDailySummaryAPI,
     EmployeeStatsAPIView,
 )
-from .admin_report_views import AdminEmployeeDayReportAPI
+from .admin_report_views import AdminEmployeeDayReportAPI, AdminEmployeeDaySummaryBatchAPI
 from .worklog_views import (
     WorkLogStartAPI,
     WorkLogEndAPI,
@@ -90,6 +90,7 @@ urlpatterns = [
         "admin/employee/<int:user_id>/daily-summary/",
         AdminEmployeeDailySummaryAPI.as_view(),
     ),
+    path("admin/employees/day-summaries/", AdminEmployeeDaySummaryBatchAPI.as_view()),
     path(
         "admin/employees/<int:employee_id>/day-report/",
         AdminEmployeeDayReportAPI.as_view(),
@@ -23,6 +23,7 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 from accounts.models import EmployeeProfile
+from utils.day_ranges import day_range
 from utils.photo_urls import build_profile_photo_url
 from .models import WorkDay, AvailabilityEvent, LocationLog, EmployeeDailySummary
 from .selectors import get_last_known_location
@@ -48,7 +49,9 @@ from .route_utils import (
     build_route_points,
     get_route_queryset,
 )
+from . import ingest
 from .daily_summary import DailySummaryService, build_visit_stops
+from .segmentation import day_segments, serialize_segment
 from mobile_api.device_session import DeviceSessionRequiredMixin
 
 
@@ -234,7 +237,7 @@ def _compute_distance_km(user_id, date):
     points = list(
         LocationLog.objects.filter(
             user_id=user_id,
-            recorded_at__date=date,
+            **day_range("recorded_at", date),
         )
         .order_by("recorded_at")
         .values_list("latitude", "longitude")
@@ -314,48 +317,7 @@ class HeartbeatAPI(DeviceSessionRequiredMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        from tracking.live_tracking_service import LiveTrackingError, apply_heartbeat
-        from utils.response import error_response, success_response
-
-        if request.user.is_staff:
-            return error_response(
-                message="Admin heartbeat not allowed",
-                code="FORBIDDEN",
-                status_code=403,
-            )
-
-        expire_overlong_workdays_for_user(request.user)
-        serializer = HeartbeatSerializer(
-            data=request.data if request.data else {"gps_enabled": True},
-            context={"request": request},
-        )
-        if not serializer.is_valid():
-            errors = serializer.errors
-            code = "VALIDATION_ERROR"
-            message = "Invalid heartbeat payload"
-            if isinstance(errors, dict):
-                detail = errors.get("detail")
-                if isinstance(detail, list) and detail:
-                    message = str(detail[0])
-                elif isinstance(detail, str):
-                    message = detail
-                nested = errors.get("non_field_errors") or errors.get("code")
-                if isinstance(errors.get("detail"), dict) and errors["detail"].get("code"):
-                    code = errors["detail"]["code"]
-            return error_response(
-                message=message,
-                code=code,
-                errors=errors,
-                status_code=400,
-            )
-        try:
-            result = apply_heartbeat(request.user, serializer.validated_data)
-        except LiveTrackingError as exc:
-            status_code = 403 if exc.code == "FORBIDDEN" else 400
-            return error_response(
-                message=exc.message, code=exc.code, status_code=status_code
-            )
-        return success_response(data=result, message="Heartbeat received")
+        return ingest.heartbeat(request.user, request.data)
 
 
 # ──────────────────────────────────────────────
@@ -374,33 +336,7 @@ class PushLocationAPI(DeviceSessionRequiredMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        from tracking.gps_service import GpsTrackingError, update_gps_point
-        from tracking.serializers import LocationLogSerializer
-
-        user = request.user
-        if user.is_staff:
-            return Response({"detail": "Admin cannot push location"}, status=403)
-
-        try:
-            result = update_gps_point(user, dict(request.data))
-        except GpsTrackingError as exc:
-            code = 403 if exc.code in {"FORBIDDEN", "ACCOUNT_DISABLED"} else 400
-            return Response({"detail": exc.message, "code": exc.code}, status=code)
-
-        out = {
-            "id": result.get("location_log_id") or result.get("route_point_id"),
-            "route_point_id": result.get("route_point_id"),
-            "duty_session_id": result.get("duty_session_id"),
-            "latitude": request.data.get("latitude"),
-            "longitude": request.data.get("longitude"),
-            "recorded_at": result.get("recorded_at"),
-            "duplicate": result.get("duplicate", False),
-            "client_point_id": result.get("client_point_id"),
-        }
-        return Response(
-            {"message": "Location saved", "location": out, "data": result},
-            status=201,
-        )
+        return ingest.push_location(request.user, request.data)
 
 
 # ──────────────────────────────────────────────
@@ -419,51 +355,7 @@ class BulkPushLocationAPI(DeviceSessionRequiredMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        from tracking.gps_service import GpsTrackingError, bulk_update_gps_points
-
-        user = request.user
-        if user.is_staff:
-            return Response({"detail": "Admin cannot push location"}, status=403)
-
-        if isinstance(request.data, list):
-            points = request.data
-            meta = {}
-            device_model = None
-            app_version = None
-        else:
-            serializer = BulkLocationPushSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            points = serializer.validated_data["locations"]
-            device_model = serializer.validated_data.get("device_model")
-            app_version = serializer.validated_data.get("app_version")
-            meta = {}
-
-        try:
-            result = bulk_update_gps_points(
-                user,
-                points,
-                device_model=device_model,
-                app_version=app_version,
-                request_meta=meta,
-            )
-        except GpsTrackingError as exc:
-            code = 403 if exc.code in {"FORBIDDEN", "ACCOUNT_DISABLED"} else 400
-            return Response({"detail": exc.message, "code": exc.code}, status=code)
-
-        status_code = 201 if result["failed_count"] == 0 else 207
-        return Response(
-            {
-                "message": f"{result['success_count']} locations saved",
-                "saved": result["success_count"],
-                "failed": result["failed_count"],
-                "duplicate_count": result.get("duplicate_count", 0),
-                "route_points_saved": result.get("route_points_saved", 0),
-                "accepted_ids": result.get("accepted_ids"),
-                "failed_items": result.get("failed_items"),
-                "duty_session_id": result.get("duty_session_id"),
-            },
-            status=status_code,
-        )
+        return ingest.bulk_push_locations(request.user, request.data)
 
 
 # ══════════════════════════════════════════════
@@ -478,57 +370,26 @@ class BulkPushLocationAPI(DeviceSessionRequiredMixin, APIView):
 @extend_schema(
     tags=["Tracking"],
     summary="Admin: tracking dashboard stats",
-    description="Returns real-time tracking statistics: total employees, online count, on-field count, GPS health.",
+    description=(
+        "Returns tracking statistics: total employees, online count, on-field count, GPS health. "
+        "Served from the shared dashboard headline counters (stale-while-revalidate)."
+    ),
     responses={200: SIMPLE_SUCCESS},
 )
 class AdminTrackingDashboardStatsAPI(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        expire_old_workdays()
-        now = timezone.now()
-        heartbeat_threshold = _online_heartbeat_threshold(now)
-
-        total_employees = EmployeeProfile.objects.filter(
-            is_active_employee=True,
-        ).count()
-
-        active_wds = list(
-            WorkDay.objects.filter(is_active=True).only(
-                "start_time", "last_heartbeat", "is_active", "user_id"
-            )
-        )
-        working_now = sum(
-            1
-            for wd in active_wds
-            if is_session_within_limit(
-                wd.start_time, is_active=bool(wd.is_active), now=now
-            )
-        )
-        online = sum(
-            1
-            for wd in active_wds
-            if is_session_within_limit(
-                wd.start_time, is_active=bool(wd.is_active), now=now
-            )
-            and wd.last_heartbeat
-            and wd.last_heartbeat >= heartbeat_threshold
-        )
-
-        offline = total_employees - online
-
-        gps_issues = AvailabilityEvent.objects.filter(
-            event_type="GPS_OFF",
-            end_time__isnull=True,
-        ).count()
+        from dashboard.services import get_headline_counters
 
+        counters = get_headline_counters()
         return Response(
             {
-                "total_employees": total_employees,
-                "working_now": working_now,
-                "online": online,
-                "offline": offline,
-                "gps_issues": gps_issues,
+                "total_employees": counters["employees"],
+                "working_now": counters["working_now"],
+                "online": counters["online"],
+                "offline": counters["employees"] - counters["online"],
+                "gps_issues": counters["gps_issues"],
             }
         )
 
@@ -621,7 +482,7 @@ class AdminTrackingStatusAPI(APIView):
         from django.db.models import Count
 
         today_point_counts = dict(
-            LocationLog.objects.filter(recorded_at__date=today)
+            LocationLog.objects.filter(**day_range("recorded_at", today))
             .values("user_id")
             .annotate(c=Count("id"))
             .values_list("user_id", "c")
@@ -889,7 +750,7 @@ class AdminEmployeeRouteGeoJSONAPI(APIView):
         coords = list(
             LocationLog.objects.filter(
                 user_id=user_id,
-                recorded_at__date=target_date,
+                **day_range("recorded_at", target_date),
             )
             .order_by("recorded_at")
             .values_list("longitude", "latitude")
@@ -1174,6 +1035,7 @@ class AdminEmployeeRouteAPI(APIView):
             workdays=workdays,
             display_meta=display_meta,
             stops=build_visit_stops(user_id, target_date),
+            segments=[serialize_segment(s) for s in day_segments(user_id, target_date)],
         )
 
         logger.info(
@@ -1304,7 +1166,7 @@ class AdminEmployeeSummaryAPI(APIView):
             ).exists()
 
         points_today = LocationLog.objects.filter(
-            user=user, recorded_at__date=today
+            user=user, **day_range("recorded_at", today)
         ).count()
         today_distance_km = 0.0
         try:
@@ -1406,7 +1268,7 @@ class AdminEmployeeTrackingDiagnosticsAPI(APIView):
                     row[key] = row[key].isoformat()
 
         points_today = LocationLog.objects.filter(
-            user=user, recorded_at__date=today
+            user=user, **day_range("recorded_at", today)
         ).count()
         distance_km = 0.0
         if points_today:
@@ -1549,7 +1411,7 @@ class AdminEmployeeActivityAPI(APIView):
         locations = (
             LocationLog.objects.filter(
                 user=user,
-                recorded_at__date=target_date,
+                **day_range("recorded_at", target_date),
             )
             .order_by("-recorded_at")
             .values(
@@ -1570,7 +1432,7 @@ class AdminEmployeeActivityAPI(APIView):
 
         events = AvailabilityEvent.objects.filter(
             user=user,
-            start_time__date=target_date,
+            **day_range("start_time", target_date),
         ).order_by("-start_time")[:30]
         for ev in events:
             activity.append(
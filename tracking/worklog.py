@@ -17,6 +17,7 @@ class WorkLog(models.Model):
         ordering = ["-start_time"]
         indexes = [
             models.Index(fields=["employee", "is_active"]),
+            models.Index(fields=["employee", "start_time"]),
         ]
 
     def __str__(self):
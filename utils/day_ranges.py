@@ -0,0 +1,64 @@
+"""
+Local calendar days as half-open timestamp ranges.
+
+``recorded_at__date=day`` compiles to a DATE()/AT TIME ZONE cast on the
+column, which cannot use ``(user, recorded_at)`` style indexes.  These
+helpers turn a local day (settings.TIME_ZONE, Asia/Kolkata) into
+``[start, end)`` aware datetimes so the filter is a plain index range scan:
+
+    LocationLog.objects.filter(user_id=uid, **day_range("recorded_at", day))
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, tzinfo
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def day_start(day: date, tz: tzinfo | None = None) -> datetime:
+    """Aware local midnight that starts ``day``."""
+    return timezone.make_aware(
+        datetime.combine(day, time.min), tz or timezone.get_current_timezone()
+    )
+
+
+def day_bounds(day: date, tz: tzinfo | None = None) -> tuple[datetime, datetime]:
+    """``[start, end)`` covering one local day."""
+    return day_start(day, tz), day_start(day + timedelta(days=1), tz)
+
+
+def day_range(field: str, day: date, *, tz: tzinfo | None = None) -> dict:
+    """Filter kwargs selecting ``field`` within one local day."""
+    return date_span(field, day, day, tz=tz)
+
+
+def date_span(
+    field: str,
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    tz: tzinfo | None = None,
+) -> dict:
+    """
+    Filter kwargs for ``field`` between local days ``start`` and ``end``,
+    both inclusive.  None leaves that side open.
+    """
+    lookups = {}
+    if start is not None:
+        lookups[f"{field}__gte"] = day_start(start, tz)
+    if end is not None:
+        lookups[f"{field}__lt"] = day_start(end + timedelta(days=1), tz)
+    return lookups
+
+
+def date_span_q(
+    field: str,
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    tz: tzinfo | None = None,
+) -> Q:
+    """``date_span`` as a Q object, for OR-ing with other conditions."""
+    return Q(**date_span(field, start, end, tz=tz))
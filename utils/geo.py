@@ -0,0 +1,230 @@
+"""
+Geohash grid + bbox / radius / nearest-N lookups on latitude/longitude columns.
+
+Farmer and Visit carry typed ``latitude`` / ``longitude`` columns plus a
+``geohash`` grid cell (precision 7, ~150 m).  Bounding boxes filter on the
+indexed lat/lng columns; radius and nearest-N queries narrow by bbox in
+SQL and compute exact haversine distances only for the candidates.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from rest_framework import serializers
+
+from utils.gps import validate_latitude, validate_longitude
+
+GEOHASH_PRECISION = 7
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = 500.0
+MAX_NEAREST = 200
+MAX_MARKERS = 2000
+NEAREST_START_KM = 1.0
+NEAREST_GROWTH = 4
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+class BBox(NamedTuple):
+    south: float
+    west: float
+    north: float
+    east: float
+
+
+# ──────────────────────────────────────────────────────────────
+# Geometry
+# ──────────────────────────────────────────────────────────────
+
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars: List[str] = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_lo = mid
+            else:
+                bits <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat: float, lng: float, radius_km: float) -> BBox:
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(180.0, dlat / cos_lat)
+    return BBox(
+        south=max(-90.0, lat - dlat),
+        west=max(-180.0, lng - dlng),
+        north=min(90.0, lat + dlat),
+        east=min(180.0, lng + dlng),
+    )
+
+
+def location_columns(lat: Optional[float], lng: Optional[float]) -> Tuple[Optional[float], Optional[float], str]:
+    """(latitude, longitude, geohash) to store for a possibly-missing point."""
+    if lat is None or lng is None:
+        return None, None, ""
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None, None, ""
+    return lat, lng, geohash_encode(lat, lng)
+
+
+# ──────────────────────────────────────────────────────────────
+# Request parsing
+# ──────────────────────────────────────────────────────────────
+
+
+def parse_bbox(raw: Optional[str]) -> Optional[BBox]:
+    """
+    ``bbox=west,south,east,north`` (Leaflet ``toBBoxString()`` order).
+    Returns None when absent.
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    parts = raw.split(",")
+    if len(parts) != 4:
+        raise serializers.ValidationError({"bbox": "bbox must be west,south,east,north."})
+    try:
+        west = validate_longitude(parts[0].strip())
+        south = validate_latitude(parts[1].strip())
+        east = validate_longitude(parts[2].strip())
+        north = validate_latitude(parts[3].strip())
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({"bbox": exc.detail}) from exc
+    if south > north or west > east:
+        raise serializers.ValidationError({"bbox": "bbox south/west must not exceed north/east."})
+    return BBox(south=south, west=west, north=north, east=east)
+
+
+def _parse_positive(params, name: str, cap: float, cast=float):
+    raw = params.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({name: f"{name} must be a number."})
+    if value <= 0:
+        raise serializers.ValidationError({name: f"{name} must be greater than 0."})
+    return min(value, cap)
+
+
+def parse_viewport(params) -> dict:
+    """
+    Map viewport from query params; all keys optional:
+
+    - ``bbox=west,south,east,north``
+    - ``lat`` + ``lng`` with ``radius_km`` and/or ``nearest`` (count)
+    """
+    viewport: dict[str, Any] = {"bbox": parse_bbox(params.get("bbox"))}
+    lat_raw, lng_raw = params.get("lat"), params.get("lng")
+    radius_km = _parse_positive(params, "radius_km", MAX_RADIUS_KM)
+    nearest = _parse_positive(params, "nearest", MAX_NEAREST, cast=int)
+    if lat_raw not in (None, "") or lng_raw not in (None, ""):
+        try:
+            viewport["center"] = (validate_latitude(lat_raw), validate_longitude(lng_raw))
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"lat": exc.detail}) from exc
+    elif radius_km or nearest:
+        raise serializers.ValidationError({"lat": "lat and lng are required with radius_km or nearest."})
+    viewport["radius_km"] = radius_km
+    viewport["nearest"] = nearest
+    return viewport
+
+
+# ──────────────────────────────────────────────────────────────
+# Queryset helpers (any model with latitude / longitude / geohash)
+# ──────────────────────────────────────────────────────────────
+
+
+def filter_bbox(qs, bbox: BBox):
+    return qs.filter(
+        latitude__gte=bbox.south,
+        latitude__lte=bbox.north,
+        longitude__gte=bbox.west,
+        longitude__lte=bbox.east,
+    )
+
+
+def within_radius(qs, lat: float, lng: float, radius_km: float, *, limit: Optional[int] = None):
+    """[(obj, distance_km)] inside the circle, nearest first."""
+    results = []
+    for obj in filter_bbox(qs, bbox_around(lat, lng, radius_km)):
+        distance = haversine_km(lat, lng, obj.latitude, obj.longitude)
+        if distance <= radius_km:
+            results.append((obj, distance))
+    results.sort(key=lambda item: item[1])
+    return results[:limit] if limit else results
+
+
+def nearest(qs, lat: float, lng: float, count: int, *, max_radius_km: float = MAX_RADIUS_KM):
+    """
+    [(obj, distance_km)] for the ``count`` closest rows within max_radius_km.
+
+    Starts with a NEAREST_START_KM circle and widens it NEAREST_GROWTH-fold
+    until it holds ``count`` rows or reaches max_radius_km.  Each step only
+    counts the bbox (LIMIT count); the candidates are fetched once, when the
+    box is full enough.  Rows inside the circle are exactly the nearest, so
+    no second query is needed to confirm them.
+    """
+    radius = min(NEAREST_START_KM, max_radius_km)
+    while True:
+        widest = radius >= max_radius_km
+        box = filter_bbox(qs, bbox_around(lat, lng, radius))
+        if widest or box[:count].count() >= count:
+            hits = within_radius(qs, lat, lng, radius, limit=count)
+            if widest or len(hits) >= count:
+                return hits
+        radius = min(max_radius_km, radius * NEAREST_GROWTH)
+
+
+def apply_viewport(qs, viewport: dict, *, limit: Optional[int] = None):
+    """[(obj, distance_km or None)] for a parsed viewport (see parse_viewport)."""
+    if viewport.get("bbox") is not None:
+        qs = filter_bbox(qs, viewport["bbox"])
+    center = viewport.get("center")
+    if center and viewport.get("nearest"):
+        return nearest(
+            qs,
+            *center,
+            min(viewport["nearest"], limit or viewport["nearest"]),
+            max_radius_km=viewport.get("radius_km") or MAX_RADIUS_KM,
+        )
+    if center and viewport.get("radius_km"):
+        return within_radius(qs, *center, viewport["radius_km"], limit=limit)
+    if limit:
+        qs = qs[:limit]
+    return [(obj, None) for obj in qs]
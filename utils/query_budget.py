@@ -0,0 +1,53 @@
+"""Query-budget assertions for endpoint tests (see config.request_metrics)."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config.request_metrics import RequestMetrics, collect_metrics
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def check_query_budget(
+    metrics: RequestMetrics,
+    *,
+    max_queries: int,
+    max_duplicates: Optional[int] = None,
+    label: str = "block",
+) -> None:
+    """Raise QueryBudgetExceeded when ``metrics`` overshoot the budget."""
+    problems = []
+    if metrics.queries > max_queries:
+        problems.append(f"{metrics.queries} queries (budget {max_queries})")
+    if max_duplicates is not None and metrics.duplicate_queries > max_duplicates:
+        sql, repeats = metrics.most_repeated()
+        problems.append(
+            f"{metrics.duplicate_queries} repeated queries (budget {max_duplicates}); "
+            f"most repeated x{repeats}: {sql[:300]}"
+        )
+    if problems:
+        raise QueryBudgetExceeded(f"{label} exceeded its query budget: " + "; ".join(problems))
+
+
+@contextmanager
+def query_budget(
+    max_queries: int, *, max_duplicates: Optional[int] = None, label: str = "block"
+) -> Iterator[RequestMetrics]:
+    """
+    Fail when the wrapped block runs more than ``max_queries`` queries, or
+    repeats one SQL shape more than ``max_duplicates`` extra times (N+1)::
+
+        with query_budget(8, max_duplicates=0, label="tracking status"):
+            self.client.get(url)
+
+    Budgets are ceilings: leave a little headroom, tighten when a view improves.
+    """
+    with collect_metrics() as metrics:
+        yield metrics
+    check_query_budget(
+        metrics, max_queries=max_queries, max_duplicates=max_duplicates, label=label
+    )
@@ -7,6 +7,11 @@ SUCCESS  →  { "success": true,  "message": "...", "data": {...} }
 ERROR    →  { "success": false, "message": "...", "errors": {...}, "code": "..." }
 """
 
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags
 from rest_framework.response import Response
 from rest_framework import status as drf_status
 
@@ -31,6 +36,23 @@ def success_response(
     )
 
 
+def etag_response(request, data=None, message: str = "Operation successful") -> Response:
+    """
+    success_response with a strong ETag over the body; answers 304 Not
+    Modified when the request's If-None-Match already holds it.
+    """
+    response = success_response(data=data, message=message)
+    digest = hashlib.sha256(
+        json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    ).hexdigest()[:32]
+    etag = f'"{digest}"'
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = Response(status=drf_status.HTTP_304_NOT_MODIFIED)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 def created_response(data=None, message: str = "Created successfully") -> Response:
     return success_response(
         data=data, message=message, status_code=drf_status.HTTP_201_CREATED
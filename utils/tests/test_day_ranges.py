@@ -0,0 +1,81 @@
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from tracking.models import LocationLog, WorkDay
+from tracking.worklog import WorkLog
+from utils.day_ranges import date_span, day_bounds, day_range
+
+DAY = date(2025, 3, 10)
+
+
+class DayRangeHelperTests(SimpleTestCase):
+    def test_local_day_is_half_open_utc_range(self):
+        start, end = day_bounds(DAY)
+        self.assertEqual(start, datetime(2025, 3, 9, 18, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(end, datetime(2025, 3, 10, 18, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(
+            day_range("recorded_at", DAY),
+            {"recorded_at__gte": start, "recorded_at__lt": end},
+        )
+
+    def test_open_ended_span(self):
+        self.assertEqual(list(date_span("created_at", DAY, None)), ["created_at__gte"])
+        self.assertEqual(list(date_span("created_at", None, DAY)), ["created_at__lt"])
+        self.assertEqual(date_span("created_at"), {})
+
+
+@skipUnless(
+    connection.vendor in ("sqlite", "postgresql"), "plan assertions need SQLite or Postgres"
+)
+class DayRangeQueryPlanTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="day_range_emp", password="x")
+
+    def _assert_index_range(self, qs, column):
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny test tables would otherwise always be seq-scanned.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}", params)
+                plan = " | ".join(str(row[0]) for row in cursor.fetchall())
+                self.assertIn("Index", plan)
+                self.assertIn("Index Cond", plan)
+                self.assertIn(column, plan)
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " | ".join(str(row[-1]) for row in cursor.fetchall())
+                self.assertIn("USING INDEX", plan)
+                self.assertIn(f"{column}>?", plan.replace(" ", ""))
+
+    def test_location_day_filter_hits_user_recorded_at_index(self):
+        local_noon = timezone.make_aware(datetime(2025, 3, 10, 12, 0))
+        workday = WorkDay.objects.create(user=self.user, date=DAY, start_time=local_noon)
+
+        def log(recorded_at):
+            return LocationLog.objects.create(
+                user=self.user,
+                workday=workday,
+                latitude=11.0,
+                longitude=78.0,
+                recorded_at=recorded_at,
+            )
+
+        inside = log(local_noon)
+        # 19:00 UTC on the 10th is already the 11th in Asia/Kolkata.
+        log(datetime(2025, 3, 10, 19, 0, tzinfo=dt_timezone.utc))
+        qs = LocationLog.objects.filter(user=self.user, **day_range("recorded_at", DAY))
+        self.assertEqual(list(qs.values_list("pk", flat=True)), [inside.pk])
+
+        sql = str(qs.query).lower()
+        self.assertNotIn("django_datetime_cast_date", sql)
+        self._assert_index_range(qs, "recorded_at")
+
+    def test_worklog_day_filter_hits_employee_start_time_index(self):
+        qs = WorkLog.objects.filter(employee=self.user, **day_range("start_time", DAY))
+        self._assert_index_range(qs, "start_time")
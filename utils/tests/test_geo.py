@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from masters.models import Crop, District, Farmer, Village
+from utils.geo import (
+    bbox_around,
+    geohash_encode,
+    haversine_km,
+    nearest,
+    parse_bbox,
+    parse_viewport,
+    within_radius,
+)
+from visits.models import Visit
+
+VILLUPURAM = (11.9416, 79.3193)
+
+
+class GeoHelperTests(SimpleTestCase):
+    def test_geohash_known_value(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_bbox_around_contains_radius(self):
+        box = bbox_around(*VILLUPURAM, 10)
+        self.assertAlmostEqual(haversine_km(box.south, VILLUPURAM[1], *VILLUPURAM), 10, places=3)
+        self.assertLess(box.west, VILLUPURAM[1])
+
+    def test_parse_bbox_uses_west_south_east_north(self):
+        box = parse_bbox("79.1,11.8,79.5,12.1")
+        self.assertEqual((box.south, box.west, box.north, box.east), (11.8, 79.1, 12.1, 79.5))
+        with self.assertRaises(serializers.ValidationError):
+            parse_bbox("79.5,11.8,79.1,12.1")
+        with self.assertRaises(serializers.ValidationError):
+            parse_bbox("1,2,3")
+
+    def test_radius_requires_center(self):
+        with self.assertRaises(serializers.ValidationError):
+            parse_viewport({"radius_km": "5"})
+
+
+class FarmerSpatialQueryTests(TestCase):
+    def setUp(self):
+        district = District.objects.create(name="Geo District")
+        self.village = Village.objects.create(name="Geo Village", district=district)
+        self.near = self._farmer("Near", "11.9420,79.3200")
+        self.mid = self._farmer("Mid", "11.9800,79.3500")
+        self.far = self._farmer("Far", "12.9716,77.5946")
+        self._farmer("No GPS", "")
+
+    def _farmer(self, name, gps):
+        return Farmer.objects.create(name=name, village=self.village, gps_location=gps)
+
+    def test_save_backfills_typed_columns(self):
+        self.assertAlmostEqual(self.near.latitude, 11.942)
+        self.assertEqual(self.near.geohash, geohash_encode(11.942, 79.32))
+        self.near.gps_location = "12.0,79.0"
+        self.near.save(update_fields=["gps_location"])
+        self.near.refresh_from_db()
+        self.assertEqual((self.near.latitude, self.near.longitude), (12.0, 79.0))
+
+    def test_radius_and_nearest(self):
+        hits = within_radius(Farmer.objects.all(), *VILLUPURAM, 10)
+        self.assertEqual([f.pk for f, _ in hits], [self.near.pk, self.mid.pk])
+
+        top = nearest(Farmer.objects.all(), *VILLUPURAM, 1)
+        self.assertEqual([f.pk for f, _ in top], [self.near.pk])
+        top3 = nearest(Farmer.objects.all(), *VILLUPURAM, 3)
+        self.assertEqual([f.pk for f, _ in top3], [self.near.pk, self.mid.pk, self.far.pk])
+
+    def test_nearest_widens_radius_and_fetches_candidates_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            top2 = nearest(Farmer.objects.all(), *VILLUPURAM, 2)
+        self.assertEqual([f.pk for f, _ in top2], [self.near.pk, self.mid.pk])
+        fetches = [q["sql"] for q in ctx.captured_queries if "COUNT(" not in q["sql"]]
+        self.assertEqual(len(fetches), 1)
+
+
+class MapFarmersViewportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username="geo_admin", password="x", is_staff=True)
+        self.client.force_authenticate(self.admin)
+        district = District.objects.create(name="Map District")
+        village = Village.objects.create(name="Map Village", district=district)
+        self.inside = Farmer.objects.create(name="Inside", village=village, gps_location="11.95,79.32")
+        self.outside = Farmer.objects.create(name="Outside", village=village, gps_location="12.97,77.59")
+        crop = Crop.objects.create(name_en="Paddy", name_ta="Paddy")
+        Visit.objects.create(employee=self.admin, farmer=self.inside, crop=crop, farmer_name="Inside")
+
+    def test_bbox_returns_only_visible_markers_with_latest_crop(self):
+        resp = self.client.get("/api/v1/map/farmers/", {"bbox": "79.0,11.5,79.6,12.2"})
+        self.assertEqual(resp.status_code, 200)
+        markers = resp.data["data"]
+        self.assertEqual([m["id"] for m in markers], [self.inside.pk])
+        self.assertEqual(markers[0]["crop"], "Paddy")
+
+    def test_nearest_includes_distance(self):
+        resp = self.client.get(
+            "/api/v1/map/farmers/", {"lat": "12.9", "lng": "77.6", "nearest": "1"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["data"][0]["id"], self.outside.pk)
+        self.assertIn("distance_km", resp.data["data"][0])
+
+    def test_viewport_is_required(self):
+        resp = self.client.get("/api/v1/map/farmers/")
+        self.assertEqual(resp.status_code, 400)
+
+    @mock.patch("utils.geo.MAX_MARKERS", 1)
+    def test_markers_are_capped(self):
+        resp = self.client.get("/api/v1/map/farmers/", {"bbox": "-180,-90,180,90"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([m["id"] for m in resp.data["data"]], [self.inside.pk])
+        self.assertIn("zoom in", resp.data["message"])
+
+    def test_invalid_bbox_is_rejected(self):
+        resp = self.client.get("/api/v1/map/farmers/", {"bbox": "bad"})
+        self.assertEqual(resp.status_code, 400)
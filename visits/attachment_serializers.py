@@ -8,6 +8,7 @@ from visits.attachments import (
     normalize_attachment_type,
     validate_attachment_payload,
 )
+from visits.media_store import atomic_blob_writes, store_blob
 from visits.models import VisitAttachment
 
 
@@ -57,7 +58,9 @@ class VisitAttachmentSerializer(serializers.ModelSerializer):
     def get_file_url(self, obj):
         from visits.media_response import build_absolute_media_url
 
-        return build_absolute_media_url(obj, self.context.get("request"))
+        return build_absolute_media_url(
+            obj, self.context.get("request"), self.context.get("url_cache")
+        )
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -103,14 +106,19 @@ class VisitAttachmentCreateSerializer(serializers.Serializer):
             return VisitAttachment.objects.create(**payload)
 
         original_filename = getattr(file_obj, "name", "") or ""
-        payload.update(
-            {
-                "file": file_obj,
-                "original_filename": original_filename,
-                "mime_type": guess_mime_type(
-                    original_filename, getattr(file_obj, "content_type", "")
-                ),
-                "file_size": getattr(file_obj, "size", 0) or 0,
-            }
-        )
-        return VisitAttachment.objects.create(**payload)
+        with atomic_blob_writes():
+            # Identical bytes already stored become a metadata-only insert.
+            blob, _ = store_blob(file_obj)
+            payload.update(
+                {
+                    "file": blob.storage_name,
+                    "blob": blob,
+                    "content_sha256": blob.sha256,
+                    "original_filename": original_filename,
+                    "mime_type": guess_mime_type(
+                        original_filename, getattr(file_obj, "content_type", "")
+                    ),
+                    "file_size": getattr(file_obj, "size", 0) or 0,
+                }
+            )
+            return VisitAttachment.objects.create(**payload)
@@ -103,8 +103,9 @@ class MobileVisitAttachmentDeleteAPI(DeviceSessionRequiredMixin, APIView):
             VisitAttachment.objects.filter(visit=visit),
             pk=attachment_id,
         )
-        if attachment.file:
+        if attachment.file and not attachment.blob_id:
             attachment.file.delete(save=False)
+        # Blob-backed files are released by the post_delete signal.
         attachment.delete()
         _invalidate_visit_caches()
         return success_response(message="Attachment deleted")
@@ -1,6 +1,7 @@
 from django.db.models import Q
 from django.utils import timezone
 
+from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
@@ -9,7 +10,6 @@ from utils.response import success_response
 from utils.schema import SIMPLE_SUCCESS
 
 from visits.models import Visit
-from visits.kpi_status import COMPLETED_STATUSES
 from masters.models import Farmer, CropIssue
 
 
@@ -28,13 +28,11 @@ class DashboardAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        from tracking.employee_kpis import get_day_kpis
+
         user = request.user
         today = timezone.now().date()
-
-        today_visits = Visit.objects.filter(employee=user, visit_date=today).count()
-        completed_visits = Visit.objects.filter(
-            employee=user, visit_date=today, status__in=COMPLETED_STATUSES
-        ).count()
+        kpis = get_day_kpis(user, today)
 
         if user.is_staff:
             farmers_count = Farmer.objects.count()
@@ -47,8 +45,8 @@ class DashboardAPI(APIView):
 
         return success_response(
             data={
-                "today_visits": today_visits,
-                "completed_visits": completed_visits,
+                "today_visits": kpis.recorded_visits,
+                "completed_visits": kpis.completed_visits,
                 "farmers": farmers_count,
                 "issues": issues_count,
             }
@@ -67,18 +65,40 @@ class MapFarmersAPI(APIView):
     Returns farmer markers with id, name, lat, lng, current crop.
     Only farmers with GPS data are returned.
     Staff see all markers; field employees see assigned / created / visited only.
+
+    A viewport is required (see utils.geo.parse_viewport):
+      ?bbox=west,south,east,north
+      ?lat=&lng=&radius_km=       markers inside the circle, nearest first
+      ?lat=&lng=&nearest=N        N closest markers
+    At most MAX_MARKERS markers are returned (lowest id first for a bbox);
+    a truncated response says so in ``message`` so the map can ask the user
+    to zoom in.
     """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from django.db.models import Exists, OuterRef
-        from farmers.helpers import parse_gps_location
+        from django.db.models import Exists, OuterRef, Subquery
+        from utils.geo import MAX_MARKERS, apply_viewport, parse_viewport
         from visits.access import is_privileged_user
 
-        qs = Farmer.objects.exclude(
-            Q(gps_location="") | Q(gps_location__isnull=True)
-        ).select_related("village")
+        viewport = parse_viewport(request.query_params)
+        if viewport["bbox"] is None and not (viewport["radius_km"] or viewport["nearest"]):
+            raise serializers.ValidationError(
+                {"bbox": "Pass bbox, or lat/lng with radius_km or nearest."}
+            )
+
+        latest_crop = (
+            Visit.objects.filter(farmer_id=OuterRef("pk"), crop__isnull=False)
+            .order_by("-visit_date", "-id")
+            .values("crop__name_en")[:1]
+        )
+        qs = (
+            Farmer.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .only("id", "name", "latitude", "longitude", "geohash")
+            .annotate(latest_crop=Subquery(latest_crop))
+            .order_by("id")
+        )
 
         user = request.user
         if not (user.is_staff or is_privileged_user(user)):
@@ -90,35 +110,23 @@ class MapFarmersAPI(APIView):
                 )
             )
 
-        farmers = list(qs)
-        farmer_ids = [f.id for f in farmers]
-
-        crop_by_farmer_id: dict[int, str | None] = {}
-        if farmer_ids:
-            for visit in (
-                Visit.objects.filter(farmer_id__in=farmer_ids, crop__isnull=False)
-                .select_related("crop")
-                .order_by("farmer_id", "-visit_date", "-id")
-            ):
-                if visit.farmer_id not in crop_by_farmer_id:
-                    crop_by_farmer_id[visit.farmer_id] = (
-                        visit.crop.name_en if visit.crop else None
-                    )
+        hits = apply_viewport(qs, viewport, limit=MAX_MARKERS + 1)
+        message = "Operation successful"
+        if len(hits) > MAX_MARKERS:
+            hits = hits[:MAX_MARKERS]
+            message = f"Showing the first {MAX_MARKERS} markers; zoom in to see the rest."
 
         markers = []
-        for farmer in farmers:
-            lat, lng = parse_gps_location(farmer.gps_location)
-            if lat is None or lng is None:
-                continue
-
-            markers.append(
-                {
-                    "id": farmer.id,
-                    "name": farmer.name,
-                    "latitude": lat,
-                    "longitude": lng,
-                    "crop": crop_by_farmer_id.get(farmer.id),
-                }
-            )
+        for farmer, distance in hits:
+            marker = {
+                "id": farmer.id,
+                "name": farmer.name,
+                "latitude": farmer.latitude,
+                "longitude": farmer.longitude,
+                "crop": farmer.latest_crop,
+            }
+            if distance is not None:
+                marker["distance_km"] = round(distance, 3)
+            markers.append(marker)
 
-        return success_response(data=markers)
+        return success_response(data=markers, message=message)
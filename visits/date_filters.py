@@ -8,6 +8,8 @@ from django.db.models import Q, QuerySet
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
+from utils.day_ranges import date_span_q
+
 
 def visit_date_filter_bounds(date_filter: str | None) -> tuple[date, date] | None:
     """
@@ -76,10 +78,10 @@ def apply_visit_date_range(
     fallback = Q(visit_date__isnull=True)
     if start is not None:
         primary &= Q(visit_date__gte=start)
-        fallback &= Q(created_at__date__gte=start)
+        fallback &= date_span_q("created_at", start, None)
     if end is not None:
         primary &= Q(visit_date__lte=end)
-        fallback &= Q(created_at__date__lte=end)
+        fallback &= date_span_q("created_at", None, end)
 
     return qs.filter(primary | fallback)
 
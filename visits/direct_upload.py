@@ -0,0 +1,440 @@
+"""
+Two-phase direct-to-storage uploads for visit media and attachments.
+
+1. ``issue_upload`` checks the declared name / size / MIME and returns a
+   presigned PUT for a fresh storage key tied to ``client_upload_id``.
+2. The client PUTs the bytes straight to storage (S3 presigned URL, or the
+   signed local stand-in ``DirectUploadPutView`` on filesystem storage).
+3. ``finalize_upload`` validates the stored object (size, type, duration) and
+   creates the VisitMedia / VisitAttachment row; the object becomes its
+   content-addressed blob, or is dropped when identical bytes already exist.
+
+Both phases are idempotent per (visit, target, client_upload_id), so app
+retries never create duplicates.  Only the local stand-in moves bytes through
+Django; with S3 the API workers handle two small JSON requests.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from visits.attachments import (
+    ATTACHMENT_TYPE_TEXT,
+    guess_mime_type,
+    normalize_attachment_type,
+    validate_attachment_payload,
+)
+from visits.media_pipeline import enqueue_media_processing
+from visits.media_store import adopt_stored, delete_file_on_commit, hash_file
+from visits.media_validation import (
+    MediaValidationError,
+    sanitize_original_filename,
+    validate_visit_media_file_detailed,
+)
+from visits.models import DirectUpload, VisitAttachment, VisitMedia
+
+logger = logging.getLogger(__name__)
+
+_SIGNING_SALT = "visits.direct_upload"
+
+
+class DirectUploadError(Exception):
+    def __init__(
+        self,
+        message: str,
+        *,
+        code: str = "UPLOAD_ERROR",
+        errors: dict | None = None,
+        status_code: int = 400,
+    ):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.errors = errors or {}
+        self.status_code = status_code
+
+
+@dataclass
+class FinalizeResult:
+    upload: DirectUpload
+    obj: VisitMedia | VisitAttachment
+    duplicate: bool
+
+
+class _DeclaredFile:
+    """Metadata-only stand-in so the existing validators can run pre-upload."""
+
+    def __init__(self, name: str, size: int, content_type: str):
+        self.name = name
+        self.size = size
+        self.content_type = content_type
+
+
+def upload_url_ttl() -> int:
+    return int(getattr(settings, "VISIT_DIRECT_UPLOAD_TTL_SECONDS", 15 * 60))
+
+
+def _is_s3(storage) -> bool:
+    return bool(getattr(storage, "bucket_name", None)) and hasattr(storage, "connection")
+
+
+def _storage_key(target: str, visit_id: int, filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    prefix = "visit_media" if target == DirectUpload.TARGET_MEDIA else "visit_attachments"
+    return f"{prefix}/direct/{visit_id}/{uuid.uuid4().hex}{ext}"
+
+
+def _presign_put(upload: DirectUpload, request=None) -> dict:
+    storage = default_storage
+    headers = {"Content-Type": upload.content_type} if upload.content_type else {}
+    if _is_s3(storage):
+        params = {
+            "Bucket": storage.bucket_name,
+            "Key": storage._normalize_name(upload.storage_key),
+        }
+        if upload.content_type:
+            params["ContentType"] = upload.content_type
+        url = storage.connection.meta.client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=upload_url_ttl()
+        )
+    else:
+        token = signing.dumps({"id": upload.pk, "key": upload.storage_key}, salt=_SIGNING_SALT)
+        url = reverse("mobile-direct-upload-put", kwargs={"token": token})
+        if request is not None:
+            url = request.build_absolute_uri(url)
+    return {
+        "method": "PUT",
+        "url": url,
+        "headers": headers,
+        "expires_at": upload.expires_at.isoformat(),
+    }
+
+
+def upload_payload(upload: DirectUpload, request=None) -> dict:
+    data = {
+        "client_upload_id": upload.client_upload_id,
+        "target": upload.target,
+        "kind": upload.kind,
+        "status": upload.status,
+        "max_bytes": upload.declared_size,
+    }
+    if upload.status == DirectUpload.STATUS_ISSUED:
+        data["upload"] = _presign_put(upload, request)
+    return data
+
+
+def _preflight(target: str, kind: str, filename: str, size: int, content_type: str) -> str:
+    """Validate declared metadata; returns the normalized kind."""
+    declared = _DeclaredFile(filename, size, content_type)
+    if target == DirectUpload.TARGET_MEDIA:
+        try:
+            validate_visit_media_file_detailed(
+                file_obj=declared, media_type=kind, check_duration=False
+            )
+        except MediaValidationError as exc:
+            raise DirectUploadError(exc.message, code=exc.code, errors=exc.errors) from exc
+        return kind.strip().lower()
+
+    attachment_type = normalize_attachment_type(kind)
+    if attachment_type == ATTACHMENT_TYPE_TEXT:
+        raise DirectUploadError(
+            "Text notes have no file; post them to the attachments endpoint.",
+            errors={"attachment_type": "Text notes cannot be uploaded directly."},
+        )
+    errors = validate_attachment_payload(attachment_type=kind, file_obj=declared)
+    if errors:
+        raise DirectUploadError("Validation failed", code="INVALID_ATTACHMENT", errors=errors)
+    return attachment_type
+
+
+def issue_upload(
+    *,
+    visit,
+    user,
+    target: str,
+    kind: str,
+    filename: str,
+    content_type: str,
+    size,
+    client_upload_id: str,
+    caption: str = "",
+    duration_seconds: float | None = None,
+) -> DirectUpload:
+    """Create (or return the existing) upload ticket for client_upload_id."""
+    client_upload_id = (client_upload_id or "").strip()
+    if not client_upload_id:
+        raise DirectUploadError(
+            "client_upload_id is required.",
+            errors={"client_upload_id": "This field is required."},
+        )
+    if target not in {c[0] for c in DirectUpload.TARGET_CHOICES}:
+        raise DirectUploadError(
+            "target must be one of: attachment, media.",
+            errors={"target": "Invalid target."},
+        )
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        size = 0
+    if size <= 0:
+        raise DirectUploadError(
+            "size must be a positive number of bytes.",
+            errors={"size": "Invalid size."},
+        )
+
+    existing = DirectUpload.objects.filter(
+        visit=visit, target=target, client_upload_id=client_upload_id
+    ).first()
+    if existing is not None:
+        if existing.status == DirectUpload.STATUS_ISSUED:
+            existing.expires_at = timezone.now() + timedelta(seconds=upload_url_ttl())
+            existing.save(update_fields=["expires_at"])
+        return existing
+
+    filename = sanitize_original_filename(filename)
+    content_type = (content_type or "").strip().lower()
+    kind = _preflight(target, kind or "", filename, size, content_type)
+    try:
+        with transaction.atomic():
+            upload = DirectUpload.objects.create(
+                visit=visit,
+                user=user,
+                client_upload_id=client_upload_id,
+                target=target,
+                kind=kind,
+                storage_key=_storage_key(target, visit.pk, filename),
+                original_filename=filename,
+                content_type=content_type,
+                declared_size=size,
+                caption=caption or "",
+                duration_seconds=duration_seconds,
+                expires_at=timezone.now() + timedelta(seconds=upload_url_ttl()),
+            )
+    except IntegrityError:
+        return DirectUpload.objects.get(
+            visit=visit, target=target, client_upload_id=client_upload_id
+        )
+    logger.info(
+        "event=direct_upload_issued visit_id=%s target=%s client_upload_id=%s size=%s",
+        visit.pk,
+        target,
+        client_upload_id,
+        size,
+    )
+    return upload
+
+
+def verify_put_token(token: str) -> DirectUpload | None:
+    """Resolve a local stand-in PUT token to its still-open upload ticket."""
+    try:
+        payload = signing.loads(token, salt=_SIGNING_SALT, max_age=upload_url_ttl())
+    except signing.BadSignature:
+        return None
+    return DirectUpload.objects.filter(
+        pk=payload.get("id"),
+        storage_key=payload.get("key"),
+        status=DirectUpload.STATUS_ISSUED,
+    ).first()
+
+
+def _reject(upload: DirectUpload, exc: DirectUploadError) -> None:
+    # Conditional so a concurrent finalize that already created the row wins.
+    rejected = DirectUpload.objects.filter(
+        pk=upload.pk, status=DirectUpload.STATUS_ISSUED
+    ).update(status=DirectUpload.STATUS_REJECTED, error=exc.message[:255])
+    if not rejected:
+        return
+    upload.status = DirectUpload.STATUS_REJECTED
+    upload.error = exc.message[:255]
+    try:
+        default_storage.delete(upload.storage_key)
+    except Exception:  # noqa: BLE001
+        logger.warning("Could not delete rejected upload %s", upload.storage_key, exc_info=True)
+
+
+def _existing_result(upload: DirectUpload) -> FinalizeResult:
+    obj = upload.media if upload.target == DirectUpload.TARGET_MEDIA else upload.attachment
+    return FinalizeResult(upload=upload, obj=obj, duplicate=True)
+
+
+def _open_upload(upload: DirectUpload) -> DirectUpload | FinalizeResult:
+    """The ticket itself while it is still open; a replay result once finalized."""
+    if upload.status == DirectUpload.STATUS_FINALIZED:
+        return _existing_result(upload)
+    if upload.status == DirectUpload.STATUS_REJECTED:
+        raise DirectUploadError(
+            upload.error or "Upload was rejected.", code="UPLOAD_REJECTED", status_code=409
+        )
+    return upload
+
+
+@dataclass
+class _Verified:
+    """Result of reading the stored object once, before any row lock is taken."""
+
+    size: int
+    sha256: str
+    meta: dict
+
+
+def _verify_stored(upload: DirectUpload) -> _Verified:
+    """Validate and hash the stored object; this streams the whole file."""
+    storage = default_storage
+    if not storage.exists(upload.storage_key):
+        code, message = "UPLOAD_NOT_FOUND", "File has not been uploaded yet."
+        if upload.expires_at < timezone.now():
+            code, message = "UPLOAD_EXPIRED", "Upload URL expired; request a new one."
+        raise DirectUploadError(message, code=code, status_code=409)
+
+    size = storage.size(upload.storage_key)
+    try:
+        if size > upload.declared_size:
+            raise DirectUploadError(
+                "Uploaded file is larger than declared.",
+                code="UPLOAD_SIZE_MISMATCH",
+                errors={"file": "Uploaded file is larger than declared."},
+            )
+        with storage.open(upload.storage_key, "rb") as fh:
+            stored = File(fh, name=upload.original_filename)
+            stored.size = size
+            stored.content_type = upload.content_type
+            if upload.target == DirectUpload.TARGET_MEDIA:
+                meta = _validate_media(upload, stored)
+            else:
+                meta = {}
+                errors = validate_attachment_payload(attachment_type=upload.kind, file_obj=stored)
+                if errors:
+                    raise DirectUploadError(
+                        "Validation failed", code="INVALID_ATTACHMENT", errors=errors
+                    )
+            sha256 = hash_file(stored)
+    except DirectUploadError as exc:
+        _reject(upload, exc)
+        raise
+    return _Verified(size=size, sha256=sha256, meta=meta)
+
+
+def _validate_media(upload: DirectUpload, stored: File) -> dict:
+    try:
+        return validate_visit_media_file_detailed(
+            file_obj=stored,
+            media_type=upload.kind,
+            client_duration_seconds=upload.duration_seconds,
+        )
+    except MediaValidationError as exc:
+        raise DirectUploadError(exc.message, code=exc.code, errors=exc.errors) from exc
+
+
+def _adopt(upload: DirectUpload, verified: _Verified):
+    """Make the uploaded object a blob, or drop it if the bytes already exist."""
+    blob, reused = adopt_stored(upload.storage_key, verified.sha256, verified.size)
+    if reused:
+        delete_file_on_commit(upload.storage_key)
+    return blob
+
+
+def _create_media(upload: DirectUpload, verified: _Verified) -> VisitMedia:
+    existing = VisitMedia.objects.filter(
+        visit_id=upload.visit_id, client_upload_id=upload.client_upload_id
+    ).first()
+    if existing is not None:
+        # Sent before through the multipart upload: keep that row, drop this copy.
+        if existing.file.name != upload.storage_key:
+            delete_file_on_commit(upload.storage_key)
+        return existing
+    blob = _adopt(upload, verified)
+    meta = verified.meta
+    media = VisitMedia.objects.create(
+        visit_id=upload.visit_id,
+        uploaded_by=upload.user,
+        file=blob.storage_name,
+        blob=blob,
+        content_sha256=blob.sha256,
+        media_type=upload.kind,
+        caption=upload.caption,
+        client_upload_id=upload.client_upload_id,
+        mime_type=meta.get("mime_type") or "",
+        original_filename=meta.get("original_filename") or "",
+        file_size=meta.get("file_size"),
+        duration_seconds=meta.get("duration_seconds"),
+        processing_status=VisitMedia.STATUS_PENDING,
+    )
+    enqueue_media_processing(media)
+    return media
+
+
+def _create_attachment(upload: DirectUpload, verified: _Verified) -> VisitAttachment:
+    blob = _adopt(upload, verified)
+    return VisitAttachment.objects.create(
+        visit_id=upload.visit_id,
+        employee_id=upload.visit.employee_id,
+        attachment_type=upload.kind,
+        uploaded_by=upload.user,
+        file=blob.storage_name,
+        blob=blob,
+        content_sha256=blob.sha256,
+        original_filename=upload.original_filename,
+        mime_type=guess_mime_type(upload.original_filename, upload.content_type),
+        file_size=verified.size,
+    )
+
+
+def finalize_upload(*, visit, target: str, client_upload_id: str) -> FinalizeResult:
+    """
+    Validate the stored object and create its row; replays return the same row.
+
+    The object is validated and hashed before the ticket is locked, so the row
+    lock only covers the short blob-adopt and insert step.
+    """
+    tickets = DirectUpload.objects.select_related("visit", "user", "media", "attachment").filter(
+        visit=visit, target=target, client_upload_id=(client_upload_id or "").strip()
+    )
+    upload = tickets.first()
+    if upload is None:
+        raise DirectUploadError(
+            "No upload was issued for this client_upload_id.",
+            code="UPLOAD_NOT_ISSUED",
+            status_code=404,
+        )
+    opened = _open_upload(upload)
+    if isinstance(opened, FinalizeResult):
+        return opened
+
+    verified = _verify_stored(upload)
+
+    with transaction.atomic():
+        # A concurrent finalize may have finished while this one was hashing.
+        opened = _open_upload(tickets.select_for_update().get(pk=upload.pk))
+        if isinstance(opened, FinalizeResult):
+            return opened
+        upload = opened
+        if upload.target == DirectUpload.TARGET_MEDIA:
+            obj = _create_media(upload, verified)
+            upload.media = obj
+        else:
+            obj = _create_attachment(upload, verified)
+            upload.attachment = obj
+        upload.status = DirectUpload.STATUS_FINALIZED
+        upload.finalized_at = timezone.now()
+        upload.save(update_fields=["status", "finalized_at", "media", "attachment"])
+
+    logger.info(
+        "event=direct_upload_finalized visit_id=%s target=%s client_upload_id=%s size=%s",
+        visit.pk,
+        target,
+        upload.client_upload_id,
+        verified.size,
+    )
+    return FinalizeResult(upload=upload, obj=obj, duplicate=False)
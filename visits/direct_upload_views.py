@@ -0,0 +1,192 @@
+import logging
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from drf_spectacular.utils import extend_schema
+from rest_framework.parsers import FormParser, JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from mobile_api.device_session import DeviceSessionRequiredMixin
+from utils.response import created_response, error_response, success_response
+from utils.schema import SIMPLE_SUCCESS, error_schema
+from visits.access import get_visit_for_user
+from visits.attachment_serializers import VisitAttachmentSerializer
+from visits.direct_upload import (
+    DirectUploadError,
+    finalize_upload,
+    issue_upload,
+    upload_payload,
+    verify_put_token,
+)
+from visits.models import DirectUpload
+from visits.serializers import VisitMediaSerializer
+
+logger = logging.getLogger(__name__)
+
+_PUT_CHUNK_BYTES = 256 * 1024
+
+
+def _own_visit_or_403(request, visit_id):
+    visit = get_visit_for_user(request.user, visit_id)
+    if visit.employee_id != request.user.id:
+        return visit, error_response(message="Not authorized", status_code=403)
+    return visit, None
+
+
+def _error(exc: DirectUploadError):
+    return error_response(
+        message=exc.message,
+        code=exc.code,
+        errors=exc.errors or None,
+        status_code=exc.status_code,
+    )
+
+
+def _parse_duration(raw):
+    if raw in (None, ""):
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        raise DirectUploadError(
+            "Invalid duration_seconds.",
+            code="INVALID_MEDIA",
+            errors={"duration_seconds": "Invalid duration_seconds."},
+        )
+
+
+@extend_schema(
+    tags=["Mobile", "Visits"],
+    summary="Request a direct upload URL",
+    description=(
+        "Phase 1 of a direct upload. Body: `target` (`media` | `attachment`), "
+        "`media_type` or `attachment_type`, `filename`, `content_type`, `size` "
+        "(bytes) and `client_upload_id`. Returns a presigned PUT; send the file "
+        "bytes there, then call the finalize endpoint."
+    ),
+    responses={201: SIMPLE_SUCCESS, 400: error_schema("UploadError")},
+)
+class DirectUploadIssueAPI(DeviceSessionRequiredMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, FormParser]
+
+    def post(self, request, visit_id):
+        visit, denied = _own_visit_or_403(request, visit_id)
+        if denied:
+            return denied
+        data = request.data
+        target = (data.get("target") or DirectUpload.TARGET_MEDIA).strip().lower()
+        try:
+            upload = issue_upload(
+                visit=visit,
+                user=request.user,
+                target=target,
+                kind=data.get("media_type") or data.get("attachment_type") or "",
+                filename=data.get("filename") or "",
+                content_type=data.get("content_type") or "",
+                size=data.get("size"),
+                client_upload_id=data.get("client_upload_id") or "",
+                caption=data.get("caption") or "",
+                duration_seconds=_parse_duration(data.get("duration_seconds")),
+            )
+        except DirectUploadError as exc:
+            return _error(exc)
+        return created_response(
+            data=upload_payload(upload, request),
+            message="Upload URL issued",
+        )
+
+
+@extend_schema(
+    tags=["Mobile", "Visits"],
+    summary="Finalize a direct upload",
+    description=(
+        "Phase 2 of a direct upload. Validates the stored file and creates the "
+        "VisitMedia / VisitAttachment row. Safe to retry: replays return the "
+        "same row with HTTP 200."
+    ),
+    responses={
+        201: SIMPLE_SUCCESS,
+        400: error_schema("UploadError"),
+        409: error_schema("UploadNotReady"),
+    },
+)
+class DirectUploadFinalizeAPI(DeviceSessionRequiredMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, FormParser]
+
+    def post(self, request, visit_id, client_upload_id):
+        visit, denied = _own_visit_or_403(request, visit_id)
+        if denied:
+            return denied
+        target = (request.data.get("target") or DirectUpload.TARGET_MEDIA).strip().lower()
+        try:
+            result = finalize_upload(
+                visit=visit, target=target, client_upload_id=client_upload_id
+            )
+        except DirectUploadError as exc:
+            return _error(exc)
+
+        if result.upload.target == DirectUpload.TARGET_MEDIA:
+            data = VisitMediaSerializer(result.obj, context={"request": request}).data
+        else:
+            data = VisitAttachmentSerializer(result.obj, context={"request": request}).data
+        return success_response(
+            data=data,
+            message="Upload already finalized" if result.duplicate else "Upload finalized",
+            status_code=200 if result.duplicate else 201,
+        )
+
+
+class _CappedBody:
+    """Read-only request body wrapper that stops after ``limit`` + 1 bytes."""
+
+    def __init__(self, request, limit: int):
+        self._request = request
+        self._remaining = limit + 1
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        chunk = self._request.read(min(size, _PUT_CHUNK_BYTES))
+        self._remaining -= len(chunk)
+        return chunk
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class DirectUploadPutView(View):
+    """
+    Local-filesystem stand-in for an S3 presigned PUT.
+
+    Authorized by the signed token alone (like a presigned URL), so it is a
+    plain Django view without JWT/device-session checks.  Bytes are streamed
+    to storage in chunks and capped at the declared size.
+    """
+
+    def put(self, request, token):
+        upload = verify_put_token(token)
+        if upload is None:
+            return JsonResponse({"detail": "Invalid or expired upload URL."}, status=403)
+        length = request.META.get("CONTENT_LENGTH")
+        try:
+            length = int(length) if length else None
+        except ValueError:
+            length = None
+        if length is not None and length > upload.declared_size:
+            return JsonResponse({"detail": "Body exceeds declared size."}, status=413)
+
+        storage = default_storage
+        if storage.exists(upload.storage_key):
+            storage.delete(upload.storage_key)
+        saved = storage.save(upload.storage_key, File(_CappedBody(request, upload.declared_size)))
+        if saved != upload.storage_key:
+            storage.delete(saved)
+            return JsonResponse({"detail": "Storage key conflict."}, status=409)
+        return JsonResponse({"detail": "Stored.", "size": storage.size(saved)}, status=200)
@@ -2,15 +2,24 @@
 
 Write/delete contracts stay model-specific. This module only normalizes
 list/read payloads so Admin can display mobile-uploaded VisitMedia.
+
+List endpoints load evidence through ``EvidenceBatch``: one attachment query
+and one media query for the whole page, with storage URLs memoized per
+request.
 """
 
 from __future__ import annotations
 
 import os
-from typing import Any
+from collections import defaultdict
+from typing import Any, Iterable
 
 from visits.attachment_serializers import VisitAttachmentSerializer
-from visits.media_response import build_absolute_media_url
+from visits.media_response import (
+    build_absolute_media_url,
+    build_absolute_rendition_url,
+    media_rendition_urls,
+)
 from visits.models import VisitAttachment, VisitMedia
 
 SOURCE_VISIT_ATTACHMENT = "visit_attachment"
@@ -70,13 +79,17 @@ def _filename(obj, original: str = "") -> str:
     return os.path.basename(stored) if stored else ""
 
 
-def _public_file_url(obj, request) -> str | None:
-    return build_absolute_media_url(obj, request)
+def _public_file_url(obj, request, url_cache: dict | None = None) -> str | None:
+    return build_absolute_media_url(obj, request, url_cache)
 
 
-def serialize_attachment_evidence(obj: VisitAttachment, request) -> dict[str, Any]:
-    data = VisitAttachmentSerializer(obj, context={"request": request}).data
-    file_url = data.get("file_url") or _public_file_url(obj, request)
+def serialize_attachment_evidence(
+    obj: VisitAttachment, request, url_cache: dict | None = None
+) -> dict[str, Any]:
+    data = VisitAttachmentSerializer(
+        obj, context={"request": request, "url_cache": url_cache}
+    ).data
+    file_url = data.get("file_url") or _public_file_url(obj, request, url_cache)
     filename = _filename(obj, obj.original_filename or "")
     created = obj.uploaded_at.isoformat() if obj.uploaded_at else None
     source_id = obj.pk
@@ -100,8 +113,10 @@ def serialize_attachment_evidence(obj: VisitAttachment, request) -> dict[str, An
     return data
 
 
-def serialize_media_evidence(obj: VisitMedia, request) -> dict[str, Any]:
-    file_url = _public_file_url(obj, request)
+def serialize_media_evidence(
+    obj: VisitMedia, request, url_cache: dict | None = None
+) -> dict[str, Any]:
+    file_url = _public_file_url(obj, request, url_cache)
     filename = _filename(obj, obj.original_filename or "")
     created_dt = obj.created_at or obj.uploaded_at
     created = created_dt.isoformat() if created_dt else None
@@ -133,6 +148,7 @@ def serialize_media_evidence(obj: VisitMedia, request) -> dict[str, Any]:
         "uploaded_by": obj.uploaded_by_id,
         "client_upload_id": obj.client_upload_id or "",
         "processing_status": obj.processing_status or "ready",
+        **media_rendition_urls(obj, request, url_cache),
         "caption": obj.caption or "",
         "text_content": None,
     }
@@ -157,41 +173,127 @@ def _dedupe_evidence(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return out
 
 
+def _preview_entries(rows: list[dict[str, Any]], limit: int, images_only: bool) -> list[dict[str, Any]]:
+    preview_source = rows
+    if images_only:
+        preview_source = [
+            r
+            for r in rows
+            if (r.get("attachment_type") == "image")
+            or str(r.get("mime_type") or "").lower().startswith("image/")
+        ]
+    return [
+        {
+            "evidence_key": r.get("evidence_key"),
+            "type": r.get("attachment_type") or "other",
+            "file_url": r.get("file_url"),
+            "thumbnail_url": r.get("thumbnail_url") or r.get("file_url"),
+            "mime_type": r.get("mime_type") or "",
+        }
+        for r in preview_source[: max(0, int(limit))]
+    ]
+
+
+class EvidenceBatch:
+    """
+    Evidence for many visits loaded in two queries.
+
+    Accepts Visit instances or ids.  Relations already prefetched on a visit
+    (``attachments`` / ``media_files``) are served from that cache; the rest
+    are fetched with one ``visit_id__in`` query per model.  Storage URLs are
+    memoized in ``url_cache`` (pass a shared dict to reuse it across batches
+    within one request).
+    """
+
+    def __init__(self, visits: Iterable, request, *, url_cache: dict | None = None):
+        self.request = request
+        self.url_cache = {} if url_cache is None else url_cache
+        self._attachments: dict[int, list[VisitAttachment]] = defaultdict(list)
+        self._media: dict[int, list[VisitMedia]] = defaultdict(list)
+        self._rows: dict[int, list[dict[str, Any]]] = {}
+        self.visit_ids: list[int] = []
+
+        missing_attachments: list[int] = []
+        missing_media: list[int] = []
+        for visit in visits:
+            visit_id = getattr(visit, "pk", visit)
+            if visit_id is None:
+                continue
+            self.visit_ids.append(visit_id)
+            pref = getattr(visit, "_prefetched_objects_cache", None) or {}
+            if "attachments" in pref:
+                self._attachments[visit_id] = list(visit.attachments.all())
+            else:
+                missing_attachments.append(visit_id)
+            if "media_files" in pref:
+                self._media[visit_id] = list(visit.media_files.all())
+            else:
+                missing_media.append(visit_id)
+        if missing_attachments:
+            attachments = (
+                VisitAttachment.objects.filter(visit_id__in=missing_attachments)
+                .select_related("employee", "uploaded_by")
+                .order_by("uploaded_at", "id")
+            )
+            for obj in attachments:
+                self._attachments[obj.visit_id].append(obj)
+        if missing_media:
+            media = (
+                VisitMedia.objects.filter(visit_id__in=missing_media)
+                .select_related("uploaded_by")
+                .order_by("uploaded_at", "id")
+            )
+            for obj in media:
+                self._media[obj.visit_id].append(obj)
+
+    def attachments_for(self, visit_id: int) -> list[VisitAttachment]:
+        return self._attachments.get(visit_id, [])
+
+    def media_for(self, visit_id: int) -> list[VisitMedia]:
+        return self._media.get(visit_id, [])
+
+    def url(self, field) -> str | None:
+        """Memoized absolute URL for any stored file field."""
+        return build_absolute_rendition_url(field, self.request, self.url_cache)
+
+    def evidence(self, visit_id: int) -> list[dict[str, Any]]:
+        """Normalized evidence for one visit: attachments + media, oldest first."""
+        if visit_id in self._rows:
+            return self._rows[visit_id]
+        rows: list[dict[str, Any]] = []
+        for obj in self.attachments_for(visit_id):
+            row = serialize_attachment_evidence(obj, self.request, self.url_cache)
+            row["_storage_name"] = _storage_name(obj)
+            rows.append(row)
+        for obj in self.media_for(visit_id):
+            row = serialize_media_evidence(obj, self.request, self.url_cache)
+            row["_storage_name"] = _storage_name(obj)
+            rows.append(row)
+        rows = _dedupe_evidence(rows)
+        rows.sort(key=_sort_key)
+        self._rows[visit_id] = rows
+        return rows
+
+    def preview(self, visit_id: int, *, limit: int = 3, images_only: bool = True) -> dict[str, Any]:
+        rows = self.evidence(visit_id)
+        return {
+            "evidence_count": len(rows),
+            "evidence_preview": _preview_entries(rows, limit, images_only),
+        }
+
+    def evidence_map(self) -> dict[int, list[dict[str, Any]]]:
+        return {visit_id: self.evidence(visit_id) for visit_id in self.visit_ids}
+
+    def preview_map(self, *, limit: int = 3, images_only: bool = True) -> dict[int, dict[str, Any]]:
+        return {
+            visit_id: self.preview(visit_id, limit=limit, images_only=images_only)
+            for visit_id in self.visit_ids
+        }
+
+
 def list_visit_evidence(visit, request) -> list[dict[str, Any]]:
     """Normalized evidence for one visit: attachments + media, oldest first."""
-    rows: list[dict[str, Any]] = []
-
-    # Prefer prefetched reverse relations to avoid N+1 on list endpoints.
-    pref = getattr(visit, "_prefetched_objects_cache", {}) or {}
-    if "attachments" in pref:
-        attachments = list(visit.attachments.all())
-    else:
-        attachments = list(
-            VisitAttachment.objects.filter(visit=visit)
-            .select_related("employee", "uploaded_by", "visit")
-            .order_by("uploaded_at", "id")
-        )
-    for obj in attachments:
-        row = serialize_attachment_evidence(obj, request)
-        row["_storage_name"] = _storage_name(obj)
-        rows.append(row)
-
-    if "media_files" in pref:
-        media = list(visit.media_files.all())
-    else:
-        media = list(
-            VisitMedia.objects.filter(visit=visit)
-            .select_related("uploaded_by")
-            .order_by("uploaded_at", "id")
-        )
-    for obj in media:
-        row = serialize_media_evidence(obj, request)
-        row["_storage_name"] = _storage_name(obj)
-        rows.append(row)
-
-    rows = _dedupe_evidence(rows)
-    rows.sort(key=_sort_key)
-    return rows
+    return EvidenceBatch([visit], request).evidence(visit.pk)
 
 
 def build_visit_evidence_preview(
@@ -204,28 +306,30 @@ def build_visit_evidence_preview(
     """
     Lightweight list-preview for farmer visit history cards.
 
-    Returns total evidence_count (all types) and a small image preview list.
+    Returns total evidence_count (all types) and a small image preview list;
+    each entry carries ``thumbnail_url`` (WebP rendition when processed).
     """
-    rows = list_visit_evidence(visit, request)
-    preview_source = rows
-    if images_only:
-        preview_source = [
-            r
-            for r in rows
-            if (r.get("attachment_type") == "image")
-            or str(r.get("mime_type") or "").lower().startswith("image/")
-        ]
-    preview = []
-    for r in preview_source[: max(0, int(limit))]:
-        preview.append(
-            {
-                "evidence_key": r.get("evidence_key"),
-                "type": r.get("attachment_type") or "other",
-                "file_url": r.get("file_url"),
-                "mime_type": r.get("mime_type") or "",
-            }
+    return EvidenceBatch([visit], request).preview(
+        visit.pk, limit=limit, images_only=images_only
+    )
+
+
+def attach_evidence_previews(
+    visits: Iterable,
+    request,
+    *,
+    limit: int = 3,
+    images_only: bool = True,
+    url_cache: dict | None = None,
+) -> EvidenceBatch:
+    """
+    Batch-load previews for a page of visits and pin each one on
+    ``visit._evidence_preview_bundle`` for the serializers to pick up.
+    """
+    visits = [v for v in visits if getattr(v, "pk", None) is not None]
+    batch = EvidenceBatch(visits, request, url_cache=url_cache)
+    for visit in visits:
+        visit._evidence_preview_bundle = batch.preview(
+            visit.pk, limit=limit, images_only=images_only
         )
-    return {
-        "evidence_count": len(rows),
-        "evidence_preview": preview,
-    }
+    return batch
@@ -130,7 +130,11 @@ def sync_visit_farmer_master(visit: Visit) -> Visit:
             visit_updates["field_id"] = new_field.id
 
     if visit_updates:
+        from reports.rollups import refresh_for_visit
+
         Visit.objects.filter(pk=visit.pk).update(**visit_updates)
         visit.refresh_from_db()
+        # update() skips the rollup signals; farmer / village may have changed.
+        refresh_for_visit(visit)
 
     return visit
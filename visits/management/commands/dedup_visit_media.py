@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from visits.media_store import adopt_stored, delete_file_on_commit, hash_file
+from visits.models import MediaBlob, VisitAttachment, VisitMedia
+
+_MODELS = (VisitMedia, VisitAttachment)
+
+
+def _referenced_elsewhere(storage_name: str) -> bool:
+    return any(model.objects.filter(file=storage_name).exists() for model in _MODELS)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move VisitMedia / VisitAttachment files onto content-addressed blobs "
+        "and delete duplicate copies. Dry-run by default; pass --confirm to apply."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--confirm",
+            action="store_true",
+            help="Rewrite rows and delete duplicate files (default is dry-run only).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Process at most N legacy rows per model.",
+        )
+
+    def handle(self, *args, **options):
+        confirm = options["confirm"]
+        limit = options["limit"]
+        if limit is not None and limit <= 0:
+            raise CommandError("--limit must be greater than 0.")
+
+        stats = {"scanned": 0, "missing": 0, "blobs": 0, "duplicates": 0, "bytes": 0}
+        # Dry-run bookkeeping: hashes seen so far this run.
+        seen: set[str] = set(MediaBlob.objects.values_list("sha256", flat=True))
+
+        for model in _MODELS:
+            qs = model.objects.filter(blob__isnull=True).exclude(file="").exclude(file__isnull=True)
+            qs = qs.order_by("pk").only("pk", "file")
+            if limit:
+                qs = qs[:limit]
+            for row in qs.iterator(chunk_size=500):
+                self._dedup_row(model, row, confirm, seen, stats)
+
+        if confirm:
+            self._resync_ref_counts()
+
+        verb = "Reclaimed" if confirm else "Would reclaim"
+        self.stdout.write(
+            f"Scanned {stats['scanned']} row(s): {stats['blobs']} new blob(s), "
+            f"{stats['duplicates']} duplicate(s), {stats['missing']} missing file(s)."
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {stats['bytes']} byte(s).")
+            if confirm
+            else self.style.WARNING(f"Dry-run: {verb.lower()} {stats['bytes']} byte(s). Re-run with --confirm to apply.")
+        )
+
+    def _dedup_row(self, model, row, confirm, seen, stats):
+        stats["scanned"] += 1
+        name = row.file.name
+        try:
+            size = default_storage.size(name)
+            with default_storage.open(name, "rb") as fh:
+                sha = hash_file(fh)
+        except (FileNotFoundError, OSError):
+            stats["missing"] += 1
+            return
+
+        if not confirm:
+            if sha in seen:
+                stats["duplicates"] += 1
+                stats["bytes"] += size
+            else:
+                seen.add(sha)
+                stats["blobs"] += 1
+            return
+
+        with transaction.atomic():
+            blob, reused = adopt_stored(name, sha, size)
+            model.objects.filter(pk=row.pk).update(
+                file=blob.storage_name, blob=blob, content_sha256=sha
+            )
+            if reused:
+                stats["duplicates"] += 1
+                if not _referenced_elsewhere(name):
+                    stats["bytes"] += size
+                    delete_file_on_commit(name)
+            elif blob.ref_count > 1:
+                # Another row already pointed at this very path.
+                stats["duplicates"] += 1
+            else:
+                stats["blobs"] += 1
+
+    def _resync_ref_counts(self):
+        """Make ref_count match the referencing rows (repairs any drift)."""
+        media = dict(
+            VisitMedia.objects.filter(blob__isnull=False)
+            .values_list("blob_id")
+            .annotate(n=Count("id"))
+        )
+        attachments = dict(
+            VisitAttachment.objects.filter(blob__isnull=False)
+            .values_list("blob_id")
+            .annotate(n=Count("id"))
+        )
+        stale, orphans = [], []
+        for blob in MediaBlob.objects.only("pk", "ref_count", "storage_name").iterator(chunk_size=1000):
+            expected = media.get(blob.pk, 0) + attachments.get(blob.pk, 0)
+            if expected == 0:
+                orphans.append(blob)
+            elif blob.ref_count != expected:
+                blob.ref_count = expected
+                stale.append(blob)
+        MediaBlob.objects.bulk_update(stale, ["ref_count"], batch_size=500)
+        with transaction.atomic():
+            for blob in orphans:
+                blob.delete()
+                delete_file_on_commit(blob.storage_name)
+        if stale or orphans:
+            self.stdout.write(
+                f"Resynced ref_count on {len(stale)} blob(s); removed {len(orphans)} unreferenced blob(s)."
+            )
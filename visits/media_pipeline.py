@@ -0,0 +1,278 @@
+"""
+Post-upload processing for VisitMedia.
+
+Uploads are validated and stored in the request with
+``processing_status=pending``; ``visits.tasks.process_visit_media`` then runs
+``process_media`` on a worker:
+
+- streamed SHA-256 of the stored file (``content_sha256``)
+- WebP thumbnail and preview renditions for images (Pillow)
+- duration probe for audio/video read from storage with seek, not into memory
+
+and advances the row to ``ready``.  Only a file that cannot be decoded marks
+the row ``failed`` (with ``processing_error``); storage and database errors
+put the row back to ``pending`` and propagate so the task retries.  A row
+left in ``processing`` by a dead worker is claimed again once
+STALE_PROCESSING_AFTER has passed.  Every claim counts in
+``processing_attempts``: the stale sweep waits longer after each attempt, and
+the claim after MAX_PROCESSING_ATTEMPTS marks the row ``failed`` instead of
+running the pipeline again.  The original file is always kept; clients fall
+back to it when renditions are missing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from visits.media_validation import probe_isobmff_duration_seconds
+from visits.models import VisitMedia
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+# Pending rows older than this are assumed to have lost their task message.
+STALE_PENDING_AFTER = timedelta(minutes=10)
+# Processing claims older than this are assumed to belong to a dead worker.
+STALE_PROCESSING_AFTER = timedelta(minutes=30)
+# Claims before a row is given up on; the sweep doubles its wait per attempt.
+MAX_PROCESSING_ATTEMPTS = 8
+
+
+class MediaDecodeError(Exception):
+    """The stored file is not a readable image; retrying will not help."""
+
+
+def thumbnail_px() -> int:
+    return int(getattr(settings, "VISIT_MEDIA_THUMBNAIL_PX", 320))
+
+
+def preview_px() -> int:
+    return int(getattr(settings, "VISIT_MEDIA_PREVIEW_PX", 1280))
+
+
+def _is_image(media: VisitMedia) -> bool:
+    if media.media_type == VisitMedia.MEDIA_TYPE_IMAGE:
+        return True
+    return media.media_type == VisitMedia.MEDIA_TYPE_BILL and (
+        media.mime_type or ""
+    ).lower().startswith("image/")
+
+
+def sha256_of_file(file_obj) -> str:
+    digest = hashlib.sha256()
+    if hasattr(file_obj, "chunks"):
+        for chunk in file_obj.chunks(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: file_obj.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_webp(image, max_px: int, *, quality: int = 80) -> ContentFile:
+    """Downscale a copy of ``image`` to fit max_px x max_px and encode as WebP."""
+    copy = image.copy()
+    copy.thumbnail((max_px, max_px))
+    if copy.mode not in ("RGB", "RGBA"):
+        copy = copy.convert("RGBA" if "A" in copy.getbands() or copy.mode == "P" else "RGB")
+    out = io.BytesIO()
+    copy.save(out, format="WEBP", quality=quality, method=4)
+    return ContentFile(out.getvalue())
+
+
+def _render_image_variants(media: VisitMedia, stem: str) -> None:
+    from PIL import Image, ImageOps
+
+    with media.file.open("rb") as fh:
+        try:
+            with Image.open(fh) as image:
+                image = ImageOps.exif_transpose(image)
+                thumbnail = render_webp(image, thumbnail_px())
+                preview = render_webp(image, preview_px())
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as exc:
+            # UnidentifiedImageError / truncated data are OSErrors from Pillow.
+            raise MediaDecodeError(f"Unreadable image: {exc}") from exc
+    media.thumbnail.save(f"{stem}_thumb.webp", thumbnail, save=False)
+    media.preview.save(f"{stem}_preview.webp", preview, save=False)
+
+
+def _reuse_renditions(media: VisitMedia) -> bool:
+    """Point at another row's renditions of the same blob instead of re-rendering."""
+    if not media.blob_id:
+        return False
+    sibling = (
+        VisitMedia.objects.filter(blob_id=media.blob_id, processing_status=VisitMedia.STATUS_READY)
+        .exclude(pk=media.pk)
+        .exclude(thumbnail="")
+        .exclude(preview="")
+        .only("thumbnail", "preview")
+        .first()
+    )
+    if sibling is None:
+        return False
+    media.thumbnail.name = sibling.thumbnail.name
+    media.preview.name = sibling.preview.name
+    return True
+
+
+def _probe_duration(media: VisitMedia) -> float | None:
+    with media.file.open("rb") as fh:
+        return probe_isobmff_duration_seconds(fh)
+
+
+def _claim_is_live(media: VisitMedia) -> bool:
+    started = media.processing_started_at
+    return started is not None and started >= timezone.now() - STALE_PROCESSING_AFTER
+
+
+def _claim(media_id: int) -> VisitMedia | None:
+    """
+    Move a pending/failed row (or a stale processing claim) to processing;
+    None if another worker owns it.
+    """
+    with transaction.atomic():
+        media = VisitMedia.objects.select_for_update().filter(pk=media_id).first()
+        if media is None:
+            return None
+        if media.processing_status == VisitMedia.STATUS_PROCESSING and _claim_is_live(media):
+            return None
+        if media.processing_status == VisitMedia.STATUS_READY and media.processed_at:
+            return None
+        if media.processing_attempts >= MAX_PROCESSING_ATTEMPTS:
+            logger.warning(
+                "event=visit_media_processing_abandoned media_id=%s attempts=%s",
+                media.pk,
+                media.processing_attempts,
+            )
+            media.processing_status = VisitMedia.STATUS_FAILED
+            media.processing_error = f"Gave up after {media.processing_attempts} attempts."
+            media.processed_at = timezone.now()
+            media.save(update_fields=["processing_status", "processing_error", "processed_at"])
+            return None
+        media.processing_status = VisitMedia.STATUS_PROCESSING
+        media.processing_started_at = timezone.now()
+        media.processing_attempts += 1
+        media.save(
+            update_fields=["processing_status", "processing_started_at", "processing_attempts"]
+        )
+        return media
+
+
+def _release(media: VisitMedia) -> None:
+    """
+    Hand a claimed row back to pending after an error worth retrying; the
+    claim time stays as the last attempt the stale sweep backs off from.
+    """
+    try:
+        VisitMedia.objects.filter(
+            pk=media.pk, processing_status=VisitMedia.STATUS_PROCESSING
+        ).update(processing_status=VisitMedia.STATUS_PENDING)
+    except Exception:  # noqa: BLE001 - the stale-claim sweep recovers the row
+        logger.warning("event=visit_media_release_failed media_id=%s", media.pk, exc_info=True)
+
+
+def process_media(media_id: int) -> VisitMedia | None:
+    """
+    Run the pipeline for one row.  Idempotent: already-processed rows and rows
+    claimed by another worker are skipped (returns None).
+    """
+    media = _claim(media_id)
+    if media is None:
+        return None
+    stem = os.path.splitext(os.path.basename(media.file.name or ""))[0] or f"media_{media.pk}"
+    fields = [
+        "content_sha256",
+        "duration_seconds",
+        "thumbnail",
+        "preview",
+        "processing_status",
+        "processing_error",
+        "processed_at",
+    ]
+    try:
+        if not media.content_sha256:
+            with media.file.open("rb") as fh:
+                media.content_sha256 = sha256_of_file(fh)
+        if _is_image(media) and not _reuse_renditions(media):
+            _render_image_variants(media, stem)
+        elif media.media_type in (VisitMedia.MEDIA_TYPE_AUDIO, VisitMedia.MEDIA_TYPE_VIDEO):
+            probed = _probe_duration(media)
+            if probed is not None:
+                media.duration_seconds = probed
+        media.processing_status = VisitMedia.STATUS_READY
+        media.processing_error = ""
+    except MediaDecodeError as exc:
+        logger.warning("event=visit_media_processing_failed media_id=%s error=%s", media.pk, exc)
+        media.processing_status = VisitMedia.STATUS_FAILED
+        media.processing_error = str(exc)[:255]
+    except Exception:
+        # Storage / DB trouble: leave the row retryable and let the task retry.
+        _release(media)
+        raise
+    media.processed_at = timezone.now()
+    media.save(update_fields=fields)
+    logger.info(
+        "event=visit_media_processed media_id=%s status=%s",
+        media.pk,
+        media.processing_status,
+    )
+    return media
+
+
+def enqueue_media_processing(media: VisitMedia) -> None:
+    """Queue processing once the surrounding transaction commits."""
+
+    def _send():
+        try:
+            from visits.tasks import process_visit_media
+
+            process_visit_media.delay(media.pk)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not enqueue process_visit_media for media_id=%s: %s", media.pk, exc)
+
+    transaction.on_commit(_send)
+
+
+def _retry_due(now) -> Q:
+    """Pending rows whose last attempt is older than the backoff for their count."""
+    due = Q(processing_attempts=0) | Q(processing_started_at__isnull=True)
+    for attempts in range(1, MAX_PROCESSING_ATTEMPTS + 1):
+        due |= Q(
+            processing_attempts=attempts,
+            processing_started_at__lt=now - STALE_PENDING_AFTER * 2 ** (attempts - 1),
+        )
+    return due
+
+
+def stale_pending_ids(limit: int = 200) -> list[int]:
+    """
+    Pending rows whose task was lost or whose retry backoff has passed, and
+    processing rows whose worker died.
+    """
+    now = timezone.now()
+    return list(
+        VisitMedia.objects.filter(
+            Q(
+                _retry_due(now),
+                processing_status=VisitMedia.STATUS_PENDING,
+                uploaded_at__lt=now - STALE_PENDING_AFTER,
+            )
+            | Q(
+                processing_status=VisitMedia.STATUS_PROCESSING,
+                processing_started_at__lt=now - STALE_PROCESSING_AFTER,
+            )
+            | Q(processing_status=VisitMedia.STATUS_PROCESSING, processing_started_at__isnull=True)
+        )
+        .order_by("uploaded_at")
+        .values_list("pk", flat=True)[:limit]
+    )
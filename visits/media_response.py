@@ -5,29 +5,55 @@ from __future__ import annotations
 from typing import Any
 
 
-def build_absolute_media_url(obj, request) -> str | None:
+def build_absolute_media_url(obj, request, url_cache: dict | None = None) -> str | None:
     """Return a production-safe absolute URL, or None if the file is missing."""
+    if not obj:
+        return None
+    return build_absolute_rendition_url(getattr(obj, "file", None), request, url_cache)
+
+
+def build_absolute_rendition_url(field, request, url_cache: dict | None = None) -> str | None:
+    """
+    Absolute URL for a stored file field (original or rendition), or None.
+
+    ``url_cache`` (storage name -> URL) lets list endpoints resolve each
+    distinct file once per request; shared blobs and renditions repeat.
+    """
     try:
-        if not obj or not getattr(obj, "file", None):
-            return None
         # Missing storage object should not crash serializers.
-        name = getattr(obj.file, "name", None)
-        if not name:
+        if not field or not getattr(field, "name", None):
             return None
-        relative = obj.file.url
+        name = field.name
+        if url_cache is not None and name in url_cache:
+            return url_cache[name]
+        relative = field.url
     except (ValueError, OSError, FileNotFoundError):
         return None
+    url = relative
     if request is not None:
         try:
-            return request.build_absolute_uri(relative)
+            url = request.build_absolute_uri(relative)
         except Exception:
-            return relative
-    return relative
+            url = relative
+    if url_cache is not None:
+        url_cache[name] = url
+    return url
+
+
+def media_rendition_urls(obj, request, url_cache: dict | None = None) -> dict[str, str | None]:
+    """thumbnail_url / preview_url for VisitMedia, falling back to the original."""
+    original = build_absolute_media_url(obj, request, url_cache)
+    thumb = build_absolute_rendition_url(getattr(obj, "thumbnail", None), request, url_cache)
+    preview = build_absolute_rendition_url(getattr(obj, "preview", None), request, url_cache)
+    return {
+        "thumbnail_url": thumb or preview or original,
+        "preview_url": preview or original,
+    }
 
 
-def serialize_visit_media(obj, request=None) -> dict[str, Any]:
+def serialize_visit_media(obj, request=None, url_cache: dict | None = None) -> dict[str, Any]:
     """Canonical VisitMedia payload used by mobile and admin."""
-    url = build_absolute_media_url(obj, request)
+    url = build_absolute_media_url(obj, request, url_cache)
     return {
         "id": obj.pk,
         "media_type": obj.media_type,
@@ -47,6 +73,7 @@ def serialize_visit_media(obj, request=None) -> dict[str, Any]:
         "uploaded_at": obj.uploaded_at.isoformat() if obj.uploaded_at else None,
         "client_upload_id": obj.client_upload_id or "",
         "processing_status": obj.processing_status or "ready",
+        **media_rendition_urls(obj, request, url_cache),
     }
 
 
@@ -0,0 +1,184 @@
+"""
+Content-addressed storage for visit evidence files.
+
+Every VisitMedia / VisitAttachment file is stored once per SHA-256 under
+``blobs/ab/cd/<sha256><ext>`` and tracked by a MediaBlob row with a reference
+count.  Uploading bytes that already exist is a metadata-only insert: the new
+row points at the existing blob and ``ref_count`` goes up.  Deleting a row
+(``visits.signals``) releases its reference; the stored file is removed when
+the last reference goes away.  WebP renditions may be shared between rows of
+the same blob, so they are deleted only once no row names them.
+
+Write new blobs inside ``atomic_blob_writes()`` so files saved by a
+transaction that rolls back are deleted again.
+
+``manage.py dedup_visit_media`` moves legacy rows onto blobs and reclaims
+duplicate files.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from visits.media_pipeline import sha256_of_file
+from visits.models import MediaBlob, VisitMedia
+
+logger = logging.getLogger(__name__)
+
+
+def blob_name(sha256: str, filename: str = "") -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def hash_file(file_obj) -> str:
+    """Streamed SHA-256; leaves the file positioned at the start."""
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    digest = sha256_of_file(file_obj)
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    return digest
+
+
+_written = threading.local()
+
+
+def _delete_quietly(storage_name: str) -> None:
+    try:
+        default_storage.delete(storage_name)
+    except Exception:  # noqa: BLE001
+        logger.warning("Could not delete stored file %s", storage_name, exc_info=True)
+
+
+@contextmanager
+def atomic_blob_writes() -> Iterator[None]:
+    """
+    ``transaction.atomic()`` that deletes the files ``store_blob`` wrote inside
+    it when the block rolls back.  Nested blocks hand their files to the
+    enclosing one on success.
+    """
+    stack: List[List[str]] = _written.__dict__.setdefault("stack", [])
+    names: List[str] = []
+    stack.append(names)
+    try:
+        with transaction.atomic():
+            yield
+    except BaseException:
+        for name in names:
+            _delete_quietly(name)
+        raise
+    finally:
+        stack.pop()
+    if stack:
+        stack[-1].extend(names)
+
+
+def _track_written(storage_name: str) -> None:
+    stack = getattr(_written, "stack", None)
+    if stack:
+        stack[-1].append(storage_name)
+
+
+def _add_reference(blob: MediaBlob) -> MediaBlob:
+    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+    blob.refresh_from_db(fields=["ref_count"])
+    return blob
+
+
+def store_blob(file_obj, *, filename: str = "", size: int | None = None) -> Tuple[MediaBlob, bool]:
+    """
+    Reference the blob for ``file_obj``'s bytes, writing them only when new.
+
+    Returns (blob, reused).  Call inside the ``atomic_blob_writes()`` block
+    that creates the referencing row so a rollback also undoes the reference
+    and deletes newly written bytes.
+    """
+    sha = hash_file(file_obj)
+    size = size if size is not None else getattr(file_obj, "size", None) or 0
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(sha256=sha).first()
+        if blob is not None and default_storage.exists(blob.storage_name):
+            return _add_reference(blob), True
+        name = default_storage.save(blob_name(sha, filename or getattr(file_obj, "name", "")), file_obj)
+        _track_written(name)
+        if blob is not None:
+            # Row survived but its file was lost: restore from these bytes.
+            blob.storage_name = name
+            blob.save(update_fields=["storage_name"])
+            return _add_reference(blob), False
+        try:
+            with transaction.atomic():
+                blob = MediaBlob.objects.create(
+                    sha256=sha, storage_name=name, size=size, ref_count=1
+                )
+        except IntegrityError:
+            # Concurrent first upload of the same bytes won the insert.
+            default_storage.delete(name)
+            blob = MediaBlob.objects.select_for_update().get(sha256=sha)
+            return _add_reference(blob), True
+    return blob, False
+
+
+def adopt_stored(storage_name: str, sha256: str, size: int) -> Tuple[MediaBlob, bool]:
+    """
+    Reference the blob for a file already in storage at ``storage_name``.
+
+    When a blob with the same hash exists it is reused (reused=True) and the
+    caller should delete its own copy; otherwise the file becomes the blob.
+    """
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is not None and default_storage.exists(blob.storage_name):
+            return _add_reference(blob), blob.storage_name != storage_name
+        if blob is not None:
+            blob.storage_name = storage_name
+            blob.save(update_fields=["storage_name"])
+            return _add_reference(blob), False
+        try:
+            with transaction.atomic():
+                blob = MediaBlob.objects.create(
+                    sha256=sha256, storage_name=storage_name, size=size, ref_count=1
+                )
+        except IntegrityError:
+            blob = MediaBlob.objects.select_for_update().get(sha256=sha256)
+            return _add_reference(blob), True
+    return blob, False
+
+
+def delete_file_on_commit(storage_name: str) -> None:
+    transaction.on_commit(lambda: _delete_quietly(storage_name))
+
+
+def release_renditions(media: VisitMedia) -> None:
+    """Delete a removed row's renditions unless another row still points at them."""
+    for name in {media.thumbnail.name, media.preview.name} - {"", None}:
+        if not VisitMedia.objects.filter(Q(thumbnail=name) | Q(preview=name)).exists():
+            delete_file_on_commit(name)
+
+
+def release_blob(blob_id: int) -> None:
+    """Drop one reference; the blob and its file go when none remain."""
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        if blob.ref_count > 1:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") - 1)
+            return
+        if blob.media.exists() or blob.attachments.exists():
+            # Count drifted low; keep the file and resync.
+            blob.ref_count = blob.media.count() + blob.attachments.count()
+            blob.save(update_fields=["ref_count"])
+            return
+        storage_name = blob.storage_name
+        blob.delete()
+        delete_file_on_commit(storage_name)
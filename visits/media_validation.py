@@ -110,45 +110,64 @@ def sanitize_original_filename(filename: str) -> str:
     return safe[:255]
 
 
-def _read_box_header(data: bytes, offset: int) -> tuple[str, int, int] | None:
-    if offset + 8 > len(data):
-        return None
-    size = struct.unpack(">I", data[offset : offset + 4])[0]
-    box_type = data[offset + 4 : offset + 8].decode("latin-1", errors="ignore")
-    header = 8
-    if size == 1:
-        if offset + 16 > len(data):
-            return None
-        size = struct.unpack(">Q", data[offset + 8 : offset + 16])[0]
-        header = 16
-    elif size == 0:
-        size = len(data) - offset
-    if size < header:
-        return None
-    return box_type, size, header
+# Boxes that may contain the mdhd atom on the way down from the file root.
+_ISOBMFF_CONTAINERS = {"moov", "trak", "mdia"}
 
 
-def _find_boxes(data: bytes, want: set[str], start: int = 0, end: int | None = None):
-    end = len(data) if end is None else end
+def _iter_boxes(file_obj, start: int, end: int | None):
+    """
+    Yield (type, payload_start, box_end) for sibling boxes in [start, end).
+
+    Only box headers are read; payloads are skipped with seek so a large
+    mdat never has to be loaded.
+    """
     offset = start
-    while offset + 8 <= end:
-        parsed = _read_box_header(data, offset)
-        if not parsed:
-            break
-        box_type, size, header = parsed
+    while end is None or offset + 8 <= end:
+        file_obj.seek(offset)
+        header = file_obj.read(8)
+        if len(header) < 8:
+            return
+        size = struct.unpack(">I", header[:4])[0]
+        box_type = header[4:8].decode("latin-1", errors="ignore")
+        header_len = 8
+        if size == 1:
+            large = file_obj.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack(">Q", large)[0]
+            header_len = 16
+        elif size == 0:
+            if end is None:
+                file_obj.seek(0, os.SEEK_END)
+                size = file_obj.tell() - offset
+            else:
+                size = end - offset
+        if size < header_len:
+            return
         box_end = offset + size
-        if box_end > end or size <= 0:
-            break
-        if box_type in want:
-            yield box_type, offset + header, box_end
-        if box_type in {"moov", "trak", "mdia", "minf", "stbl"}:
-            yield from _find_boxes(data, want, offset + header, box_end)
+        if end is not None and box_end > end:
+            return
+        yield box_type, offset + header_len, box_end
         offset = box_end
 
 
+def _find_mdhd(file_obj, start: int, end: int | None) -> tuple[int, int] | None:
+    for box_type, payload_start, box_end in _iter_boxes(file_obj, start, end):
+        if box_type == "mdhd":
+            return payload_start, box_end
+        if box_type in _ISOBMFF_CONTAINERS:
+            found = _find_mdhd(file_obj, payload_start, box_end)
+            if found:
+                return found
+    return None
+
+
 def probe_isobmff_duration_seconds(file_obj) -> float | None:
     """
     Read duration from ISO BMFF (mp4/m4a/mov) mdhd atom.
+
+    Walks box headers with seek, so only a few hundred bytes are read
+    regardless of where moov sits in the file.
     Returns None when duration cannot be determined.
     """
     try:
@@ -156,29 +175,28 @@ def probe_isobmff_duration_seconds(file_obj) -> float | None:
     except Exception:
         pos = None
     try:
-        if hasattr(file_obj, "seek"):
-            file_obj.seek(0)
-        # Cap read — duration lives early in moov for typical mobile exports.
-        data = file_obj.read(8 * 1024 * 1024)
-        if not data or len(data) < 16:
+        if not hasattr(file_obj, "seek"):
             return None
-        for box_type, payload_start, payload_end in _find_boxes(data, {"mdhd"}):
-            payload = data[payload_start:payload_end]
-            if len(payload) < 20:
-                continue
-            version = payload[0]
-            if version == 0 and len(payload) >= 20:
-                timescale = struct.unpack(">I", payload[12:16])[0]
-                duration = struct.unpack(">I", payload[16:20])[0]
-            elif version == 1 and len(payload) >= 32:
-                timescale = struct.unpack(">I", payload[20:24])[0]
-                duration = struct.unpack(">Q", payload[24:32])[0]
-            else:
-                continue
-            if timescale <= 0:
-                continue
-            return float(duration) / float(timescale)
-        return None
+        found = _find_mdhd(file_obj, 0, None)
+        if not found:
+            return None
+        payload_start, box_end = found
+        file_obj.seek(payload_start)
+        payload = file_obj.read(min(32, box_end - payload_start))
+        if len(payload) < 20:
+            return None
+        version = payload[0]
+        if version == 0:
+            timescale = struct.unpack(">I", payload[12:16])[0]
+            duration = struct.unpack(">I", payload[16:20])[0]
+        elif version == 1 and len(payload) >= 32:
+            timescale = struct.unpack(">I", payload[20:24])[0]
+            duration = struct.unpack(">Q", payload[24:32])[0]
+        else:
+            return None
+        if timescale <= 0:
+            return None
+        return float(duration) / float(timescale)
     except Exception:
         logger.debug("ISO BMFF duration probe failed", exc_info=True)
         return None
@@ -234,11 +252,15 @@ def validate_visit_media_file_detailed(
     file_obj,
     media_type: str,
     client_duration_seconds: float | None = None,
+    check_duration: bool = True,
 ) -> dict[str, Any]:
     """
     Validate media and return metadata dict:
     mime_type, file_size, duration_seconds, original_filename
     Raises MediaValidationError with machine-readable code.
+
+    check_duration=False validates declared metadata only (name, size, MIME),
+    e.g. before a direct-to-storage upload when no bytes are available yet.
     """
     media_type = (media_type or "").strip().lower()
     if media_type not in EXTENSIONS_BY_MEDIA_TYPE:
@@ -335,7 +357,7 @@ def validate_visit_media_file_detailed(
         }.get(ext, "")
 
     duration_seconds = None
-    if media_type == "video":
+    if check_duration and media_type == "video":
         probed = probe_media_duration_seconds(
             file_obj=file_obj, media_type=media_type, mime_type=content_type
         )
@@ -364,7 +386,7 @@ def validate_visit_media_file_detailed(
                 code=CODE_VIDEO_DURATION_EXCEEDED,
                 errors={"file": "Video must be 60 seconds or shorter."},
             )
-    elif media_type == "audio":
+    elif check_duration and media_type == "audio":
         probed = probe_media_duration_seconds(
             file_obj=file_obj, media_type=media_type, mime_type=content_type
         )
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.17 on 2026-10-19 13:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _geohash(lat, lng, precision=7):
+    # Frozen copy of utils.geo.geohash_encode as of this migration.
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            bits = (bits << 1) | (lng >= mid)
+            lng_lo, lng_hi = (mid, lng_hi) if lng >= mid else (lng_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            bits = (bits << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _in_range(lat, lng):
+    return -90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0
+
+
+def backfill_visit_geohash(apps, schema_editor):
+    Visit = apps.get_model("visits", "Visit")
+    batch = []
+    qs = Visit.objects.filter(latitude__isnull=False, longitude__isnull=False).only(
+        "id", "latitude", "longitude"
+    )
+    for visit in qs.iterator(chunk_size=2000):
+        if not _in_range(visit.latitude, visit.longitude):
+            continue
+        visit.geohash = _geohash(visit.latitude, visit.longitude)
+        batch.append(visit)
+        if len(batch) >= 1000:
+            Visit.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        Visit.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('masters', '0028_geo_columns'),
+        ('tracking', '0015_employee_live_location_heartbeat_state'),
+        ('visits', '0030_business_locations_and_multi_problem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visit',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['latitude', 'longitude'], name='visits_visi_latitud_abe62c_idx'),
+        ),
+        migrations.RunPython(backfill_visit_geohash, migrations.RunPython.noop),
+    ]
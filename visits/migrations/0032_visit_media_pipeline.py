@@ -0,0 +1,43 @@
+# Generated by Django 5.2.17 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0031_geo_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitmedia',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='visitmedia',
+            name='preview',
+            field=models.FileField(blank=True, default='', upload_to='visit_media/previews/'),
+        ),
+        migrations.AddField(
+            model_name='visitmedia',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='visitmedia',
+            name='processing_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='visitmedia',
+            name='thumbnail',
+            field=models.FileField(blank=True, default='', upload_to='visit_media/thumbs/'),
+        ),
+        migrations.AlterField(
+            model_name='visitmedia',
+            name='processing_status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Pending'), ('processing', 'Processing'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+    ]
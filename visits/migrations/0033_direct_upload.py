@@ -0,0 +1,43 @@
+# Generated by Django 5.2.17 on 2026-10-19 13:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0032_visit_media_pipeline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_upload_id', models.CharField(max_length=64)),
+                ('target', models.CharField(choices=[('media', 'Visit media'), ('attachment', 'Visit attachment')], max_length=20)),
+                ('kind', models.CharField(max_length=20)),
+                ('storage_key', models.CharField(max_length=255, unique=True)),
+                ('original_filename', models.CharField(blank=True, default='', max_length=255)),
+                ('content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('declared_size', models.PositiveBigIntegerField()),
+                ('caption', models.CharField(blank=True, default='', max_length=255)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('issued', 'Issued'), ('finalized', 'Finalized'), ('rejected', 'Rejected')], default='issued', max_length=20)),
+                ('error', models.CharField(blank=True, default='', max_length=255)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finalized_at', models.DateTimeField(blank=True, null=True)),
+                ('attachment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='visits.visitattachment')),
+                ('media', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='visits.visitmedia')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='direct_uploads', to=settings.AUTH_USER_MODEL)),
+                ('visit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='direct_uploads', to='visits.visit')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('visit', 'target', 'client_upload_id'), name='uniq_direct_upload_client_id')],
+            },
+        ),
+    ]
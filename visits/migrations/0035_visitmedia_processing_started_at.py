@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0034_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitmedia',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0035_visitmedia_processing_started_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitmedia',
+            name='processing_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -27,6 +27,7 @@ class Visit(models.Model):
     # Location
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default="", db_index=True)
     address = models.TextField(null=True, blank=True)
     district = models.ForeignKey(
         "masters.District", on_delete=models.PROTECT, null=True, blank=True
@@ -166,6 +167,7 @@ class Visit(models.Model):
             models.Index(fields=["employee", "created_at"]),
             models.Index(fields=["employee", "visit_date"]),
             models.Index(fields=["farmer", "visit_date"]),
+            models.Index(fields=["latitude", "longitude"]),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -176,10 +178,35 @@ class Visit(models.Model):
             )
         ]
 
+    def save(self, *args, **kwargs):
+        from utils.geo import location_columns
+
+        self.geohash = location_columns(self.latitude, self.longitude)[2]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Visit {self.id} - {self.farmer_name} - {self.visit_date}"
 
 
+class MediaBlob(models.Model):
+    """
+    One stored file, addressed by SHA-256 and shared by every VisitMedia /
+    VisitAttachment row with identical bytes (see visits.media_store).
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    storage_name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} x{self.ref_count}"
+
+
 class VisitMedia(models.Model):
     """Canonical visit media row (image / audio / video / bill document)."""
 
@@ -196,10 +223,12 @@ class VisitMedia(models.Model):
 
     STATUS_READY = "ready"
     STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
     STATUS_FAILED = "failed"
     PROCESSING_STATUS_CHOICES = [
         (STATUS_READY, "Ready"),
         (STATUS_PENDING, "Pending"),
+        (STATUS_PROCESSING, "Processing"),
         (STATUS_FAILED, "Failed"),
     ]
 
@@ -226,6 +255,19 @@ class VisitMedia(models.Model):
         choices=PROCESSING_STATUS_CHOICES,
         default=STATUS_READY,
     )
+    # Derived by visits.media_pipeline after upload.
+    thumbnail = models.FileField(upload_to="visit_media/thumbs/", blank=True, default="")
+    preview = models.FileField(upload_to="visit_media/previews/", blank=True, default="")
+    content_sha256 = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    blob = models.ForeignKey(
+        MediaBlob, on_delete=models.PROTECT, null=True, blank=True, related_name="media"
+    )
+    processing_error = models.CharField(max_length=255, blank=True, default="")
+    # When a worker last claimed the row; stale claims are taken back by another one.
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    # Claims so far; the stale sweep backs off on it and gives up at a limit.
+    processing_attempts = models.PositiveSmallIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
 
@@ -272,6 +314,14 @@ class VisitAttachment(models.Model):
     original_filename = models.CharField(max_length=255, blank=True, default="")
     mime_type = models.CharField(max_length=128, blank=True, default="")
     file_size = models.PositiveIntegerField(default=0)
+    content_sha256 = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    blob = models.ForeignKey(
+        MediaBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="attachments",
+    )
     uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
     uploaded_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -298,3 +348,74 @@ class VisitAttachment(models.Model):
             "other": "OTHER",
         }
         return legacy.get(self.attachment_type, "OTHER")
+
+
+class DirectUpload(models.Model):
+    """
+    Two-phase upload ticket: the client PUTs bytes straight to storage at
+    ``storage_key`` and then finalizes, which creates the VisitMedia /
+    VisitAttachment row (see visits.direct_upload).
+    """
+
+    TARGET_MEDIA = "media"
+    TARGET_ATTACHMENT = "attachment"
+    TARGET_CHOICES = [
+        (TARGET_MEDIA, "Visit media"),
+        (TARGET_ATTACHMENT, "Visit attachment"),
+    ]
+
+    STATUS_ISSUED = "issued"
+    STATUS_FINALIZED = "finalized"
+    STATUS_REJECTED = "rejected"
+    STATUS_CHOICES = [
+        (STATUS_ISSUED, "Issued"),
+        (STATUS_FINALIZED, "Finalized"),
+        (STATUS_REJECTED, "Rejected"),
+    ]
+
+    visit = models.ForeignKey(
+        Visit, on_delete=models.CASCADE, related_name="direct_uploads"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="direct_uploads",
+    )
+    client_upload_id = models.CharField(max_length=64)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    # VisitMedia.media_type or VisitAttachment.attachment_type
+    kind = models.CharField(max_length=20)
+    storage_key = models.CharField(max_length=255, unique=True)
+    original_filename = models.CharField(max_length=255, blank=True, default="")
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    declared_size = models.PositiveBigIntegerField()
+    caption = models.CharField(max_length=255, blank=True, default="")
+    duration_seconds = models.FloatField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_ISSUED
+    )
+    error = models.CharField(max_length=255, blank=True, default="")
+    media = models.ForeignKey(
+        VisitMedia, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    attachment = models.ForeignKey(
+        VisitAttachment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    finalized_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["visit", "target", "client_upload_id"],
+                name="uniq_direct_upload_client_id",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.target}:{self.client_upload_id} | Visit {self.visit_id}"
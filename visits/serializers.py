@@ -55,7 +55,9 @@ class VisitMediaSerializer(serializers.ModelSerializer):
     def _url(self, obj):
         from visits.media_response import build_absolute_media_url
 
-        return build_absolute_media_url(obj, self.context.get("request"))
+        return build_absolute_media_url(
+            obj, self.context.get("request"), self.context.get("url_cache")
+        )
 
     @extend_schema_field(OpenApiTypes.URI)
     def get_file_url(self, obj):
@@ -77,7 +79,9 @@ class VisitMediaSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         from visits.media_response import serialize_visit_media
 
-        return serialize_visit_media(instance, self.context.get("request"))
+        return serialize_visit_media(
+            instance, self.context.get("request"), self.context.get("url_cache")
+        )
 
 
 class VisitMediaUploadSerializer(serializers.ModelSerializer):
@@ -6,8 +6,10 @@ import logging
 from dataclasses import dataclass
 
 from django.contrib.auth.models import User
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError
 
+from visits.media_pipeline import enqueue_media_processing
+from visits.media_store import atomic_blob_writes, store_blob
 from visits.media_validation import (
     MediaValidationError,
     validate_visit_media_file_detailed,
@@ -87,7 +89,10 @@ def upload_visit_media(
     """
     Canonical VisitMedia writer.
 
-    Replay of the same (visit, client_upload_id) returns the existing row.
+    Replay of the same (visit, client_upload_id) returns the existing row;
+    identical bytes under a new id share the stored file (visits.media_store).
+    The row is stored as ``pending``; thumbnails, hash and duration probe run
+    in ``visits.tasks.process_visit_media`` after commit.
     """
     media_type = (media_type or "").strip().lower()
     valid_types = {c[0] for c in VisitMedia.MEDIA_TYPE_CHOICES}
@@ -128,11 +133,14 @@ def upload_visit_media(
     owner = uploaded_by or getattr(visit, "employee", None)
 
     try:
-        with transaction.atomic():
+        with atomic_blob_writes():
+            blob, reused = store_blob(file, size=meta.get("file_size"))
             media = VisitMedia.objects.create(
                 visit=visit,
                 uploaded_by=owner if getattr(owner, "pk", None) else None,
-                file=file,
+                file=blob.storage_name,
+                blob=blob,
+                content_sha256=blob.sha256,
                 media_type=media_type,
                 caption=caption or "",
                 client_upload_id=upload_id,
@@ -140,16 +148,18 @@ def upload_visit_media(
                 original_filename=meta.get("original_filename") or "",
                 file_size=meta.get("file_size"),
                 duration_seconds=meta.get("duration_seconds"),
-                processing_status=VisitMedia.STATUS_READY,
+                processing_status=VisitMedia.STATUS_PENDING,
             )
+            enqueue_media_processing(media)
         logger.info(
             "event=visit_media_uploaded visit_id=%s media_id=%s type=%s "
-            "client_upload_id=%s size=%s",
+            "client_upload_id=%s size=%s deduplicated=%s",
             visit.pk,
             media.pk,
             media_type,
             upload_id or None,
             meta.get("file_size"),
+            reused,
         )
         return MediaUploadResult(media=media, created=True, duplicate=False)
     except IntegrityError:
@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from visits.models import Visit
+from visits.models import Visit, VisitAttachment, VisitMedia
 from visits.farmer_sync import sync_visit_farmer_master
 
 _syncing = False
@@ -40,3 +40,19 @@ def visit_post_save_sync_farmer(sender, instance, raw=False, **kwargs):
 @receiver(post_delete, sender=Visit)
 def visit_post_delete_invalidate(sender, instance, **kwargs):
     _invalidate_after_visit_change()
+
+
+@receiver(post_delete, sender=VisitMedia)
+@receiver(post_delete, sender=VisitAttachment)
+def evidence_post_delete_release_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        from visits.media_store import release_blob
+
+        release_blob(instance.blob_id)
+
+
+@receiver(post_delete, sender=VisitMedia)
+def media_post_delete_release_renditions(sender, instance, **kwargs):
+    from visits.media_store import release_renditions
+
+    release_renditions(instance)
@@ -21,7 +21,7 @@ def notify_visit_created(self, visit_id: int) -> None:
     """
     try:
         from visits.models import Visit
-        from notifications.services import create_notification
+        from notifications.services import broadcast_to_admins
 
         visit = (
             Visit.objects.select_related("employee", "district")
@@ -32,20 +32,19 @@ def notify_visit_created(self, visit_id: int) -> None:
             logger.warning("notify_visit_created: visit_id=%s not found", visit_id)
             return
 
-        # Notify the employee's admin (all staff users)
-        from django.contrib.auth.models import User
-
-        admins = User.objects.filter(is_staff=True, is_active=True)
-        for admin in admins:
-            create_notification(
-                user=admin,
-                notification_type="VISIT_CREATED",
-                message=(
-                    f"New visit by {visit.employee.username} "
-                    f"for farmer {visit.farmer_name or visit.farmer_phone or 'Unknown'} "
-                    f"on {visit.visit_date}."
-                ),
-            )
+        # Notify all staff users in one bulk insert; bursts from the same
+        # employee (offline sync) fold into "N new visits by X".
+        username = visit.employee.username
+        broadcast_to_admins(
+            notification_type="VISIT_CREATED",
+            message=(
+                f"New visit by {username} "
+                f"for farmer {visit.farmer_name or visit.farmer_phone or 'Unknown'} "
+                f"on {visit.visit_date}."
+            ),
+            group_key=f"visit_created:{visit.employee_id}",
+            group_message=lambda count: f"{count} new visits by {username}.",
+        )
 
         logger.info("Notifications sent for visit_id=%s", visit_id)
 
@@ -76,3 +75,31 @@ def generate_visit_report_pdf(self, visit_id: int, requested_by_user_id: int) ->
     except Exception as exc:
         logger.exception("generate_visit_report_pdf failed for visit_id=%s", visit_id)
         raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def process_visit_media(self, media_id: int) -> None:
+    """
+    Hash, render WebP thumbnail/preview and probe duration for one VisitMedia.
+    Undecodable files mark the row failed; storage/DB errors are retried.
+    """
+    try:
+        from visits.media_pipeline import process_media
+
+        process_media(media_id)
+    except Exception as exc:
+        logger.exception("process_visit_media failed for media_id=%s", media_id)
+        raise self.retry(exc=exc)
+
+
+@shared_task
+def requeue_stale_visit_media() -> int:
+    """Re-dispatch uploads whose task message was lost or whose worker died."""
+    from visits.media_pipeline import stale_pending_ids
+
+    ids = stale_pending_ids()
+    for media_id in ids:
+        process_visit_media.delay(media_id)
+    if ids:
+        logger.info("Re-queued %s stale VisitMedia rows", len(ids))
+    return len(ids)
@@ -0,0 +1,170 @@
+"""Two-phase direct uploads: issue presigned PUT -> PUT bytes -> finalize."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+from unittest import mock
+from urllib.parse import urlparse
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+
+from accounts.models import EmployeeProfile
+from masters.models import Crop, Farmer
+from mobile_api.test_helpers import login_mobile_client
+from visits.models import DirectUpload, Visit, VisitAttachment, VisitMedia
+
+_MEDIA_ROOT = tempfile.mkdtemp(prefix="visit_direct_upload_")
+
+_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
+    b"\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx\x9cc\xf8\x0f\x00"
+    b"\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+@override_settings(MEDIA_ROOT=_MEDIA_ROOT)
+class DirectUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="direct_emp", password="x")
+        EmployeeProfile.objects.create(
+            user=self.user, employee_id="EMP-DIRECT", phone="9000000777", is_active_employee=True
+        )
+        farmer = Farmer.objects.create(name="Direct Farmer", phone="9000111333")
+        crop = Crop.objects.create(name_en="Millet", name_ta="Millet", is_active=True)
+        self.visit = Visit.objects.create(
+            employee=self.user, farmer=farmer, crop=crop, latitude=11.9, longitude=79.3
+        )
+        self.client = login_mobile_client(employee_id="EMP-DIRECT")
+        self.base = f"/api/v1/mobile/visits/{self.visit.pk}/uploads/"
+
+    def _issue(self, **extra):
+        body = {
+            "target": "media",
+            "media_type": "image",
+            "filename": "leaf.png",
+            "content_type": "image/png",
+            "size": len(_PNG),
+            "client_upload_id": "up-1",
+            **extra,
+        }
+        return self.client.post(self.base, body, format="json")
+
+    def _put(self, issued, body):
+        upload = issued.data["data"]["upload"]
+        return self.client.generic(
+            "PUT",
+            urlparse(upload["url"]).path,
+            body,
+            content_type=upload["headers"].get("Content-Type", "application/octet-stream"),
+        )
+
+    def _finalize(self, client_upload_id="up-1", target="media"):
+        return self.client.post(
+            f"{self.base}{client_upload_id}/finalize/", {"target": target}, format="json"
+        )
+
+    def test_media_issue_put_finalize_is_idempotent(self):
+        issued = self._issue()
+        self.assertEqual(issued.status_code, 201, issued.content)
+        self.assertEqual(issued.data["data"]["upload"]["method"], "PUT")
+
+        # Finalizing before the bytes arrive is a retryable conflict.
+        self.assertEqual(self._finalize().status_code, 409)
+
+        self.assertEqual(self._put(issued, _PNG).status_code, 200)
+        done = self._finalize()
+        self.assertEqual(done.status_code, 201, done.content)
+        self.assertEqual(done.data["data"]["processing_status"], VisitMedia.STATUS_PENDING)
+
+        replay = self._finalize()
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(replay.data["data"]["id"], done.data["data"]["id"])
+        # Re-issuing after finalize returns the ticket without a new URL.
+        again = self._issue()
+        self.assertEqual(again.data["data"]["status"], DirectUpload.STATUS_FINALIZED)
+        self.assertNotIn("upload", again.data["data"])
+
+        media = VisitMedia.objects.get(visit=self.visit)
+        self.assertEqual(media.client_upload_id, "up-1")
+        self.assertEqual(media.file_size, len(_PNG))
+        self.assertTrue(media.file.name.startswith("visit_media/direct/"))
+
+    def test_finalize_of_media_already_uploaded_drops_the_new_object(self):
+        earlier = VisitMedia.objects.create(
+            visit=self.visit,
+            media_type="image",
+            client_upload_id="up-1",
+            file=SimpleUploadedFile("leaf.png", _PNG, content_type="image/png"),
+        )
+        issued = self._issue()
+        self._put(issued, _PNG)
+        key = DirectUpload.objects.get(client_upload_id="up-1").storage_key
+        with self.captureOnCommitCallbacks(execute=True):
+            done = self._finalize()
+        self.assertEqual(done.data["data"]["id"], earlier.pk)
+        self.assertFalse(default_storage.exists(key))
+        self.assertTrue(default_storage.exists(earlier.file.name))
+
+    def test_object_is_hashed_before_the_ticket_is_locked(self):
+        from visits import direct_upload
+
+        self._put(self._issue(), _PNG)
+        events = []
+        real_hash, real_lock = direct_upload.hash_file, QuerySet.select_for_update
+
+        def hash_file(stored):
+            events.append("hash")
+            return real_hash(stored)
+
+        def select_for_update(qs, *args, **kwargs):
+            events.append(f"lock:{qs.model.__name__}")
+            return real_lock(qs, *args, **kwargs)
+
+        with mock.patch.object(direct_upload, "hash_file", side_effect=hash_file), mock.patch.object(
+            QuerySet, "select_for_update", autospec=True, side_effect=select_for_update
+        ):
+            done = self._finalize()
+        self.assertEqual(done.status_code, 201, done.content)
+        self.assertEqual(events[:2], ["hash", "lock:DirectUpload"])
+
+    def test_attachment_flow_and_oversized_body_rejected(self):
+        pdf = b"%PDF-1.4\n%test\n"
+        issued = self._issue(
+            target="attachment",
+            media_type="",
+            attachment_type="pdf",
+            filename="bill.pdf",
+            content_type="application/pdf",
+            size=len(pdf),
+            client_upload_id="att-1",
+        )
+        self.assertEqual(issued.status_code, 201, issued.content)
+        self._put(issued, pdf)
+        done = self._finalize("att-1", target="attachment")
+        self.assertEqual(done.status_code, 201, done.content)
+        attachment = VisitAttachment.objects.get(visit=self.visit)
+        self.assertEqual(attachment.attachment_type, "pdf")
+        self.assertEqual(attachment.file_size, len(pdf))
+
+        small = self._issue(client_upload_id="up-big", size=10)
+        self.assertEqual(self._put(small, _PNG).status_code, 413)
+
+    def test_declared_type_and_token_are_checked(self):
+        bad = self._issue(filename="run.exe", content_type="application/octet-stream")
+        self.assertEqual(bad.status_code, 400)
+        self.assertFalse(DirectUpload.objects.exists())
+
+        forged = self.client.generic(
+            "PUT", "/api/v1/mobile/uploads/direct/not-a-token/", _PNG, content_type="image/png"
+        )
+        self.assertEqual(forged.status_code, 403)
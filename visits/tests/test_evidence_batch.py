@@ -0,0 +1,157 @@
+"""Batched evidence loading: query count must not grow with the visit count."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmployeeProfile
+from farmers.serializers import FarmerVisitSerializer
+from masters.models import Crop, District, Farmer, Village
+from tracking.employee_report import build_employee_visits_for_date
+from visits.evidence import EvidenceBatch, list_visit_evidence
+from visits.models import Visit, VisitAttachment, VisitMedia
+
+_MEDIA_ROOT = tempfile.mkdtemp(prefix="visit_evidence_batch_")
+_JPEG = b"\xff\xd8\xff" + b"leaf" * 50
+
+
+@override_settings(MEDIA_ROOT=_MEDIA_ROOT)
+class EvidenceBatchTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="batch_admin", password="x", is_staff=True, is_superuser=True
+        )
+        self.emp = User.objects.create_user(username="batch_emp", password="x")
+        EmployeeProfile.objects.create(
+            user=self.emp, employee_id="EMP-BATCH", phone="9000000555", is_active_employee=True
+        )
+        self.district = District.objects.create(name="Batch District")
+        village = Village.objects.create(name="Batch Village", district=self.district)
+        self.farmer = Farmer.objects.create(
+            name="Batch Farmer", phone="9000111555", district=self.district, village=village
+        )
+        self.crop = Crop.objects.create(name_en="Ragi", name_ta="Ragi", is_active=True)
+        self.today = timezone.localdate()
+        self.request = RequestFactory().get("/")
+
+    def _visit_with_evidence(self, n):
+        visit = Visit.objects.create(
+            employee=self.emp,
+            farmer=self.farmer,
+            farmer_name="Batch Farmer",
+            crop=self.crop,
+            latitude=11.0,
+            longitude=78.0,
+            district=self.district,
+            visit_date=self.today,
+        )
+        VisitAttachment.objects.create(
+            visit=visit,
+            employee=self.emp,
+            attachment_type="image",
+            file=SimpleUploadedFile(f"att_{n}.jpg", _JPEG, content_type="image/jpeg"),
+            mime_type="image/jpeg",
+        )
+        VisitMedia.objects.create(
+            visit=visit,
+            media_type="image",
+            mime_type="image/jpeg",
+            file=SimpleUploadedFile(f"media_{n}.jpg", _JPEG, content_type="image/jpeg"),
+        )
+        return visit
+
+    def _queries(self, fn, tables=None):
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        sql = [q["sql"] for q in ctx.captured_queries]
+        if tables:
+            sql = [s for s in sql if any(f'FROM "{t}"' in s for t in tables)]
+        return len(sql)
+
+    def _grow(self, fn, extra=4, tables=None):
+        """Query count for fn() with one visit, then with 1 + extra visits."""
+        self._visit_with_evidence(0)
+        single = self._queries(fn, tables)
+        for i in range(extra):
+            self._visit_with_evidence(i + 1)
+        return single, self._queries(fn, tables)
+
+    def test_batch_loads_any_number_of_visits_in_two_queries(self):
+        visits = [self._visit_with_evidence(i) for i in range(5)]
+        with self.assertNumQueries(2):
+            batch = EvidenceBatch([v.pk for v in visits], self.request)
+            evidence = batch.evidence_map()
+            previews = batch.preview_map()
+
+        self.assertEqual({len(rows) for rows in evidence.values()}, {2})
+        self.assertEqual(previews[visits[0].pk]["evidence_count"], 2)
+        self.assertEqual(evidence[visits[0].pk], list_visit_evidence(visits[0], self.request))
+        # Each distinct stored file resolves its URL once.
+        self.assertEqual(len(batch.url_cache), 10)
+
+    def test_prefetched_relations_are_not_queried_again(self):
+        self._visit_with_evidence(0)
+        visits = list(
+            Visit.objects.prefetch_related(
+                "attachments__employee", "attachments__uploaded_by", "media_files"
+            )
+        )
+        with self.assertNumQueries(0):
+            EvidenceBatch(visits, self.request).evidence_map()
+
+    def test_farmer_visit_history_is_constant(self):
+        def render():
+            qs = (
+                Visit.objects.filter(farmer=self.farmer)
+                .select_related("employee", "village", "district", "crop", "farmer", "field")
+                .prefetch_related("media_files", "issues__recommendations__given_by")
+            )
+            data = FarmerVisitSerializer(qs, many=True, context={"request": self.request}).data
+            self.assertTrue(all(row["evidence_count"] == 2 for row in data))
+
+        single, many = self._grow(render)
+        self.assertEqual(single, many)
+
+    def test_employee_day_report_is_constant(self):
+        def render():
+            build_employee_visits_for_date(
+                user_id=self.emp.pk, target_date=self.today, request=self.request
+            )
+
+        single, many = self._grow(render)
+        self.assertEqual(single, many)
+        data = build_employee_visits_for_date(
+            user_id=self.emp.pk, target_date=self.today, request=self.request
+        )
+        self.assertEqual(data["total_visits"], 5)
+        self.assertEqual(data["completed_visits"] + data["pending_visits"], 5)
+        self.assertTrue(all(row["photo_count"] == 2 for row in data["visits"]))
+
+    def test_admin_visit_list_is_constant(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+
+        def render():
+            response = client.get("/api/v1/admin/visits/", {"page_size": 50})
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertTrue(all(row["evidence_count"] == 2 for row in response.data["results"]))
+
+        # Only evidence tables: problem-item rendering is out of scope here.
+        single, many = self._grow(
+            render, tables=("visits_visitattachment", "visits_visitmedia")
+        )
+        self.assertEqual(single, many)
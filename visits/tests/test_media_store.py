@@ -0,0 +1,116 @@
+"""Content-addressed media blobs: shared storage, ref counting, legacy dedup command."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from masters.models import Crop, Farmer
+from visits.media_store import blob_name
+from visits.models import MediaBlob, Visit, VisitMedia
+from visits.services.media_service import upload_visit_media
+
+_MEDIA_ROOT = tempfile.mkdtemp(prefix="visit_media_store_")
+_JPEG = b"\xff\xd8\xff" + b"leaf" * 100
+
+
+@override_settings(MEDIA_ROOT=_MEDIA_ROOT)
+class MediaBlobStoreTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="blob_emp", password="x")
+        farmer = Farmer.objects.create(name="Blob Farmer", phone="9000111444")
+        crop = Crop.objects.create(name_en="Banana", name_ta="Banana", is_active=True)
+        self.visit = Visit.objects.create(
+            employee=self.user, farmer=farmer, crop=crop, latitude=11.9, longitude=79.3
+        )
+
+    def _upload(self, client_upload_id, content=_JPEG):
+        return upload_visit_media(
+            visit=self.visit,
+            file=SimpleUploadedFile("leaf.jpg", content, content_type="image/jpeg"),
+            media_type="image",
+            client_upload_id=client_upload_id,
+            uploaded_by=self.user,
+        ).media
+
+    def test_identical_bytes_share_one_blob_until_last_reference_goes(self):
+        first = self._upload("a")
+        second = self._upload("b")
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.file.name, second.file.name)
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertTrue(blob.storage_name.startswith(f"blobs/{blob.sha256[:2]}/"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(default_storage.exists(blob.storage_name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(default_storage.exists(blob.storage_name))
+
+    def test_rolled_back_upload_deletes_the_bytes_it_wrote(self):
+        content = b"\xff\xd8\xff" + b"rollback" * 100
+        name = blob_name(hashlib.sha256(content).hexdigest(), "leaf.jpg")
+        with mock.patch.object(VisitMedia.objects, "create", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                self._upload("rolled-back", content=content)
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_shared_renditions_are_deleted_with_the_last_row_using_them(self):
+        first = self._upload("a")
+        second = self._upload("b")
+        thumb = default_storage.save("visit_media/thumbs/leaf_thumb.webp", ContentFile(b"webp"))
+        VisitMedia.objects.filter(pk__in=[first.pk, second.pk]).update(thumbnail=thumb)
+        first.refresh_from_db()
+        second.refresh_from_db()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(thumb))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(default_storage.exists(thumb))
+
+    def test_dedup_command_moves_legacy_rows_onto_one_blob(self):
+        names = []
+        for i in range(2):
+            media = VisitMedia(visit=self.visit, media_type="image", mime_type="image/jpeg")
+            media.file.save(f"legacy_{i}.jpg", ContentFile(_JPEG), save=True)
+            names.append(media.file.name)
+
+        out = io.StringIO()
+        call_command("dedup_visit_media", stdout=out)
+        self.assertIn(f"Dry-run: would reclaim {len(_JPEG)} byte(s)", out.getvalue())
+        self.assertFalse(MediaBlob.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("dedup_visit_media", "--confirm", stdout=io.StringIO())
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(
+            set(VisitMedia.objects.values_list("file", flat=True)), {blob.storage_name}
+        )
+        self.assertEqual([default_storage.exists(n) for n in names], [True, False])
@@ -0,0 +1,178 @@
+"""VisitMedia post-upload pipeline: pending -> ready, WebP renditions, streamed probe."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import shutil
+import struct
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from masters.models import Crop, Farmer
+from visits.evidence import build_visit_evidence_preview
+from visits.media_pipeline import (
+    MAX_PROCESSING_ATTEMPTS,
+    STALE_PENDING_AFTER,
+    STALE_PROCESSING_AFTER,
+    process_media,
+    stale_pending_ids,
+)
+from visits.media_validation import probe_isobmff_duration_seconds
+from visits.models import Visit, VisitMedia
+from visits.services.media_service import upload_visit_media
+
+_MEDIA_ROOT = tempfile.mkdtemp(prefix="visit_media_pipeline_")
+
+
+def _jpeg_bytes(width=2400, height=1200) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (40, 120, 60)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+class _CountingReader(io.BytesIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+@override_settings(MEDIA_ROOT=_MEDIA_ROOT)
+class VisitMediaPipelineTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="pipe_emp", password="x")
+        farmer = Farmer.objects.create(name="Pipe Farmer", phone="9000111222")
+        crop = Crop.objects.create(name_en="Paddy", name_ta="Paddy", is_active=True)
+        self.visit = Visit.objects.create(
+            employee=self.user, farmer=farmer, crop=crop, latitude=11.9, longitude=79.3
+        )
+
+    def _upload(self, name="leaf.jpg", content=None, content_type="image/jpeg"):
+        content = content if content is not None else _jpeg_bytes()
+        return upload_visit_media(
+            visit=self.visit,
+            file=SimpleUploadedFile(name, content, content_type=content_type),
+            media_type="image",
+            uploaded_by=self.user,
+        ).media
+
+    def test_upload_is_pending_until_processed_then_has_webp_renditions(self):
+        content = _jpeg_bytes()
+        with mock.patch("visits.tasks.process_visit_media.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                media = self._upload(content=content)
+        self.assertEqual(media.processing_status, VisitMedia.STATUS_PENDING)
+        delay.assert_called_once_with(media.pk)
+
+        processed = process_media(media.pk)
+        self.assertEqual(processed.processing_status, VisitMedia.STATUS_READY)
+        self.assertEqual(processed.content_sha256, hashlib.sha256(content).hexdigest())
+        self.assertIsNotNone(processed.processed_at)
+        with processed.thumbnail.open("rb") as fh, Image.open(fh) as thumb:
+            self.assertEqual(thumb.format, "WEBP")
+            self.assertEqual(max(thumb.size), 320)
+        with processed.preview.open("rb") as fh, Image.open(fh) as preview:
+            self.assertEqual(max(preview.size), 1280)
+
+        # Already processed: second run is a no-op.
+        self.assertIsNone(process_media(media.pk))
+
+        preview = build_visit_evidence_preview(self.visit, request=None)
+        self.assertTrue(preview["evidence_preview"][0]["thumbnail_url"].endswith("_thumb.webp"))
+
+    def test_undecodable_image_is_marked_failed(self):
+        media = self._upload(name="broken.png", content=b"\x89PNG not really", content_type="image/png")
+        processed = process_media(media.pk)
+        self.assertEqual(processed.processing_status, VisitMedia.STATUS_FAILED)
+        self.assertTrue(processed.processing_error)
+        self.assertFalse(processed.thumbnail)
+
+        # Evidence still points at the original file.
+        row = build_visit_evidence_preview(self.visit, request=None)["evidence_preview"][0]
+        self.assertEqual(row["thumbnail_url"], row["file_url"])
+
+    def test_storage_error_is_retried_not_failed(self):
+        media = self._upload(content=_jpeg_bytes(800, 600))
+        with mock.patch(
+            "visits.media_pipeline._render_image_variants", side_effect=OSError("bucket unavailable")
+        ):
+            with self.assertRaises(OSError):
+                process_media(media.pk)
+        media.refresh_from_db()
+        self.assertEqual(media.processing_status, VisitMedia.STATUS_PENDING)
+        self.assertEqual(process_media(media.pk).processing_status, VisitMedia.STATUS_READY)
+
+    def test_claim_of_dead_worker_is_requeued_and_taken_back(self):
+        media = self._upload(content=_jpeg_bytes(640, 480))
+        VisitMedia.objects.filter(pk=media.pk).update(
+            processing_status=VisitMedia.STATUS_PROCESSING, processing_started_at=timezone.now()
+        )
+        self.assertIsNone(process_media(media.pk))
+        self.assertNotIn(media.pk, stale_pending_ids())
+
+        VisitMedia.objects.filter(pk=media.pk).update(
+            processing_started_at=timezone.now() - STALE_PROCESSING_AFTER - timedelta(minutes=1)
+        )
+        self.assertIn(media.pk, stale_pending_ids())
+        self.assertEqual(process_media(media.pk).processing_status, VisitMedia.STATUS_READY)
+
+    def test_always_failing_row_backs_off_then_is_given_up(self):
+        media = self._upload(content=_jpeg_bytes(640, 480))
+        VisitMedia.objects.filter(pk=media.pk).update(
+            uploaded_at=timezone.now() - STALE_PENDING_AFTER - timedelta(minutes=1)
+        )
+        with mock.patch(
+            "visits.media_pipeline._render_image_variants", side_effect=OSError("bucket unavailable")
+        ):
+            for _ in range(2):
+                with self.assertRaises(OSError):
+                    process_media(media.pk)
+        media.refresh_from_db()
+        self.assertEqual(media.processing_attempts, 2)
+        self.assertEqual(media.processing_status, VisitMedia.STATUS_PENDING)
+
+        # Second retry waits twice the base delay since the last attempt.
+        last_attempt = timezone.now() - STALE_PENDING_AFTER - timedelta(minutes=1)
+        VisitMedia.objects.filter(pk=media.pk).update(processing_started_at=last_attempt)
+        self.assertNotIn(media.pk, stale_pending_ids())
+        VisitMedia.objects.filter(pk=media.pk).update(
+            processing_started_at=last_attempt - STALE_PENDING_AFTER
+        )
+        self.assertIn(media.pk, stale_pending_ids())
+
+        VisitMedia.objects.filter(pk=media.pk).update(processing_attempts=MAX_PROCESSING_ATTEMPTS)
+        self.assertIsNone(process_media(media.pk))
+        media.refresh_from_db()
+        self.assertEqual(media.processing_status, VisitMedia.STATUS_FAILED)
+        self.assertIn("Gave up", media.processing_error)
+        self.assertNotIn(media.pk, stale_pending_ids())
+
+    def test_probe_skips_payload_before_moov(self):
+        mdhd = _box(
+            b"mdhd",
+            b"\x00" * 12 + struct.pack(">II", 1000, 42_000) + b"\x55\xc4\x00\x00",
+        )
+        moov = _box(b"moov", _box(b"trak", _box(b"mdia", mdhd)))
+        data = _box(b"ftyp", b"isom\x00\x00\x02\x00") + _box(b"mdat", b"\x00" * 4_000_000) + moov
+        reader = _CountingReader(data)
+        self.assertAlmostEqual(probe_isobmff_duration_seconds(reader), 42.0)
+        self.assertLess(reader.bytes_read, 1024)
@@ -12,6 +12,7 @@ from .views import (
     StartVisitAPI,
     ActiveVisitAPI,
 )
+from .direct_upload_views import DirectUploadFinalizeAPI, DirectUploadIssueAPI
 
 urlpatterns = [
     # --- CRITICAL: Add explicit update route first to prevent shadowing ---
@@ -37,6 +38,16 @@ urlpatterns = [
         VisitAttachmentUploadAPI.as_view(),
         name="visit-attachment-upload",
     ),
+    path(
+        "<int:visit_id>/uploads/",
+        DirectUploadIssueAPI.as_view(),
+        name="visit-direct-upload-issue",
+    ),
+    path(
+        "<int:visit_id>/uploads/<str:client_upload_id>/finalize/",
+        DirectUploadFinalizeAPI.as_view(),
+        name="visit-direct-upload-finalize",
+    ),
     path(
         "<int:file_id>/download/",
         VisitAttachmentDownloadAPI.as_view(),